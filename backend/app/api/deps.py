@@ -7,31 +7,31 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from ..database import get_db
 from ..core.security import verify_token
+from ..core.logger import set_log_user
 from ..models.user import User, UserRole
 
 # HTTPベアラー認証スキーム
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def authenticate_token(token: str, db: Session) -> User:
     """
-    現在のログインユーザーを取得
+    アクセストークンからユーザーを取得
+    
+    Authorizationヘッダーを使えない接続（WebSocket・Server-Sent Events）では
+    クエリパラメータのトークンをこの関数で検証する。
     
     Args:
-        credentials: HTTPベアラー認証情報
+        token: アクセストークン
         db: データベースセッション
         
     Returns:
-        User: 現在のユーザー
+        User: トークンのユーザー
         
     Raises:
         HTTPException: 認証失敗時
     """
     # トークンを検証
-    token = credentials.credentials
     payload = verify_token(token, token_type="access")
     
     if payload is None:
@@ -74,9 +74,32 @@ def get_current_user(
             detail="アカウントが無効化されています"
         )
     
+    # ログにユーザーIDを付与
+    set_log_user(user.id)
+    
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    現在のログインユーザーを取得
+    
+    Args:
+        credentials: HTTPベアラー認証情報
+        db: データベースセッション
+        
+    Returns:
+        User: 現在のユーザー
+        
+    Raises:
+        HTTPException: 認証失敗時
+    """
+    return authenticate_token(credentials.credentials, db)
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
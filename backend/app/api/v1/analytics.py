@@ -0,0 +1,238 @@
+"""
+分析（KPI）API
+
+日次・月次の集計テーブル（company_kpi_rollups / staff_kpi_rollups）だけを読み、予約などのテーブルは検索しない。
+集計は定期ジョブ（refresh_analytics）で差分更新される。需要予測は定期ジョブ（refresh_forecast）が
+1日1回作成したものを返す。
+"""
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from ...database import get_db
+from ...models.company import Company as CompanyModel
+from ...models.kpi_rollup import CompanyKpiRollup, StaffKpiRollup
+from ...models.staff import Staff as StaffModel
+from ...models.user import User
+from ...schemas.analytics import CompanyKpi, KpiTotals, StaffKpi, DemandForecast, ForecastWeek, ForecastDay
+from ...config import settings
+from ...core.responses import model_response
+from ...utils.analytics import WATERMARK_KEY
+from ...utils.date_utils import format_date, local_today
+from ...utils.forecast import forecast_cache, week_start
+from ...utils.state_store import load_state
+from ..deps import get_admin_user
+
+router = APIRouter()
+
+Grain = Literal["day", "month"]
+
+
+def _period_filter(query, model, grain: str, start: Optional[str], end: Optional[str]):
+    """粒度と期間（YYYY/MM または YYYY/MM/DD、両端を含む）で絞り込む"""
+    query = query.filter(model.grain == grain)
+    if grain == "month":
+        # 日付で指定された場合はその月を対象にする
+        start, end = start and start[:7], end and end[:7]
+    elif end and len(end) <= 7:
+        # 月で指定された場合はその月の末日まで含める
+        end = f"{end}/31"
+    if start:
+        query = query.filter(model.period >= start)
+    if end:
+        query = query.filter(model.period <= end)
+    return query
+
+
+def _with_refreshed_at(response, db: Session):
+    """集計の最終更新時刻をヘッダーで返す"""
+    refreshed_at = load_state(db, WATERMARK_KEY)
+    if refreshed_at:
+        response.headers["X-Analytics-Refreshed-At"] = refreshed_at
+    return response
+
+
+@router.get("/analytics/overview", response_model=List[KpiTotals])
+def get_analytics_overview(
+    grain: Grain = Query("month", description="集計の粒度（day / month）"),
+    start: Optional[str] = Query(None, description="開始期間（YYYY/MM または YYYY/MM/DD）"),
+    end: Optional[str] = Query(None, description="終了期間（YYYY/MM または YYYY/MM/DD）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    期間ごとの全企業の集計を取得（管理者のみ）
+
+    Args:
+        grain: 集計の粒度
+        start: 開始期間
+        end: 終了期間
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[KpiTotals]: 期間順の集計（充足率・売上・平均評価など）
+    """
+    rows = _period_filter(db.query(CompanyKpiRollup), CompanyKpiRollup, grain, start, end).all()
+    totals = defaultdict(lambda: {"status_counts": Counter()})
+    for row in rows:
+        total = totals[row.period]
+        for name in (
+            "reservation_count", "slot_count", "filled_slot_count", "assignment_count",
+            "service_minutes", "revenue", "rating_count", "rating_sum",
+        ):
+            total[name] = total.get(name, 0) + (getattr(row, name) or 0)
+        total["status_counts"].update(row.status_counts or {})
+    items = [KpiTotals(period=period, **values) for period, values in sorted(totals.items())]
+    return _with_refreshed_at(model_response(List[KpiTotals], items), db)
+
+
+@router.get("/analytics/companies", response_model=List[CompanyKpi])
+def get_company_analytics(
+    grain: Grain = Query("month", description="集計の粒度（day / month）"),
+    start: Optional[str] = Query(None, description="開始期間（YYYY/MM または YYYY/MM/DD）"),
+    end: Optional[str] = Query(None, description="終了期間（YYYY/MM または YYYY/MM/DD）"),
+    company_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    企業ごと・期間ごとの集計を取得（管理者のみ）
+
+    Args:
+        grain: 集計の粒度
+        start: 開始期間
+        end: 終了期間
+        company_id: 企業ID（省略時は全企業）
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[CompanyKpi]: 期間・企業ID順の集計
+    """
+    query = db.query(CompanyKpiRollup, CompanyModel.name).outerjoin(
+        CompanyModel, CompanyModel.id == CompanyKpiRollup.company_id
+    )
+    query = _period_filter(query, CompanyKpiRollup, grain, start, end)
+    if company_id is not None:
+        query = query.filter(CompanyKpiRollup.company_id == company_id)
+    rows = query.order_by(CompanyKpiRollup.period, CompanyKpiRollup.company_id).all()
+    items = [
+        CompanyKpi.model_validate({
+            **{column.name: getattr(row, column.name) for column in CompanyKpiRollup.__table__.columns},
+            "status_counts": row.status_counts or {},
+            "company_name": company_name,
+        })
+        for row, company_name in rows
+    ]
+    return _with_refreshed_at(model_response(List[CompanyKpi], items), db)
+
+
+@router.get("/analytics/staff", response_model=List[StaffKpi])
+def get_staff_analytics(
+    grain: Grain = Query("month", description="集計の粒度（day / month）"),
+    start: Optional[str] = Query(None, description="開始期間（YYYY/MM または YYYY/MM/DD）"),
+    end: Optional[str] = Query(None, description="終了期間（YYYY/MM または YYYY/MM/DD）"),
+    staff_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    スタッフごと・期間ごとの集計を取得（管理者のみ）
+
+    Args:
+        grain: 集計の粒度
+        start: 開始期間
+        end: 終了期間
+        staff_id: スタッフID（省略時は全スタッフ）
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[StaffKpi]: 期間・スタッフID順の集計（稼働率・給与・平均評価など）
+    """
+    query = db.query(StaffKpiRollup, StaffModel.name).outerjoin(
+        StaffModel, StaffModel.id == StaffKpiRollup.staff_id
+    )
+    query = _period_filter(query, StaffKpiRollup, grain, start, end)
+    if staff_id is not None:
+        query = query.filter(StaffKpiRollup.staff_id == staff_id)
+    rows = query.order_by(StaffKpiRollup.period, StaffKpiRollup.staff_id).all()
+    items = [
+        StaffKpi.model_validate({
+            **{column.name: getattr(row, column.name) for column in StaffKpiRollup.__table__.columns},
+            "staff_name": staff_name,
+        })
+        for row, staff_name in rows
+    ]
+    return _with_refreshed_at(model_response(List[StaffKpi], items), db)
+
+
+@router.get("/analytics/forecast", response_model=DemandForecast)
+def get_demand_forecast(
+    weeks: int = Query(4, ge=1, le=settings.FORECAST_HORIZON_WEEKS, description="今週から予測する週数"),
+    company_id: Optional[int] = Query(None, description="企業ID（省略時は全企業の合計）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    曜日・時間帯ごとのスタッフ需要（予約の枠数）の予測を取得（管理者のみ）
+
+    Args:
+        weeks: 今週から予測する週数
+        company_id: 企業ID（省略時は全企業の合計）
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        DemandForecast: 週・日・時間帯ごとの予測枠数
+
+    Raises:
+        HTTPException: 予測がまだ作成されていない場合（503）
+    """
+    generated_at, result, arrays = forecast_cache.get(db)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="需要予測はまだ作成されていません（定期処理の実行後に利用できます）"
+        )
+
+    bands = result["bands"]
+    horizon = result["horizon_weeks"]
+    if company_id is not None:
+        forecast = arrays.get(str(company_id))
+    elif arrays:
+        forecast = sum(arrays.values())
+    else:
+        forecast = None
+
+    # 予測の作成後に週が変わっていれば、今週の分から返す
+    first_week = date.fromisoformat(result["first_week"])
+    current_week = week_start(local_today())
+    offset = max((current_week - first_week).days // 7, 0)
+    items = []
+    for index in range(offset, min(offset + weeks, horizon)):
+        monday = first_week + timedelta(weeks=index)
+        days = []
+        for weekday in range(7):
+            values = forecast[index, weekday] if forecast is not None else [0.0] * len(bands)
+            slots = {band: round(float(value), 2) for band, value in zip(bands, values)}
+            days.append(ForecastDay(
+                date=format_date(monday + timedelta(days=weekday)),
+                weekday=weekday,
+                slots=slots,
+                total=round(sum(slots.values()), 2),
+            ))
+        items.append(ForecastWeek(
+            week_start=format_date(monday),
+            total=round(sum(day.total for day in days), 2),
+            days=days,
+        ))
+
+    return model_response(DemandForecast, DemandForecast(
+        generated_at=generated_at,
+        history_weeks=result["history_weeks"],
+        company_id=company_id,
+        weeks=items,
+    ))
@@ -1,7 +1,7 @@
 """
 アサイン管理API
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ...database import get_db
@@ -10,8 +10,16 @@ from ...models.reservation import Reservation as ReservationModel
 from ...models.staff import Staff as StaffModel
 from ...models.company import Company as CompanyModel
 from ...models.user import User, UserRole
-from ..deps import get_current_active_user
-from pydantic import BaseModel
+from ..deps import get_current_active_user, get_admin_user
+from ...utils.sync import record_tombstone
+from ...utils.schedule_conflicts import find_conflict, conflict_message, scan_conflicts, load_day_schedules
+from ...utils.assignment_optimizer import plan_assignments, save_plan
+from ...utils.date_utils import parse_date, format_date
+from ...utils.availability import assignment_window
+from ...utils.reservation_status import on_assignment_change
+from ...utils.open_slots import refresh_open_slots
+from ...core.jobs import enqueue
+from pydantic import BaseModel, model_validator
 
 router = APIRouter()
 
@@ -25,6 +33,29 @@ class AssignmentCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class BulkOffer(BaseModel):
+    staff_id: int
+    slot_number: Optional[int] = None  # Noneの場合は全体オファー
+
+
+class BulkAssignmentCreate(BaseModel):
+    """
+    一括オファー
+
+    offers（スタッフと枠の組）か staff_ids（全員に全体オファー）のどちらか一方を指定する。
+    """
+    offers: List[BulkOffer] = []
+    staff_ids: List[int] = []
+    notes: Optional[str] = None
+    notify: bool = True  # スタッフにメールで通知するか
+
+    @model_validator(mode="after")
+    def check_mode(self):
+        if bool(self.offers) == bool(self.staff_ids):
+            raise ValueError("offers と staff_ids のどちらか一方を指定してください")
+        return self
+
+
 class AssignmentUpdate(BaseModel):
     status: Optional[AssignmentStatus] = None
     slot_number: Optional[int] = None  # 枠番号の変更も可能に
@@ -48,6 +79,46 @@ class ReservationSummary(BaseModel):
     class Config:
         from_attributes = True
 
+class ConflictingAssignment(BaseModel):
+    """重なっているアサイン"""
+    assignment_id: int
+    reservation_id: int
+    start_time: str
+    end_time: str
+
+
+class ScheduleConflictResponse(BaseModel):
+    """同じスタッフの確定済みアサインの時間の重なり"""
+    staff_id: int
+    date: str
+    assignments: List[ConflictingAssignment]
+
+
+class PlannedSlot(BaseModel):
+    """自動割り当ての対象枠"""
+    reservation_id: int
+    slot_number: Optional[int] = None
+    start_time: str
+    end_time: str
+
+
+class PlannedAssignmentResponse(PlannedSlot):
+    """自動割り当ての結果"""
+    staff_id: int
+    staff_name: str
+    cost: float
+    assignment_id: Optional[int] = None  # dry_run の場合はNone
+
+
+class OptimizeResponse(BaseModel):
+    """自動割り当てのレスポンス"""
+    date: str
+    dry_run: bool
+    open_slots: int
+    assignments: List[PlannedAssignmentResponse]
+    unassigned: List[PlannedSlot]
+
+
 class AssignmentResponse(BaseModel):
     id: int
     reservation_id: int
@@ -125,6 +196,104 @@ def get_my_assignments(
     return result
 
 
+@router.get("/assignments/conflicts", response_model=List[ScheduleConflictResponse])
+def get_schedule_conflicts(
+    staff_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    確定済みアサインのダブルブッキングを一括チェック（管理者のみ）
+
+    Args:
+        staff_id: 指定した場合、このスタッフのみ確認
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[ScheduleConflictResponse]: 時間が重なっているアサインの組
+    """
+    return [
+        ScheduleConflictResponse(
+            staff_id=conflict.staff_id,
+            date=conflict.date,
+            assignments=[
+                ConflictingAssignment(
+                    assignment_id=item.assignment_id,
+                    reservation_id=item.reservation_id,
+                    start_time=item.start_time,
+                    end_time=item.end_time,
+                )
+                for item in (conflict.first, conflict.second)
+            ],
+        )
+        for conflict in scan_conflicts(db, staff_id)
+    ]
+
+
+@router.post("/assignments/optimize", response_model=OptimizeResponse)
+def optimize_assignments(
+    date: str = Query(..., description="日付（YYYY/MM/DD または YYYY-MM-DD）"),
+    dry_run: bool = Query(False, description="Trueの場合は割り当て案を返すだけで登録しない"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    指定日の空き枠にスタッフを自動で割り当て、オファー（PENDING）を一括作成（管理者のみ）
+
+    稼働可能時間・確定済みのアサイン・評価・前後の事業所との距離からコストを計算し、
+    合計コストが最小になる割り当てを求める。
+
+    Args:
+        date: 日付
+        dry_run: 割り当て案の確認のみ
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        OptimizeResponse: 割り当て結果と割り当てられなかった枠
+    """
+    day = parse_date(date)
+    if day is None:
+        raise HTTPException(status_code=400, detail="日付の形式が不正です（YYYY/MM/DD）")
+
+    plan = plan_assignments(db, day)
+    created = [] if dry_run else save_plan(db, plan, current_user.id)
+
+    staff_ids = {planned.staff_id for planned in plan.assignments}
+    staff_names = dict(
+        db.query(StaffModel.id, StaffModel.name).filter(StaffModel.id.in_(staff_ids)).all()
+    ) if staff_ids else {}
+
+    return OptimizeResponse(
+        date=format_date(day),
+        dry_run=dry_run,
+        open_slots=len(plan.slots),
+        assignments=[
+            PlannedAssignmentResponse(
+                reservation_id=planned.slot.reservation_id,
+                slot_number=planned.slot.slot_number,
+                start_time=planned.slot.start_time,
+                end_time=planned.slot.end_time,
+                staff_id=planned.staff_id,
+                staff_name=staff_names.get(planned.staff_id, "不明"),
+                cost=round(planned.cost, 2),
+                assignment_id=created[index].id if created else None,
+            )
+            for index, planned in enumerate(plan.assignments)
+        ],
+        unassigned=[
+            PlannedSlot(
+                reservation_id=slot.reservation_id,
+                slot_number=slot.slot_number,
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+            )
+            for slot in plan.unassigned
+        ],
+    )
+
+
 @router.get("/assignments/{assignment_id}", response_model=AssignmentResponse)
 def get_assignment_by_id(
     assignment_id: int, 
@@ -296,6 +465,11 @@ def assign_staff_to_reservation(
         if existing:
             raise HTTPException(status_code=400, detail="このスタッフは既にこの予約に応募しています")
     
+    # 同じ日の別の予約で確定済みの時間帯と重なっていないかチェック
+    conflict = find_conflict(db, assignment.staff_id, reservation, assignment.slot_number)
+    if conflict:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict_message(conflict))
+    
     # アサイン作成
     db_assignment = ReservationStaff(
         reservation_id=reservation_id,
@@ -307,6 +481,10 @@ def assign_staff_to_reservation(
     )
     
     db.add(db_assignment)
+    on_assignment_change(
+        db, reservation, assignment.staff_id, None, AssignmentStatus.PENDING, slot_number=assignment.slot_number
+    )
+    refresh_open_slots(db, [reservation_id])
     db.commit()
     db.refresh(db_assignment)
     
@@ -323,6 +501,154 @@ def assign_staff_to_reservation(
     }
 
 
+@router.post("/reservations/{reservation_id}/assignments/bulk", status_code=status.HTTP_201_CREATED)
+def bulk_assign_staff_to_reservation(
+    reservation_id: int,
+    request: BulkAssignmentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    予約の枠を複数のスタッフに一括でオファー（管理者のみ）
+
+    既存のアサイン・スタッフ・確定済みの予定をそれぞれ1回のクエリで読み込んで全件を検証し、
+    1件でも問題があれば何も登録しない。通知メールは1件のジョブとして登録し、ワーカーがまとめて送信する。
+
+    Args:
+        reservation_id: 予約ID
+        request: スタッフと枠の組、または全体オファーするスタッフのリスト
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        作成したアサインのリスト
+    """
+    reservation = db.query(ReservationModel).filter(ReservationModel.id == reservation_id).first()
+    if not reservation:
+        raise HTTPException(status_code=404, detail="予約が見つかりません")
+
+    offers = request.offers or [BulkOffer(staff_id=staff_id) for staff_id in request.staff_ids]
+    time_slots = reservation.time_slots
+    if isinstance(time_slots, str):
+        import json
+        time_slots = json.loads(time_slots)
+    slot_count = len(time_slots or [])
+
+    staff_ids = {offer.staff_id for offer in offers}
+    staff_rows = db.query(StaffModel.id, StaffModel.name, User.email).outerjoin(
+        User, User.id == StaffModel.user_id
+    ).filter(StaffModel.id.in_(staff_ids)).all()
+    staff_by_id = {row.id: row for row in staff_rows}
+
+    # 既存のアサイン（辞退・キャンセル以外）
+    existing = db.query(ReservationStaff.staff_id, ReservationStaff.slot_number).filter(
+        ReservationStaff.reservation_id == reservation_id,
+        ReservationStaff.status != AssignmentStatus.REJECTED,
+        ReservationStaff.status != AssignmentStatus.CANCELLED
+    ).all()
+    taken_slots = {slot_number for _, slot_number in existing if slot_number is not None}
+    applied_staff = {staff_id for staff_id, _ in existing}
+
+    day = parse_date(reservation.reservation_date)
+    schedules = load_day_schedules(db, day, staff_ids) if day else {}
+
+    errors = []
+    requested_slots = set()
+    requested_pairs = set()
+    for offer in offers:
+        if offer.staff_id not in staff_by_id:
+            errors.append(f"スタッフID {offer.staff_id} が見つかりません")
+            continue
+        if (offer.staff_id, offer.slot_number) in requested_pairs:
+            errors.append(f"スタッフID {offer.staff_id} のオファーが重複しています")
+            continue
+        requested_pairs.add((offer.staff_id, offer.slot_number))
+
+        if offer.slot_number is not None:
+            if slot_count == 0:
+                errors.append("この予約には時間枠が設定されていません")
+                continue
+            if offer.slot_number < 1 or offer.slot_number > slot_count:
+                errors.append(f"無効な枠番号です（{offer.slot_number}）。有効範囲: 1-{slot_count}")
+                continue
+            if offer.slot_number in taken_slots or offer.slot_number in requested_slots:
+                errors.append(f"枠{offer.slot_number}は既にオファーを送信済みです")
+                continue
+            requested_slots.add(offer.slot_number)
+        elif offer.staff_id in applied_staff:
+            errors.append(f"{staff_by_id[offer.staff_id].name}は既にこの予約に応募しています")
+            continue
+
+        schedule = schedules.get(offer.staff_id)
+        if schedule is not None:
+            start, end = assignment_window(
+                time_slots, offer.slot_number, reservation.start_time, reservation.end_time
+            )
+            conflict = schedule.find_overlap(start, end)
+            if conflict:
+                errors.append(f"{staff_by_id[offer.staff_id].name}: {conflict_message(conflict)}")
+
+    if errors:
+        raise HTTPException(status_code=400, detail=" / ".join(errors))
+
+    db_assignments = [
+        ReservationStaff(
+            reservation_id=reservation_id,
+            staff_id=offer.staff_id,
+            assigned_by=current_user.id,
+            slot_number=offer.slot_number,
+            notes=request.notes,
+            status=AssignmentStatus.PENDING
+        )
+        for offer in offers
+    ]
+    db.add_all(db_assignments)
+    on_assignment_change(db, reservation, None, None, AssignmentStatus.PENDING, count=len(db_assignments))
+    refresh_open_slots(db, [reservation_id])
+
+    if request.notify:
+        company = db.query(CompanyModel).filter(CompanyModel.id == reservation.company_id).first()
+        notifications = []
+        for offer in offers:
+            staff = staff_by_id[offer.staff_id]
+            if not staff.email:
+                continue
+            slot = time_slots[offer.slot_number - 1] if offer.slot_number else {}
+            notifications.append([staff.email, {
+                "staff_name": staff.name,
+                "reservation_id": reservation.id,
+                "company_name": company.name if company else "",
+                "reservation_date": reservation.reservation_date,
+                "start_time": slot.get("start_time", reservation.start_time),
+                "end_time": slot.get("end_time", reservation.end_time),
+                "office_address": reservation.office_address,
+            }])
+        if notifications:
+            # アサインと同じトランザクションで登録し、送信はワーカーに任せる
+            enqueue(db, "email.staff_assigned", {"notifications": notifications}, created_by=current_user.id)
+
+    db.flush()
+    created_ids = [db_assignment.id for db_assignment in db_assignments]
+    db.commit()
+    # コミットで失効した属性（assigned_at など）を1回のクエリで再読み込み
+    db.query(ReservationStaff).filter(ReservationStaff.id.in_(created_ids)).all()
+
+    return [
+        {
+            "id": db_assignment.id,
+            "reservation_id": db_assignment.reservation_id,
+            "staff_id": db_assignment.staff_id,
+            "staff_name": staff_by_id[db_assignment.staff_id].name,
+            "status": db_assignment.status.value,
+            "assigned_by": db_assignment.assigned_by,
+            "assigned_at": db_assignment.assigned_at.isoformat() if db_assignment.assigned_at else None,
+            "slot_number": db_assignment.slot_number,
+            "notes": db_assignment.notes,
+        }
+        for db_assignment in db_assignments
+    ]
+
+
 @router.put("/assignments/{assignment_id}")
 def update_assignment(
     assignment_id: int,
@@ -336,9 +662,37 @@ def update_assignment(
     
     # 更新
     update_data = assignment.model_dump(exclude_unset=True)
+    
+    # 確定にする（確定済みの枠を変える）場合は、同じ日の別の確定済みアサインと時間が重なっていないかチェック
+    changes_schedule = "status" in update_data or "slot_number" in update_data
+    if changes_schedule and update_data.get("status", db_assignment.status) == AssignmentStatus.CONFIRMED:
+        conflict = find_conflict(
+            db, db_assignment.staff_id, db_assignment.reservation,
+            update_data.get("slot_number", db_assignment.slot_number),
+            exclude_assignment_id=db_assignment.id,
+        )
+        if conflict:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict_message(conflict))
+    old_status, old_slot_number = db_assignment.status, db_assignment.slot_number
     for field, value in update_data.items():
         setattr(db_assignment, field, value)
     
+    if db_assignment.slot_number != old_slot_number:
+        # 予約全体のアサインかどうかが変わる場合があるため、変更前のアサインを外して変更後を加える
+        on_assignment_change(
+            db, db_assignment.reservation, db_assignment.staff_id, old_status, None, slot_number=old_slot_number
+        )
+        on_assignment_change(
+            db, db_assignment.reservation, db_assignment.staff_id, None, db_assignment.status,
+            slot_number=db_assignment.slot_number,
+        )
+    elif db_assignment.status != old_status:
+        on_assignment_change(
+            db, db_assignment.reservation, db_assignment.staff_id, old_status, db_assignment.status,
+            slot_number=db_assignment.slot_number,
+        )
+    if changes_schedule:
+        refresh_open_slots(db, [db_assignment.reservation_id])
     db.commit()
     db.refresh(db_assignment)
     
@@ -364,7 +718,17 @@ def delete_assignment(assignment_id: int, db: Session = Depends(get_db)):
     if not db_assignment:
         raise HTTPException(status_code=404, detail="アサインが見つかりません")
     
+    record_tombstone(
+        db, ReservationStaff.__tablename__, assignment_id,
+        company_id=db_assignment.reservation.company_id if db_assignment.reservation else None,
+        staff_id=db_assignment.staff_id,
+    )
+    on_assignment_change(
+        db, db_assignment.reservation, db_assignment.staff_id, db_assignment.status, None,
+        slot_number=db_assignment.slot_number,
+    )
     db.delete(db_assignment)
+    refresh_open_slots(db, [db_assignment.reservation_id])
     db.commit()
     
     return None
@@ -469,8 +833,20 @@ def accept_assignment(
             detail=f"受託可能な状態ではありません。現在のステータス: {assignment.status.value}"
         )
     
+    # オファー後に別の予約を受託している場合があるため、受託時にも重なりをチェック
+    conflict = find_conflict(
+        db, staff.id, assignment.reservation, assignment.slot_number, exclude_assignment_id=assignment.id
+    )
+    if conflict:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict_message(conflict))
+    
     # ステータスをCONFIRMEDに変更
     assignment.status = AssignmentStatus.CONFIRMED
+    on_assignment_change(
+        db, assignment.reservation, staff.id, AssignmentStatus.PENDING, AssignmentStatus.CONFIRMED,
+        slot_number=assignment.slot_number,
+    )
+    refresh_open_slots(db, [assignment.reservation_id])
     db.commit()
     db.refresh(assignment)
     
@@ -526,6 +902,11 @@ def reject_assignment(
     
     # ステータスをREJECTEDに変更
     assignment.status = AssignmentStatus.REJECTED
+    on_assignment_change(
+        db, assignment.reservation, staff.id, AssignmentStatus.PENDING, AssignmentStatus.REJECTED,
+        slot_number=assignment.slot_number,
+    )
+    refresh_open_slots(db, [assignment.reservation_id])
     # 辞退理由をnotesに追加
     if reject_request.rejection_reason:
         existing_notes = assignment.notes or ""
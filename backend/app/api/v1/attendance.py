@@ -11,6 +11,8 @@ from ...models.attendance import Attendance as AttendanceModel, AttendanceStatus
 from ...models.staff import Staff as StaffModel
 from ...models.reservation import Reservation as ReservationModel
 from ...models.user import User, UserRole
+from ...utils.reservation_status import on_assignment_change
+from ...utils.care_records import add_care_record
 from ..deps import get_current_active_user, get_admin_user, get_staff_user
 
 router = APIRouter()
@@ -189,7 +191,7 @@ def complete_report(
 ):
     """完了報告"""
     from ...models.employee import Employee as EmployeeModel
-    from ...models.reservation_staff import ReservationStaff
+    from ...models.reservation_staff import ReservationStaff, AssignmentStatus
     
     # 勤怠レコードを取得
     attendance = db.query(AttendanceModel).filter(
@@ -204,7 +206,20 @@ def complete_report(
     attendance.completed_at = datetime.now()
     attendance.status = AttendanceStatus.COMPLETED
     
-    # 特記事項を社員のconcernsとmedical_recordに反映
+    # アサインを完了報告済みにして、予約のステータスに反映
+    if attendance.assignment_id:
+        completed_assignment = db.query(ReservationStaff).filter(
+            ReservationStaff.id == attendance.assignment_id
+        ).first()
+        if completed_assignment and completed_assignment.status == AssignmentStatus.CONFIRMED:
+            completed_assignment.status = AssignmentStatus.COMPLETED
+            on_assignment_change(
+                db, completed_assignment.reservation, completed_assignment.staff_id,
+                AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED,
+                slot_number=completed_assignment.slot_number,
+            )
+    
+    # 特記事項を社員のケア記録に追加
     if attendance.assignment_id and request.report:
         # アサイン情報から予約とスロット番号を取得
         assignment = db.query(ReservationStaff).filter(
@@ -226,20 +241,11 @@ def complete_report(
                     employee = db.query(EmployeeModel).filter(EmployeeModel.id == employee_id).first()
                     
                     if employee:
-                        # 特記事項をconcernsとmedical_recordに反映（既存の内容に追記）
-                        report_text = request.report.strip()
-                        if report_text:
-                            # concernsに追記（既存があれば改行で追加）
-                            if employee.concerns:
-                                employee.concerns = f"{employee.concerns}\n\n{report_text}"
-                            else:
-                                employee.concerns = report_text
-                            
-                            # medical_recordにも同じ内容を追記
-                            if employee.medical_record:
-                                employee.medical_record = f"{employee.medical_record}\n\n{report_text}"
-                            else:
-                                employee.medical_record = report_text
+                        # 特記事項を社員のケア記録として追加（社員の行には追記しない）
+                        add_care_record(
+                            db, employee.id, request.report,
+                            attendance_id=attendance.id, staff_id=attendance.staff_id,
+                        )
     
     db.commit()
     db.refresh(attendance)
@@ -0,0 +1,200 @@
+"""
+スタッフ稼働可能時間API
+
+/staff/available は staff.py の /staff/{staff_id} より先に登録する必要があるため、
+main.py ではこのルーターを staff のルーターより前に登録している。
+"""
+from datetime import date as date_type
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+from ...database import get_db
+from ...models.staff import Staff as StaffModel
+from ...models.staff_availability import StaffAvailability, StaffAvailabilityException
+from ...models.user import User, UserRole
+from ...schemas.staff import Staff
+from ...schemas.availability import (
+    AvailabilityWindow, AvailabilityException, AvailabilityExceptionCreate, StaffAvailabilityResponse,
+)
+from ...utils.availability import find_available_staff
+from ...utils.date_utils import parse_date, format_date, time_to_minutes
+from ..deps import get_current_active_user, get_admin_user
+
+router = APIRouter()
+
+
+def _get_staff_for_update(db: Session, staff_id: int, current_user: User) -> StaffModel:
+    """スタッフを取得（管理者または本人のみ）"""
+    staff = db.query(StaffModel).filter(StaffModel.id == staff_id).first()
+    if staff is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Staff with id {staff_id} not found"
+        )
+    if current_user.role != UserRole.ADMIN and staff.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="このスタッフの稼働可能時間を操作する権限がありません"
+        )
+    return staff
+
+
+@router.get("/staff/available", response_model=List[Staff])
+def get_available_staff(
+    date: str = Query(..., description="日付（YYYY/MM/DD または YYYY-MM-DD）"),
+    start: str = Query(..., description="開始時刻（HH:MM）"),
+    end: str = Query(..., description="終了時刻（HH:MM）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    指定日時に稼働できるスタッフを取得（管理者のみ）
+
+    毎週の稼働時間帯と日付指定の例外から稼働可能で、
+    同じ時間帯に確定済みのアサインがないスタッフを返す。
+
+    Args:
+        date: 日付
+        start: 開始時刻
+        end: 終了時刻
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[Staff]: 稼働できるスタッフのリスト
+    """
+    day = parse_date(date)
+    if day is None:
+        raise HTTPException(status_code=400, detail="日付の形式が不正です（YYYY/MM/DD）")
+    try:
+        if time_to_minutes(start) >= time_to_minutes(end):
+            raise HTTPException(status_code=400, detail="終了時刻は開始時刻より後にしてください")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="時刻の形式が不正です（HH:MM）")
+
+    return find_available_staff(db, day, start, end)
+
+
+@router.get("/staff/{staff_id}/availability", response_model=StaffAvailabilityResponse)
+def get_staff_availability(
+    staff_id: int,
+    include_past: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    スタッフの稼働可能時間を取得
+
+    Args:
+        staff_id: スタッフID
+        include_past: 過去の日付の例外も含めるか
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        StaffAvailabilityResponse: 毎週の稼働時間帯と日付指定の例外
+    """
+    weekly = db.query(StaffAvailability).filter(
+        StaffAvailability.staff_id == staff_id
+    ).order_by(StaffAvailability.weekday, StaffAvailability.start_time).all()
+
+    query = db.query(StaffAvailabilityException).filter(StaffAvailabilityException.staff_id == staff_id)
+    if not include_past:
+        # 日付は YYYY/MM/DD に正規化して保存しているため文字列で比較できる
+        query = query.filter(StaffAvailabilityException.date >= format_date(date_type.today()))
+    exceptions = query.order_by(StaffAvailabilityException.date).all()
+
+    return StaffAvailabilityResponse(staff_id=staff_id, weekly=weekly, exceptions=exceptions)
+
+
+@router.put("/staff/{staff_id}/availability/weekly", response_model=List[AvailabilityWindow])
+def replace_weekly_availability(
+    staff_id: int,
+    windows: List[AvailabilityWindow],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    毎週の稼働時間帯を置き換え（管理者または本人のみ）
+
+    Args:
+        staff_id: スタッフID
+        windows: 稼働時間帯のリスト（空の場合は全て削除）
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        List[AvailabilityWindow]: 登録後の稼働時間帯
+    """
+    _get_staff_for_update(db, staff_id, current_user)
+
+    db.query(StaffAvailability).filter(StaffAvailability.staff_id == staff_id).delete(synchronize_session=False)
+    db.add_all([
+        StaffAvailability(staff_id=staff_id, weekday=w.weekday, start_time=w.start_time, end_time=w.end_time)
+        for w in windows
+    ])
+    db.commit()
+
+    return sorted(windows, key=lambda w: (w.weekday, w.start_time))
+
+
+@router.post(
+    "/staff/{staff_id}/availability/exceptions",
+    response_model=AvailabilityException,
+    status_code=status.HTTP_201_CREATED
+)
+def create_availability_exception(
+    staff_id: int,
+    exception: AvailabilityExceptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    日付指定の稼働可否（休み・追加の稼働）を登録（管理者または本人のみ）
+
+    Args:
+        staff_id: スタッフID
+        exception: 日付・稼働可否・時間帯（省略時は終日）
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        AvailabilityException: 登録した例外
+    """
+    _get_staff_for_update(db, staff_id, current_user)
+
+    db_exception = StaffAvailabilityException(staff_id=staff_id, **exception.model_dump())
+    db.add(db_exception)
+    db.commit()
+    db.refresh(db_exception)
+    return db_exception
+
+
+@router.delete("/staff/{staff_id}/availability/exceptions/{exception_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_availability_exception(
+    staff_id: int,
+    exception_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    日付指定の稼働可否を削除（管理者または本人のみ）
+
+    Args:
+        staff_id: スタッフID
+        exception_id: 例外ID
+        db: データベースセッション
+        current_user: 現在のユーザー
+    """
+    _get_staff_for_update(db, staff_id, current_user)
+
+    db_exception = db.query(StaffAvailabilityException).filter(
+        StaffAvailabilityException.id == exception_id,
+        StaffAvailabilityException.staff_id == staff_id
+    ).first()
+    if db_exception is None:
+        raise HTTPException(status_code=404, detail="稼働可否の登録が見つかりません")
+
+    db.delete(db_exception)
+    db.commit()
+    return None
@@ -1,22 +1,28 @@
 """
 企業管理API
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from ...database import get_db
 from ...models.company import Company as CompanyModel
+from ...models.kpi_rollup import CompanyKpiRollup
 from ...models.user import User
 from ...schemas.company import Company, CompanyCreate, CompanyUpdate
 from ..deps import get_current_active_user, get_admin_user
+from ...core.etag import resource_etag, collection_etag, not_modified
+from ...core.responses import model_response
+from ...utils.batch import parse_ids, batch_response
 from pydantic import BaseModel
 
 router = APIRouter()
 
 
-@router.get("/companies")
+@router.get("/companies", response_model=List[Company], response_model_by_alias=False)
 def get_companies(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
@@ -27,7 +33,11 @@ def get_companies(
     """
     企業一覧を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
     Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         skip: スキップする件数
         limit: 取得する最大件数
         search: 検索キーワード（企業名）
@@ -48,47 +58,71 @@ def get_companies(
     if is_active is not None:
         query = query.filter(CompanyModel.is_active == is_active)
     
-    companies_models = query.offset(skip).limit(limit).all()
-    result = []
-    for company_model in companies_models:
-        company_dict = {
-            "company_name": company_model.name,
-            "representative_name": company_model.representative,
-            "office_name": company_model.office_name,
-            "industry": company_model.industry,
-            "plan": company_model.plan,
-            "contract_start_date": company_model.contract_start_date or "",
-            "contract_end_date": company_model.contract_end_date,
-            "usage_count": company_model.usage_count,
-            "address": company_model.address,
-            "phone": company_model.phone,
-            "email": company_model.email,
-            "contact_person": company_model.contact_person,
-            "contact_phone": company_model.contact_phone,
-            "contact_email": company_model.contact_email,
-            "notes": company_model.notes,
-            "usage_status": "active",  # デフォルト値
-            "line_id": None,  # デフォルト値
-            "id": company_model.id,
-            "user_id": company_model.user_id,
-            "created_at": company_model.created_at,
-            "updated_at": company_model.updated_at,
-        }
-        result.append(company_dict)
-    return result
+    etag = collection_etag("companies", query, CompanyModel, {
+        "skip": skip, "limit": limit, "search": search, "is_active": is_active,
+    })
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    companies = query.offset(skip).limit(limit).all()
+    # 一覧はエイリアスではなくフィールド名（company_name など）で返す
+    return model_response(List[Company], companies, by_alias=False, response=response)
+
+
+# /companies/{company_id} より先に登録する（"batch" がIDとして解釈されないように）
+@router.get("/companies/batch", response_model=Dict[int, Optional[Company]], response_model_by_alias=False)
+def get_companies_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="企業ID（カンマ区切り、最大100件）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    複数の企業を1回のクエリで取得
+    
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
+    Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
+        ids: 企業ID（カンマ区切り）
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        Dict[int, Optional[Company]]: {企業ID: 企業}（見つからないIDは null）
+    """
+    id_list = parse_ids(ids)
+    query = db.query(CompanyModel).filter(CompanyModel.id.in_(id_list))
+    
+    etag = collection_etag("companies_batch", query, CompanyModel, {"ids": id_list})
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    # 一覧と同じくフィールド名で返す
+    return batch_response(Company, query.all(), id_list, by_alias=False, response=response)
 
 
 @router.get("/companies/{company_id}", response_model=Company)
 def get_company(
     company_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     企業詳細を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
     Args:
         company_id: 企業ID
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         db: データベースセッション
         current_user: 現在のユーザー
         
@@ -104,8 +138,11 @@ def get_company(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Company with id {company_id} not found"
         )
-    company = Company.model_validate(db_company)
-    return company.model_dump(by_alias=True)
+    
+    cached = not_modified(request, response, resource_etag("company", company_id, db_company.updated_at, db_company.version))
+    if cached:
+        return cached
+    return model_response(Company, db_company, response=response)
 
 
 @router.post("/companies", response_model=Company, status_code=status.HTTP_201_CREATED)
@@ -131,8 +168,7 @@ def create_company(
     db.add(db_company)
     db.commit()
     db.refresh(db_company)
-    company = Company.model_validate(db_company)
-    return company.model_dump(by_alias=True)
+    return model_response(Company, db_company, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/companies/{company_id}", response_model=Company)
@@ -171,8 +207,7 @@ def update_company(
     
     db.commit()
     db.refresh(db_company)
-    company = Company.model_validate(db_company)
-    return company.model_dump(by_alias=True)
+    return model_response(Company, db_company)
 
 
 @router.delete("/companies/{company_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -199,6 +234,8 @@ def delete_company(
             detail=f"Company with id {company_id} not found"
         )
     
+    # 集計の行も削除する（外部キーのCASCADEがない既存のDBやSQLiteでも残らないように明示的に削除）
+    db.query(CompanyKpiRollup).filter(CompanyKpiRollup.company_id == company_id).delete(synchronize_session=False)
     db.delete(db_company)
     db.commit()
     return None
@@ -264,5 +301,5 @@ def renew_company_contract(
     
     db.commit()
     db.refresh(db_company)
-    return db_company
+    return model_response(Company, db_company)
 
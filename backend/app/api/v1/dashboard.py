@@ -0,0 +1,394 @@
+"""
+ダッシュボードAPI（ロールごとのホーム画面の集約）
+
+ホーム画面が必要とするデータ（ユーザー情報・予約・アサイン・給与・評価など）を1回のリクエストで返す。
+
+    - 認証済みユーザー（と企業・スタッフ）は依存関係で1回だけ解決し、各セクションで共有する
+    - 互いに依存しないクエリは、それぞれ接続プールから取得した別のセッションで
+      スレッドプール上で並行に実行する（応答時間は各クエリの合計ではなく最も遅いクエリで決まる）
+"""
+import asyncio
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from ...database import get_db, SessionLocal
+from ...models.company import Company as CompanyModel
+from ...models.employee import Employee as EmployeeModel
+from ...models.reservation import Reservation as ReservationModel, ReservationStatus
+from ...models.reservation_staff import ReservationStaff, AssignmentStatus
+from ...models.staff import Staff as StaffModel
+from ...models.user import User, UserRole
+from ...schemas.company import Company
+from ...schemas.rating import RatingSummary
+from ...schemas.staff import Staff
+from ...schemas.user import User as UserSchema
+from ...core.responses import model_response
+from ...utils.date_utils import local_today, format_date
+from ..deps import get_admin_user, get_company_user, get_staff_user
+from .assignments import AssignmentResponse, ReservationSummary
+from .ratings import calculate_rating_summary
+from .staff import StaffEarningsResponse, calculate_staff_earnings
+
+router = APIRouter()
+
+# 一覧セクションの件数
+RECENT_LIMIT = 5
+
+
+class DashboardReservation(ReservationSummary):
+    """ダッシュボードの予約（確定スタッフ名付き）"""
+    slot_count: Optional[int] = None
+    slots_filled: Optional[int] = None
+    staff_names: List[str] = []
+
+
+class StaffDashboard(BaseModel):
+    """スタッフのホーム画面"""
+    user: UserSchema
+    staff: Staff
+    earnings: StaffEarningsResponse  # 今月の給与
+    rating_summary: RatingSummary
+    pending_offers: List[AssignmentResponse]  # 回答待ちのオファー（日付順）
+    upcoming_shifts: List[AssignmentResponse]  # 今日以降の確定シフト（日付順）
+
+
+class CompanyDashboard(BaseModel):
+    """企業のホーム画面"""
+    user: UserSchema
+    company: Company
+    upcoming_reservations: List[DashboardReservation]  # 今日以降の予約（日付順、最大5件）
+    reservation_counts: Dict[str, int]  # ステータスごとの予約数
+    active_employee_count: int
+    unrated_assignment_count: int  # 確定・完了済みで評価していないアサイン数
+
+
+class AdminDashboard(BaseModel):
+    """管理者のホーム画面"""
+    user: UserSchema
+    company_count: int
+    available_staff_count: int
+    month_reservation_count: int  # 今月の予約数
+    recruiting_reservation_count: int  # 募集中・アサイン中の予約数
+    pending_offer_count: int  # スタッフの回答待ちのオファー数
+    recent_reservations: List[DashboardReservation]  # 最近登録された予約（最大5件）
+
+
+def _in_session(section: Callable[..., Any], *args) -> Any:
+    """セクションを専用のセッションで実行（ORMオブジェクトはセッション内でスキーマに変換する）"""
+    db = SessionLocal()
+    try:
+        return section(db, *args)
+    finally:
+        db.close()
+
+
+async def _gather(request_db: Session, **sections) -> Dict[str, Any]:
+    """
+    独立したセクションを並行に実行
+
+    認証などで使ったリクエストのセッションは、先に閉じて接続をプールに返す
+    （保持したままセクションの接続を待つと、同時リクエストが多いときにプールが枯渇する）。
+    リクエストのセッションで読み込んだオブジェクトは、呼び出す前にスキーマに変換しておくこと。
+
+    Args:
+        request_db: リクエストのセッション（get_db）
+        sections: 名前=(関数, 引数...) の組。関数は最初の引数にセッションを受け取る
+
+    Returns:
+        {名前: 結果}
+    """
+    request_db.close()
+    results = await asyncio.gather(*(
+        run_in_threadpool(_in_session, section, *args) for section, *args in sections.values()
+    ))
+    return dict(zip(sections, results))
+
+
+def _user_payload(user: User, company_id: Optional[int] = None) -> UserSchema:
+    """auth/me と同じユーザー情報"""
+    payload = UserSchema.model_validate(user)
+    payload.company_id = company_id
+    return payload
+
+
+def _reservation_summaries(db: Session, reservations: List[ReservationModel]) -> List[DashboardReservation]:
+    """予約に企業名・確定スタッフ名を付ける（企業・アサインはそれぞれ1回のクエリで取得）"""
+    ids = [reservation.id for reservation in reservations]
+    company_names = dict(db.query(CompanyModel.id, CompanyModel.name).filter(
+        CompanyModel.id.in_({reservation.company_id for reservation in reservations})
+    ).all()) if reservations else {}
+    staff_names: Dict[int, List[str]] = {}
+    if ids:
+        rows = db.query(ReservationStaff.reservation_id, StaffModel.name).join(
+            StaffModel, StaffModel.id == ReservationStaff.staff_id
+        ).filter(
+            ReservationStaff.reservation_id.in_(ids),
+            ReservationStaff.status.in_([AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED]),
+        ).order_by(ReservationStaff.slot_number, ReservationStaff.id).all()
+        for reservation_id, name in rows:
+            staff_names.setdefault(reservation_id, []).append(name)
+    return [
+        DashboardReservation(
+            id=reservation.id,
+            company_name=company_names.get(reservation.company_id),
+            office_name=reservation.office_name,
+            office_address=reservation.office_address,
+            reservation_date=reservation.reservation_date,
+            start_time=reservation.start_time,
+            end_time=reservation.end_time,
+            service_duration=reservation.service_duration,
+            hourly_rate=reservation.hourly_rate,
+            time_slots=reservation.time_slots,
+            status=reservation.status.value if reservation.status else None,
+            slot_count=reservation.slot_count,
+            slots_filled=reservation.slots_filled,
+            staff_names=staff_names.get(reservation.id, []),
+        )
+        for reservation in reservations
+    ]
+
+
+# ---------------------------------------------------------------------------
+# スタッフ
+# ---------------------------------------------------------------------------
+
+def _current_staff(
+    current_user: User = Depends(get_staff_user),
+    db: Session = Depends(get_db)
+) -> StaffModel:
+    """ログイン中のユーザーのスタッフ情報"""
+    staff = db.query(StaffModel).filter(StaffModel.user_id == current_user.id).first()
+    if staff is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="スタッフ情報が見つかりません"
+        )
+    return staff
+
+
+def _staff_earnings(db: Session, staff_id: int, today: date) -> StaffEarningsResponse:
+    staff = db.query(StaffModel).filter(StaffModel.id == staff_id).one()
+    return calculate_staff_earnings(db, staff, today.month, today.year)
+
+
+def _staff_rating_summary(db: Session, staff_id: int) -> RatingSummary:
+    staff = db.query(StaffModel).filter(StaffModel.id == staff_id).one()
+    return calculate_rating_summary(db, staff)
+
+
+def _staff_assignments(
+    db: Session, staff_id: int, staff_name: str, assignment_status: AssignmentStatus, date_from: Optional[str]
+) -> List[AssignmentResponse]:
+    """スタッフのアサインを予約・企業と結合して1回のクエリで取得（予約日・開始時刻順）"""
+    query = db.query(ReservationStaff, ReservationModel, CompanyModel.name).join(
+        ReservationModel, ReservationModel.id == ReservationStaff.reservation_id
+    ).outerjoin(
+        CompanyModel, CompanyModel.id == ReservationModel.company_id
+    ).filter(
+        ReservationStaff.staff_id == staff_id,
+        ReservationStaff.status == assignment_status,
+    )
+    if date_from:
+        query = query.filter(ReservationModel.reservation_date >= date_from)
+    rows = query.order_by(ReservationModel.reservation_date, ReservationModel.start_time, ReservationStaff.id).all()
+    return [
+        AssignmentResponse(
+            id=assignment.id,
+            reservation_id=assignment.reservation_id,
+            staff_id=assignment.staff_id,
+            staff_name=staff_name,
+            slot_number=assignment.slot_number,
+            status=assignment.status,
+            assigned_by=assignment.assigned_by,
+            assigned_at=assignment.assigned_at.isoformat() if assignment.assigned_at else None,
+            notes=assignment.notes,
+            reservation=ReservationSummary(
+                id=reservation.id,
+                company_name=company_name,
+                office_name=reservation.office_name,
+                office_address=reservation.office_address,
+                reservation_date=reservation.reservation_date,
+                start_time=reservation.start_time,
+                end_time=reservation.end_time,
+                hourly_rate=reservation.hourly_rate,
+                time_slots=reservation.time_slots,
+            ),
+        )
+        for assignment, reservation, company_name in rows
+    ]
+
+
+@router.get("/dashboard/staff", response_model=StaffDashboard)
+async def get_staff_dashboard(
+    current_user: User = Depends(get_staff_user),
+    staff: StaffModel = Depends(_current_staff),
+    db: Session = Depends(get_db)
+):
+    """
+    スタッフのホーム画面のデータを取得
+
+    Args:
+        current_user: 現在のユーザー
+        staff: ログイン中のユーザーのスタッフ情報
+        db: データベースセッション（セクションの実行前に閉じる）
+
+    Returns:
+        StaffDashboard: 今月の給与・評価サマリー・回答待ちのオファー・今後のシフト
+    """
+    today = local_today()
+    user_payload = _user_payload(current_user)
+    staff_payload = Staff.model_validate(staff)
+    sections = await _gather(
+        db,
+        earnings=(_staff_earnings, staff_payload.id, today),
+        rating_summary=(_staff_rating_summary, staff_payload.id),
+        pending_offers=(_staff_assignments, staff_payload.id, staff_payload.name, AssignmentStatus.PENDING, None),
+        upcoming_shifts=(
+            _staff_assignments, staff_payload.id, staff_payload.name, AssignmentStatus.CONFIRMED, format_date(today),
+        ),
+    )
+    return model_response(StaffDashboard, StaffDashboard(user=user_payload, staff=staff_payload, **sections))
+
+
+# ---------------------------------------------------------------------------
+# 企業
+# ---------------------------------------------------------------------------
+
+def _current_company(
+    company_id: Optional[int] = Query(None, description="企業ID（管理者のみ指定）"),
+    current_user: User = Depends(get_company_user),
+    db: Session = Depends(get_db)
+) -> CompanyModel:
+    """ログイン中の企業ユーザーの企業（管理者は company_id で指定）"""
+    query = db.query(CompanyModel)
+    if current_user.role == UserRole.COMPANY:
+        company = query.filter(CompanyModel.user_id == current_user.id).first()
+    elif company_id is not None:
+        company = query.filter(CompanyModel.id == company_id).first()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="管理者は company_id を指定してください"
+        )
+    if company is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="企業情報が見つかりません"
+        )
+    return company
+
+
+def _company_upcoming_reservations(db: Session, company_id: int, date_from: str) -> List[DashboardReservation]:
+    reservations = db.query(ReservationModel).filter(
+        ReservationModel.company_id == company_id,
+        ReservationModel.reservation_date >= date_from,
+        ReservationModel.status != ReservationStatus.CANCELLED,
+    ).order_by(ReservationModel.reservation_date, ReservationModel.start_time).limit(RECENT_LIMIT).all()
+    return _reservation_summaries(db, reservations)
+
+
+def _company_reservation_counts(db: Session, company_id: int) -> Dict[str, int]:
+    rows = db.query(ReservationModel.status, func.count(ReservationModel.id)).filter(
+        ReservationModel.company_id == company_id
+    ).group_by(ReservationModel.status).all()
+    return {reservation_status.value: count for reservation_status, count in rows}
+
+
+def _company_active_employee_count(db: Session, company_id: int) -> int:
+    return db.query(func.count(EmployeeModel.id)).filter(
+        EmployeeModel.company_id == company_id, EmployeeModel.is_active.is_(True)
+    ).scalar() or 0
+
+
+def _company_unrated_assignment_count(db: Session, company_id: int) -> int:
+    # 予約の確定・完了アサイン数と評価済みアサイン数（アサイン変更時に更新されるカウンタ）の差
+    return int(db.query(
+        func.coalesce(func.sum(ReservationModel.confirmed_count - ReservationModel.rated_count), 0)
+    ).filter(
+        ReservationModel.company_id == company_id,
+        ReservationModel.status != ReservationStatus.CANCELLED,
+    ).scalar() or 0)
+
+
+@router.get("/dashboard/company", response_model=CompanyDashboard)
+async def get_company_dashboard(
+    current_user: User = Depends(get_company_user),
+    company: CompanyModel = Depends(_current_company),
+    db: Session = Depends(get_db)
+):
+    """
+    企業のホーム画面のデータを取得
+
+    Args:
+        current_user: 現在のユーザー
+        company: ログイン中の企業ユーザーの企業（管理者は company_id で指定）
+        db: データベースセッション（セクションの実行前に閉じる）
+
+    Returns:
+        CompanyDashboard: 今後の予約・ステータスごとの予約数・社員数・未評価のアサイン数
+    """
+    company_payload = Company.model_validate(company)
+    user_payload = _user_payload(
+        current_user, company_payload.id if current_user.role == UserRole.COMPANY else None
+    )
+    sections = await _gather(
+        db,
+        upcoming_reservations=(_company_upcoming_reservations, company_payload.id, format_date(local_today())),
+        reservation_counts=(_company_reservation_counts, company_payload.id),
+        active_employee_count=(_company_active_employee_count, company_payload.id),
+        unrated_assignment_count=(_company_unrated_assignment_count, company_payload.id),
+    )
+    return model_response(CompanyDashboard, CompanyDashboard(user=user_payload, company=company_payload, **sections))
+
+
+# ---------------------------------------------------------------------------
+# 管理者
+# ---------------------------------------------------------------------------
+
+def _count(db: Session, column, *criteria) -> int:
+    return db.query(func.count(column)).filter(*criteria).scalar() or 0
+
+
+def _recent_reservations(db: Session) -> List[DashboardReservation]:
+    reservations = db.query(ReservationModel).order_by(
+        ReservationModel.created_at.desc(), ReservationModel.id.desc()
+    ).limit(RECENT_LIMIT).all()
+    return _reservation_summaries(db, reservations)
+
+
+@router.get("/dashboard/admin", response_model=AdminDashboard)
+async def get_admin_dashboard(
+    current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    管理者のホーム画面のデータを取得
+
+    Args:
+        current_user: 現在のユーザー（管理者権限必須）
+        db: データベースセッション（セクションの実行前に閉じる）
+
+    Returns:
+        AdminDashboard: 企業数・稼働可能なスタッフ数・予約数・回答待ちのオファー数・最近の予約
+    """
+    month_prefix = local_today().strftime("%Y/%m/")
+    user_payload = _user_payload(current_user)
+    sections = await _gather(
+        db,
+        company_count=(_count, CompanyModel.id),
+        available_staff_count=(_count, StaffModel.id, StaffModel.is_available.is_(True)),
+        month_reservation_count=(
+            _count, ReservationModel.id, ReservationModel.reservation_date.startswith(month_prefix),
+        ),
+        recruiting_reservation_count=(
+            _count, ReservationModel.id,
+            ReservationModel.status.in_([ReservationStatus.RECRUITING, ReservationStatus.ASSIGNING]),
+        ),
+        pending_offer_count=(_count, ReservationStaff.id, ReservationStaff.status == AssignmentStatus.PENDING),
+        recent_reservations=(_recent_reservations,),
+    )
+    return model_response(AdminDashboard, AdminDashboard(user=user_payload, **sections))
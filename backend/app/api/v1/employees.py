@@ -1,44 +1,87 @@
 """
 企業の社員管理API
 """
+import base64
+import json
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from ...database import get_db
 from ...models.employee import Employee as EmployeeModel
+from ...models.employee_care_record import EmployeeCareRecord
 from ...models.company import Company as CompanyModel
-from ...models.user import User
-from ...schemas.employee import Employee, EmployeeCreate, EmployeeUpdate
-from ..deps import get_current_active_user, get_admin_user, get_company_user
+from ...models.staff import Staff as StaffModel
+from ...models.user import User, UserRole
+from ...schemas.employee import Employee, EmployeeCreate, EmployeeUpdate, EmployeeListItem
+from ...schemas.care_record import CareRecordList, CareRecordSummary
+from ...utils.care_records import latest_care_records, served_employee_ids, summarize
+from ...utils.roster import touch_reservations_of_employee
+from ...core.responses import model_response
+from ...utils.projection import parse_fields, project_query, projection_schema, projected_response
+from ..deps import get_current_active_user, get_admin_user, get_company_user, get_staff_user
 
 router = APIRouter()
 
 
-@router.get("/employees", response_model=List[Employee])
+def _encode_cursor(record: EmployeeCareRecord) -> str:
+    raw = json.dumps([record.created_at.isoformat(), record.id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """カーソルをデコード（不正な場合は400）"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, last_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルが不正です。cursor を指定せずに再取得してください"
+        )
+
+
+@router.get("/employees", response_model=List[EmployeeListItem])
 def get_employees(
     skip: int = 0,
     limit: int = 100,
     company_id: Optional[int] = Query(None, description="企業IDでフィルター"),
     search: Optional[str] = Query(None, description="名前または部署で検索"),
     is_active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り、例: name,department,is_active）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     社員一覧を取得
     
+    お悩み・カルテの全文は含めず、最新のケア記録の要約のみ返す（全文は社員詳細・ケア記録の履歴で取得）。
+    ケア記録の要約は管理者・スタッフにのみ返し、企業ユーザーには含めない。
+    fields を指定した場合は、その項目（と id）のカラムだけを読み込んで返す
+    
     Args:
         skip: スキップする件数
         limit: 取得する最大件数
         company_id: 企業IDでフィルター
         search: 検索キーワード（名前または部署）
         is_active: アクティブ状態でフィルター
+        fields: 返す項目（カンマ区切り）
         db: データベースセッション
         current_user: 現在のユーザー
         
     Returns:
-        List[Employee]: 社員のリスト
+        List[EmployeeListItem]: 社員のリスト
     """
+    names = parse_fields(fields, EmployeeListItem)
+    # ケア記録（/employees/{id}/care-records）と同じく、要約も管理者・スタッフにのみ返す
+    can_view_care_records = current_user.role in (UserRole.ADMIN, UserRole.STAFF)
+    if names is not None and "latest_care_record" in names and not can_view_care_records:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ケア記録を参照する権限がありません"
+        )
     query = db.query(EmployeeModel)
     
     # 企業ユーザーの場合は自社の社員のみ表示
@@ -61,8 +104,29 @@ def get_employees(
     if is_active is not None:
         query = query.filter(EmployeeModel.is_active == is_active)
     
-    employees = query.offset(skip).limit(limit).all()
-    return employees
+    employees = project_query(query, EmployeeModel, names).offset(skip).limit(limit).all()
+    
+    item_schema = EmployeeListItem if names is None else projection_schema(EmployeeListItem, names)
+    latest = {}
+    if can_view_care_records and (names is None or "latest_care_record" in names):
+        visible_ids = [employee.id for employee in employees]
+        if current_user.role == UserRole.STAFF:
+            # スタッフには担当したことのある社員の要約のみ返す（履歴APIと同じ条件）
+            staff = db.query(StaffModel).filter(StaffModel.user_id == current_user.id).first()
+            visible_ids = list(served_employee_ids(db, staff.id, visible_ids)) if staff else []
+        latest = latest_care_records(db, visible_ids)
+    items = []
+    for employee in employees:
+        item = item_schema.model_validate(employee)
+        record = latest.get(employee.id)
+        if record is not None:
+            item.latest_care_record = CareRecordSummary(
+                id=record.id, staff_name=record.staff_name, summary=summarize(record.body), created_at=record.created_at
+            )
+        items.append(item)
+    if names is not None:
+        return projected_response(items, EmployeeListItem, names)
+    return model_response(List[EmployeeListItem], items)
 
 
 @router.get("/employees/{employee_id}", response_model=Employee)
@@ -94,6 +158,67 @@ def get_employee(
     return employee
 
 
+@router.get("/employees/{employee_id}/care-records", response_model=CareRecordList)
+def get_care_records(
+    employee_id: int,
+    cursor: Optional[str] = Query(None, description="前回の next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_staff_user)
+):
+    """
+    社員のケア記録（完了報告の特記事項）を新しい順に取得
+
+    管理者と、この社員が名簿に載っている予約に確定・完了のアサインがあるスタッフのみ参照できる。
+    
+    Args:
+        employee_id: 社員ID
+        cursor: ページングのカーソル
+        limit: 1回に取得する最大件数
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者またはスタッフ権限必須）
+        
+    Returns:
+        CareRecordList: ケア記録と次のページのカーソル
+        
+    Raises:
+        HTTPException: 社員が見つからない場合、または担当したことのない社員の場合
+    """
+    exists = db.query(EmployeeModel.id).filter(EmployeeModel.id == employee_id).first()
+    if exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Employee with id {employee_id} not found"
+        )
+    if current_user.role != UserRole.ADMIN:
+        staff = db.query(StaffModel).filter(StaffModel.user_id == current_user.id).first()
+        if staff is None or employee_id not in served_employee_ids(db, staff.id, [employee_id]):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="ケア記録を参照する権限がありません"
+            )
+    
+    query = db.query(EmployeeCareRecord).filter(EmployeeCareRecord.employee_id == employee_id)
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            EmployeeCareRecord.created_at < created_at,
+            and_(EmployeeCareRecord.created_at == created_at, EmployeeCareRecord.id < last_id),
+        ))
+    
+    records = query.order_by(
+        EmployeeCareRecord.created_at.desc(), EmployeeCareRecord.id.desc()
+    ).limit(limit + 1).all()
+    has_more = len(records) > limit
+    records = records[:limit]
+    
+    return CareRecordList(
+        items=records,
+        next_cursor=_encode_cursor(records[-1]) if has_more else None,
+        has_more=has_more,
+    )
+
+
 @router.post("/employees", response_model=Employee, status_code=status.HTTP_201_CREATED)
 def create_employee(
     employee: EmployeeCreate,
@@ -202,6 +327,9 @@ def update_employee(
     
     # 更新
     update_data = employee.model_dump(exclude_unset=True)
+    if update_data.get('name', db_employee.name) != db_employee.name:
+        # 名簿にいる予約の employee_names が変わる
+        touch_reservations_of_employee(db, db_employee.id)
     for field, value in update_data.items():
         setattr(db_employee, field, value)
     
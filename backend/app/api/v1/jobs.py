@@ -0,0 +1,82 @@
+"""
+バックグラウンドジョブAPI
+
+ジョブは jobs テーブルに登録され、別プロセスのワーカー（python -m app.worker）が実行する（core/jobs.py）。
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from ...core.jobs import JOB_TYPES, enqueue
+from ...database import get_db
+from ...models.job import Job
+from ...models.user import User, UserRole
+from ...schemas.job import JobCreate, JobStatus
+from ..deps import get_admin_user, get_current_active_user
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    request: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    ジョブを登録（管理者のみ）
+
+    例: {"type": "consistency.verify", "payload": {"apply": true, "incremental": true}}
+
+    Args:
+        request: ジョブの種類・引数・実行予定時刻
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        JobStatus: 登録したジョブ（GET /jobs/{job_id} で状態を確認する）
+
+    Raises:
+        HTTPException: 登録されていない種類の場合
+    """
+    if request.type not in JOB_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"未登録のジョブの種類です（登録済み: {', '.join(JOB_TYPES)}）"
+        )
+    job = enqueue(db, request.type, request.payload, run_at=request.run_at, created_by=current_user.id)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    ジョブの状態を取得（管理者、またはジョブを登録したユーザー）
+
+    Args:
+        job_id: ジョブID
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        JobStatus: ジョブの状態・試行回数・結果
+
+    Raises:
+        HTTPException: ジョブが見つからない、権限がない場合
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ジョブID {job_id} が見つかりません"
+        )
+    if current_user.role != UserRole.ADMIN and job.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="このジョブを参照する権限がありません"
+        )
+    return job
@@ -0,0 +1,135 @@
+"""
+スタッフ向けの空き枠（求人）API
+
+open_slots テーブル（utils/open_slots.py で維持）を (date, start_minute, area) の索引で
+範囲検索し、(日付, 開始時刻, ID) の順にカーソルでページングする。
+"""
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from ...database import get_db
+from ...models.open_slot import OpenSlotIndex
+from ...models.user import User
+from ...schemas.open_slot import OpenJobList
+from ...core.etag import collection_etag, not_modified
+from ...utils.date_utils import parse_date, format_date, local_today, time_to_minutes
+from ..deps import get_current_active_user
+
+router = APIRouter()
+
+
+def _encode_cursor(row: OpenSlotIndex) -> str:
+    raw = json.dumps([row.date, row.start_minute, row.id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int, int]:
+    """カーソルをデコード（不正な場合は400）"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        day, start_minute, last_id = json.loads(raw)
+        return str(day), int(start_minute), int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルが不正です。cursor を指定せずに再取得してください"
+        )
+
+
+def _parse_minutes(value: Optional[str], name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return time_to_minutes(value)
+    except (ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail=f"{name} の形式が不正です（HH:MM）")
+
+
+@router.get("/jobs/open", response_model=OpenJobList)
+def list_open_jobs(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = Query(None, description="開始日（YYYY/MM/DD、省略時は今日）"),
+    date_to: Optional[str] = Query(None, description="終了日（YYYY/MM/DD）"),
+    start: Optional[str] = Query(None, description="この時刻以降に始まる枠（HH:MM）"),
+    end: Optional[str] = Query(None, description="この時刻までに終わる枠（HH:MM）"),
+    area: Optional[str] = Query(None, description="都道府県（例: 東京都）"),
+    city: Optional[str] = Query(None, description="市区町村（例: 千代田区）"),
+    cursor: Optional[str] = Query(None, description="前回の next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    スタッフ募集中の空き枠を日付・開始時刻順に取得
+    
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
+    Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
+        date_from: 開始日
+        date_to: 終了日
+        start: 枠の開始時刻の下限
+        end: 枠の終了時刻の上限
+        area: 都道府県
+        city: 市区町村
+        cursor: ページングのカーソル
+        limit: 1回に取得する最大件数
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        OpenJobList: 空き枠と次のページのカーソル
+    """
+    first_day = parse_date(date_from) if date_from else local_today()
+    last_day = parse_date(date_to) if date_to else None
+    if first_day is None or (date_to and last_day is None):
+        raise HTTPException(status_code=400, detail="日付の形式が不正です（YYYY/MM/DD）")
+    start_minute = _parse_minutes(start, "start")
+    end_minute = _parse_minutes(end, "end")
+    
+    query = db.query(OpenSlotIndex).filter(OpenSlotIndex.date >= format_date(first_day))
+    if last_day:
+        query = query.filter(OpenSlotIndex.date <= format_date(last_day))
+    if start_minute is not None:
+        query = query.filter(OpenSlotIndex.start_minute >= start_minute)
+    if end_minute is not None:
+        query = query.filter(OpenSlotIndex.end_minute <= end_minute)
+    if area:
+        query = query.filter(OpenSlotIndex.area == area)
+    if city:
+        query = query.filter(OpenSlotIndex.city == city)
+    
+    params = {
+        "date_from": format_date(first_day), "date_to": date_to, "start": start, "end": end,
+        "area": area, "city": city, "cursor": cursor, "limit": limit,
+    }
+    cached = not_modified(request, response, collection_etag("open_jobs", query, OpenSlotIndex, params))
+    if cached:
+        return cached
+    
+    if cursor:
+        day, last_start, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            OpenSlotIndex.date > day,
+            and_(OpenSlotIndex.date == day, or_(
+                OpenSlotIndex.start_minute > last_start,
+                and_(OpenSlotIndex.start_minute == last_start, OpenSlotIndex.id > last_id),
+            )),
+        ))
+    
+    rows = query.order_by(
+        OpenSlotIndex.date, OpenSlotIndex.start_minute, OpenSlotIndex.id
+    ).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return OpenJobList(
+        items=rows,
+        next_cursor=_encode_cursor(rows[-1]) if has_more else None,
+        has_more=has_more,
+    )
@@ -0,0 +1,42 @@
+"""
+給与計算API
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from ...database import get_db
+from ...models.user import User
+from ...schemas.payroll import Payslip
+from ...core.responses import model_response
+from ...utils.batch import parse_ids
+from ...utils.date_utils import local_today
+from ...utils.payroll import calculate_payroll
+from ..deps import get_admin_user
+
+router = APIRouter()
+
+
+@router.get("/payroll", response_model=List[Payslip])
+def get_payroll(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="年（省略時は今月）"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="月（省略時は今月）"),
+    ids: Optional[str] = Query(None, description="スタッフID（カンマ区切り、省略時は全スタッフ）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    月次の給与明細を全スタッフ分まとめて取得（管理者のみ）
+
+    Args:
+        year: 年
+        month: 月
+        ids: スタッフID（カンマ区切り）
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        List[Payslip]: スタッフIDの順の給与明細（アサインがないスタッフは0円）
+    """
+    today = local_today()
+    payslips = calculate_payroll(db, year or today.year, month or today.month, parse_ids(ids))
+    return model_response(List[Payslip], payslips)
@@ -1,14 +1,17 @@
 """
 評価API
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from typing import List
 from ...database import get_db
 from ...models.rating import Rating as RatingModel
+from ...models.reservation import Reservation as ReservationModel
 from ...models.staff import Staff as StaffModel
 from ...schemas.rating import Rating, RatingCreate, RatingUpdate, RatingSummary
+from ...utils.reservation_status import on_rating_change
+from ...utils.batch import parse_pairs
 
 router = APIRouter()
 
@@ -33,6 +36,36 @@ def get_ratings(
     return ratings
 
 
+# /ratings/{rating_id} より先に登録する（"check" がIDとして解釈されないように）
+@router.get("/ratings/check")
+def check_ratings_exist(
+    pairs: str = Query(..., description="予約ID:スタッフIDのカンマ区切り（例: 12:3,12:4、最大100件）"),
+    db: Session = Depends(get_db)
+):
+    """
+    複数の予約・スタッフの組み合わせについて、評価が既に存在するかを1回のクエリでチェック
+    
+    Returns:
+        dict: {"予約ID:スタッフID": {"exists": bool, "rating_id": int | None}}
+    """
+    parsed = parse_pairs(pairs)
+    found = {}
+    if parsed:
+        rows = db.query(RatingModel.id, RatingModel.reservation_id, RatingModel.staff_id).filter(
+            tuple_(RatingModel.reservation_id, RatingModel.staff_id).in_(parsed)
+        ).order_by(RatingModel.id).all()
+        for row in rows:
+            found.setdefault((row.reservation_id, row.staff_id), row.id)
+    
+    return {
+        f"{reservation_id}:{staff_id}": {
+            "exists": (reservation_id, staff_id) in found,
+            "rating_id": found.get((reservation_id, staff_id)),
+        }
+        for reservation_id, staff_id in parsed
+    }
+
+
 @router.get("/ratings/{rating_id}", response_model=Rating)
 def get_rating(rating_id: int, db: Session = Depends(get_db)):
     """指定された評価を取得"""
@@ -101,6 +134,10 @@ def create_rating(rating: RatingCreate, db: Session = Depends(get_db)):
     
     db_rating = RatingModel(**rating_data)
     db.add(db_rating)
+    
+    # 予約のステータスに反映（全スタッフの評価が揃えば評価済み）
+    reservation = db.query(ReservationModel).filter(ReservationModel.id == rating.reservation_id).first()
+    on_rating_change(db, reservation, rating.staff_id, 1)
     db.commit()
     db.refresh(db_rating)
     
@@ -172,8 +209,10 @@ def delete_rating(rating_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="評価が見つかりません")
     
     staff_id = db_rating.staff_id
+    reservation = db.query(ReservationModel).filter(ReservationModel.id == db_rating.reservation_id).first()
     
     db.delete(db_rating)
+    on_rating_change(db, reservation, staff_id, -1)
     db.commit()
     
     # スタッフの平均評価を更新
@@ -194,6 +233,31 @@ def delete_rating(rating_id: int, db: Session = Depends(get_db)):
     return None
 
 
+def calculate_rating_summary(db: Session, staff: StaffModel) -> RatingSummary:
+    """スタッフの評価サマリーを1回の集計クエリで計算"""
+    avg_rating, rating_count, avg_cleanliness, avg_responsiveness, avg_satisfaction, avg_punctuality, avg_skill = db.query(
+        func.avg(RatingModel.average_rating),
+        func.count(RatingModel.id),
+        func.avg(RatingModel.cleanliness),
+        func.avg(RatingModel.responsiveness),
+        func.avg(RatingModel.satisfaction),
+        func.avg(RatingModel.punctuality),
+        func.avg(RatingModel.skill),
+    ).filter(RatingModel.staff_id == staff.id).one()
+    
+    return RatingSummary(
+        staff_id=staff.id,
+        staff_name=staff.name,
+        average_rating=float(avg_rating) if avg_rating else 0.0,
+        rating_count=rating_count or 0,
+        avg_cleanliness=float(avg_cleanliness or 0.0),
+        avg_responsiveness=float(avg_responsiveness or 0.0),
+        avg_satisfaction=float(avg_satisfaction or 0.0),
+        avg_punctuality=float(avg_punctuality or 0.0),
+        avg_skill=float(avg_skill or 0.0)
+    )
+
+
 @router.get("/staff/{staff_id}/rating-summary", response_model=RatingSummary)
 def get_staff_rating_summary(staff_id: int, db: Session = Depends(get_db)):
     """スタッフの評価サマリーを取得"""
@@ -201,50 +265,5 @@ def get_staff_rating_summary(staff_id: int, db: Session = Depends(get_db)):
     if not staff:
         raise HTTPException(status_code=404, detail="スタッフが見つかりません")
     
-    # 平均評価
-    avg_rating = db.query(
-        func.avg(RatingModel.average_rating)
-    ).filter(
-        RatingModel.staff_id == staff_id
-    ).scalar()
-    
-    # 評価数
-    rating_count = db.query(
-        func.count(RatingModel.id)
-    ).filter(
-        RatingModel.staff_id == staff_id
-    ).scalar()
-    
-    # 項目別平均
-    avg_cleanliness = db.query(
-        func.avg(RatingModel.cleanliness)
-    ).filter(RatingModel.staff_id == staff_id).scalar() or 0.0
-    
-    avg_responsiveness = db.query(
-        func.avg(RatingModel.responsiveness)
-    ).filter(RatingModel.staff_id == staff_id).scalar() or 0.0
-    
-    avg_satisfaction = db.query(
-        func.avg(RatingModel.satisfaction)
-    ).filter(RatingModel.staff_id == staff_id).scalar() or 0.0
-    
-    avg_punctuality = db.query(
-        func.avg(RatingModel.punctuality)
-    ).filter(RatingModel.staff_id == staff_id).scalar() or 0.0
-    
-    avg_skill = db.query(
-        func.avg(RatingModel.skill)
-    ).filter(RatingModel.staff_id == staff_id).scalar() or 0.0
-    
-    return RatingSummary(
-        staff_id=staff_id,
-        staff_name=staff.name,
-        average_rating=float(avg_rating) if avg_rating else 0.0,
-        rating_count=rating_count or 0,
-        avg_cleanliness=float(avg_cleanliness),
-        avg_responsiveness=float(avg_responsiveness),
-        avg_satisfaction=float(avg_satisfaction),
-        avg_punctuality=float(avg_punctuality),
-        avg_skill=float(avg_skill)
-    )
+    return calculate_rating_summary(db, staff)
 
@@ -0,0 +1,173 @@
+"""
+リアルタイム通知API（WebSocket / Server-Sent Events）
+
+予約の枠の空き状況の変化をポーリングなしで受け取るためのエンドポイント。
+ブラウザの EventSource / WebSocket はAuthorizationヘッダーを付けられないため、
+アクセストークンはクエリパラメータ token で渡す。
+
+接続直後に現在の状態（type=snapshot）を送り、以降は変化した枠だけ（type=slots）を送る。
+type=resync を受け取った場合は配信が追いつかなかったため、クライアントは再取得すること。
+"""
+import json
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from ...config import settings
+from ...core.realtime import broker, reservation_channel, company_channel
+from ...database import SessionLocal
+from ...models.company import Company as CompanyModel
+from ...models.reservation import Reservation as ReservationModel
+from ...models.user import UserRole
+from ...utils.slot_events import slot_snapshot
+from ..deps import authenticate_token
+
+router = APIRouter()
+
+
+def _authorize_reservation(token: str, reservation_id: int) -> dict:
+    """
+    予約チャネルの購読権限を確認し、現在の枠の状態を返す
+
+    配信中にDB接続を保持しないよう、セッションはこの関数内で閉じる。
+    """
+    db = SessionLocal()
+    try:
+        authenticate_token(token, db)
+        reservation = db.query(ReservationModel).filter(ReservationModel.id == reservation_id).first()
+        if reservation is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"予約ID {reservation_id} が見つかりません"
+            )
+        return slot_snapshot(reservation)
+    finally:
+        db.close()
+
+
+def _authorize_company(token: str, company_id: int) -> None:
+    """企業チャネルの購読権限を確認（管理者または自社の企業ユーザーのみ）"""
+    db = SessionLocal()
+    try:
+        user = authenticate_token(token, db)
+        if user.role == UserRole.ADMIN:
+            return
+        company = db.query(CompanyModel).filter(CompanyModel.user_id == user.id).first()
+        if user.role != UserRole.COMPANY or not company or company.id != company_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この企業の通知を受け取る権限がありません"
+            )
+    finally:
+        db.close()
+
+
+def _format_event(message: dict) -> str:
+    """Server-Sent Events の1イベント分の文字列"""
+    return f"event: {message['type']}\ndata: {json.dumps(message, ensure_ascii=False)}\n\n"
+
+
+async def _event_stream(request: Request, channel: str, initial: Optional[dict]):
+    """購読したチャネルのメッセージをSSE形式で送り続ける"""
+    subscription = broker.subscribe(channel)
+    try:
+        if initial is not None:
+            yield _format_event(initial)
+        while not await request.is_disconnected():
+            message = await subscription.get(timeout=settings.REALTIME_KEEPALIVE_SECONDS)
+            if message is None:
+                # プロキシによる切断を防ぐためのコメント行
+                yield ": keepalive\n\n"
+                continue
+            yield _format_event(message)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _sse_response(request: Request, channel: str, initial: Optional[dict]) -> StreamingResponse:
+    return StreamingResponse(
+        _event_stream(request, channel, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _websocket_stream(websocket: WebSocket, channel: str, initial: Optional[dict]) -> None:
+    """購読したチャネルのメッセージをWebSocketで送り続ける（クライアントからの受信は不要）"""
+    subscription = broker.subscribe(channel)
+    try:
+        if initial is not None:
+            await websocket.send_json(initial)
+        while True:
+            message = await subscription.get(timeout=settings.REALTIME_KEEPALIVE_SECONDS)
+            await websocket.send_json(message if message is not None else {"type": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/realtime/reservations/{reservation_id}/events")
+async def reservation_events(
+    request: Request,
+    reservation_id: int,
+    token: str = Query(..., description="アクセストークン")
+):
+    """
+    予約の枠の空き状況をServer-Sent Eventsで配信
+
+    Args:
+        request: リクエスト（切断の検知用）
+        reservation_id: 予約ID
+        token: アクセストークン
+
+    Returns:
+        StreamingResponse: text/event-stream
+    """
+    snapshot = await run_in_threadpool(_authorize_reservation, token, reservation_id)
+    return _sse_response(request, reservation_channel(reservation_id), snapshot)
+
+
+@router.get("/realtime/companies/{company_id}/events")
+async def company_events(
+    request: Request,
+    company_id: int,
+    token: str = Query(..., description="アクセストークン")
+):
+    """
+    企業の全予約の枠の空き状況をServer-Sent Eventsで配信（管理者または自社のみ）
+
+    Args:
+        request: リクエスト（切断の検知用）
+        company_id: 企業ID
+        token: アクセストークン
+
+    Returns:
+        StreamingResponse: text/event-stream
+    """
+    await run_in_threadpool(_authorize_company, token, company_id)
+    return _sse_response(request, company_channel(company_id), None)
+
+
+@router.websocket("/realtime/reservations/{reservation_id}/ws")
+async def reservation_websocket(websocket: WebSocket, reservation_id: int, token: str = Query(...)):
+    """予約の枠の空き状況をWebSocketで配信"""
+    try:
+        snapshot = await run_in_threadpool(_authorize_reservation, token, reservation_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+    await websocket.accept()
+    await _websocket_stream(websocket, reservation_channel(reservation_id), snapshot)
+
+
+@router.websocket("/realtime/companies/{company_id}/ws")
+async def company_websocket(websocket: WebSocket, company_id: int, token: str = Query(...)):
+    """企業の全予約の枠の空き状況をWebSocketで配信（管理者または自社のみ）"""
+    try:
+        await run_in_threadpool(_authorize_company, token, company_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+    await websocket.accept()
+    await _websocket_stream(websocket, company_channel(company_id), None)
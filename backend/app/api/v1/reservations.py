@@ -1,11 +1,13 @@
 """
 予約管理API
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.orm.attributes import flag_modified
-from typing import List, Optional
+from typing import Dict, List, Optional
 import json
+import logging
 from ...database import get_db
 from ...models.reservation import Reservation as ReservationModel, ReservationStatus
 from ...models.employee import Employee as EmployeeModel
@@ -14,34 +16,60 @@ from ...models.reservation_staff import ReservationStaff as ReservationStaffMode
 from ...models.user import User
 from ...schemas.reservation import Reservation, ReservationCreate, ReservationUpdate, EmployeeRegistration, SlotEmployeeAssignment
 from ..deps import get_current_active_user, get_company_user
+from ...core.etag import resource_etag, collection_etag, not_modified
+from ...core.responses import model_response
 from ...utils.time_slot_calculator import calculate_time_slots, calculate_total_minutes
+from ...utils.sync import record_tombstone
+from ...utils.slot_events import slot_states, publish_slot_changes, publish_slot_snapshot
+from ...utils.reservation_status import refresh_status
+from ...utils.open_slots import refresh_open_slots, remove_open_slots
+from ...utils.waitlist import promote_next, publish_promotion, promotion_email_data, remove_waitlist
+from ...utils.roster import (
+    split_names, resolve_employee, is_registered, roster_count, add_to_roster,
+    assign_roster_slot, release_roster_slot, sync_roster_names,
+)
+from ...core.jobs import enqueue
+from ...utils.analytics import record_touched_day
+from ...utils.projection import parse_fields, project_query, projection_schema, projected_response
+from ...utils.batch import parse_ids, batch_response
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.get("/reservations", response_model=List[Reservation])
 def get_reservations(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[ReservationStatus] = None,
     company_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り、例: office_name,reservation_date,status）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     予約一覧を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す。
+    fields を指定した場合は、その項目（と id）のカラムだけを読み込んで返す
+    
     Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         skip: スキップする件数
         limit: 取得する最大件数
         status: ステータスフィルター
         company_id: 企業IDフィルター
+        fields: 返す項目（カンマ区切り）
         db: データベースセッション
         current_user: 現在のユーザー
         
     Returns:
         List[Reservation]: 予約のリスト
     """
+    names = parse_fields(fields, Reservation)
     query = db.query(ReservationModel)
     
     # フィルター
@@ -51,21 +79,81 @@ def get_reservations(
     if company_id:
         query = query.filter(ReservationModel.company_id == company_id)
     
-    reservations = query.offset(skip).limit(limit).all()
-    return reservations
+    etag = collection_etag("reservations", query, ReservationModel, {
+        "skip": skip, "limit": limit, "status": status, "company_id": company_id, "fields": names,
+    })
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    # employee_names は名簿から生成するため、指定された場合だけ名簿を読み込む
+    query = project_query(query, ReservationModel, names, {
+        "employee_names": selectinload(ReservationModel.roster),
+    })
+    if names is None:
+        return model_response(List[Reservation], query.offset(skip).limit(limit).all(), response=response)
+    return projected_response(query.offset(skip).limit(limit).all(), Reservation, names, response)
+
+
+# /reservations/{reservation_id} より先に登録する（"batch" がIDとして解釈されないように）
+@router.get("/reservations/batch", response_model=Dict[int, Optional[Reservation]])
+def get_reservations_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="予約ID（カンマ区切り、最大100件）"),
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り、例: office_name,reservation_date,status）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    複数の予約を1回のクエリで取得
+    
+    If-None-Match が現在のETagと一致する場合は 304 を返す。
+    
+    Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
+        ids: 予約ID（カンマ区切り）
+        fields: 返す項目（カンマ区切り）
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        Dict[int, Optional[Reservation]]: {予約ID: 予約}（見つからないIDは null）
+    """
+    names = parse_fields(fields, Reservation)
+    id_list = parse_ids(ids)
+    query = db.query(ReservationModel).filter(ReservationModel.id.in_(id_list))
+    
+    etag = collection_etag("reservations_batch", query, ReservationModel, {"ids": id_list, "fields": names})
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    query = project_query(query, ReservationModel, names, {
+        "employee_names": selectinload(ReservationModel.roster),
+    })
+    schema = Reservation if names is None else projection_schema(Reservation, names)
+    return batch_response(schema, query.all(), id_list, response=response)
 
 
 @router.get("/reservations/{reservation_id}", response_model=Reservation)
 def get_reservation(
     reservation_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     予約詳細を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
     Args:
         reservation_id: 予約ID
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         db: データベースセッション
         current_user: 現在のユーザー
         
@@ -75,16 +163,25 @@ def get_reservation(
     Raises:
         HTTPException: 予約が見つからない場合
     """
-    reservation = db.query(ReservationModel).filter(
+    # 本体（time_slotsなど）を読み込む前に更新日時・バージョンだけでETagを判定する
+    current = db.query(ReservationModel.updated_at, ReservationModel.version).filter(
         ReservationModel.id == reservation_id
     ).first()
     
-    if reservation is None:
+    if current is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Reservation with id {reservation_id} not found"
         )
-    return reservation
+    
+    cached = not_modified(request, response, resource_etag("reservation", reservation_id, current.updated_at, current.version))
+    if cached:
+        return cached
+    
+    reservation = db.query(ReservationModel).filter(
+        ReservationModel.id == reservation_id
+    ).first()
+    return model_response(Reservation, reservation, response=response)
 
 
 @router.post("/reservations", response_model=Reservation, status_code=status.HTTP_201_CREATED)
@@ -138,7 +235,7 @@ def create_reservation(
             )
         
         # 計算結果をモデルに反映
-        reservation_data = reservation.model_dump()
+        reservation_data = reservation.model_dump(exclude={'employee_names'})
         reservation_data['total_duration'] = total_duration
         reservation_data['slot_count'] = slot_result['slot_count']
         reservation_data['time_slots'] = slot_result['slots']
@@ -147,9 +244,13 @@ def create_reservation(
         db_reservation = ReservationModel(**reservation_data)
     else:
         # 時間枠情報がない場合は、従来通りの作成
-        db_reservation = ReservationModel(**reservation.model_dump())
+        db_reservation = ReservationModel(**reservation.model_dump(exclude={'employee_names'}))
     
     db.add(db_reservation)
+    db.flush()
+    # 社員名は名簿（reservation_employees）に登録する
+    sync_roster_names(db, db_reservation, split_names(reservation.employee_names))
+    refresh_open_slots(db, [db_reservation.id])
     db.commit()
     db.refresh(db_reservation)
     return db_reservation
@@ -187,8 +288,10 @@ def update_reservation(
             detail=f"Reservation with id {reservation_id} not found"
         )
     
-    # 更新データを取得
+    # 更新データを取得（社員名は名簿に反映するため別に扱う）
     update_data = reservation.model_dump(exclude_unset=True)
+    employee_names_given = 'employee_names' in update_data
+    employee_names = update_data.pop('employee_names', None)
     
     # 時間枠の再計算が必要かチェック
     needs_recalculation = (
@@ -233,12 +336,29 @@ def update_reservation(
         if 'slots_filled' not in update_data:
             update_data['slots_filled'] = db_reservation.slots_filled
     
+    # 予約日・企業が変わる場合、変更前の日の集計も作り直す
+    if (
+        update_data.get('reservation_date', db_reservation.reservation_date) != db_reservation.reservation_date
+        or update_data.get('company_id', db_reservation.company_id) != db_reservation.company_id
+    ):
+        record_touched_day(db, db_reservation.reservation_date)
+    
     # 更新
     for key, value in update_data.items():
         setattr(db_reservation, key, value)
+    if employee_names_given:
+        sync_roster_names(db, db_reservation, split_names(employee_names))
+    
+    # 枠数が変わると確定に必要な人数も変わるため、ステータスを再判定
+    if 'time_slots' in update_data and 'status' not in update_data:
+        refresh_status(db_reservation)
+    refresh_open_slots(db, [reservation_id])
     
     db.commit()
     db.refresh(db_reservation)
+    
+    if 'time_slots' in update_data:
+        publish_slot_snapshot(db_reservation)
     return db_reservation
 
 
@@ -269,6 +389,9 @@ def delete_reservation(
             detail=f"Reservation with id {reservation_id} not found"
         )
     
+    record_tombstone(db, ReservationModel.__tablename__, reservation_id, company_id=db_reservation.company_id)
+    remove_open_slots(db, [reservation_id])
+    remove_waitlist(db, [reservation_id])
     db.delete(db_reservation)
     db.commit()
     return None
@@ -308,9 +431,24 @@ def add_employee_to_reservation(
                 detail=f"予約ID {reservation_id} が見つかりません"
             )
         
-        # 既に登録済みかチェック
-        existing_employees = db_reservation.employee_names or ""
-        if employee_data.employee_name in existing_employees:
+        # 変更通知用に更新前の枠の状態を保持
+        slots_before = slot_states(db_reservation)
+        
+        # 登録する社員を特定（企業内に見つからなければ作成）
+        try:
+            employee = resolve_employee(
+                db, db_reservation.company_id, employee_data.employee_name,
+                department=employee_data.department, position=employee_data.position,
+                phone=employee_data.phone, email=employee_data.email, employee_id=employee_data.employee_id,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        # 既に登録済みかチェック（名簿の一意索引）
+        if is_registered(db, reservation_id, employee.id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"社員 '{employee_data.employee_name}' は既にこの予約に登録されています"
@@ -324,7 +462,7 @@ def add_employee_to_reservation(
             )
         
         # 現在の登録人数をカウント
-        current_count = len(existing_employees.split(',')) if existing_employees else 0
+        current_count = roster_count(db, reservation_id)
         
         # 満席チェック
         if current_count >= db_reservation.max_participants:
@@ -369,6 +507,7 @@ def add_employee_to_reservation(
                 )
             
             # 指定された枠に割り当て
+            slots[slot_index]['employee_id'] = employee.id
             slots[slot_index]['employee_name'] = employee_data.employee_name
             slots[slot_index]['employee_department'] = employee_data.department
             if employee_data.position:
@@ -379,43 +518,45 @@ def add_employee_to_reservation(
             db_reservation.time_slots = slots
             flag_modified(db_reservation, 'time_slots')
             
-            print(f"✅ 社員を枠{employee_data.slot_number}に割り当て: {employee_data.employee_name}")
+            logger.debug(
+                "社員を枠に割り当て",
+                extra={"reservation_id": reservation_id, "slot_number": employee_data.slot_number}
+            )
         
-        # 社員名を追加（カンマ区切り）
-        if existing_employees:
-            db_reservation.employee_names = f"{existing_employees}, {employee_data.employee_name}"
-        else:
-            db_reservation.employee_names = employee_data.employee_name
+        # 名簿に追加（登録時の部署・役職・備考は名簿の行に保存する）
+        add_to_roster(
+            db, db_reservation, employee,
+            slot_number=employee_data.slot_number if db_reservation.time_slots else None,
+            department=employee_data.department, position=employee_data.position, notes=employee_data.notes,
+        )
         
         # slots_filledを更新
         db_reservation.slots_filled = current_count + 1
         
-        # 備考に社員情報を追記（オプション）
-        employee_info = f"\n[社員登録] {employee_data.employee_name} ({employee_data.department}"
-        if employee_data.position:
-            employee_info += f" - {employee_data.position}"
-        employee_info += ")"
-        if employee_data.notes:
-            employee_info += f" - {employee_data.notes}"
-        
-        if db_reservation.notes:
-            db_reservation.notes = f"{db_reservation.notes}{employee_info}"
-        else:
-            db_reservation.notes = employee_info.strip()
-        
-        print(f"🔄 社員登録完了: {employee_data.employee_name}, slots_filled={db_reservation.slots_filled}")
+        logger.debug(
+            "社員登録完了",
+            extra={"reservation_id": reservation_id, "slots_filled": db_reservation.slots_filled}
+        )
         
         db.commit()
         db.refresh(db_reservation)
+        publish_slot_changes(db_reservation, slots_before)
         
         return db_reservation
         
     except HTTPException:
         db.rollback()
         raise
+    except IntegrityError:
+        # 同じ社員が同時に登録された
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"社員 '{employee_data.employee_name}' は既にこの予約に登録されています"
+        )
     except Exception as e:
         db.rollback()
-        print(f"❌ 社員登録エラー: {str(e)}")
+        logger.exception("社員登録エラー", extra={"reservation_id": reservation_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"社員の登録に失敗しました: {str(e)}"
@@ -496,6 +637,9 @@ def assign_employee_to_slot(
             detail=f"無効な枠番号です。有効範囲: 1-{len(db_reservation.time_slots)}"
         )
     
+    # 変更通知用に更新前の枠の状態を保持
+    slots_before = slot_states(db_reservation)
+    
     # time_slotsを更新（枠番号は1始まりなのでインデックスは-1）
     try:
         # time_slotsが文字列の場合はJSONパース、リストの場合はそのまま使用
@@ -539,21 +683,31 @@ def assign_employee_to_slot(
         db_reservation.time_slots = slots
         flag_modified(db_reservation, 'time_slots')
         
+        # 名簿に反映（この枠にいた別の社員は枠から外れる）
+        assign_roster_slot(db, db_reservation, employee, assignment.slot_number)
+        
         # slots_filledを更新（is_filled=Trueの枠数をカウント）
         filled_count = sum(1 for slot in slots if slot.get('is_filled', False))
         db_reservation.slots_filled = filled_count
         
-        print(f"🔄 従業員割り当て: 予約ID={db_reservation.id}, 枠{assignment.slot_number}, 割り当て済み={filled_count}/{len(slots)}")
-        
         db.commit()
         db.refresh(db_reservation)
-        
-        print(f"✅ コミット後: slots_filled={db_reservation.slots_filled}")
+        publish_slot_changes(db_reservation, slots_before)
+        
+        logger.debug(
+            "従業員割り当て",
+            extra={
+                "reservation_id": reservation_id,
+                "slot_number": assignment.slot_number,
+                "slots_filled": db_reservation.slots_filled,
+                "slot_count": len(slots),
+            }
+        )
         
         return db_reservation
     except Exception as e:
         db.rollback()
-        print(f"❌ エラー: {str(e)}")
+        logger.exception("従業員割り当てエラー", extra={"reservation_id": reservation_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"社員の割り当てに失敗しました: {str(e)}"
@@ -570,6 +724,8 @@ def unassign_employee_from_slot(
     """
     予約の特定の時間枠から社員の割り当てを解除（企業のみ）
     
+    キャンセル待ちがいる場合は、同じトランザクションで先頭をこの枠に繰り上げて通知する。
+    
     Args:
         reservation_id: 予約ID
         slot_number: 枠番号（1始まり）
@@ -638,18 +794,27 @@ def unassign_employee_from_slot(
             detail=f"無効な枠番号です。有効範囲: 1-{len(slots)}"
         )
     
+    # 変更通知用に更新前の枠の状態を保持
+    slots_before = slot_states(db_reservation)
+    
     # time_slotsを更新
     slot_index = slot_number - 1
     
     # 社員情報を削除
+    release_roster_slot(db_reservation, slot_number, slots[slot_index].get('employee_id'))
     if 'employee_id' in slots[slot_index]:
         del slots[slot_index]['employee_id']
     if 'employee_name' in slots[slot_index]:
         del slots[slot_index]['employee_name']
     if 'employee_department' in slots[slot_index]:
         del slots[slot_index]['employee_department']
+    if 'employee_position' in slots[slot_index]:
+        del slots[slot_index]['employee_position']
     slots[slot_index]['is_filled'] = False
     
+    # キャンセル待ちの先頭を空いた枠に繰り上げ（名簿にも追加される）
+    promoted = promote_next(db, db_reservation, slots, slot_number)
+    
     # SQLAlchemyにJSONフィールドの変更を通知
     db_reservation.time_slots = slots
     flag_modified(db_reservation, 'time_slots')
@@ -658,12 +823,28 @@ def unassign_employee_from_slot(
     filled_count = sum(1 for slot in slots if slot.get('is_filled', False))
     db_reservation.slots_filled = filled_count
     
-    print(f"🔄 従業員割り当て解除: 予約ID={db_reservation.id}, 枠{slot_number}, 割り当て済み={filled_count}/{len(slots)}")
+    if promoted and promoted.email:
+        # 繰り上げと同じトランザクションで登録し、送信はワーカーに任せる
+        enqueue(db, "email.waitlist_promoted", {
+            "to_email": promoted.email,
+            "data": promotion_email_data(db_reservation, promoted, slots[slot_index]),
+        }, created_by=current_user.id)
     
     db.commit()
     db.refresh(db_reservation)
-    
-    print(f"✅ コミット後: slots_filled={db_reservation.slots_filled}")
+    publish_slot_changes(db_reservation, slots_before)
+    if promoted:
+        publish_promotion(db_reservation, promoted)
+    
+    logger.debug(
+        "従業員割り当て解除",
+        extra={
+            "reservation_id": reservation_id,
+            "slot_number": slot_number,
+            "slots_filled": db_reservation.slots_filled,
+            "slot_count": len(slots),
+        }
+    )
     
     return db_reservation
 
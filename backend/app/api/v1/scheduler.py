@@ -0,0 +1,51 @@
+"""
+定期処理（スケジューラー）API
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from ...core.scheduler import scheduler, get_scheduler_status
+from ...database import get_db
+from ...models.user import User
+from ..deps import get_admin_user
+
+router = APIRouter()
+
+
+@router.get("/scheduler/metrics")
+def get_scheduler_metrics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    定期処理の実行状況を取得（管理者のみ）
+
+    Args:
+        db: データベースセッション
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        リースの保持者と、ジョブごとの実行回数・実行時間・更新件数
+    """
+    return get_scheduler_status(db)
+
+
+@router.post("/scheduler/run")
+async def run_scheduler(current_user: User = Depends(get_admin_user)):
+    """
+    定期処理をすぐに1回実行（管理者のみ）
+
+    他のワーカーがリースを保持している場合は実行しない。
+
+    Args:
+        current_user: 現在のユーザー（管理者権限必須）
+
+    Returns:
+        実行結果
+    """
+    if not await run_in_threadpool(scheduler.run_once):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="他のワーカーが定期処理を実行中です"
+        )
+    return {"success": True, "message": "定期処理を実行しました"}
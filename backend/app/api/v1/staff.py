@@ -1,44 +1,60 @@
 """
 スタッフ管理API
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from ...database import get_db
 from ...models.staff import Staff as StaffModel
 from ...models.reservation_staff import ReservationStaff, AssignmentStatus
+from ...utils.reservation_status import CONFIRMED_STATUSES
 from ...models.reservation import Reservation as ReservationModel
+from ...models.kpi_rollup import StaffKpiRollup
 from ...models.user import User
 from ...schemas.staff import Staff, StaffCreate, StaffUpdate
 from ..deps import get_current_active_user, get_admin_user
+from ...core.etag import resource_etag, collection_etag, not_modified
+from ...core.responses import model_response
+from ...utils.projection import parse_fields, project_query, projection_schema, projected_response
+from ...utils.batch import parse_ids, batch_response
 
 router = APIRouter()
 
 
 @router.get("/staff", response_model=List[Staff])
 def get_staff_list(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     is_available: Optional[bool] = None,
     search: Optional[str] = Query(None, description="名前で検索"),
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り、例: name,is_available,rating）"),
     db: Session = Depends(get_db)
 ):
     """
     スタッフ一覧を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す。
+    fields を指定した場合は、その項目（と id）のカラムだけを読み込んで返す。
+    
     Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         skip: スキップする件数
         limit: 取得する最大件数
         is_available: 稼働可能フィルター
         search: 検索キーワード（名前）
+        fields: 返す項目（カンマ区切り）
         db: データベースセッション
         current_user: 現在のユーザー
         
     Returns:
         List[Staff]: スタッフのリスト
     """
+    names = parse_fields(fields, Staff)
     query = db.query(StaffModel)
     
     # フィルター
@@ -48,21 +64,77 @@ def get_staff_list(
     if search:
         query = query.filter(StaffModel.name.contains(search))
     
+    etag = collection_etag("staff", query, StaffModel, {
+        "skip": skip, "limit": limit, "is_available": is_available, "search": search, "fields": names,
+    })
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    if names is not None:
+        staff = project_query(query, StaffModel, names).offset(skip).limit(limit).all()
+        return projected_response(staff, Staff, names, response)
+    
     staff = query.offset(skip).limit(limit).all()
-    return staff
+    return model_response(List[Staff], staff, response=response)
+
+
+# /staff/{staff_id} より先に登録する（"batch" がIDとして解釈されないように）
+@router.get("/staff/batch", response_model=Dict[int, Optional[Staff]])
+def get_staff_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="スタッフID（カンマ区切り、最大100件）"),
+    fields: Optional[str] = Query(None, description="返す項目（カンマ区切り、例: name,is_available,rating）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    複数のスタッフを1回のクエリで取得
+    
+    If-None-Match が現在のETagと一致する場合は 304 を返す。
+    
+    Args:
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
+        ids: スタッフID（カンマ区切り）
+        fields: 返す項目（カンマ区切り）
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        Dict[int, Optional[Staff]]: {スタッフID: スタッフ}（見つからないIDは null）
+    """
+    names = parse_fields(fields, Staff)
+    id_list = parse_ids(ids)
+    query = db.query(StaffModel).filter(StaffModel.id.in_(id_list))
+    
+    etag = collection_etag("staff_batch", query, StaffModel, {"ids": id_list, "fields": names})
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    schema = Staff if names is None else projection_schema(Staff, names)
+    return batch_response(schema, project_query(query, StaffModel, names).all(), id_list, response=response)
 
 
 @router.get("/staff/{staff_id}", response_model=Staff)
 def get_staff(
     staff_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     スタッフ詳細を取得
     
+    If-None-Match が現在のETagと一致する場合は 304 を返す
+    
     Args:
         staff_id: スタッフID
+        request: リクエスト
+        response: レスポンス（ETagヘッダー設定用）
         db: データベースセッション
         current_user: 現在のユーザー
         
@@ -78,7 +150,11 @@ def get_staff(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Staff with id {staff_id} not found"
         )
-    return staff
+    
+    cached = not_modified(request, response, resource_etag("staff", staff_id, staff.updated_at, staff.version))
+    if cached:
+        return cached
+    return model_response(Staff, staff, response=response)
 
 
 @router.post("/staff", response_model=Staff, status_code=status.HTTP_201_CREATED)
@@ -182,6 +258,8 @@ def delete_staff(
             detail=f"Staff with id {staff_id} not found"
         )
     
+    # 集計の行も削除する（外部キーのCASCADEがない既存のDBやSQLiteでも残らないように明示的に削除）
+    db.query(StaffKpiRollup).filter(StaffKpiRollup.staff_id == staff_id).delete(synchronize_session=False)
     db.delete(db_staff)
     db.commit()
     return None
@@ -212,49 +290,27 @@ class StaffEarningsResponse(BaseModel):
     details: List[EarningsDetail]  # 明細リスト
 
 
-@router.get("/staff/{staff_id}/earnings", response_model=StaffEarningsResponse)
-def get_staff_earnings(
-    staff_id: int,
-    month: Optional[int] = Query(None, description="月（1-12）"),
-    year: Optional[int] = Query(None, description="年"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
+def calculate_staff_earnings(
+    db: Session, staff: StaffModel, month: Optional[int] = None, year: Optional[int] = None
+) -> StaffEarningsResponse:
     """
-    スタッフの給与情報を取得
+    スタッフの確定済み・完了報告済みのアサインから給与を計算（権限チェックは呼び出し側で行う）
     
     Args:
-        staff_id: スタッフID
-        month: 月（省略時は全て）
-        year: 年（省略時は現在年）
         db: データベースセッション
-        current_user: 現在のユーザー
+        staff: スタッフ
+        month: 月（省略時は全て）
+        year: 年
         
     Returns:
         StaffEarningsResponse: スタッフの給与情報
     """
-    # スタッフの存在確認
-    staff = db.query(StaffModel).filter(StaffModel.id == staff_id).first()
-    if staff is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Staff with id {staff_id} not found"
-        )
+    staff_id = staff.id
     
-    # 権限チェック（本人または管理者のみ）
-    if current_user.role.upper() != 'ADMIN':
-        # スタッフユーザーの場合、自分のIDのみアクセス可能
-        staff_user = db.query(User).filter(User.id == staff.user_id).first()
-        if staff_user and staff_user.id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="このスタッフの給与情報を閲覧する権限がありません"
-            )
-    
-    # 確定済みアサインを取得
+    # 確定済み・完了報告済みのアサインを取得（完了報告で COMPLETED になっても給与の対象）
     assignments = db.query(ReservationStaff).filter(
         ReservationStaff.staff_id == staff_id,
-        ReservationStaff.status == AssignmentStatus.CONFIRMED
+        ReservationStaff.status.in_(CONFIRMED_STATUSES)
     ).all()
     
     # 予約情報を取得
@@ -380,3 +436,45 @@ def get_staff_earnings(
         details=details
     )
 
+
+@router.get("/staff/{staff_id}/earnings", response_model=StaffEarningsResponse)
+def get_staff_earnings(
+    staff_id: int,
+    month: Optional[int] = Query(None, description="月（1-12）"),
+    year: Optional[int] = Query(None, description="年"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    スタッフの給与情報を取得
+    
+    Args:
+        staff_id: スタッフID
+        month: 月（省略時は全て）
+        year: 年（省略時は現在年）
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        StaffEarningsResponse: スタッフの給与情報
+    """
+    # スタッフの存在確認
+    staff = db.query(StaffModel).filter(StaffModel.id == staff_id).first()
+    if staff is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Staff with id {staff_id} not found"
+        )
+    
+    # 権限チェック（本人または管理者のみ）
+    if current_user.role.upper() != 'ADMIN':
+        # スタッフユーザーの場合、自分のIDのみアクセス可能
+        staff_user = db.query(User).filter(User.id == staff.user_id).first()
+        if staff_user and staff_user.id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="このスタッフの給与情報を閲覧する権限がありません"
+            )
+    
+    return calculate_staff_earnings(db, staff, month, year)
+
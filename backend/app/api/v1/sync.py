@@ -0,0 +1,144 @@
+"""
+差分同期API
+
+クライアントは前回のレスポンスの next_token を since に指定すると、
+それ以降に作成・更新・削除されたレコードだけを受け取れる。
+has_more が True の間は next_token で続けて取得する。
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ...database import get_db
+from ...models.reservation import Reservation as ReservationModel
+from ...models.reservation_staff import ReservationStaff
+from ...models.staff import Staff as StaffModel
+from ...models.company import Company as CompanyModel
+from ...models.user import User, UserRole
+from ...schemas.sync import ReservationSyncResponse, AssignmentSyncResponse
+from ...utils.sync import SyncCursor, InvalidSyncToken, fetch_changes, fetch_tombstones
+from ..deps import get_current_active_user
+
+router = APIRouter()
+
+
+def _decode_cursor(since: Optional[str]) -> SyncCursor:
+    """同期トークンをデコード（不正な場合は400）"""
+    try:
+        return SyncCursor.decode(since)
+    except InvalidSyncToken:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="同期トークンが不正です。since を指定せずに再同期してください"
+        )
+
+
+def _own_company_id(db: Session, current_user: User) -> int:
+    """企業ユーザーの企業IDを取得"""
+    company = db.query(CompanyModel).filter(CompanyModel.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="企業情報が見つかりません")
+    return company.id
+
+
+def _own_staff_id(db: Session, current_user: User) -> int:
+    """スタッフユーザーのスタッフIDを取得"""
+    staff = db.query(StaffModel).filter(StaffModel.user_id == current_user.id).first()
+    if not staff:
+        raise HTTPException(status_code=404, detail="スタッフ情報が見つかりません")
+    return staff.id
+
+
+@router.get("/sync/reservations", response_model=ReservationSyncResponse)
+def sync_reservations(
+    since: Optional[str] = Query(None, description="前回の next_token（初回は省略）"),
+    company_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    予約の差分を取得
+
+    企業ユーザーは自社の予約のみ取得できる。
+
+    Args:
+        since: 同期トークン
+        company_id: 企業IDフィルター（管理者・スタッフのみ）
+        limit: 1回に取得する最大件数
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        ReservationSyncResponse: 変更・削除された予約と次のトークン
+    """
+    cursor = _decode_cursor(since)
+    if current_user.role == UserRole.COMPANY:
+        company_id = _own_company_id(db, current_user)
+
+    query = db.query(ReservationModel)
+    if company_id:
+        query = query.filter(ReservationModel.company_id == company_id)
+
+    changes, more_changes, next_cursor = fetch_changes(db, query, ReservationModel, cursor, limit)
+    deleted, more_deleted, next_cursor.tombstone_id = fetch_tombstones(
+        db, ReservationModel.__tablename__, cursor, limit, company_id=company_id
+    )
+
+    return ReservationSyncResponse(
+        changes=changes,
+        deleted=deleted,
+        next_token=next_cursor.encode(),
+        has_more=more_changes or more_deleted,
+    )
+
+
+@router.get("/sync/assignments", response_model=AssignmentSyncResponse)
+def sync_assignments(
+    since: Optional[str] = Query(None, description="前回の next_token（初回は省略）"),
+    staff_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    アサインの差分を取得
+
+    スタッフユーザーは自分のアサイン、企業ユーザーは自社の予約のアサインのみ取得できる。
+
+    Args:
+        since: 同期トークン
+        staff_id: スタッフIDフィルター（管理者のみ）
+        limit: 1回に取得する最大件数
+        db: データベースセッション
+        current_user: 現在のユーザー
+
+    Returns:
+        AssignmentSyncResponse: 変更・削除されたアサインと次のトークン
+    """
+    cursor = _decode_cursor(since)
+    company_id = None
+    if current_user.role == UserRole.STAFF:
+        staff_id = _own_staff_id(db, current_user)
+    elif current_user.role == UserRole.COMPANY:
+        company_id = _own_company_id(db, current_user)
+        staff_id = None
+
+    query = db.query(ReservationStaff)
+    if staff_id:
+        query = query.filter(ReservationStaff.staff_id == staff_id)
+    if company_id:
+        query = query.join(ReservationModel, ReservationModel.id == ReservationStaff.reservation_id).filter(
+            ReservationModel.company_id == company_id
+        )
+
+    changes, more_changes, next_cursor = fetch_changes(db, query, ReservationStaff, cursor, limit)
+    deleted, more_deleted, next_cursor.tombstone_id = fetch_tombstones(
+        db, ReservationStaff.__tablename__, cursor, limit, company_id=company_id, staff_id=staff_id
+    )
+
+    return AssignmentSyncResponse(
+        changes=changes,
+        deleted=deleted,
+        next_token=next_cursor.encode(),
+        has_more=more_changes or more_deleted,
+    )
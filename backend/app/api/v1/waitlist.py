@@ -0,0 +1,204 @@
+"""
+予約のキャンセル待ちAPI
+
+満席の予約（または埋まっている枠）にキャンセル待ちとして登録する。
+枠が空いたときの繰り上げは、割り当て解除（DELETE /reservations/{id}/slots/{slot}/employee）の
+トランザクションの中で行う（utils/waitlist.py）。
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from ...database import get_db
+from ...models.company import Company as CompanyModel
+from ...models.employee import Employee as EmployeeModel
+from ...models.reservation import Reservation as ReservationModel
+from ...models.reservation_employee import ReservationEmployee
+from ...models.reservation_waitlist import ReservationWaitlist, WaitlistStatus
+from ...models.user import User
+from ...schemas.waitlist import WaitlistCreate, WaitlistEntry
+from ...utils.slot_events import slot_states
+from ...utils.waitlist import waiting_count
+from ..deps import get_current_active_user, get_company_user
+
+router = APIRouter()
+
+
+def _get_reservation(db: Session, reservation_id: int) -> ReservationModel:
+    db_reservation = db.query(ReservationModel).filter(ReservationModel.id == reservation_id).first()
+    if db_reservation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"予約ID {reservation_id} が見つかりません"
+        )
+    return db_reservation
+
+
+@router.post(
+    "/reservations/{reservation_id}/waitlist",
+    response_model=WaitlistEntry,
+    status_code=status.HTTP_201_CREATED
+)
+def join_waitlist(
+    reservation_id: int,
+    entry: WaitlistCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    満席の予約にキャンセル待ちとして登録
+    
+    Args:
+        reservation_id: 予約ID
+        entry: 社員情報と希望枠（省略時はどの枠でも可）
+        db: データベースセッション
+        current_user: 現在のユーザー
+        
+    Returns:
+        WaitlistEntry: 登録したキャンセル待ち（待機中の順番を含む）
+        
+    Raises:
+        HTTPException: 予約が見つからない、空きがある、または既に登録済みの場合
+    """
+    db_reservation = _get_reservation(db, reservation_id)
+    
+    filled = slot_states(db_reservation)
+    if not filled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="この予約には時間枠が設定されていません"
+        )
+    if entry.preferred_slot is not None:
+        if entry.preferred_slot > len(filled):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"無効な枠番号です。有効範囲: 1-{len(filled)}"
+            )
+        if not filled[entry.preferred_slot - 1]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"枠{entry.preferred_slot}は空いています。キャンセル待ちではなく直接登録してください"
+            )
+    elif not all(filled):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="この予約には空きがあります。キャンセル待ちではなく直接登録してください"
+        )
+    
+    # 名簿に登録済みかチェック（社員IDの指定がなければ社員名で照合）
+    registered = db.query(ReservationEmployee.id).join(
+        EmployeeModel, EmployeeModel.id == ReservationEmployee.employee_id
+    ).filter(
+        ReservationEmployee.reservation_id == reservation_id,
+        EmployeeModel.id == entry.employee_id if entry.employee_id is not None
+        else EmployeeModel.name == entry.employee_name,
+    ).first()
+    if registered:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"社員 '{entry.employee_name}' は既にこの予約に登録されています"
+        )
+    already_waiting = db.query(ReservationWaitlist.id).filter(
+        ReservationWaitlist.reservation_id == reservation_id,
+        ReservationWaitlist.employee_name == entry.employee_name,
+        ReservationWaitlist.status == WaitlistStatus.WAITING,
+    ).first()
+    if already_waiting:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"社員 '{entry.employee_name}' は既にこの予約のキャンセル待ちに登録されています"
+        )
+    
+    db_entry = ReservationWaitlist(reservation_id=reservation_id, **entry.model_dump())
+    db.add(db_entry)
+    db.commit()
+    db.refresh(db_entry)
+    
+    response = WaitlistEntry.model_validate(db_entry)
+    response.queue_position = waiting_count(db, reservation_id, before_id=db_entry.id) + 1
+    return response
+
+
+@router.get("/reservations/{reservation_id}/waitlist", response_model=List[WaitlistEntry])
+def get_waitlist(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_company_user)
+):
+    """
+    予約のキャンセル待ち（待機中）を順番に取得（企業または管理者のみ）
+    
+    Args:
+        reservation_id: 予約ID
+        db: データベースセッション
+        current_user: 現在のユーザー（企業または管理者権限必須）
+        
+    Returns:
+        List[WaitlistEntry]: 待機中の登録（登録順）
+    """
+    db_reservation = _get_reservation(db, reservation_id)
+    
+    # 企業ユーザーは自分の企業の予約のみ参照可能
+    if current_user.role.upper() == 'COMPANY':
+        company = db.query(CompanyModel).filter(CompanyModel.user_id == current_user.id).first()
+        if not company or db_reservation.company_id != company.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この予約を操作する権限がありません"
+            )
+    
+    entries = db.query(ReservationWaitlist).filter(
+        ReservationWaitlist.reservation_id == reservation_id,
+        ReservationWaitlist.status == WaitlistStatus.WAITING,
+    ).order_by(ReservationWaitlist.id).all()
+    
+    response = [WaitlistEntry.model_validate(entry) for entry in entries]
+    for index, item in enumerate(response, start=1):
+        item.queue_position = index
+    return response
+
+
+@router.delete("/reservations/{reservation_id}/waitlist/{waitlist_id}", status_code=status.HTTP_204_NO_CONTENT)
+def leave_waitlist(
+    reservation_id: int,
+    waitlist_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_company_user)
+):
+    """
+    キャンセル待ちを取り消す（企業または管理者のみ）
+    
+    Args:
+        reservation_id: 予約ID
+        waitlist_id: キャンセル待ちID
+        db: データベースセッション
+        current_user: 現在のユーザー（企業または管理者権限必須）
+        
+    Raises:
+        HTTPException: 登録が見つからない、権限がない、または既に繰り上げ済みの場合
+    """
+    db_reservation = _get_reservation(db, reservation_id)
+    
+    # 企業ユーザーは自分の企業の予約のみ操作可能
+    if current_user.role.upper() == 'COMPANY':
+        company = db.query(CompanyModel).filter(CompanyModel.user_id == current_user.id).first()
+        if not company or db_reservation.company_id != company.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="この予約を操作する権限がありません"
+            )
+    
+    db_entry = db.query(ReservationWaitlist).filter(
+        ReservationWaitlist.id == waitlist_id,
+        ReservationWaitlist.reservation_id == reservation_id,
+    ).first()
+    if db_entry is None:
+        raise HTTPException(status_code=404, detail="キャンセル待ちの登録が見つかりません")
+    if db_entry.status == WaitlistStatus.PROMOTED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="既に繰り上げ済みのため取り消せません。予約の枠から割り当てを解除してください"
+        )
+    
+    db_entry.status = WaitlistStatus.CANCELLED
+    db.commit()
+    return None
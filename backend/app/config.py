@@ -66,7 +66,48 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: Optional[str] = None
     SMTP_FROM_EMAIL: str = "noreply@orientalsynergy.com"
     SMTP_TLS: bool = True
-    
+
+    # ログ設定
+    LOG_LEVEL: str = "INFO"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # DEBUGログの出力率（0.0〜1.0）
+    LOG_QUEUE_SIZE: int = 10000  # ログキューの上限（超過分は破棄）
+
+    # リアルタイム通知設定
+    REALTIME_BACKEND: str = "memory"  # memory（単一プロセス） / redis（複数ワーカー）
+    REALTIME_QUEUE_SIZE: int = 256  # 1接続あたりの未送信メッセージの上限
+    REALTIME_KEEPALIVE_SECONDS: float = 15.0  # 無通信時にkeepaliveを送る間隔
+
+    # 定期処理（オファーの期限切れ・募集期限の締め切り）
+    TIMEZONE: str = "Asia/Tokyo"  # 募集期限などの日時文字列のタイムゾーン
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL_SECONDS: float = 60.0  # 実行間隔
+    SCHEDULER_LEASE_SECONDS: float = 180.0  # 実行権（リース）の有効期間（実行間隔より長くする）
+    SCHEDULER_BATCH_SIZE: int = 500  # 1回のUPDATEで更新する最大件数
+    OFFER_EXPIRY_HOURS: int = 72  # オファー（PENDING）の有効期間
+
+    # 給与計算
+    PAYROLL_OVERTIME_RATE: float = 1.25  # 予定の施術時間を超えた実働の割増率
+
+    # 需要予測（定期処理で1日1回作成）
+    FORECAST_HISTORY_WEEKS: int = 26  # 学習に使う過去の週数
+    FORECAST_HORIZON_WEEKS: int = 12  # 予測する週数（/analytics/forecast の weeks の上限）
+    FORECAST_REFRESH_HOUR: int = 3  # 毎日この時刻（TIMEZONE）以降の最初の実行で予測を作り直す
+
+    # バックグラウンドジョブ（python -m app.worker で実行）
+    JOB_WORKER_CONCURRENCY: int = 4  # ワーカー1プロセスで同時に実行するジョブ数
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0  # 実行できるジョブがないときの確認間隔
+    JOB_LOCK_TIMEOUT_SECONDS: float = 600.0  # 生存確認がないままこの時間を過ぎた実行中のジョブは停止したワーカーのものとみなす
+    JOB_HEARTBEAT_INTERVAL_SECONDS: float = 30.0  # ワーカーが実行中のジョブの locked_at を更新する間隔
+    JOB_RETRY_DELAY_SECONDS: float = 30.0  # 失敗から再実行までの待ち時間（試行ごとに2倍）
+
+    # レスポンスの圧縮（gzip / Brotli）
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # これ未満の本体は圧縮しない（バイト）
+    COMPRESSION_OFFLOAD_SIZE: int = 65536  # これ以上の本体はスレッドで圧縮する（バイト）
+    COMPRESSION_CACHE_SIZE: int = 256  # キャッシュする圧縮済み本体の件数（本体のハッシュごと）
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+
     class Config:
         env_file = ".env"
         case_sensitive = True
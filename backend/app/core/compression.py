@@ -0,0 +1,223 @@
+"""
+レスポンスの圧縮（gzip / Brotli）
+
+Accept-Encoding に応じて、JSONなどのテキストのレスポンスを圧縮するASGIミドルウェア。
+
+    - brotli がインストールされていれば br を優先し、なければ gzip のみ
+    - COMPRESSION_MINIMUM_SIZE 未満の本体は圧縮しない
+    - COMPRESSION_OFFLOAD_SIZE 以上の本体はスレッドで圧縮し、イベントループを止めない
+    - ETag が付いたレスポンスは (本体のSHA-1, 方式) をキーに圧縮結果をキャッシュし、
+      同じ内容の再送では圧縮を省略する（ポーリングする一覧・詳細向け）。
+      ETag は対象の行の updated_at・version から作る弱いETagで、結合した他のテーブルの内容や
+      ユーザーの権限で変わる項目を含まず、同じETagでも本体が同じとは限らないため、キーには使わない
+    - SSE（text/event-stream）やストリーミングのレスポンス、画像などは圧縮しない
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import anyio
+
+try:
+    import brotli  # 任意の依存関係
+except ImportError:
+    brotli = None
+
+# 圧縮するContent-Type（前方一致）
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding ヘッダーを {方式: q値} に変換"""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """
+    レスポンスの圧縮方式を選ぶ
+
+    Returns:
+        "br" / "gzip"（圧縮しない場合はNone）
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedCache:
+    """本体のハッシュごとの圧縮済みの本体（件数の上限を超えたら古いものから破棄）"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """
+    レスポンスを gzip / Brotli で圧縮するASGIミドルウェア
+
+    本体が1回で送られる通常のレスポンスだけを対象にし、ストリーミングはそのまま流す。
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        offload_size: int = 65536,
+        cache_size: int = 256,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.cache = CompressedCache(cache_size)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                # 本体の大きさが分かるまで開始メッセージを保留する
+                start_message = message
+                passthrough = not self._compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # ストリーミング・小さい本体はそのまま送る
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = start_message.get("headers", [])
+            compressed = await self._compress(encoding, body, self._header(headers, b"etag"))
+            headers = [
+                (name, value) for name, value in headers
+                if name not in (b"content-length", b"content-encoding")
+            ]
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            headers = self._add_vary(headers)
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+        for key, value in headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    def _compressible(self, message) -> bool:
+        """圧縮の対象になるレスポンスか（ステータス・Content-Type・既存のContent-Encodingで判定）"""
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        headers = message.get("headers", [])
+        if self._header(headers, b"content-encoding") is not None:
+            return False
+        content_type = (self._header(headers, b"content-type") or b"").decode("latin-1").lower()
+        if content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[index] = (name, value + b", Accept-Encoding")
+                return headers
+        headers.append((b"vary", b"Accept-Encoding"))
+        return headers
+
+    def _compress_sync(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def _compress(self, encoding: str, body: bytes, etag: Optional[bytes]) -> bytes:
+        """本体を圧縮（ETagがあれば本体のハッシュでキャッシュを使い、大きい本体はスレッドで圧縮）"""
+        key = None
+        if etag is not None:
+            key = (hashlib.sha1(body).digest(), encoding)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if len(body) >= self.offload_size:
+            compressed = await anyio.to_thread.run_sync(self._compress_sync, encoding, body)
+        else:
+            compressed = self._compress_sync(encoding, body)
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
@@ -0,0 +1,101 @@
+"""
+条件付きGET（ETag / If-None-Match）
+
+ポーリングするクライアント向けに、リソースが変更されていなければ
+レスポンス本体をシリアライズせずに 304 Not Modified を返す。
+
+    - 詳細リソース: (リソース名, id, updated_at, version) から弱いETagを生成
+    - 一覧: 絞り込み条件に一致する行の (max(updated_at), 件数, sum(version), sum(id)) と
+      クエリパラメータから生成
+
+updated_at はSQLiteでは秒単位のため、同じ秒の2回目の更新では変わらない。
+各行の version は更新のたびに1増えるため、これを含めてどの更新でもETagが変わるようにする
+（一覧の sum(id) は、削除と追加で件数が変わらない場合の検出用）。
+
+ETagの計算には updated_at・version と件数だけを取得する軽量なクエリを使い、
+304の場合は本体の読み込み・シリアライズを行わない。
+"""
+import hashlib
+from typing import Any, Dict, Optional
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+# 304の場合もクライアントが毎回再検証するようにする
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    値の組から弱いETagを生成
+
+    Args:
+        parts: ETagの元になる値（文字列化してハッシュする）
+
+    Returns:
+        W/"..." 形式のETag
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def resource_etag(resource: str, resource_id: int, updated_at: Any, version: Any) -> str:
+    """詳細リソースのETag"""
+    return make_etag(resource, resource_id, updated_at, version)
+
+
+def collection_etag(resource: str, query: Query, model, params: Dict[str, Any]) -> str:
+    """
+    一覧のETag
+
+    ページング（skip/limit）を適用する前のクエリを渡す。絞り込み条件に一致する行の
+    いずれかが更新されると sum(version) が、追加・削除されると件数か sum(id) が変わる。
+
+    Args:
+        resource: リソース名
+        query: 絞り込み済み・ページング前のクエリ
+        model: 対象モデル（id・updated_at・version カラムを持つ）
+        params: レスポンスに影響するクエリパラメータ（skip/limitを含む）
+
+    Returns:
+        ETag
+    """
+    last_updated, count, version_sum, id_sum = query.with_entities(
+        func.max(model.updated_at), func.count(), func.sum(model.version), func.sum(model.id)
+    ).order_by(None).one()
+    return make_etag(resource, last_updated, count, version_sum, id_sum, sorted(params.items()))
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match ヘッダーとETagを弱い比較で照合"""
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    ETagをレスポンスヘッダーに設定し、If-None-Match と一致すれば 304 レスポンスを返す
+
+    Args:
+        request: リクエスト
+        response: エンドポイントに注入されたレスポンス（200の場合のヘッダー設定用）
+        etag: 現在のETag
+
+    Returns:
+        Response: 304レスポンス（変更がない場合）
+        None: 変更がある場合（通常どおり本体を返す）
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,298 @@
+"""
+DBのキューを使ったバックグラウンドジョブ
+
+APIは enqueue でリクエストと同じトランザクションにジョブを登録するだけにし、
+別プロセスのワーカー（python -m app.worker）が実行待ちのジョブを取得して実行する。
+Redis などのブローカーは使わない。
+
+    - 取得: PostgreSQL は FOR UPDATE SKIP LOCKED で他のワーカーが取得中の行を飛ばす。
+      SQLite は state が QUEUED のままの場合だけ RUNNING にする条件付きUPDATE（1文で原子的）で取得する
+    - 同時実行数: 種類ごとに、全ワーカー合計の RUNNING の件数が上限未満の場合だけ取得する
+      （PostgreSQL は種類ごとのアドバイザリロックで件数の確認と更新を直列化する）
+    - 再試行: 失敗したジョブは max_attempts まで、待ち時間を2倍ずつ延ばして実行待ちに戻す
+    - 生存確認: ワーカーは実行中のジョブの locked_at を JOB_HEARTBEAT_INTERVAL_SECONDS ごとに更新する
+    - 停止したワーカー: locked_at が JOB_LOCK_TIMEOUT_SECONDS 以上更新されていない RUNNING のジョブは実行待ちに戻す
+      （実行時間の長いジョブも、ワーカーが動いている間は戻されない）
+
+ジョブの種類はファイル末尾の JOB_TYPES に登録する。
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import engine
+from ..models.job import Job, JobState
+from ..utils.consistency import verify_consistency, describe_change
+from ..utils.email import send_staff_assigned_emails, send_waitlist_promoted_email
+
+logger = logging.getLogger(__name__)
+
+# 結果に含める不整合・修正内容の最大件数
+REPORT_SAMPLE_SIZE = 100
+
+_jobs = Job.__table__
+
+
+@dataclass
+class JobType:
+    """ジョブの種類（func は payload を受け取り、JSONにシリアライズできる結果を返す）"""
+    name: str
+    func: Callable[[dict], Any]
+    concurrency: int = 1  # 全ワーカー合計の同時実行数の上限
+    max_attempts: int = 3
+
+
+def enqueue(
+    db: Session,
+    job_type: str,
+    payload: Optional[dict] = None,
+    run_at: Optional[datetime] = None,
+    created_by: Optional[int] = None,
+) -> Job:
+    """
+    ジョブを登録（コミットは呼び出し元で行う）
+
+    業務データの変更と同じトランザクションで登録するため、ロールバックされた処理の
+    ジョブは実行されず、コミットされた処理のジョブは失われない。
+
+    Args:
+        db: データベースセッション
+        job_type: ジョブの種類（JOB_TYPES のキー）
+        payload: ハンドラーに渡す引数（JSONにシリアライズできる値）
+        run_at: 実行予定時刻（省略時はすぐ）
+        created_by: 登録したユーザーのID
+
+    Returns:
+        登録したジョブ（IDはフラッシュ後に確定）
+
+    Raises:
+        ValueError: 登録されていない種類の場合
+    """
+    definition = JOB_TYPES.get(job_type)
+    if definition is None:
+        raise ValueError(f"未登録のジョブの種類です: {job_type}")
+    job = Job(
+        type=job_type,
+        state=JobState.QUEUED,
+        payload=payload or {},
+        attempts=0,
+        max_attempts=definition.max_attempts,
+        run_at=run_at or datetime.now(timezone.utc),
+        created_by=created_by,
+    )
+    db.add(job)
+    return job
+
+
+def claim_job(bind: Engine, worker_id: str, job_types: Iterable[str]) -> Optional[Row]:
+    """
+    実行待ちのジョブを1件取得して RUNNING にする
+
+    Args:
+        bind: DBエンジン
+        worker_id: このワーカーの識別子
+        job_types: 取得するジョブの種類
+
+    Returns:
+        取得したジョブ（id, type, payload, attempts, max_attempts）。
+        実行できるジョブがない場合や、他のワーカーと競合した場合はNone
+    """
+    names = list(job_types)
+    now = datetime.now(timezone.utc)
+    with bind.begin() as conn:
+        running = dict(conn.execute(
+            select(_jobs.c.type, func.count())
+            .where(_jobs.c.state == JobState.RUNNING, _jobs.c.type.in_(names))
+            .group_by(_jobs.c.type)
+        ).all())
+        available = [name for name in names if running.get(name, 0) < JOB_TYPES[name].concurrency]
+        if not available:
+            return None
+
+        postgres = conn.dialect.name == "postgresql"
+        stmt = select(_jobs.c.id, _jobs.c.type).where(
+            _jobs.c.state == JobState.QUEUED,
+            _jobs.c.run_at <= now,
+            _jobs.c.type.in_(available),
+        ).order_by(_jobs.c.run_at, _jobs.c.id).limit(1)
+        if postgres:
+            stmt = stmt.with_for_update(skip_locked=True)
+        candidate = conn.execute(stmt).first()
+        if candidate is None:
+            return None
+        # 同じ種類を取得中の他のワーカーがいる場合は次の確認に回す（トランザクション終了で解放）
+        if postgres and not conn.execute(
+            select(func.pg_try_advisory_xact_lock(func.hashtext(f"jobs:{candidate.type}")))
+        ).scalar():
+            return None
+
+        # 取得と同時実行数の確認を1文で行う（SQLiteはこのUPDATEの間、他の書き込みを待たせる）
+        others = _jobs.alias("running_jobs")
+        running_count = select(func.count()).select_from(others).where(
+            others.c.type == candidate.type, others.c.state == JobState.RUNNING
+        ).scalar_subquery()
+        result = conn.execute(
+            update(_jobs)
+            .where(
+                _jobs.c.id == candidate.id,
+                _jobs.c.state == JobState.QUEUED,
+                running_count < JOB_TYPES[candidate.type].concurrency,
+            )
+            .values(state=JobState.RUNNING, attempts=_jobs.c.attempts + 1, locked_by=worker_id, locked_at=now)
+        )
+        if not result.rowcount:
+            return None
+        return conn.execute(
+            select(_jobs.c.id, _jobs.c.type, _jobs.c.payload, _jobs.c.attempts, _jobs.c.max_attempts)
+            .where(_jobs.c.id == candidate.id)
+        ).first()
+
+
+def _finish(bind: Engine, job: Row, worker_id: str, **values) -> bool:
+    """自分が実行中のジョブの状態を更新（タイムアウトで他のワーカーに渡っていた場合はFalse）"""
+    with bind.begin() as conn:
+        result = conn.execute(
+            update(_jobs)
+            .where(_jobs.c.id == job.id, _jobs.c.state == JobState.RUNNING, _jobs.c.locked_by == worker_id)
+            .values(locked_by=None, locked_at=None, **values)
+        )
+    return bool(result.rowcount)
+
+
+def heartbeat(bind: Engine, worker_id: str) -> int:
+    """
+    このワーカーが実行中のジョブの locked_at を現在時刻に更新（requeue_stale_jobs で戻されないようにする）
+
+    Returns:
+        更新したジョブ数
+    """
+    with bind.begin() as conn:
+        return conn.execute(
+            update(_jobs)
+            .where(_jobs.c.state == JobState.RUNNING, _jobs.c.locked_by == worker_id)
+            .values(locked_at=datetime.now(timezone.utc))
+        ).rowcount
+
+
+def run_job(bind: Engine, job: Row, worker_id: str) -> bool:
+    """
+    取得したジョブを実行して結果を記録
+
+    失敗した場合、試行回数が max_attempts 未満なら JOB_RETRY_DELAY_SECONDS × 2^(試行回数-1) 秒後に
+    実行待ちに戻し、上限に達していれば FAILED にする。
+
+    Args:
+        bind: DBエンジン
+        job: claim_job で取得したジョブ
+        worker_id: このワーカーの識別子
+
+    Returns:
+        成功した場合はTrue
+    """
+    try:
+        result = JOB_TYPES[job.type].func(job.payload or {})
+    except Exception as e:
+        now = datetime.now(timezone.utc)
+        error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            _finish(bind, job, worker_id, state=JobState.QUEUED, run_at=now + timedelta(seconds=delay), last_error=error)
+            logger.warning("ジョブが失敗したため再実行します", extra={
+                "job_id": job.id, "job_type": job.type, "attempts": job.attempts, "retry_in_seconds": delay,
+                "error": error,
+            })
+        else:
+            _finish(bind, job, worker_id, state=JobState.FAILED, finished_at=now, last_error=error)
+            logger.exception("ジョブが失敗しました", extra={
+                "job_id": job.id, "job_type": job.type, "attempts": job.attempts,
+            })
+        return False
+
+    _finish(
+        bind, job, worker_id,
+        state=JobState.SUCCEEDED, result=result, finished_at=datetime.now(timezone.utc), last_error=None,
+    )
+    return True
+
+
+def requeue_stale_jobs(bind: Engine, timeout_seconds: float) -> int:
+    """
+    locked_at が timeout_seconds 以上更新されていない RUNNING のジョブ（停止したワーカーのもの）を実行待ちに戻す
+
+    試行回数が上限に達しているジョブは FAILED にする。
+
+    Returns:
+        更新したジョブ数
+    """
+    now = datetime.now(timezone.utc)
+    stale = (_jobs.c.state == JobState.RUNNING, _jobs.c.locked_at < now - timedelta(seconds=timeout_seconds))
+    error = "ワーカーの生存確認が途絶えたまま上限時間を過ぎました"
+    with bind.begin() as conn:
+        requeued = conn.execute(
+            update(_jobs).where(*stale, _jobs.c.attempts < _jobs.c.max_attempts)
+            .values(state=JobState.QUEUED, run_at=now, locked_by=None, locked_at=None, last_error=error)
+        ).rowcount
+        failed = conn.execute(
+            update(_jobs).where(*stale)
+            .values(state=JobState.FAILED, finished_at=now, locked_by=None, locked_at=None, last_error=error)
+        ).rowcount
+    if requeued or failed:
+        logger.warning("停止したワーカーのジョブを戻しました", extra={"requeued": requeued, "failed": failed})
+    return requeued + failed
+
+
+def _send_staff_assigned_emails(payload: dict) -> dict:
+    """payload: {"notifications": [[送信先, assignment_data], ...]}"""
+    notifications = [(to_email, data) for to_email, data in payload["notifications"]]
+    send_staff_assigned_emails(notifications)
+    return {"count": len(notifications)}
+
+
+def _send_waitlist_promoted_email(payload: dict) -> dict:
+    """payload: {"to_email": 送信先, "data": waitlist_data}"""
+    send_waitlist_promoted_email(payload["to_email"], payload["data"])
+    return {"count": 1}
+
+
+def _verify_consistency(payload: dict) -> dict:
+    """payload: {"apply": bool, "incremental": bool, "reservation_ids": [int, ...] or null}"""
+    with engine.connect() as conn:
+        report = verify_consistency(
+            conn,
+            apply=bool(payload.get("apply")),
+            incremental=bool(payload.get("incremental")),
+            batch_size=settings.SCHEDULER_BATCH_SIZE,
+            reservation_ids=payload.get("reservation_ids"),
+        )
+    return {
+        "checked": report.checked,
+        "applied": report.applied,
+        "fix_count": len(report.fixes),
+        "issue_count": len(report.issues),
+        "fixes": [
+            {
+                "reservation_id": fix.reservation_id,
+                "changes": [describe_change(column, old, new) for column, (old, new) in fix.changes.items()],
+            }
+            for fix in report.fixes[:REPORT_SAMPLE_SIZE]
+        ],
+        "issues": [
+            {"reservation_id": issue.reservation_id, "kind": issue.kind, "message": issue.message}
+            for issue in report.issues[:REPORT_SAMPLE_SIZE]
+        ],
+    }
+
+
+JOB_TYPES: Dict[str, JobType] = {
+    job_type.name: job_type
+    for job_type in (
+        JobType("email.staff_assigned", _send_staff_assigned_emails, concurrency=2, max_attempts=5),
+        JobType("email.waitlist_promoted", _send_waitlist_promoted_email, concurrency=2, max_attempts=5),
+        # 予約テーブル全体を読むため1件ずつ実行する（修正は冪等なので再実行してよい）
+        JobType("consistency.verify", _verify_consistency, concurrency=1, max_attempts=2),
+    )
+}
@@ -0,0 +1,207 @@
+"""
+構造化ロギング（JSON形式・非同期出力）
+
+ログレコードは QueueHandler でキューに積むだけで、実際の出力は
+QueueListener のスレッドが行う。リクエスト処理中のスレッドが
+標準出力などのI/Oでブロックされることはない。
+"""
+import copy
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+from pythonjsonlogger import jsonlogger
+from ..config import settings
+
+# アプリケーション全体のロガー名（各モジュールは logging.getLogger(__name__) を使う）
+LOGGER_NAME = "app"
+
+# リクエスト単位のログコンテキスト
+# 同期エンドポイントはスレッドプールで実行され、contextvarsはコピーされるため、
+# 値そのものではなく可変のdictを共有してuser_idなどを後から書き込めるようにする
+_request_context: ContextVar[Optional[dict]] = ContextVar("request_context", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_request_context() -> Optional[dict]:
+    """現在のリクエストのログコンテキストを取得（リクエスト外ではNone）"""
+    return _request_context.get()
+
+
+def set_log_user(user_id: int) -> None:
+    """
+    現在のリクエストのログコンテキストにユーザーIDを設定
+
+    Args:
+        user_id: ログインユーザーのID
+    """
+    context = _request_context.get()
+    if context is not None:
+        context["user_id"] = user_id
+
+
+class RequestContextFilter(logging.Filter):
+    """ログレコードにリクエストID・ユーザーIDを付与するフィルター"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get() or {}
+        record.request_id = context.get("request_id")
+        record.user_id = context.get("user_id")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    大量に出力されるデバッグログを間引くフィルター
+
+    `extra={"sample_rate": 0.1}` を指定したレコードはその確率で出力する。
+    指定のないDEBUGレコードには LOG_DEBUG_SAMPLE_RATE を適用する。
+    """
+
+    def __init__(self, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is None:
+            if record.levelno != logging.DEBUG:
+                return True
+            rate = self.debug_sample_rate
+        if rate >= 1.0:
+            return True
+        return random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    キューが満杯の場合はレコードを破棄するQueueHandler
+
+    ログ出力が詰まってもリクエスト処理を止めないことを優先する。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 引数の展開と例外のテキスト化だけを行い、JSON整形はリスナー側に任せる
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_formatter() -> logging.Formatter:
+    """JSONフォーマッターを作成"""
+    return jsonlogger.JsonFormatter(
+        "%(asctime)s %(levelname)s %(name)s %(message)s %(request_id)s %(user_id)s",
+        rename_fields={"asctime": "timestamp", "levelname": "level", "name": "logger"},
+        json_ensure_ascii=False,
+    )
+
+
+def setup_logging() -> None:
+    """
+    ロギングを初期化してQueueListenerを起動（複数回呼ばれても1度だけ実行）
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_build_formatter())
+
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    # フィルターはキューに積む前（呼び出し元スレッド）で評価する
+    queue_handler.addFilter(SamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(RequestContextFilter())
+
+    app_logger = logging.getLogger(LOGGER_NAME)
+    app_logger.handlers = [queue_handler]
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """QueueListenerを停止し、キューに残っているログを出力し切る"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
+class RequestLoggingMiddleware:
+    """
+    リクエストごとのログコンテキスト設定とアクセスログ出力を行うASGIミドルウェア
+
+    - X-Request-ID ヘッダーがあれば引き継ぎ、なければ採番してレスポンスに付与
+    - レスポンス完了時に処理時間（latency_ms）をJSONログとして出力
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        context = {"request_id": request_id, "user_id": None}
+        token = _request_context.set(context)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.logger.info(
+                "request completed",
+                extra={
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "status_code": status_code,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                },
+            )
+            _request_context.reset(token)
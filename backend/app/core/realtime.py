@@ -0,0 +1,184 @@
+"""
+リアルタイム通知のPub/Subブローカー
+
+チャネル（例: reservation:12, company:3）ごとに購読者のキューを持ち、
+publish されたメッセージを WebSocket / Server-Sent Events の接続に配信する。
+
+    - memory: プロセス内のみで配信（開発環境・単一ワーカー向け）
+    - redis:  Redis Pub/Sub を経由して全ワーカーに配信（gunicornの複数ワーカー向け）
+
+publish はスレッドセーフで、同期エンドポイント（スレッドプール）から直接呼び出せる。
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redisのチャネル名の接頭辞
+REDIS_CHANNEL_PREFIX = "realtime:"
+
+
+def reservation_channel(reservation_id: int) -> str:
+    """予約のチャネル名"""
+    return f"reservation:{reservation_id}"
+
+
+def company_channel(company_id: int) -> str:
+    """企業のチャネル名"""
+    return f"company:{company_id}"
+
+
+class Subscription:
+    """
+    1接続分の購読
+
+    配信が追いつかずキューが溢れた場合は溜まっているメッセージを捨て、
+    クライアントに再取得（resync）を促すメッセージだけを残す。
+    """
+
+    def __init__(self, channel: str, maxsize: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, message: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "channel": self.channel})
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """次のメッセージを取得（タイムアウトした場合はNone）"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBroker:
+    """プロセス内のPub/Subブローカー"""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """イベントループを記録（アプリケーション起動時に呼ぶ）"""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        """終了処理"""
+        self._subscribers.clear()
+
+    def subscribe(self, channel: str) -> Subscription:
+        """チャネルを購読（イベントループ上で呼ぶ）"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        subscription = Subscription(channel, self.queue_size)
+        self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読を解除"""
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.channel]
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """
+        メッセージを配信（どのスレッドからでも呼び出せる）
+
+        Args:
+            channel: チャネル名
+            message: JSONにシリアライズ可能なメッセージ
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._dispatch, channel, message)
+
+    def _dispatch(self, channel: str, message: Dict[str, Any]) -> None:
+        """購読者のキューにメッセージを入れる（イベントループ上で実行）"""
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.put(message)
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Redis Pub/Sub を経由するブローカー
+
+    publish したメッセージはRedisを経由して全ワーカーが受信し、
+    各ワーカーは自分のプロセス内の購読者に配信する。
+    """
+
+    def __init__(self, url: str, queue_size: int = 256):
+        super().__init__(queue_size)
+        import redis  # 任意の依存関係（REALTIME_BACKEND=redis の場合のみ必要）
+        import redis.asyncio
+        self._url = url
+        self._publisher = redis.Redis.from_url(url)
+        self._async_redis = redis.asyncio
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await super().start()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._publisher.close()
+        await super().stop()
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        try:
+            self._publisher.publish(REDIS_CHANNEL_PREFIX + channel, json.dumps(message, ensure_ascii=False))
+        except Exception:
+            logger.exception("リアルタイム通知の送信に失敗しました", extra={"channel": channel})
+
+    async def _listen(self) -> None:
+        """Redisのメッセージを受信してプロセス内の購読者に配信（切断時は再接続）"""
+        while True:
+            client = self._async_redis.from_url(self._url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(REDIS_CHANNEL_PREFIX + "*")
+                async for item in pubsub.listen():
+                    if item.get("type") != "pmessage":
+                        continue
+                    channel = item["channel"].decode("utf-8")[len(REDIS_CHANNEL_PREFIX):]
+                    self._dispatch(channel, json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis Pub/Subの受信に失敗しました。再接続します")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+                await client.close()
+
+
+def _create_broker() -> InMemoryBroker:
+    """設定に応じたブローカーを作成"""
+    backend = settings.REALTIME_BACKEND.lower()
+    if backend == "redis":
+        return RedisBroker(settings.REDIS_URL, settings.REALTIME_QUEUE_SIZE)
+    if backend != "memory":
+        raise ValueError(f"REALTIME_BACKEND の値が不正です: {settings.REALTIME_BACKEND}")
+    return InMemoryBroker(settings.REALTIME_QUEUE_SIZE)
+
+
+broker = _create_broker()
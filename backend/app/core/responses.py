@@ -0,0 +1,70 @@
+"""
+レスポンスのシリアライズ
+
+response_model を指定したエンドポイントでは、ORMオブジェクトをスキーマに変換したあと
+FastAPI が response_model で再検証し、jsonable_encoder で辞書に変換してからJSONにする。
+一覧では行数分この変換が重なるため、件数の多いエンドポイントでは
+
+    - 型ごとに1回だけ作成した TypeAdapter でORMオブジェクトを検証し
+    - pydantic-core で直接JSONのバイト列にする
+
+ことで、1回の変換でレスポンス本体を作る。response_model はOpenAPIのスキーマ用に残す。
+
+それ以外のエンドポイントの既定のレスポンスクラスは orjson を使う ORJSONResponse（main.py）。
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+# 直接Responseを返す場合もエンドポイントで設定したヘッダー（条件付きGET）を引き継ぐ
+PASSTHROUGH_HEADERS = ("etag", "cache-control")
+
+
+@lru_cache(maxsize=None)
+def type_adapter(annotation: Any) -> TypeAdapter:
+    """
+    型ごとの TypeAdapter（検証・シリアライズのスキーマは初回だけ構築する）
+
+    Args:
+        annotation: スキーマまたは List[スキーマ] などの型
+
+    Returns:
+        TypeAdapter
+    """
+    return TypeAdapter(annotation)
+
+
+def passthrough_headers(response: Optional[Response]) -> Optional[Dict[str, str]]:
+    """エンドポイントに注入されたレスポンスから引き継ぐヘッダー"""
+    if response is None:
+        return None
+    return {key: response.headers[key] for key in PASSTHROUGH_HEADERS if key in response.headers}
+
+
+def model_response(
+    annotation: Any,
+    content: Any,
+    *,
+    by_alias: bool = True,
+    status_code: int = status.HTTP_200_OK,
+    response: Optional[Response] = None,
+) -> Response:
+    """
+    ORMオブジェクト（またはそのリスト）を1回の変換でJSONレスポンスにする
+
+    Args:
+        annotation: レスポンスの型（例: Company, List[Reservation]）
+        content: ORMオブジェクト、スキーマのインスタンス、またはそのリスト
+        by_alias: エイリアス名で出力するか（FastAPIの response_model と同じく既定はTrue）
+        status_code: ステータスコード
+        response: エンドポイントに注入されたレスポンス（ETagなどのヘッダーを引き継ぐ）
+
+    Returns:
+        Response: application/json のレスポンス
+    """
+    adapter = type_adapter(annotation)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True), by_alias=by_alias)
+    return Response(
+        content=body, status_code=status_code, media_type="application/json", headers=passthrough_headers(response)
+    )
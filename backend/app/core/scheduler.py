@@ -0,0 +1,213 @@
+"""
+プロセス内の定期処理スケジューラー
+
+各ワーカーが一定間隔でDB上のリース（scheduler_leases）の取得を試み、
+取得できたワーカーだけがジョブを実行する。リースは実行のたびに延長され、
+保持していたワーカーが停止した場合は有効期限切れ後に他のワーカーが引き継ぐ。
+
+ジョブの実行時間と更新件数は maintenance_state に保存し、
+どのワーカーからでも /scheduler/metrics で参照できる。
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from ..config import settings
+from ..database import engine
+from ..models.scheduler_lease import SchedulerLease
+from ..utils.state_store import load_state, save_state
+from ..utils.sweeps import expire_pending_offers, close_past_deadline_reservations
+from ..utils.analytics import refresh_analytics
+from ..utils.forecast import refresh_forecast
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "sweeper"
+METRICS_KEY = "scheduler.metrics"
+
+_leases = SchedulerLease.__table__
+
+
+@dataclass
+class Job:
+    """定期ジョブ（func は接続・現在時刻・バッチサイズを受け取り、更新件数を返す）"""
+    name: str
+    func: Callable[[Connection, datetime, int], int]
+
+
+def acquire_lease(bind: Engine, name: str, owner: str, ttl_seconds: float) -> bool:
+    """
+    リースを取得または延長
+
+    Args:
+        bind: DBエンジン
+        name: リース名
+        owner: このワーカーの識別子
+        ttl_seconds: 有効期間（秒）
+
+    Returns:
+        このワーカーがリースを保持していればTrue
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    with bind.begin() as conn:
+        # 自分が保持しているか、期限切れの場合だけ更新できる
+        result = conn.execute(
+            update(_leases)
+            .where(_leases.c.name == name, or_(_leases.c.owner == owner, _leases.c.expires_at < now))
+            .values(owner=owner, expires_at=expires_at)
+        )
+        if result.rowcount:
+            return True
+        if conn.execute(select(_leases.c.name).where(_leases.c.name == name)).first():
+            return False
+    try:
+        with bind.begin() as conn:
+            conn.execute(insert(_leases).values(name=name, owner=owner, expires_at=expires_at))
+        return True
+    except IntegrityError:
+        # 他のワーカーが同時に作成した
+        return False
+
+
+def release_lease(bind: Engine, name: str, owner: str) -> None:
+    """保持しているリースを期限切れにして、他のワーカーがすぐに引き継げるようにする"""
+    with bind.begin() as conn:
+        conn.execute(
+            update(_leases)
+            .where(_leases.c.name == name, _leases.c.owner == owner)
+            .values(expires_at=datetime.now(timezone.utc))
+        )
+
+
+class Scheduler:
+    """リースを保持している間だけジョブを実行するスケジューラー"""
+
+    def __init__(self, bind: Engine, jobs: List[Job], interval: float, lease_seconds: float, batch_size: int):
+        self.bind = bind
+        self.jobs = jobs
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """バックグラウンドで実行を開始（アプリケーション起動時に呼ぶ）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """実行を停止してリースを解放（アプリケーション終了時に呼ぶ）"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await run_in_threadpool(release_lease, self.bind, LEASE_NAME, self.owner)
+        except Exception:
+            logger.exception("スケジューラーのリースの解放に失敗しました")
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception("定期処理の実行に失敗しました")
+            await asyncio.sleep(self.interval)
+
+    def run_once(self) -> bool:
+        """
+        リースを取得できた場合に全ジョブを1回実行
+
+        Returns:
+            実行した場合はTrue
+        """
+        if not acquire_lease(self.bind, LEASE_NAME, self.owner, self.lease_seconds):
+            return False
+
+        results = {}
+        for job in self.jobs:
+            started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            affected, error = 0, None
+            try:
+                with self.bind.connect() as conn:
+                    affected = job.func(conn, started_at, self.batch_size)
+            except Exception as e:
+                error = str(e)
+                logger.exception("定期ジョブの実行に失敗しました", extra={"job": job.name})
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            results[job.name] = (started_at, duration_ms, affected, error)
+            if affected:
+                logger.info("定期ジョブを実行しました", extra={
+                    "job": job.name, "affected": affected, "duration_ms": duration_ms,
+                })
+
+        self._record_metrics(results)
+        return True
+
+    def _record_metrics(self, results: dict) -> None:
+        """ジョブごとの実行回数・直近の実行時間・更新件数を保存"""
+        with self.bind.begin() as conn:
+            metrics = load_state(conn, METRICS_KEY, {})
+            for name, (started_at, duration_ms, affected, error) in results.items():
+                previous = metrics.get(name, {})
+                metrics[name] = {
+                    "runs": previous.get("runs", 0) + 1,
+                    "errors": previous.get("errors", 0) + (1 if error else 0),
+                    "last_run_at": started_at.isoformat(),
+                    "last_duration_ms": duration_ms,
+                    "last_affected": affected,
+                    "total_affected": previous.get("total_affected", 0) + affected,
+                    "max_duration_ms": max(previous.get("max_duration_ms", 0), duration_ms),
+                    "last_error": error,
+                    "owner": self.owner,
+                }
+            save_state(conn, METRICS_KEY, metrics)
+
+
+def get_scheduler_status(bind) -> dict:
+    """
+    リースの保持者とジョブのメトリクス
+
+    Args:
+        bind: Session または Connection
+
+    Returns:
+        {"lease": {...} or None, "jobs": {ジョブ名: メトリクス}}
+    """
+    lease = bind.execute(
+        select(_leases.c.owner, _leases.c.expires_at).where(_leases.c.name == LEASE_NAME)
+    ).first()
+    return {
+        "lease": {"owner": lease.owner, "expires_at": lease.expires_at} if lease else None,
+        "jobs": load_state(bind, METRICS_KEY, {}),
+    }
+
+
+scheduler = Scheduler(
+    engine,
+    [
+        Job("expire_pending_offers", expire_pending_offers),
+        Job("close_past_deadline_reservations", close_past_deadline_reservations),
+        Job("refresh_analytics", refresh_analytics),
+        Job("refresh_forecast", refresh_forecast),
+    ],
+    interval=settings.SCHEDULER_INTERVAL_SECONDS,
+    lease_seconds=settings.SCHEDULER_LEASE_SECONDS,
+    batch_size=settings.SCHEDULER_BATCH_SIZE,
+)
@@ -2,12 +2,22 @@
 FastAPI アプリケーション本体
 """
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .config import settings
-from .api.v1 import auth, users, companies, staff, employees, reservations, attendance, ratings, assignments, upload
+from .core.logger import setup_logging, shutdown_logging, RequestLoggingMiddleware
+from .core.compression import CompressionMiddleware
+from .core.realtime import broker
+from .core.scheduler import scheduler
+from .api.v1 import auth, users, companies, availability, staff, employees, reservations, waitlist, open_slots, attendance, ratings, assignments, upload, sync, realtime, scheduler as scheduler_api, dashboard, analytics, payroll, jobs
+import logging
 import os
 
+# 構造化ロギングの初期化
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # FastAPIアプリケーションの作成
 app = FastAPI(
     title=settings.APP_NAME,
@@ -16,6 +26,8 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    # dict などを返すエンドポイントは orjson でシリアライズする（一覧は core/responses.py で直接JSON化）
+    default_response_class=ORJSONResponse,
 )
 
 # CORS設定
@@ -27,6 +39,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# レスポンスの圧縮（Accept-Encoding に応じて gzip / Brotli）
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+        cache_size=settings.COMPRESSION_CACHE_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# リクエストID・処理時間のログ出力
+app.add_middleware(RequestLoggingMiddleware)
+
 
 # ヘルスチェックエンドポイント
 @app.get("/", tags=["Health"])
@@ -49,13 +75,25 @@ async def health_check():
 app.include_router(auth.router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1", tags=["Users"])
 app.include_router(companies.router, prefix="/api/v1", tags=["Companies"])
+# /staff/available を /staff/{staff_id} より先に登録する
+app.include_router(availability.router, prefix="/api/v1", tags=["Staff Availability"])
 app.include_router(staff.router, prefix="/api/v1", tags=["Staff"])
 app.include_router(employees.router, prefix="/api/v1", tags=["Employees"])
 app.include_router(reservations.router, prefix="/api/v1", tags=["Reservations"])
+app.include_router(waitlist.router, prefix="/api/v1", tags=["Waitlist"])
+app.include_router(open_slots.router, prefix="/api/v1", tags=["Jobs"])
 app.include_router(attendance.router, prefix="/api/v1", tags=["Attendance"])
 app.include_router(ratings.router, prefix="/api/v1", tags=["Ratings"])
 app.include_router(assignments.router, prefix="/api/v1", tags=["Assignments"])
 app.include_router(upload.router, prefix="/api/v1", tags=["Upload"])
+app.include_router(sync.router, prefix="/api/v1", tags=["Sync"])
+app.include_router(realtime.router, prefix="/api/v1", tags=["Realtime"])
+app.include_router(scheduler_api.router, prefix="/api/v1", tags=["Scheduler"])
+app.include_router(dashboard.router, prefix="/api/v1", tags=["Dashboard"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["Analytics"])
+app.include_router(payroll.router, prefix="/api/v1", tags=["Payroll"])
+# /jobs/open（空き枠一覧）を /jobs/{job_id} より先に登録する
+app.include_router(jobs.router, prefix="/api/v1", tags=["Background Jobs"])
 
 
 # 静的ファイルの配信設定（アップロードされた画像）
@@ -68,13 +106,18 @@ app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 @app.on_event("startup")
 async def startup_event():
     """アプリケーション起動時の処理"""
-    print("🚀 Oriental Synergy API が起動しました")
-    print(f"📝 ドキュメント: http://localhost:8000/api/docs")
+    await broker.start()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
+    logger.info("Oriental Synergy API が起動しました", extra={"docs_url": "/api/docs"})
 
 
 # 終了時の処理
 @app.on_event("shutdown")
 async def shutdown_event():
     """アプリケーション終了時の処理"""
-    print("👋 Oriental Synergy API が終了しました")
+    await scheduler.stop()
+    await broker.stop()
+    logger.info("Oriental Synergy API が終了しました")
+    shutdown_logging()
 
@@ -5,10 +5,25 @@ from .user import User
 from .company import Company
 from .staff import Staff
 from .employee import Employee
+from .employee_care_record import EmployeeCareRecord
 from .reservation import Reservation
 from .attendance import Attendance
 from .rating import Rating
 from .reservation_staff import ReservationStaff
+from .reservation_employee import ReservationEmployee
+from .maintenance_state import MaintenanceState
+from .tombstone import Tombstone
+from .staff_availability import StaffAvailability, StaffAvailabilityException
+from .scheduler_lease import SchedulerLease
+from .reservation_waitlist import ReservationWaitlist
+from .open_slot import OpenSlotIndex
+from .kpi_rollup import CompanyKpiRollup, StaffKpiRollup, KpiTouchedDay
+from .job import Job
 
-__all__ = ["User", "Company", "Staff", "Employee", "Reservation", "Attendance", "Rating", "ReservationStaff"]
+__all__ = [
+    "User", "Company", "Staff", "Employee", "Reservation", "Attendance", "Rating", "ReservationStaff",
+    "ReservationEmployee", "MaintenanceState", "Tombstone", "StaffAvailability", "StaffAvailabilityException",
+    "SchedulerLease", "ReservationWaitlist", "OpenSlotIndex", "EmployeeCareRecord", "CompanyKpiRollup",
+    "StaffKpiRollup", "KpiTouchedDay", "Job",
+]
 
@@ -1,7 +1,7 @@
 """
 企業モデル
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -30,6 +30,7 @@ class Company(Base):
     notes = Column(Text)  # 備考
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default="0", onupdate=text("version + 1"))  # 更新のたびに1増える（ETag用）
     
     # リレーション
     user = relationship("User", backref="companies")
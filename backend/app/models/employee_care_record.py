@@ -0,0 +1,47 @@
+"""
+社員のケア記録モデル
+"""
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class EmployeeCareRecord(Base):
+    """
+    社員のケア記録テーブル（追記のみ）
+
+    スタッフの完了報告の特記事項を1件ずつ保存する。以前は社員の concerns / medical_record に
+    全文を追記していたため、社員の行が際限なく大きくなっていた。
+    履歴は社員ごとに新しい順（created_at, id の降順）にカーソルでページングする。
+    """
+    __tablename__ = "employee_care_records"
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    attendance_id = Column(Integer, ForeignKey("attendance.id", ondelete="SET NULL"), nullable=True)
+    staff_id = Column(Integer, ForeignKey("staff.id", ondelete="SET NULL"), nullable=True)
+    body = Column(Text, nullable=False)
+    # カーソルで (created_at, id) を比較するため、アプリ側で秒未満まで同じ形式で設定する
+    # （SQLiteでは server_default の CURRENT_TIMESTAMP と形式が異なり、比較がずれる）
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now(), nullable=False)
+
+    # リレーション
+    staff = relationship("Staff", lazy="joined")
+
+    __table_args__ = (
+        # 社員ごとの新しい順の履歴・最新の記録を索引だけで取り出す
+        Index("ix_employee_care_records_employee_created", employee_id, created_at.desc(), id.desc()),
+    )
+
+    @property
+    def staff_name(self):
+        return self.staff.name if self.staff else None
+
+    def __repr__(self):
+        return f"<EmployeeCareRecord(id={self.id}, employee_id={self.employee_id})>"
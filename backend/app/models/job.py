@@ -0,0 +1,50 @@
+"""
+バックグラウンドジョブのキューモデル
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum
+from sqlalchemy.sql import func
+from ..database import Base
+import enum
+
+
+class JobState(str, enum.Enum):
+    """ジョブの状態"""
+    QUEUED = "queued"        # 実行待ち（run_at 以降に実行する）
+    RUNNING = "running"      # ワーカーが実行中
+    SUCCEEDED = "succeeded"  # 成功
+    FAILED = "failed"        # 再試行の上限まで失敗
+
+
+class Job(Base):
+    """
+    バックグラウンドジョブテーブル（core/jobs.py で登録・取得し、python -m app.worker が実行する）
+
+    APIはリクエストと同じトランザクションで行を追加するだけにして、メール送信などの遅い処理を
+    Webのワーカーから切り離す。ワーカーは実行待ちの行を1件ずつ RUNNING に更新して取得する。
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # 実行待ちのジョブを実行予定時刻の順に取り出す
+        Index("ix_jobs_claim", "state", "run_at"),
+        # 種類ごとの実行中の件数（同時実行数の上限）
+        Index("ix_jobs_type_state", "type", "state"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(50), nullable=False)  # 例: email.staff_assigned
+    state = Column(SQLEnum(JobState), default=JobState.QUEUED, nullable=False)
+    payload = Column(JSON)  # ハンドラーに渡す引数
+    result = Column(JSON)  # ハンドラーの戻り値（成功時）
+    attempts = Column(Integer, nullable=False, default=0)  # 実行した回数
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime(timezone=True), nullable=False)  # この時刻以降に実行する（再試行時は延期）
+    locked_by = Column(String(255))  # 実行中のワーカー（ホスト名:PID:ランダム値）
+    locked_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 登録したユーザー（APIから登録した場合）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, type={self.type}, state={self.state})>"
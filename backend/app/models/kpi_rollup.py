@@ -0,0 +1,85 @@
+"""
+分析用の集計（ロールアップ）モデル
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, JSON
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class CompanyKpiRollup(Base):
+    """
+    企業ごとの日次・月次の集計テーブル（utils/analytics.py で維持する）
+
+    日次の行は予約日ごとに予約・アサイン・評価から再集計し、月次の行は日次の行を合計して作る。
+    /analytics の各APIはこのテーブルだけを読む。
+    """
+    __tablename__ = "company_kpi_rollups"
+    __table_args__ = (
+        Index("ix_company_kpi_rollups_key", "grain", "period", "company_id", unique=True),
+        Index("ix_company_kpi_rollups_company", "company_id", "grain", "period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    grain = Column(String(5), nullable=False)  # day / month
+    period = Column(String(10), nullable=False)  # 2025/10/30 / 2025/10
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    reservation_count = Column(Integer, nullable=False, default=0)
+    status_counts = Column(JSON)  # {"confirmed": 3, "cancelled": 1, ...}
+    slot_count = Column(Integer, nullable=False, default=0)  # キャンセル以外の予約の枠数
+    filled_slot_count = Column(Integer, nullable=False, default=0)  # うち予約済みの枠数
+    assignment_count = Column(Integer, nullable=False, default=0)  # 確定・完了のアサイン数
+    service_minutes = Column(Integer, nullable=False, default=0)  # 確定・完了のアサインの施術時間（分）
+    revenue = Column(Integer, nullable=False, default=0)  # 時給 × 施術時間（円）
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0)  # 評価（5項目の平均）の合計
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CompanyKpiRollup(grain={self.grain}, period={self.period}, company_id={self.company_id})>"
+
+
+class StaffKpiRollup(Base):
+    """
+    スタッフごとの日次・月次の集計テーブル（utils/analytics.py で維持する）
+
+    稼働可能時間（毎週の稼働時間帯と例外）に対する施術時間で稼働率を求める。
+    """
+    __tablename__ = "staff_kpi_rollups"
+    __table_args__ = (
+        Index("ix_staff_kpi_rollups_key", "grain", "period", "staff_id", unique=True),
+        Index("ix_staff_kpi_rollups_staff", "staff_id", "grain", "period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    grain = Column(String(5), nullable=False)  # day / month
+    period = Column(String(10), nullable=False)  # 2025/10/30 / 2025/10
+    staff_id = Column(Integer, ForeignKey("staff.id", ondelete="CASCADE"), nullable=False)
+    offer_count = Column(Integer, nullable=False, default=0)  # 受けたオファー数（全ステータス）
+    assignment_count = Column(Integer, nullable=False, default=0)  # 確定・完了のアサイン数
+    declined_count = Column(Integer, nullable=False, default=0)  # 辞退したオファー数
+    service_minutes = Column(Integer, nullable=False, default=0)  # 確定・完了のアサインの施術時間（分）
+    available_minutes = Column(Integer, nullable=False, default=0)  # 稼働可能時間（分）
+    earnings = Column(Integer, nullable=False, default=0)  # 給与（円）
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<StaffKpiRollup(grain={self.grain}, period={self.period}, staff_id={self.staff_id})>"
+
+
+class KpiTouchedDay(Base):
+    """
+    再集計が必要な日の記録（utils/analytics.py の touched_days が読む）
+
+    予約日を変更した予約は変更前の日が予約テーブルから分からなくなるため、
+    変更と同じトランザクションで変更前の日を記録する。
+    """
+    __tablename__ = "kpi_touched_days"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(10), nullable=False)  # 2025/10/30
+    touched_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<KpiTouchedDay(period={self.period})>"
@@ -0,0 +1,18 @@
+"""
+メンテナンス処理の状態モデル（バッチ処理の前回実行時刻などを保持）
+"""
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class MaintenanceState(Base):
+    """メンテナンス状態テーブル（キー・バリュー形式）"""
+    __tablename__ = "maintenance_state"
+    
+    key = Column(String(100), primary_key=True)  # 例: consistency.last_run_at
+    value = Column(Text)  # JSON文字列
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<MaintenanceState(key={self.key})>"
@@ -0,0 +1,40 @@
+"""
+空き枠インデックスモデル
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class OpenSlotIndex(Base):
+    """
+    スタッフ募集中の空き枠テーブル（utils/open_slots.py で維持する索引用のテーブル）
+
+    募集中（RECRUITING / ASSIGNING）の予約の枠のうち、有効なアサイン（辞退・キャンセル以外）が
+    ない枠を1行として持つ。予約の枠やアサインが変わるたびにその予約の行だけを差分更新する。
+    """
+    __tablename__ = "open_slots"
+    __table_args__ = (
+        # /jobs/open の日付・開始時刻の範囲検索とページング用
+        Index("ix_open_slots_date_start_area", "date", "start_minute", "area"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"), nullable=False, index=True)
+    slot_number = Column(Integer, nullable=True)  # Noneの場合は予約全体（枠なし）
+    company_id = Column(Integer, nullable=False)
+    date = Column(String(10), nullable=False)  # YYYY/MM/DD に正規化
+    start_minute = Column(Integer, nullable=False)
+    end_minute = Column(Integer, nullable=False)
+    start_time = Column(String(5), nullable=False)
+    end_time = Column(String(5), nullable=False)
+    area = Column(String(20), nullable=False, default="")  # 都道府県
+    city = Column(String(50), nullable=False, default="")  # 市区町村
+    office_name = Column(String(255))
+    office_address = Column(Text)
+    hourly_rate = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default="0", onupdate=text("version + 1"))  # 更新のたびに1増える（ETag用）
+    
+    def __repr__(self):
+        return f"<OpenSlotIndex(reservation_id={self.reservation_id}, slot_number={self.slot_number}, date={self.date})>"
@@ -1,10 +1,11 @@
 """
 予約モデル
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum, Text, JSON, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from ..database import Base
+from ..utils.date_utils import parse_local_datetime
 import enum
 
 
@@ -22,6 +23,10 @@ class ReservationStatus(str, enum.Enum):
 class Reservation(Base):
     """予約テーブル"""
     __tablename__ = "reservations"
+    __table_args__ = (
+        # 企業ごとのステータス別一覧用
+        Index("ix_reservations_company_status", "company_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -31,9 +36,11 @@ class Reservation(Base):
     start_time = Column(String(10), nullable=False)  # 15:00
     end_time = Column(String(10), nullable=False)    # 17:00
     application_deadline = Column(String(50))  # 募集期限（YYYY/MM/DD HH:MM）
+    application_deadline_at = Column(DateTime(timezone=True), index=True)  # 募集期限（UTC、application_deadline から自動設定）
     max_participants = Column(Integer, default=1, nullable=False)  # 募集人数
     staff_names = Column(Text)  # カンマ区切り
-    employee_names = Column(Text)  # カンマ区切り
+    # 参加社員は reservation_employees（roster）で管理する。
+    # 既存DBに残る employee_names カラムは migrate_employee_roster.py で名簿に移行する
     
     # 時間枠管理フィールド
     total_duration = Column(Integer)  # 全体時間（分）
@@ -44,16 +51,39 @@ class Reservation(Base):
     slots_filled = Column(Integer, default=0)  # 予約済み枠数
     hourly_rate = Column(Integer)  # 時給（円）
     
-    status = Column(SQLEnum(ReservationStatus), default=ReservationStatus.RECRUITING, nullable=False)
+    status = Column(SQLEnum(ReservationStatus), default=ReservationStatus.RECRUITING, nullable=False, index=True)
+    
+    # ステータス自動遷移用のカウンター（utils/reservation_status.py で更新）
+    offered_count = Column(Integer, default=0, server_default="0", nullable=False)  # オファー中・確定・完了のアサイン数
+    confirmed_count = Column(Integer, default=0, server_default="0", nullable=False)  # 確定・完了のアサイン数
+    completed_count = Column(Integer, default=0, server_default="0", nullable=False)  # 完了報告済みのアサイン数
+    rated_count = Column(Integer, default=0, server_default="0", nullable=False)  # 評価済みスタッフの確定・完了アサイン数
+    whole_confirmed_count = Column(Integer, default=0, server_default="0", nullable=False)  # 予約全体（枠指定なし）の確定・完了アサイン数
     notes = Column(Text)
     requirements = Column(Text)  # 要望など
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)  # 差分同期用にインデックス
+    version = Column(Integer, nullable=False, default=0, server_default="0", onupdate=text("version + 1"))  # 更新のたびに1増える（ETag用）
     
     # リレーション
     company = relationship("Company", backref="reservations")
     ratings = relationship("Rating", back_populates="reservation")
     staff_assignments = relationship("ReservationStaff", back_populates="reservation")
+    roster = relationship(
+        "ReservationEmployee", back_populates="reservation", order_by="ReservationEmployee.id",
+        lazy="selectin", cascade="all, delete-orphan", passive_deletes=True,
+    )
+    
+    @property
+    def employee_names(self):
+        """参加社員名のカンマ区切り（レスポンス用に名簿から生成する）"""
+        return ", ".join(entry.employee.name for entry in self.roster) or None
+    
+    @validates("application_deadline")
+    def _sync_application_deadline_at(self, key, value):
+        """募集期限の文字列から、定期処理で比較する日時を設定する"""
+        self.application_deadline_at = parse_local_datetime(value)
+        return value
     
     def __repr__(self):
         return f"<Reservation(id={self.id}, company_id={self.company_id}, date={self.reservation_date})>"
@@ -0,0 +1,40 @@
+"""
+予約の参加社員（名簿）モデル
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ReservationEmployee(Base):
+    """
+    予約の参加社員テーブル
+
+    以前は予約の employee_names にカンマ区切りで社員名を追記していた。
+    (reservation_id, employee_id) の一意制約で二重登録を防ぎ、
+    予約ごとの登録の確認・件数の集計もこの索引で行う。
+    """
+    __tablename__ = "reservation_employees"
+    __table_args__ = (
+        UniqueConstraint("reservation_id", "employee_id", name="uq_reservation_employees_reservation_employee"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
+    slot_number = Column(Integer, nullable=True)  # 枠番号（1始まり、枠のない予約はNone）
+    department = Column(String(100))  # 登録時の部署
+    position = Column(String(100))    # 登録時の役職
+    notes = Column(Text)  # 登録時の備考（以前は予約の notes に追記していた）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # リレーション
+    reservation = relationship("Reservation", back_populates="roster")
+    employee = relationship("Employee", lazy="joined")
+
+    def __repr__(self):
+        return (
+            f"<ReservationEmployee(reservation_id={self.reservation_id}, employee_id={self.employee_id}, "
+            f"slot={self.slot_number})>"
+        )
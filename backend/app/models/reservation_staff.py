@@ -1,13 +1,20 @@
 """
 予約-スタッフ関連モデル（多対多）
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
+from datetime import datetime, timedelta, timezone
+from ..config import settings
 import enum
 
 
+def _default_expires_at():
+    """オファーの有効期限（作成から OFFER_EXPIRY_HOURS 時間後）"""
+    return datetime.now(timezone.utc) + timedelta(hours=settings.OFFER_EXPIRY_HOURS)
+
+
 class AssignmentStatus(str, enum.Enum):
     """アサインステータス"""
     PENDING = "pending"          # 承認待ち
@@ -20,6 +27,10 @@ class AssignmentStatus(str, enum.Enum):
 class ReservationStaff(Base):
     """予約-スタッフ関連テーブル（多対多）"""
     __tablename__ = "reservation_staff"
+    __table_args__ = (
+        # ダブルブッキング検出でスタッフの確定済みアサインを引くため（既存DBは migrate_sync.py で作成）
+        Index("ix_reservation_staff_staff_status", "staff_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     reservation_id = Column(Integer, ForeignKey("reservations.id"), nullable=False)
@@ -29,6 +40,10 @@ class ReservationStaff(Base):
     assigned_by = Column(Integer, ForeignKey("users.id"))  # アサインした管理者/企業ユーザー
     assigned_at = Column(DateTime(timezone=True), server_default=func.now())
     notes = Column(String(500))  # 備考
+    # 差分同期用（migrate_sync.py で追加した既存DBにはサーバー側デフォルトがないため、INSERT時にも設定する）
+    updated_at = Column(DateTime(timezone=True), default=func.now(), server_default=func.now(), onupdate=func.now(), index=True)
+    # PENDING のまま期限を過ぎたオファーは定期処理でキャンセルする（migrate_scheduler.py で追加）
+    expires_at = Column(DateTime(timezone=True), default=_default_expires_at, index=True)
     
     # リレーション
     reservation = relationship("Reservation", back_populates="staff_assignments")
@@ -0,0 +1,51 @@
+"""
+予約のキャンセル待ちモデル
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+import enum
+
+
+class WaitlistStatus(str, enum.Enum):
+    """キャンセル待ちステータス"""
+    WAITING = "waiting"      # 待機中
+    PROMOTED = "promoted"    # 繰り上げ済み
+    CANCELLED = "cancelled"  # 取り消し
+
+
+class ReservationWaitlist(Base):
+    """
+    予約のキャンセル待ちテーブル
+
+    予約ごとにIDの昇順（登録順）で並ぶキュー。枠が空いたときは、希望枠がないか
+    その枠を希望している待機中の先頭が同じトランザクションで繰り上がる。
+    """
+    __tablename__ = "reservation_waitlist"
+    __table_args__ = (
+        # 予約ごとの待機中の先頭を索引だけで取り出す
+        Index("ix_reservation_waitlist_queue", "reservation_id", "status", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id", ondelete="CASCADE"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    employee_name = Column(String(100), nullable=False)
+    department = Column(String(100))
+    position = Column(String(100))
+    email = Column(String(255))
+    phone = Column(String(20))
+    notes = Column(Text)
+    preferred_slot = Column(Integer, nullable=True)  # 希望枠番号（Noneの場合はどの枠でも可）
+    status = Column(SQLEnum(WaitlistStatus), default=WaitlistStatus.WAITING, nullable=False)
+    promoted_slot = Column(Integer, nullable=True)  # 繰り上がった枠番号
+    promoted_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # リレーション
+    reservation = relationship("Reservation", backref="waitlist_entries")
+    
+    def __repr__(self):
+        return f"<ReservationWaitlist(reservation_id={self.reservation_id}, employee_name={self.employee_name}, status={self.status})>"
@@ -0,0 +1,19 @@
+"""
+定期処理の実行権（リース）モデル
+
+複数のワーカー（gunicorn）のうち、リースを保持している1つだけが定期処理を実行する。
+"""
+from sqlalchemy import Column, String, DateTime
+from ..database import Base
+
+
+class SchedulerLease(Base):
+    """定期処理のリーステーブル"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(100), primary_key=True)  # 例: sweeper
+    owner = Column(String(255), nullable=False)  # 保持しているワーカー（ホスト名:PID:ランダム値）
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # この時刻を過ぎると他のワーカーが取得できる
+    
+    def __repr__(self):
+        return f"<SchedulerLease(name={self.name}, owner={self.owner})>"
@@ -1,7 +1,7 @@
 """
 スタッフモデル
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Date, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -26,11 +26,18 @@ class Staff(Base):
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default="0", onupdate=text("version + 1"))  # 更新のたびに1増える（ETag用）
     
     # リレーション
     user = relationship("User", backref="staff")
     ratings = relationship("Rating", back_populates="staff")
     reservations = relationship("ReservationStaff", back_populates="staff")
+    availability_windows = relationship(
+        "StaffAvailability", back_populates="staff", cascade="all, delete-orphan", passive_deletes=True,
+    )
+    availability_exceptions = relationship(
+        "StaffAvailabilityException", back_populates="staff", cascade="all, delete-orphan", passive_deletes=True,
+    )
     
     def __repr__(self):
         return f"<Staff(id={self.id}, name={self.name})>"
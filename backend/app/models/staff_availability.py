@@ -0,0 +1,55 @@
+"""
+スタッフの稼働可能時間モデル
+"""
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class StaffAvailability(Base):
+    """スタッフの毎週の稼働可能時間帯テーブル"""
+    __tablename__ = "staff_availability"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    staff_id = Column(Integer, ForeignKey("staff.id", ondelete="CASCADE"), nullable=False, index=True)
+    weekday = Column(Integer, nullable=False)  # 0=月曜 〜 6=日曜
+    start_time = Column(String(5), nullable=False)  # 10:00
+    end_time = Column(String(5), nullable=False)  # 18:00（24:00も可）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # リレーション
+    staff = relationship("Staff", back_populates="availability_windows")
+    
+    __table_args__ = (
+        Index("ix_staff_availability_weekday_staff", "weekday", "staff_id"),
+    )
+    
+    def __repr__(self):
+        return f"<StaffAvailability(staff_id={self.staff_id}, weekday={self.weekday}, {self.start_time}-{self.end_time})>"
+
+
+class StaffAvailabilityException(Base):
+    """スタッフの日付指定の稼働可否テーブル（休み・追加の稼働）"""
+    __tablename__ = "staff_availability_exceptions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    staff_id = Column(Integer, ForeignKey("staff.id", ondelete="CASCADE"), nullable=False, index=True)
+    date = Column(String(10), nullable=False)  # 2025/10/30
+    is_available = Column(Boolean, default=False, nullable=False)  # False=休み、True=追加で稼働可能
+    start_time = Column(String(5))  # 未指定の場合は終日
+    end_time = Column(String(5))
+    reason = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # リレーション
+    staff = relationship("Staff", back_populates="availability_exceptions")
+    
+    __table_args__ = (
+        Index("ix_staff_availability_exceptions_date_staff", "date", "staff_id"),
+    )
+    
+    def __repr__(self):
+        return f"<StaffAvailabilityException(staff_id={self.staff_id}, date={self.date}, is_available={self.is_available})>"
@@ -0,0 +1,26 @@
+"""
+削除記録モデル（差分同期用）
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class Tombstone(Base):
+    """
+    削除記録テーブル
+
+    差分同期API（/sync/...）で削除されたレコードをクライアントに伝えるため、
+    物理削除したレコードのIDを記録する。
+    """
+    __tablename__ = "tombstones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(50), nullable=False)  # reservations / reservation_staff
+    record_id = Column(Integer, nullable=False)
+    company_id = Column(Integer, index=True)  # 企業ユーザーの同期範囲の絞り込み用
+    staff_id = Column(Integer, index=True)  # スタッフユーザーの同期範囲の絞り込み用
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Tombstone(table={self.table_name}, record_id={self.record_id})>"
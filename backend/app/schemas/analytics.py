@@ -0,0 +1,92 @@
+"""
+分析（KPI）スキーマ
+"""
+from typing import Dict, List, Optional
+from pydantic import BaseModel, model_validator
+
+
+def _ratio(numerator, denominator) -> Optional[float]:
+    """比率（分母が0の場合はNone、小数第3位まで）"""
+    if not denominator:
+        return None
+    return round(numerator / denominator, 3)
+
+
+class KpiTotals(BaseModel):
+    """期間ごとの全企業の集計"""
+    period: str  # 2025/10/30 / 2025/10
+    reservation_count: int = 0
+    status_counts: Dict[str, int] = {}
+    slot_count: int = 0
+    filled_slot_count: int = 0
+    fill_rate: Optional[float] = None  # 予約済みの枠数 / 枠数（キャンセル以外）
+    assignment_count: int = 0
+    service_minutes: int = 0
+    revenue: int = 0  # 時給 × 施術時間（円）
+    rating_count: int = 0
+    rating_sum: float = 0
+    average_rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+    @model_validator(mode="after")
+    def _derive(self):
+        self.fill_rate = _ratio(self.filled_slot_count, self.slot_count)
+        self.average_rating = _ratio(self.rating_sum, self.rating_count)
+        return self
+
+
+class CompanyKpi(KpiTotals):
+    """企業ごとの集計"""
+    company_id: int
+    company_name: Optional[str] = None
+
+
+class StaffKpi(BaseModel):
+    """スタッフごとの集計"""
+    period: str
+    staff_id: int
+    staff_name: Optional[str] = None
+    offer_count: int = 0
+    assignment_count: int = 0
+    declined_count: int = 0
+    service_minutes: int = 0
+    available_minutes: int = 0
+    utilization: Optional[float] = None  # 施術時間 / 稼働可能時間
+    earnings: int = 0
+    rating_count: int = 0
+    rating_sum: float = 0
+    average_rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+    @model_validator(mode="after")
+    def _derive(self):
+        self.utilization = _ratio(self.service_minutes, self.available_minutes)
+        self.average_rating = _ratio(self.rating_sum, self.rating_count)
+        return self
+
+
+class ForecastDay(BaseModel):
+    """1日分の予測"""
+    date: str  # 2025/10/30
+    weekday: int  # 0=月曜 〜 6=日曜
+    slots: Dict[str, float]  # 時間帯（morning / afternoon / evening）ごとの枠数
+    total: float
+
+
+class ForecastWeek(BaseModel):
+    """1週分の予測"""
+    week_start: str  # 月曜日
+    total: float
+    days: List[ForecastDay]
+
+
+class DemandForecast(BaseModel):
+    """スタッフ需要（予約の枠数）の予測"""
+    generated_at: str  # 予測の作成日時
+    history_weeks: int  # 学習に使った過去の週数
+    company_id: Optional[int] = None  # Noneの場合は全企業の合計
+    weeks: List[ForecastWeek]
@@ -0,0 +1,77 @@
+"""
+スタッフ稼働可能時間スキーマ
+"""
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List
+from datetime import datetime
+from ..utils.date_utils import parse_date, format_date, time_to_minutes
+
+
+def _validate_time(value: Optional[str]) -> Optional[str]:
+    """HH:MM形式をチェックしてゼロ埋めした文字列を返す"""
+    if value is None:
+        return value
+    minutes = time_to_minutes(value)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class AvailabilityWindow(BaseModel):
+    """毎週の稼働時間帯"""
+    weekday: int = Field(..., ge=0, le=6, description="曜日（0=月曜 〜 6=日曜）")
+    start_time: str = Field(..., description="開始時刻（HH:MM）")
+    end_time: str = Field(..., description="終了時刻（HH:MM、24:00も可）")
+    
+    _normalize_time = field_validator("start_time", "end_time")(_validate_time)
+    
+    @model_validator(mode="after")
+    def check_order(self):
+        if time_to_minutes(self.start_time) >= time_to_minutes(self.end_time):
+            raise ValueError("終了時刻は開始時刻より後にしてください")
+        return self
+    
+    class Config:
+        from_attributes = True
+
+
+class AvailabilityExceptionCreate(BaseModel):
+    """日付指定の稼働可否の作成"""
+    date: str = Field(..., description="日付（YYYY/MM/DD）")
+    is_available: bool = False  # False=休み、True=追加で稼働可能
+    start_time: Optional[str] = None  # 未指定の場合は終日
+    end_time: Optional[str] = None
+    reason: Optional[str] = None
+    
+    _normalize_time = field_validator("start_time", "end_time")(_validate_time)
+    
+    @field_validator("date")
+    @classmethod
+    def normalize_date(cls, v):
+        parsed = parse_date(v)
+        if parsed is None:
+            raise ValueError("日付の形式が不正です（YYYY/MM/DD）")
+        return format_date(parsed)
+    
+    @model_validator(mode="after")
+    def check_times(self):
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValueError("開始時刻と終了時刻は両方指定するか、両方省略してください")
+        if self.start_time and time_to_minutes(self.start_time) >= time_to_minutes(self.end_time):
+            raise ValueError("終了時刻は開始時刻より後にしてください")
+        return self
+
+
+class AvailabilityException(AvailabilityExceptionCreate):
+    """日付指定の稼働可否"""
+    id: int
+    staff_id: int
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class StaffAvailabilityResponse(BaseModel):
+    """スタッフの稼働可能時間"""
+    staff_id: int
+    weekly: List[AvailabilityWindow] = []
+    exceptions: List[AvailabilityException] = []
@@ -0,0 +1,35 @@
+"""
+社員のケア記録スキーマ
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class CareRecord(BaseModel):
+    """ケア記録レスポンススキーマ"""
+    id: int
+    employee_id: int
+    attendance_id: Optional[int] = None
+    staff_id: Optional[int] = None
+    staff_name: Optional[str] = None
+    body: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CareRecordList(BaseModel):
+    """ケア記録の履歴（新しい順、カーソルページング）"""
+    items: List[CareRecord]
+    next_cursor: Optional[str] = None  # 次のページの cursor（最終ページはNone）
+    has_more: bool
+
+
+class CareRecordSummary(BaseModel):
+    """一覧に含める最新のケア記録の要約"""
+    id: int
+    staff_name: Optional[str] = None
+    summary: str
+    created_at: datetime
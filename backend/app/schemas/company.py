@@ -1,7 +1,7 @@
 """
 企業スキーマ
 """
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional
 from datetime import datetime
 
@@ -60,6 +60,12 @@ class Company(CompanyBase):
     created_at: datetime
     updated_at: datetime
     
+    @field_validator('contract_start_date', mode='before')
+    @classmethod
+    def default_contract_start_date(cls, v):
+        """契約開始日が未設定の場合は空文字（一覧・詳細で同じ値を返す）"""
+        return v or ""
+    
     class Config:
         from_attributes = True
         populate_by_name = True  # エイリアスとフィールド名の両方を許可
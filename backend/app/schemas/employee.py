@@ -4,6 +4,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
+from .care_record import CareRecordSummary
 
 
 class EmployeeBase(BaseModel):
@@ -51,3 +52,23 @@ class Employee(EmployeeBase):
     class Config:
         from_attributes = True
 
+
+class EmployeeListItem(BaseModel):
+    """社員一覧のレスポンススキーマ（お悩み・カルテの全文は含めず、最新のケア記録の要約のみ）"""
+    id: int
+    company_id: int
+    name: str
+    department: str
+    position: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    line_id: Optional[str] = None
+    line_linked: bool = False
+    is_active: bool = True
+    notes: Optional[str] = None
+    latest_care_record: Optional[CareRecordSummary] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,32 @@
+"""
+バックグラウンドジョブスキーマ
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+from ..models.job import JobState
+
+
+class JobCreate(BaseModel):
+    """ジョブ登録スキーマ"""
+    type: str = Field(..., description="ジョブの種類（例: consistency.verify）")
+    payload: Dict[str, Any] = {}
+    run_at: Optional[datetime] = Field(None, description="実行予定時刻（省略時はすぐ）")
+
+
+class JobStatus(BaseModel):
+    """ジョブの状態レスポンススキーマ"""
+    id: int
+    type: str
+    state: JobState
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: Optional[datetime] = None
+    locked_at: Optional[datetime] = None  # ワーカーの最後の生存確認時刻（実行中のみ）
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    result: Optional[Any] = None  # ハンドラーの戻り値（成功時）
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,30 @@
+"""
+空き枠（スタッフ向け求人）スキーマ
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class OpenJob(BaseModel):
+    """スタッフ募集中の空き枠"""
+    reservation_id: int
+    slot_number: Optional[int] = None  # Noneの場合は予約全体
+    company_id: int
+    office_name: Optional[str] = None
+    office_address: Optional[str] = None
+    area: str  # 都道府県
+    city: str  # 市区町村
+    date: str  # YYYY/MM/DD
+    start_time: str
+    end_time: str
+    hourly_rate: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class OpenJobList(BaseModel):
+    """空き枠の一覧（カーソルページング）"""
+    items: List[OpenJob]
+    next_cursor: Optional[str] = None  # 次のページの cursor（最終ページはNone）
+    has_more: bool
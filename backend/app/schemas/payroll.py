@@ -0,0 +1,26 @@
+"""
+給与明細スキーマ
+"""
+from pydantic import BaseModel
+
+
+class Payslip(BaseModel):
+    """スタッフ1人の月次の給与明細"""
+    staff_id: int
+    staff_name: str
+    year: int
+    month: int
+    assignment_count: int = 0  # 確定済みアサイン数
+    scheduled_minutes: int = 0  # 予定の施術時間（分）
+    worked_minutes: int = 0  # 実働時間（分、勤怠がないアサインは予定の施術時間）
+    overtime_minutes: int = 0  # 予定の施術時間を超えた実働（分）
+    shortfall_minutes: int = 0  # 遅刻・早退で不足した時間（分）
+    late_count: int = 0
+    early_leave_count: int = 0
+    base_pay: int = 0  # 時給 × 予定の施術時間（円）
+    overtime_pay: int = 0  # 時給 × 割増率 × 超過時間（円）
+    deductions: int = 0  # 時給 × 不足時間（円）
+    total_pay: int = 0  # 支給額
+
+    class Config:
+        from_attributes = True
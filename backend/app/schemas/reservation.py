@@ -98,6 +98,7 @@ class Reservation(ReservationBase):
 
 class EmployeeRegistration(BaseModel):
     """社員の予約登録スキーマ"""
+    employee_id: Optional[int] = None  # 省略時は企業内の社員名で特定（いなければ作成）
     employee_name: str
     department: str
     position: Optional[str] = None
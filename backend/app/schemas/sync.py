@@ -0,0 +1,41 @@
+"""
+差分同期スキーマ
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from ..models.reservation_staff import AssignmentStatus
+from .reservation import Reservation
+
+
+class SyncAssignment(BaseModel):
+    """差分同期用のアサイン"""
+    id: int
+    reservation_id: int
+    staff_id: int
+    slot_number: Optional[int] = None
+    status: AssignmentStatus
+    assigned_by: Optional[int] = None
+    assigned_at: Optional[datetime] = None
+    notes: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class SyncResponseBase(BaseModel):
+    """差分同期レスポンスの共通部分"""
+    deleted: List[int] = []  # 削除されたレコードのID
+    next_token: str  # 次回の since に指定するトークン
+    has_more: bool = False  # Trueの場合は next_token で続きを取得する
+
+
+class ReservationSyncResponse(SyncResponseBase):
+    """予約の差分同期レスポンス"""
+    changes: List[Reservation] = []
+
+
+class AssignmentSyncResponse(SyncResponseBase):
+    """アサインの差分同期レスポンス"""
+    changes: List[SyncAssignment] = []
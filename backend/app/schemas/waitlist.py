@@ -0,0 +1,38 @@
+"""
+キャンセル待ちスキーマ
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from ..models.reservation_waitlist import WaitlistStatus
+
+
+class WaitlistCreate(BaseModel):
+    """キャンセル待ち登録スキーマ"""
+    employee_id: Optional[int] = None
+    employee_name: str
+    department: str
+    position: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None  # 繰り上げ時の通知先
+    notes: Optional[str] = None
+    preferred_slot: Optional[int] = Field(None, ge=1, description="希望枠番号（省略時はどの枠でも可）")
+
+
+class WaitlistEntry(BaseModel):
+    """キャンセル待ちレスポンススキーマ"""
+    id: int
+    reservation_id: int
+    employee_id: Optional[int] = None
+    employee_name: str
+    department: Optional[str] = None
+    position: Optional[str] = None
+    preferred_slot: Optional[int] = None
+    status: WaitlistStatus
+    queue_position: Optional[int] = None  # 待機中の順番（1始まり）
+    promoted_slot: Optional[int] = None
+    promoted_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,351 @@
+"""
+分析用の集計（日次・月次のロールアップ）の差分更新
+
+前回実行以降に変更があった予約日だけを再集計する。
+
+    - 予約・アサイン・評価が更新された予約の予約日
+    - 予約日を変更した予約の変更前の日（kpi_touched_days）
+    - 削除記録（tombstones）がある企業・スタッフの集計済みの日
+    - 稼働時間の例外が更新された日、毎週の稼働時間帯が更新されたスタッフの今日以降の集計済みの日
+
+対象日の日次の行は予約・アサイン・評価・稼働可能時間から作り直し（削除して挿入）、
+その日を含む月の月次の行は日次の行を合計して作り直す。初回（ウォーターマークなし）は全日を集計する。
+"""
+import json
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.engine import Connection
+from ..models.kpi_rollup import CompanyKpiRollup, StaffKpiRollup, KpiTouchedDay
+from ..models.rating import Rating
+from ..models.reservation import Reservation, ReservationStatus
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from ..models.staff import Staff
+from ..models.staff_availability import StaffAvailability, StaffAvailabilityException
+from ..models.tombstone import Tombstone
+from .availability import SLOT_MINUTES, compile_day_masks
+from .date_utils import date_variants, format_date, local_today, parse_date
+from .state_store import database_now, load_state, save_state
+
+# 前回実行時刻を保存するキー
+WATERMARK_KEY = "analytics.last_run_at"
+
+# 差分チェック時の重なり幅（SQLiteのupdated_atは秒単位のため、境界の取りこぼしを防ぐ）
+WATERMARK_OVERLAP = timedelta(seconds=1)
+
+DAY = "day"
+MONTH = "month"
+
+# 施術時間・売上に数えるアサイン
+_ACTIVE_STATUSES = (AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED)
+
+_reservations = Reservation.__table__
+_assignments = ReservationStaff.__table__
+_ratings = Rating.__table__
+_company_rollups = CompanyKpiRollup.__table__
+_staff_rollups = StaffKpiRollup.__table__
+_touched_days = KpiTouchedDay.__table__
+
+# 日次の行を合計して月次の行を作るカラム
+_COMPANY_SUM_COLUMNS = (
+    "reservation_count", "slot_count", "filled_slot_count", "assignment_count",
+    "service_minutes", "revenue", "rating_count", "rating_sum",
+)
+_STAFF_SUM_COLUMNS = (
+    "offer_count", "assignment_count", "declined_count", "service_minutes",
+    "available_minutes", "earnings", "rating_count", "rating_sum",
+)
+
+
+def service_minutes(time_slots, slot_number: Optional[int], service_duration: Optional[int]) -> int:
+    """
+    アサインの施術時間（分）
+
+    給与計算（calculate_staff_earnings）と同じく、枠番号があればその枠の duration、
+    なければ予約の施術時間。
+    """
+    if slot_number and time_slots:
+        slots = time_slots
+        if isinstance(slots, str):
+            try:
+                slots = json.loads(slots)
+            except (json.JSONDecodeError, TypeError):
+                return 0
+        if isinstance(slots, list):
+            for slot in slots:
+                if isinstance(slot, dict) and slot.get("slot") == slot_number:
+                    return slot.get("duration") or 0
+        return 0
+    return service_duration or 0
+
+
+def record_touched_day(db, reservation_date: Optional[str]) -> None:
+    """
+    予約日の変更前の日を再集計の対象として記録（変更と同じトランザクションでコミットすること）
+
+    Args:
+        db: Session または Connection
+        reservation_date: 変更前の予約日
+    """
+    day = parse_date(reservation_date) if reservation_date else None
+    if day is not None:
+        db.execute(insert(_touched_days).values(period=format_date(day)))
+
+
+def _rollup_days(conn: Connection, table, column, ids: Iterable[int], date_from: Optional[date] = None) -> Set[str]:
+    """企業・スタッフの集計済みの日（日次の行の期間）"""
+    ids = list(ids)
+    if not ids:
+        return set()
+    stmt = select(table.c.period).where(table.c.grain == DAY, column.in_(ids)).distinct()
+    if date_from is not None:
+        stmt = stmt.where(table.c.period >= format_date(date_from))
+    return set(conn.execute(stmt).scalars().all())
+
+
+def touched_days(conn: Connection, since: Optional[datetime]) -> Set[date]:
+    """
+    再集計が必要な予約日
+
+    Args:
+        conn: DB接続
+        since: この時刻以降の変更を対象にする（Noneの場合は全日）
+
+    Returns:
+        日付の集合
+    """
+    if since is None:
+        values = set(conn.execute(select(_reservations.c.reservation_date).distinct()).scalars().all())
+        # 予約がなくなった日の行も消すため、集計済みの日も対象にする
+        values |= set(conn.execute(
+            select(_company_rollups.c.period).where(_company_rollups.c.grain == DAY).distinct()
+        ).scalars().all())
+        values |= set(conn.execute(
+            select(_staff_rollups.c.period).where(_staff_rollups.c.grain == DAY).distinct()
+        ).scalars().all())
+        return {day for day in map(parse_date, values) if day is not None}
+
+    changed = or_(
+        _reservations.c.updated_at >= since,
+        _reservations.c.id.in_(select(_assignments.c.reservation_id).where(_assignments.c.updated_at >= since)),
+        _reservations.c.id.in_(select(_ratings.c.reservation_id).where(_ratings.c.updated_at >= since)),
+    )
+    values = set(conn.execute(select(_reservations.c.reservation_date).where(changed).distinct()).scalars().all())
+
+    # 予約日を変更した予約の変更前の日
+    values |= set(conn.execute(
+        select(_touched_days.c.period).where(_touched_days.c.touched_at >= since).distinct()
+    ).scalars().all())
+
+    # 削除された予約・アサインは予約日が分からないため、その企業・スタッフの集計済みの日を再集計する
+    deleted = conn.execute(
+        select(Tombstone.company_id, Tombstone.staff_id).where(Tombstone.deleted_at >= since)
+    ).all()
+    values |= _rollup_days(
+        conn, _company_rollups, _company_rollups.c.company_id,
+        {row.company_id for row in deleted if row.company_id is not None},
+    )
+    values |= _rollup_days(
+        conn, _staff_rollups, _staff_rollups.c.staff_id,
+        {row.staff_id for row in deleted if row.staff_id is not None},
+    )
+
+    # 稼働可能時間の変更（毎週の稼働時間帯は過去の日には遡らない）
+    values |= set(conn.execute(
+        select(StaffAvailabilityException.date).where(StaffAvailabilityException.updated_at >= since).distinct()
+    ).scalars().all())
+    weekly_staff_ids = conn.execute(
+        select(StaffAvailability.staff_id).where(StaffAvailability.updated_at >= since).distinct()
+    ).scalars().all()
+    values |= _rollup_days(conn, _staff_rollups, _staff_rollups.c.staff_id, weekly_staff_ids, local_today())
+
+    return {day for day in map(parse_date, values) if day is not None}
+
+
+def _available_minutes(conn: Connection, days: List[date]) -> Dict[Tuple[str, int], int]:
+    """日ごと・スタッフごとの稼働可能時間（分、受付中のスタッフのみ）"""
+    windows_by_weekday = defaultdict(list)
+    for window in conn.execute(
+        select(StaffAvailability.staff_id, StaffAvailability.weekday,
+               StaffAvailability.start_time, StaffAvailability.end_time)
+        .join(Staff, Staff.id == StaffAvailability.staff_id)
+        .where(Staff.is_available.is_(True), StaffAvailability.weekday.in_({day.weekday() for day in days}))
+    ):
+        windows_by_weekday[window.weekday].append(window)
+
+    variants = {variant: day for day in days for variant in date_variants(day)}
+    exceptions_by_day = defaultdict(list)
+    for exception in conn.execute(
+        select(StaffAvailabilityException.staff_id, StaffAvailabilityException.date,
+               StaffAvailabilityException.is_available,
+               StaffAvailabilityException.start_time, StaffAvailabilityException.end_time)
+        .join(Staff, Staff.id == StaffAvailabilityException.staff_id)
+        .where(Staff.is_available.is_(True), StaffAvailabilityException.date.in_(list(variants)))
+    ):
+        exceptions_by_day[variants[exception.date]].append(exception)
+
+    minutes = {}
+    for day in days:
+        masks = compile_day_masks(windows_by_weekday[day.weekday()], exceptions_by_day[day])
+        for staff_id, mask in masks.items():
+            if mask:
+                minutes[(format_date(day), staff_id)] = bin(mask).count("1") * SLOT_MINUTES
+    return minutes
+
+
+def _company_row() -> dict:
+    row = {name: 0 for name in _COMPANY_SUM_COLUMNS}
+    row["status_counts"] = Counter()
+    return row
+
+
+def _staff_row() -> dict:
+    return {name: 0 for name in _STAFF_SUM_COLUMNS}
+
+
+def rebuild_days(conn: Connection, days: List[date]) -> None:
+    """
+    指定した日の日次の行を作り直す（コミットは呼び出し側で行う）
+
+    Args:
+        conn: DB接続
+        days: 予約日
+    """
+    if not days:
+        return
+    variants = {variant: format_date(day) for day in days for variant in date_variants(day)}
+    periods = sorted(set(variants.values()))
+
+    reservations = conn.execute(
+        select(
+            _reservations.c.id, _reservations.c.company_id, _reservations.c.reservation_date,
+            _reservations.c.status, _reservations.c.slot_count, _reservations.c.slots_filled,
+            _reservations.c.time_slots, _reservations.c.service_duration, _reservations.c.hourly_rate,
+        ).where(_reservations.c.reservation_date.in_(list(variants)))
+    ).all()
+    reservation_map = {row.id: row for row in reservations}
+    reservation_ids = list(reservation_map)
+
+    companies: Dict[Tuple[str, int], dict] = defaultdict(_company_row)
+    staff: Dict[Tuple[str, int], dict] = defaultdict(_staff_row)
+
+    for row in reservations:
+        company = companies[(variants[row.reservation_date], row.company_id)]
+        company["reservation_count"] += 1
+        company["status_counts"][row.status.value if row.status else "unknown"] += 1
+        if row.status != ReservationStatus.CANCELLED:
+            company["slot_count"] += row.slot_count or 1
+            company["filled_slot_count"] += row.slots_filled or 0
+
+    if reservation_ids:
+        for assignment in conn.execute(
+            select(_assignments.c.reservation_id, _assignments.c.staff_id,
+                   _assignments.c.slot_number, _assignments.c.status)
+            .where(_assignments.c.reservation_id.in_(reservation_ids))
+        ):
+            reservation = reservation_map[assignment.reservation_id]
+            period = variants[reservation.reservation_date]
+            member = staff[(period, assignment.staff_id)]
+            member["offer_count"] += 1
+            if assignment.status == AssignmentStatus.REJECTED:
+                member["declined_count"] += 1
+            if assignment.status not in _ACTIVE_STATUSES:
+                continue
+            minutes = service_minutes(reservation.time_slots, assignment.slot_number, reservation.service_duration)
+            hourly_rate = reservation.hourly_rate or 0
+            # 給与計算と同じく円未満は切り捨てる
+            amount = int((minutes * hourly_rate) / 60) if minutes > 0 and hourly_rate > 0 else 0
+            company = companies[(period, reservation.company_id)]
+            company["assignment_count"] += 1
+            company["service_minutes"] += minutes
+            company["revenue"] += amount
+            member["assignment_count"] += 1
+            member["service_minutes"] += minutes
+            member["earnings"] += amount
+
+        for rating in conn.execute(
+            select(_ratings.c.reservation_id, _ratings.c.company_id, _ratings.c.staff_id, _ratings.c.average_rating)
+            .where(_ratings.c.reservation_id.in_(reservation_ids))
+        ):
+            period = variants[reservation_map[rating.reservation_id].reservation_date]
+            for row in (companies[(period, rating.company_id)], staff[(period, rating.staff_id)]):
+                row["rating_count"] += 1
+                row["rating_sum"] += rating.average_rating or 0
+
+    for key, minutes in _available_minutes(conn, days).items():
+        staff[key]["available_minutes"] = minutes
+
+    for table, rows, id_column in (
+        (_company_rollups, companies, "company_id"),
+        (_staff_rollups, staff, "staff_id"),
+    ):
+        conn.execute(delete(table).where(table.c.grain == DAY, table.c.period.in_(periods)))
+        if rows:
+            conn.execute(insert(table), [
+                {"grain": DAY, "period": period, id_column: row_id, **values}
+                for (period, row_id), values in rows.items()
+            ])
+
+
+def rebuild_months(conn: Connection, months: Iterable[str]) -> None:
+    """
+    指定した月（YYYY/MM）の月次の行を日次の行の合計で作り直す（コミットは呼び出し側で行う）
+    """
+    months = sorted(set(months))
+    if not months:
+        return
+    for table, columns, id_column, make_row in (
+        (_company_rollups, _COMPANY_SUM_COLUMNS, "company_id", _company_row),
+        (_staff_rollups, _STAFF_SUM_COLUMNS, "staff_id", _staff_row),
+    ):
+        totals: Dict[Tuple[str, int], dict] = defaultdict(make_row)
+        day_rows = conn.execute(
+            select(table).where(
+                table.c.grain == DAY,
+                or_(*(table.c.period.startswith(f"{month}/") for month in months)),
+            )
+        ).mappings()
+        for day_row in day_rows:
+            total = totals[(day_row["period"][:7], day_row[id_column])]
+            for name in columns:
+                total[name] += day_row[name] or 0
+            if "status_counts" in total:
+                total["status_counts"].update(day_row["status_counts"] or {})
+        conn.execute(delete(table).where(table.c.grain == MONTH, table.c.period.in_(months)))
+        if totals:
+            conn.execute(insert(table), [
+                {"grain": MONTH, "period": period, id_column: row_id, **values}
+                for (period, row_id), values in totals.items()
+            ])
+
+
+def refresh_analytics(conn: Connection, now: datetime, batch_size: int) -> int:
+    """
+    前回実行以降に変更があった日の集計を作り直す（定期ジョブ）
+
+    Args:
+        conn: DB接続（バッチごとにコミットする）
+        now: 現在時刻（UTC）
+        batch_size: 1回のトランザクションで再集計する最大日数
+
+    Returns:
+        再集計した日数
+    """
+    started_at = database_now(conn)
+    last_run = load_state(conn, WATERMARK_KEY)
+    since = datetime.fromisoformat(last_run) - WATERMARK_OVERLAP if last_run else None
+
+    days = sorted(touched_days(conn, since))
+    for start in range(0, len(days), batch_size):
+        batch = days[start:start + batch_size]
+        rebuild_days(conn, batch)
+        rebuild_months(conn, {format_date(day)[:7] for day in batch})
+        conn.commit()
+
+    if since is not None:
+        # 前回までの実行で再集計済みの記録を削除
+        conn.execute(delete(_touched_days).where(_touched_days.c.touched_at < since))
+    save_state(conn, WATERMARK_KEY, started_at.isoformat())
+    conn.commit()
+    return len(days)
@@ -0,0 +1,31 @@
+"""
+住所の地域（都道府県・市区町村）
+
+事業所の座標は保持していないため、住所の先頭の都道府県・市区町村を地域として使う
+（自動割り当ての移動コストの見積もり、空き枠の地域での絞り込み）。
+"""
+import re
+from typing import Optional, Tuple
+
+# 都道府県は名前に「都」「府」を含むもの（京都府）があるため、列挙できる都・道・府は明示し、県は2〜3文字とする
+_PREFECTURE = r"東京都|北海道|(?:京都|大阪)府|.{2,3}県"
+# 市区町村は最初の「市」「区」、または「郡」の後の最初の「町」「村」まで（大阪市北区 → 大阪市、町田市・大町市・市川市も1つ目の市まで）。
+# 名前が「市」で終わる市（四日市市など）は列挙する。市・区・郡がない場合は最初の「町」「村」まで
+_MUNICIPALITY = r"(?:四日市|廿日市|野々市)市|.+?(?:市|区|郡.+?[町村])|.+?[町村]"
+_AREA_PATTERN = re.compile(rf"^({_PREFECTURE})?({_MUNICIPALITY})?")
+
+
+def address_area(address: Optional[str]) -> Tuple[str, str]:
+    """
+    住所の（都道府県, 市区町村）
+
+    Args:
+        address: 住所
+
+    Returns:
+        読み取れない部分は空文字
+    """
+    if not address:
+        return ("", "")
+    match = _AREA_PATTERN.match(address.replace(" ", "").replace("　", ""))
+    return (match.group(1) or "", match.group(2) or "") if match else ("", "")
@@ -0,0 +1,347 @@
+"""
+スタッフの自動割り当て（最小コストの二部マッチング）
+
+指定日の募集中の予約の空き枠と、稼働できるスタッフの組み合わせにコストを付け、
+ハンガリアン法で合計コストが最小になる割り当てを求める。
+
+    - 稼働不可（稼働可能時間外・確定済みのアサインや回答待ちのオファーと重なる）の組は割り当てない
+    - 評価が高いスタッフほど低コスト
+    - 前後のアサインの事業所との距離（住所の都道府県・市区町村の一致度）が近いほど低コスト
+
+1回のマッチングでは1人1枠しか割り当てられないため、割り当てた枠をスタッフの
+予定に加えて、残りの枠について割り当てられなくなるまでマッチングを繰り返す。
+scipy がインストールされていれば linear_sum_assignment を使い、なければNumPy実装を使う。
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from ..models.reservation import Reservation
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from ..models.staff import Staff
+from ..models.staff_availability import StaffAvailability, StaffAvailabilityException
+from .areas import address_area
+from .availability import compile_day_masks, touched_mask
+from .date_utils import date_variants, time_to_minutes
+from .open_slots import OPEN_STATUSES, INACTIVE_ASSIGNMENT_STATUSES, slot_windows, refresh_open_slots
+from .reservation_status import CONFIRMED_STATUSES, on_assignment_change
+from .schedule_conflicts import ScheduledAssignment, StaffSchedule, load_day_schedules
+
+# 割り当てられない組のコスト（linear_sum_assignment は inf を扱えないため有限の大きな値）
+INFEASIBLE = 1e6
+
+# コストの重み
+RATING_WEIGHT = 2.0            # 評価（5段階）が1下がるごとのコスト
+DEFAULT_RATING = 3.0           # 評価がないスタッフの評価
+TRAVEL_WEIGHT = 1.0            # 移動（前後のアサインとの距離）のコスト
+LOAD_WEIGHT = 0.5              # その日に既に割り当てられている件数あたりのコスト
+UNREGISTERED_PENALTY = 3.0     # 稼働可能時間を登録していないスタッフのコスト
+
+# 同じ住所 / 同じ市区町村 / 同じ都道府県 / それ以外 の移動コスト
+TRAVEL_SAME_OFFICE = 0.0
+TRAVEL_SAME_CITY = 1.0
+TRAVEL_SAME_PREFECTURE = 2.0
+TRAVEL_FAR = 4.0
+
+# 自動割り当てで作成したオファーの備考
+PLAN_NOTE = "自動割り当て"
+
+
+@dataclass(frozen=True)
+class OpenSlot:
+    """スタッフが未割り当ての枠（枠番号がNoneの場合は予約全体）"""
+    reservation_id: int
+    slot_number: Optional[int]
+    start_time: str
+    end_time: str
+    office_address: Optional[str]
+
+    @property
+    def start(self) -> int:
+        return time_to_minutes(self.start_time)
+
+    @property
+    def end(self) -> int:
+        return time_to_minutes(self.end_time)
+
+
+@dataclass(frozen=True)
+class PlannedAssignment:
+    """割り当て案"""
+    slot: OpenSlot
+    staff_id: int
+    cost: float
+
+
+@dataclass
+class AssignmentPlan:
+    """1日分の割り当て案"""
+    date: date
+    slots: List[OpenSlot]
+    assignments: List[PlannedAssignment] = field(default_factory=list)
+
+    @property
+    def unassigned(self) -> List[OpenSlot]:
+        assigned = {(planned.slot.reservation_id, planned.slot.slot_number) for planned in self.assignments}
+        return [slot for slot in self.slots if (slot.reservation_id, slot.slot_number) not in assigned]
+
+
+@dataclass
+class _Candidate:
+    staff_id: int
+    base_cost: float
+    mask: Optional[int]  # 稼働可能時間を登録していない場合はNone
+
+
+def travel_cost(from_address: Optional[str], to_address: Optional[str]) -> float:
+    """
+    2つの事業所間の移動コスト
+
+    住所の座標は保持していないため、都道府県・市区町村の一致度で近さを見積もる。
+    どちらかの住所が不明な場合は0。
+    """
+    if not from_address or not to_address:
+        return 0.0
+    if from_address.strip() == to_address.strip():
+        return TRAVEL_SAME_OFFICE
+    from_prefecture, from_city = address_area(from_address)
+    to_prefecture, to_city = address_area(to_address)
+    if from_prefecture and from_prefecture == to_prefecture:
+        return TRAVEL_SAME_CITY if from_city and from_city == to_city else TRAVEL_SAME_PREFECTURE
+    if not from_prefecture and from_city and from_city == to_city:
+        return TRAVEL_SAME_CITY
+    return TRAVEL_FAR
+
+
+def _hungarian(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ハンガリアン法（ポテンシャル付き最短増加路）、行数 <= 列数
+
+    各行について列方向の更新をベクトル化しているため、O(n^2 m) のうち内側の m はNumPyで処理される。
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # match[j]: 列jに割り当てた行（1始まり、0は未割り当て）
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            improve = free & (reduced < minv[1:])
+            minv[1:][improve] = reduced[improve]
+            way[1:][improve] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            used_columns = np.nonzero(used)[0]
+            u[match[used_columns]] += delta
+            v[used_columns] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    columns = np.nonzero(match[1:])[0]
+    rows = match[1:][columns] - 1
+    order = np.argsort(rows)
+    return rows[order], columns[order]
+
+
+def solve_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    最小コストの割り当て（長方形の行列も可）
+
+    Returns:
+        (行のインデックス, 列のインデックス)
+    """
+    if cost.size == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    try:
+        from scipy.optimize import linear_sum_assignment  # 任意の依存関係
+    except ImportError:
+        linear_sum_assignment = None
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    if cost.shape[0] > cost.shape[1]:
+        columns, rows = _hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], columns[order]
+    return _hungarian(cost)
+
+
+def collect_open_slots(db: Session, day: date) -> List[OpenSlot]:
+    """
+    指定日の募集中の予約のうち、スタッフが未割り当て（オファー中も含めて）の枠
+
+    Args:
+        db: データベースセッション
+        day: 日付
+
+    Returns:
+        空き枠のリスト（予約ID・枠番号順）
+    """
+    reservations = db.query(Reservation).filter(
+        Reservation.reservation_date.in_(date_variants(day)),
+        Reservation.status.in_(OPEN_STATUSES),
+    ).order_by(Reservation.id).all()
+    if not reservations:
+        return []
+
+    taken = set(db.query(ReservationStaff.reservation_id, ReservationStaff.slot_number).filter(
+        ReservationStaff.reservation_id.in_([reservation.id for reservation in reservations]),
+        ReservationStaff.status.notin_(INACTIVE_ASSIGNMENT_STATUSES),
+    ).all())
+
+    return [
+        OpenSlot(reservation.id, slot_number, start_time, end_time, reservation.office_address)
+        for reservation in reservations
+        for slot_number, start_time, end_time in slot_windows(
+            reservation.time_slots, reservation.start_time, reservation.end_time
+        )
+        if (reservation.id, slot_number) not in taken
+    ]
+
+
+def _load_candidates(db: Session, day: date) -> List[_Candidate]:
+    """割り当て候補のスタッフ（稼働可能フラグが立っているスタッフ）"""
+    staff_rows = db.query(Staff.id, Staff.rating).filter(Staff.is_available.isnot(False)).order_by(Staff.id).all()
+
+    windows = db.query(StaffAvailability.staff_id, StaffAvailability.start_time, StaffAvailability.end_time).filter(
+        StaffAvailability.weekday == day.weekday()
+    ).all()
+    exceptions = db.query(
+        StaffAvailabilityException.staff_id, StaffAvailabilityException.is_available,
+        StaffAvailabilityException.start_time, StaffAvailabilityException.end_time,
+    ).filter(StaffAvailabilityException.date.in_(date_variants(day))).all()
+    masks = compile_day_masks(windows, exceptions)
+    registered = {staff_id for (staff_id,) in db.query(StaffAvailability.staff_id).distinct()}
+
+    candidates = []
+    for staff_id, rating in staff_rows:
+        if staff_id in masks:
+            mask, penalty = masks[staff_id], 0.0
+        elif staff_id in registered:
+            continue  # 毎週の稼働時間帯は登録済みだが、この曜日は稼働しない
+        else:
+            mask, penalty = None, UNREGISTERED_PENALTY
+        score = float(rating) if rating else DEFAULT_RATING
+        candidates.append(_Candidate(staff_id, RATING_WEIGHT * (5.0 - score) + penalty, mask))
+    return candidates
+
+
+def plan_assignments(db: Session, day: date) -> AssignmentPlan:
+    """
+    指定日の空き枠へのスタッフの割り当て案を作成（DBは変更しない）
+
+    Args:
+        db: データベースセッション
+        day: 日付
+
+    Returns:
+        AssignmentPlan: 割り当て案
+    """
+    slots = collect_open_slots(db, day)
+    plan = AssignmentPlan(date=day, slots=slots)
+    candidates = _load_candidates(db, day)
+    if not slots or not candidates:
+        return plan
+
+    # 回答待ちのオファーも受託されれば拘束されるため、同じ時間帯に二重にオファーしないよう予定に含める
+    # （受託時の重なりの確認は確定済みのアサインだけを対象にする）
+    schedules: Dict[int, StaffSchedule] = load_day_schedules(
+        db, day, statuses=(AssignmentStatus.PENDING, *CONFIRMED_STATUSES)
+    )
+    slot_masks = {slot: touched_mask(slot.start_time, slot.end_time) for slot in slots}
+    remaining = list(slots)
+    planned_id = 0
+    while remaining:
+        cost = np.full((len(candidates), len(remaining)), INFEASIBLE)
+        for row, candidate in enumerate(candidates):
+            schedule = schedules.get(candidate.staff_id)
+            for column, slot in enumerate(remaining):
+                if candidate.mask is not None and slot_masks[slot] & ~candidate.mask:
+                    continue
+                travel = 0.0
+                load = 0
+                if schedule is not None:
+                    if schedule.find_overlap(slot.start, slot.end):
+                        continue
+                    before, after = schedule.neighbours(slot.start, slot.end)
+                    if before is not None:
+                        travel += travel_cost(before.office_address, slot.office_address)
+                    if after is not None:
+                        travel += travel_cost(slot.office_address, after.office_address)
+                    load = len(schedule)
+                cost[row, column] = candidate.base_cost + TRAVEL_WEIGHT * travel + LOAD_WEIGHT * load
+
+        rows, columns = solve_assignment(cost)
+        chosen = [(row, column) for row, column in zip(rows, columns) if cost[row, column] < INFEASIBLE]
+        if not chosen:
+            break
+
+        for row, column in chosen:
+            slot = remaining[column]
+            staff_id = candidates[row].staff_id
+            plan.assignments.append(PlannedAssignment(slot, staff_id, float(cost[row, column])))
+            # 以降のマッチングで重なり・移動距離を考慮できるよう予定に加える（IDは既存と重ならない負の値）
+            planned_id -= 1
+            schedules.setdefault(staff_id, StaffSchedule()).add(ScheduledAssignment(
+                planned_id, slot.reservation_id, staff_id, "", slot.start, slot.end, slot.office_address
+            ))
+        chosen_columns = {column for _, column in chosen}
+        remaining = [slot for column, slot in enumerate(remaining) if column not in chosen_columns]
+
+    plan.assignments.sort(key=lambda planned: (planned.slot.reservation_id, planned.slot.slot_number or 0))
+    return plan
+
+
+def save_plan(db: Session, plan: AssignmentPlan, assigned_by: int) -> List[ReservationStaff]:
+    """
+    割り当て案をオファー（PENDING）として一括登録
+
+    Args:
+        db: データベースセッション
+        plan: plan_assignments() の結果
+        assigned_by: 登録するユーザーのID
+
+    Returns:
+        作成したアサインのリスト
+    """
+    rows = [
+        ReservationStaff(
+            reservation_id=planned.slot.reservation_id,
+            staff_id=planned.staff_id,
+            slot_number=planned.slot.slot_number,
+            assigned_by=assigned_by,
+            status=AssignmentStatus.PENDING,
+            notes=PLAN_NOTE,
+        )
+        for planned in plan.assignments
+    ]
+    db.add_all(rows)
+
+    offers_per_reservation: Dict[int, int] = {}
+    for planned in plan.assignments:
+        reservation_id = planned.slot.reservation_id
+        offers_per_reservation[reservation_id] = offers_per_reservation.get(reservation_id, 0) + 1
+    if offers_per_reservation:
+        reservations = db.query(Reservation).filter(Reservation.id.in_(offers_per_reservation)).all()
+        for reservation in reservations:
+            on_assignment_change(
+                db, reservation, None, None, AssignmentStatus.PENDING, count=offers_per_reservation[reservation.id]
+            )
+        refresh_open_slots(db, offers_per_reservation)
+    db.commit()
+    return rows
@@ -0,0 +1,172 @@
+"""
+スタッフの稼働可能時間（ビットマスク）
+
+1日を15分単位の96区間に分け、各スタッフの稼働可能な区間を整数のビットマスクで表す。
+「指定した時間帯に稼働できるスタッフ」は、依頼時間帯のマスクが
+稼働可能マスクに含まれるか（request & ~available == 0）のビット演算で判定する。
+
+    - 毎週の稼働時間帯（StaffAvailability）を曜日ごとにORで合成
+    - 日付指定の例外（StaffAvailabilityException）で休みを除外・追加の稼働を合成
+    - 同じ日に確定済み（CONFIRMED・COMPLETED）のアサインと時間が重なるスタッフを除外
+"""
+import json
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.staff import Staff
+from ..models.staff_availability import StaffAvailability, StaffAvailabilityException
+from ..models.reservation import Reservation
+from ..models.reservation_staff import ReservationStaff
+from .date_utils import date_variants, time_to_minutes
+from .reservation_status import CONFIRMED_STATUSES
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES  # 96
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+
+def _mask(first_slot: int, last_slot: int) -> int:
+    """first_slot 以上 last_slot 未満の区間のビットを立てる"""
+    first_slot = max(first_slot, 0)
+    last_slot = min(last_slot, SLOTS_PER_DAY)
+    if last_slot <= first_slot:
+        return 0
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+def covered_mask(start_time: str, end_time: str) -> int:
+    """
+    時間帯に完全に含まれる区間のマスク（稼働可能時間用、端数は切り捨て）
+
+    例: 10:05〜11:00 は 10:15〜11:00 の3区間
+    """
+    start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+    return _mask(-(-start // SLOT_MINUTES), end // SLOT_MINUTES)
+
+
+def touched_mask(start_time: str, end_time: str) -> int:
+    """
+    時間帯と少しでも重なる区間のマスク（依頼時間帯・休み用、端数は切り上げ）
+
+    例: 10:05〜11:00 は 10:00〜11:00 の4区間
+    """
+    start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+    return _mask(start // SLOT_MINUTES, -(-end // SLOT_MINUTES))
+
+
+def compile_day_masks(
+    windows: Iterable[StaffAvailability],
+    exceptions: Iterable[StaffAvailabilityException],
+) -> Dict[int, int]:
+    """
+    スタッフごとの1日分の稼働可能マスクを作成
+
+    Args:
+        windows: 対象曜日の毎週の稼働時間帯
+        exceptions: 対象日の例外
+
+    Returns:
+        スタッフID -> 稼働可能マスク
+    """
+    masks: Dict[int, int] = defaultdict(int)
+    for window in windows:
+        masks[window.staff_id] |= covered_mask(window.start_time, window.end_time)
+
+    # 休みを先に除外してから追加の稼働を合成する（同じ日に両方ある場合は追加を優先）
+    ordered = sorted(exceptions, key=lambda exception: exception.is_available)
+    for exception in ordered:
+        whole_day = not exception.start_time or not exception.end_time
+        if exception.is_available:
+            mask = FULL_DAY_MASK if whole_day else covered_mask(exception.start_time, exception.end_time)
+            masks[exception.staff_id] |= mask
+        else:
+            mask = FULL_DAY_MASK if whole_day else touched_mask(exception.start_time, exception.end_time)
+            masks[exception.staff_id] &= ~mask & FULL_DAY_MASK
+    return dict(masks)
+
+
+def assignment_window(
+    time_slots, slot_number: Optional[int], start_time: str, end_time: str
+) -> Tuple[int, int]:
+    """
+    アサインの拘束時間（分）
+
+    枠番号が指定されている場合はその枠の時間帯、なければ予約全体の時間帯。
+
+    Returns:
+        (開始分, 終了分)
+    """
+    if slot_number and time_slots:
+        slots = json.loads(time_slots) if isinstance(time_slots, str) else time_slots
+        if isinstance(slots, list) and 0 < slot_number <= len(slots):
+            slot = slots[slot_number - 1]
+            if slot.get("start_time") and slot.get("end_time"):
+                return time_to_minutes(slot["start_time"]), time_to_minutes(slot["end_time"])
+    return time_to_minutes(start_time), time_to_minutes(end_time)
+
+
+def busy_staff_ids(db: Session, day: date, start: int, end: int, staff_ids: Optional[Iterable[int]] = None) -> set:
+    """
+    指定日の時間帯（分）に確定済み（完了報告済みを含む）のアサインがあるスタッフのID
+
+    Args:
+        db: データベースセッション
+        day: 日付
+        start: 開始分
+        end: 終了分
+        staff_ids: 指定した場合、このスタッフのみ確認
+    """
+    query = db.query(
+        ReservationStaff.staff_id, ReservationStaff.slot_number,
+        Reservation.time_slots, Reservation.start_time, Reservation.end_time,
+    ).join(Reservation, Reservation.id == ReservationStaff.reservation_id).filter(
+        ReservationStaff.status.in_(CONFIRMED_STATUSES),
+        Reservation.reservation_date.in_(date_variants(day)),
+    )
+    if staff_ids is not None:
+        query = query.filter(ReservationStaff.staff_id.in_(list(staff_ids)))
+
+    busy = set()
+    for row in query:
+        if row.staff_id in busy:
+            continue
+        busy_start, busy_end = assignment_window(row.time_slots, row.slot_number, row.start_time, row.end_time)
+        if busy_start < end and start < busy_end:
+            busy.add(row.staff_id)
+    return busy
+
+
+def find_available_staff(db: Session, day: date, start_time: str, end_time: str) -> List[Staff]:
+    """
+    指定日時に稼働できるスタッフを取得
+
+    Args:
+        db: データベースセッション
+        day: 日付
+        start_time: 開始時刻（HH:MM）
+        end_time: 終了時刻（HH:MM）
+
+    Returns:
+        稼働できるスタッフのリスト（ID順）
+    """
+    request_mask = touched_mask(start_time, end_time)
+
+    windows = db.query(StaffAvailability.staff_id, StaffAvailability.start_time, StaffAvailability.end_time).filter(
+        StaffAvailability.weekday == day.weekday()
+    ).all()
+    exceptions = db.query(
+        StaffAvailabilityException.staff_id, StaffAvailabilityException.is_available,
+        StaffAvailabilityException.start_time, StaffAvailabilityException.end_time,
+    ).filter(StaffAvailabilityException.date.in_(date_variants(day))).all()
+
+    masks = compile_day_masks(windows, exceptions)
+    candidates = [staff_id for staff_id, mask in masks.items() if request_mask & ~mask == 0]
+    if not candidates:
+        return []
+
+    busy = busy_staff_ids(db, day, time_to_minutes(start_time), time_to_minutes(end_time), candidates)
+    free_ids = [staff_id for staff_id in candidates if staff_id not in busy]
+    if not free_ids:
+        return []
+    return db.query(Staff).filter(Staff.id.in_(free_ids), Staff.is_available.isnot(False)).order_by(Staff.id).all()
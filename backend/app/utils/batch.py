@@ -0,0 +1,104 @@
+"""
+複数件の一括取得（ids= / pairs=）
+
+画面の行・カードごとに詳細APIを呼ぶ代わりに、IDをまとめて1回のリクエスト・1回の IN クエリで取得する。
+結果は指定されたIDをキーにした辞書で返し、見つからないIDの値は None にする。
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from ..core.responses import model_response
+
+# 1回のリクエストで指定できる件数の上限
+MAX_BATCH_SIZE = 100
+
+
+def _check_size(count: int, name: str) -> None:
+    if count > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} は一度に{MAX_BATCH_SIZE}件まで指定できます"
+        )
+
+
+def parse_ids(ids: Optional[str], name: str = "ids") -> Optional[List[int]]:
+    """
+    カンマ区切りのIDを解析
+
+    Args:
+        ids: 例 "1,2,3"（Noneの場合は一括取得しない）
+        name: エラーメッセージに使うパラメータ名
+
+    Returns:
+        IDのリスト（指定順・重複なし）。ids が None の場合はNone
+
+    Raises:
+        HTTPException: 形式が不正な場合・件数が上限を超える場合（400）
+    """
+    if ids is None:
+        return None
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} の形式が不正です（カンマ区切りの整数）"
+        )
+    parsed = list(dict.fromkeys(parsed))
+    _check_size(len(parsed), name)
+    return parsed
+
+
+def parse_pairs(pairs: str, name: str = "pairs") -> List[Tuple[int, int]]:
+    """
+    カンマ区切りのIDの組（例 "12:3,12:4"）を解析
+
+    Returns:
+        (ID, ID) のリスト（指定順・重複なし）
+
+    Raises:
+        HTTPException: 形式が不正な場合・件数が上限を超える場合（400）
+    """
+    parsed = []
+    try:
+        for part in pairs.split(","):
+            if not part.strip():
+                continue
+            first, second = part.split(":")
+            parsed.append((int(first), int(second)))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} の形式が不正です（カンマ区切りの ID:ID）"
+        )
+    parsed = list(dict.fromkeys(parsed))
+    _check_size(len(parsed), name)
+    return parsed
+
+
+def keyed_by_id(rows: Iterable[Any], ids: List[int]) -> Dict[int, Optional[Any]]:
+    """取得した行を指定されたIDの順に辞書にする（見つからないIDはNone）"""
+    found = {row.id: row for row in rows}
+    return {row_id: found.get(row_id) for row_id in ids}
+
+
+def batch_response(
+    schema: Type[BaseModel], rows: Iterable[Any], ids: List[int], *, by_alias: bool = True,
+    response: Optional[Response] = None,
+) -> Response:
+    """
+    一括取得の結果を {ID: 項目} のJSONレスポンスにする
+
+    Args:
+        schema: 1件のレスポンススキーマ（fields= の場合は項目を絞ったスキーマ）
+        rows: IN クエリで取得した行
+        ids: parse_ids の結果
+        by_alias: エイリアス名で出力するか
+        response: エンドポイントに注入されたレスポンス（ETagなどのヘッダーを引き継ぐ）
+
+    Returns:
+        Response: application/json のレスポンス
+    """
+    return model_response(
+        Dict[int, Optional[schema]], keyed_by_id(rows, ids), by_alias=by_alias, response=response
+    )
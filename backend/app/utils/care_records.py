@@ -0,0 +1,128 @@
+"""
+社員のケア記録
+
+完了報告の特記事項は employee_care_records に1件ずつ追記し、社員の行には書き込まない。
+一覧では社員ごとの最新の記録の要約だけを返し、全文は履歴API（カーソルページング）で取得する。
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.employee_care_record import EmployeeCareRecord
+from ..models.reservation_employee import ReservationEmployee
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+
+# 旧 concerns / medical_record で報告を追記するときに使っていた区切り
+LEGACY_SEPARATOR = "\n\n"
+
+# 一覧に含める要約の最大文字数
+SUMMARY_LENGTH = 80
+
+
+def add_care_record(
+    db: Session, employee_id: int, body: str, attendance_id: Optional[int] = None, staff_id: Optional[int] = None
+) -> Optional[EmployeeCareRecord]:
+    """
+    ケア記録を追加（コミットは呼び出し側で行う）
+
+    Returns:
+        追加した記録（本文が空の場合はNone）
+    """
+    body = (body or "").strip()
+    if not body:
+        return None
+    record = EmployeeCareRecord(employee_id=employee_id, attendance_id=attendance_id, staff_id=staff_id, body=body)
+    db.add(record)
+    return record
+
+
+def served_employee_ids(db: Session, staff_id: int, employee_ids: Iterable[int]) -> Set[int]:
+    """
+    スタッフがケア記録を参照できる社員（確定・完了のアサインがある予約の名簿に載っている社員）
+
+    Args:
+        db: データベースセッション
+        staff_id: スタッフID
+        employee_ids: 確認する社員ID
+
+    Returns:
+        employee_ids のうち参照できる社員ID
+    """
+    ids = list(employee_ids)
+    if not ids:
+        return set()
+    rows = db.query(ReservationEmployee.employee_id).join(
+        ReservationStaff, ReservationStaff.reservation_id == ReservationEmployee.reservation_id
+    ).filter(
+        ReservationEmployee.employee_id.in_(ids),
+        ReservationStaff.staff_id == staff_id,
+        ReservationStaff.status.in_([AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED]),
+    ).distinct()
+    return {employee_id for employee_id, in rows}
+
+
+def summarize(body: str, length: int = SUMMARY_LENGTH) -> str:
+    """本文の要約（1行目の先頭 length 文字、省略した場合は末尾に…）"""
+    text = body.strip()
+    first_line = text.splitlines()[0] if text else ""
+    if first_line == text and len(text) <= length:
+        return text
+    return first_line[:length] + "…"
+
+
+def latest_care_records(db: Session, employee_ids: Iterable[int]) -> Dict[int, EmployeeCareRecord]:
+    """
+    社員ごとの最新のケア記録を1回のクエリで取得
+
+    移行した記録は後から登録されるため、IDではなく (created_at, id) の降順で社員ごとの先頭を選ぶ。
+    """
+    ids = list(employee_ids)
+    if not ids:
+        return {}
+    ranked = db.query(
+        EmployeeCareRecord.id,
+        func.row_number().over(
+            partition_by=EmployeeCareRecord.employee_id,
+            order_by=(EmployeeCareRecord.created_at.desc(), EmployeeCareRecord.id.desc()),
+        ).label("rank"),
+    ).filter(EmployeeCareRecord.employee_id.in_(ids)).subquery()
+    records = db.query(EmployeeCareRecord).join(ranked, ranked.c.id == EmployeeCareRecord.id).filter(
+        ranked.c.rank == 1
+    ).all()
+    return {record.employee_id: record for record in records}
+
+
+def strip_appended_reports(text: Optional[str], reports: Dict[int, str]) -> Tuple[Optional[str], List[int]]:
+    """
+    旧コードが concerns / medical_record の末尾に追記した完了報告を取り除く
+
+    旧コードは報告の本文（前後の空白を除いたもの）を LEGACY_SEPARATOR で区切って末尾に追記していたため、
+    末尾が報告の本文と一致する間だけ取り除く。管理者が書いた部分や、報告と一致しない段落は残す。
+
+    Args:
+        text: concerns または medical_record
+        reports: 候補の報告（勤怠ID -> 前後の空白を除いた報告の本文）
+
+    Returns:
+        (残りのテキスト（空の場合はNone）, 取り除いた報告の勤怠ID（追記された順）)
+    """
+    remaining = (text or "").rstrip()
+    # 短い報告が長い報告の末尾と一致する場合があるため、長いものから試す
+    candidates = sorted(((body, attendance_id) for attendance_id, body in reports.items() if body),
+                        key=lambda item: (-len(item[0]), item[1]))
+    removed: List[int] = []
+    while remaining:
+        for body, attendance_id in candidates:
+            if attendance_id in removed:
+                continue
+            if remaining == body:
+                remaining = ""
+            elif remaining.endswith(LEGACY_SEPARATOR + body):
+                remaining = remaining[:-len(LEGACY_SEPARATOR + body)].rstrip()
+            else:
+                continue
+            removed.append(attendance_id)
+            break
+        else:
+            break
+    removed.reverse()
+    return (remaining or None), removed
@@ -0,0 +1,430 @@
+"""
+予約データの整合性チェック
+
+予約テーブルをID順のバッチ（キーセットページング）で読み込み、以下の不変条件を検証する。
+全件を一度にメモリへ読み込まないため、件数が増えてもメモリ使用量は一定。
+
+    - time_slots が二重エンコードされていない
+    - time_slots の枠数が募集人数・施術時間から計算した枠数と一致する
+    - 名簿（reservation_employees）の社員が time_slots のいずれかの枠に入っている
+    - time_slots の枠に入っている社員が名簿に登録されている
+    - slots_filled が is_filled=True の枠数と一致する
+    - slot_count が time_slots の枠数と一致する
+    - 有効なアサインの slot_number が存在する枠を指している
+    - 同じ枠に有効なアサインが重複していない
+
+修正可能な不整合はバッチごとに executemany の UPDATE でまとめて書き戻す。
+アサインに関する不整合は自動修正せず、レポートのみ行う。
+"""
+import copy
+import json
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select, update, bindparam, func, or_
+from sqlalchemy.engine import Connection
+from ..models.employee import Employee
+from ..models.reservation import Reservation
+from ..models.reservation_employee import ReservationEmployee
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from .state_store import database_now, load_state, save_state
+from .time_slot_calculator import calculate_time_slots
+
+# 前回実行時刻を保存するキー
+WATERMARK_KEY = "consistency.last_run_at"
+
+# 差分チェック時の重なり幅（SQLiteのupdated_atは秒単位のため、境界の取りこぼしを防ぐ）
+WATERMARK_OVERLAP = timedelta(seconds=1)
+
+# 社員名のみ登録されていて部署が不明な場合の表示（旧 fix_time_slots_filled.py と同じ）
+UNKNOWN_DEPARTMENT = "(登録済み)"
+
+# 自動修正の対象カラム
+FIXABLE_COLUMNS = ("time_slots", "slots_filled", "slot_count")
+
+_reservations = Reservation.__table__
+_assignments = ReservationStaff.__table__
+_roster = ReservationEmployee.__table__
+_employees = Employee.__table__
+
+_INACTIVE_STATUSES = (AssignmentStatus.REJECTED, AssignmentStatus.CANCELLED)
+
+
+@dataclass
+class Issue:
+    """自動修正できない不整合"""
+    reservation_id: int
+    kind: str
+    message: str
+
+
+@dataclass
+class Fix:
+    """予約1件分の修正内容（カラム名 -> (修正前, 修正後)）"""
+    reservation_id: int
+    changes: Dict[str, Tuple[Any, Any]]
+
+
+@dataclass
+class ConsistencyReport:
+    """整合性チェックの結果"""
+    checked: int = 0
+    fixes: List[Fix] = field(default_factory=list)
+    issues: List[Issue] = field(default_factory=list)
+    applied: bool = False
+    since: Optional[datetime] = None
+
+
+def _decode_time_slots(raw: Any) -> Tuple[Optional[list], bool]:
+    """
+    time_slots をリストとして取得
+
+    Returns:
+        (枠のリスト（解析できない場合はNone）, 二重エンコードされていたか)
+    """
+    if raw is None:
+        return [], False
+    if isinstance(raw, list):
+        return raw, False
+    if isinstance(raw, str):
+        try:
+            decoded = json.loads(raw)
+        except ValueError:
+            return None, True
+        if isinstance(decoded, list):
+            return decoded, True
+    return None, False
+
+
+@lru_cache(maxsize=1024)
+def _expected_slots(
+    start_time: str, end_time: str, service_duration: int, break_duration: int, max_participants: int
+) -> Optional[Tuple[dict, ...]]:
+    """募集条件から本来の時間枠を計算（同じ条件の予約が多いためキャッシュする）"""
+    result = calculate_time_slots(start_time, end_time, service_duration, break_duration, max_participants)
+    if not result["valid"]:
+        return None
+    return tuple(result["slots"])
+
+
+def _rebuild_layout(row, slots: list, assignments: Sequence) -> Tuple[list, Optional[Issue]]:
+    """
+    募集人数・施術時間から計算した枠数と time_slots が食い違う場合に枠を作り直す
+
+    既存の割り当て情報は枠番号順に引き継ぐ。割り当て済みの枠やアサインが
+    削除される枠にある場合は作り直さず、レポートのみ行う。
+    """
+    if not row.service_duration or row.service_duration <= 0:
+        return slots, None
+
+    expected = _expected_slots(
+        row.start_time, row.end_time, row.service_duration,
+        row.break_duration or 0, row.max_participants or 1,
+    )
+    if expected is None or len(expected) == len(slots):
+        return slots, None
+
+    dropped = slots[len(expected):]
+    assigned_numbers = [a.slot_number for a in assignments if a.slot_number and a.slot_number > len(expected)]
+    if any(slot.get("is_filled") for slot in dropped) or assigned_numbers:
+        return slots, Issue(
+            row.id, "slot_layout",
+            f"枠数が募集条件と一致しません（現在{len(slots)}枠 / 本来{len(expected)}枠）。"
+            f"削除対象の枠に割り当てがあるため自動修正しません",
+        )
+
+    new_slots = [copy.deepcopy(slot) for slot in expected]
+    for index, new_slot in enumerate(new_slots):
+        if index < len(slots) and slots[index].get("is_filled"):
+            new_slot["employee_id"] = slots[index].get("employee_id")
+            new_slot["employee_name"] = slots[index].get("employee_name")
+            new_slot["employee_department"] = slots[index].get("employee_department")
+            new_slot["is_filled"] = True
+    return new_slots, None
+
+
+def _reconcile_roster(row, slots: list, roster: Sequence) -> Tuple[list, List[Issue]]:
+    """
+    名簿（reservation_employees）と time_slots の社員を突き合わせる
+
+    枠に入っていない名簿の社員は空いている枠に補完する。空き枠が足りない場合と、
+    枠に入っているが名簿にない社員はレポートのみ行う（名簿は migrate_employee_roster.py で補完する）。
+
+    Returns:
+        (修正後の枠, 不整合のリスト)
+    """
+    names = [entry.name for entry in roster]
+    slot_names = [slot.get("employee_name") for slot in slots if slot.get("is_filled") and slot.get("employee_name")]
+    missing_names = Counter(names) - Counter(slot_names)
+    missing = []
+    for entry in roster:
+        if missing_names[entry.name] > 0:
+            missing_names[entry.name] -= 1
+            missing.append(entry)
+
+    overflow: List[str] = []
+    if missing:
+        slots = [dict(slot) for slot in slots]
+        free = [slot for slot in slots if not slot.get("is_filled")]
+        for entry in missing:
+            if not free:
+                overflow.append(entry.name)
+                continue
+            slot = free.pop(0)
+            slot["is_filled"] = True
+            slot["employee_id"] = entry.employee_id
+            slot["employee_name"] = entry.name
+            slot["employee_department"] = entry.department or UNKNOWN_DEPARTMENT
+
+    issues = []
+    if overflow:
+        issues.append(Issue(
+            row.id, "employee_overflow",
+            f"空き枠が足りないため枠に入れられない社員がいます: {', '.join(overflow)}",
+        ))
+    unregistered = list((Counter(slot_names) - Counter(names)).elements())
+    if unregistered:
+        issues.append(Issue(
+            row.id, "unregistered_employee",
+            f"枠に入っている社員が名簿に登録されていません: {', '.join(unregistered)}",
+        ))
+    return slots, issues
+
+
+def _check_assignments(row, slot_total: int, assignments: Sequence) -> List[Issue]:
+    """アサインの枠番号と重複をチェック（自動修正はしない）"""
+    issues = []
+    by_slot: Dict[int, List[int]] = defaultdict(list)
+    for assignment in assignments:
+        if assignment.slot_number is None:
+            continue
+        if assignment.slot_number < 1 or assignment.slot_number > slot_total:
+            issues.append(Issue(
+                row.id, "invalid_slot",
+                f"アサインID {assignment.id} の枠番号 {assignment.slot_number} は存在しません（有効範囲: 1-{slot_total}）",
+            ))
+        by_slot[assignment.slot_number].append(assignment.id)
+    for slot_number, assignment_ids in sorted(by_slot.items()):
+        if len(assignment_ids) > 1:
+            issues.append(Issue(
+                row.id, "double_booked",
+                f"枠{slot_number}に有効なアサインが重複しています（アサインID: {', '.join(map(str, assignment_ids))}）",
+            ))
+    return issues
+
+
+def check_reservation(row, assignments: Sequence, roster: Sequence = ()) -> Tuple[Optional[Fix], List[Issue]]:
+    """
+    予約1件の整合性をチェック
+
+    Args:
+        row: 予約の行（id, time_slots, slots_filled などを持つ）
+        assignments: この予約の有効なアサイン（却下・キャンセル以外）
+        roster: この予約の名簿（employee_id, name, department を持つ行、登録順）
+
+    Returns:
+        (修正内容（修正不要ならNone）, 自動修正できない不整合のリスト)
+    """
+    issues: List[Issue] = []
+    changes: Dict[str, Tuple[Any, Any]] = {}
+
+    slots, double_encoded = _decode_time_slots(row.time_slots)
+    if slots is None:
+        issues.append(Issue(row.id, "invalid_time_slots", "time_slots を解析できません"))
+        return None, issues
+
+    new_slots, issue = _rebuild_layout(row, slots, assignments)
+    if issue:
+        issues.append(issue)
+
+    if new_slots:
+        new_slots, roster_issues = _reconcile_roster(row, new_slots, roster)
+        issues.extend(roster_issues)
+        slots_filled = sum(1 for slot in new_slots if slot.get("is_filled"))
+        slot_count = len(new_slots)
+    else:
+        # 時間枠のない予約は名簿の社員数を予約済み枠数とする
+        slots_filled = len(roster)
+        slot_count = row.slot_count
+
+    if double_encoded or new_slots != slots:
+        changes["time_slots"] = (row.time_slots, new_slots)
+    if (row.slots_filled or 0) != slots_filled:
+        changes["slots_filled"] = (row.slots_filled, slots_filled)
+    if row.slot_count != slot_count:
+        changes["slot_count"] = (row.slot_count, slot_count)
+
+    issues.extend(_check_assignments(row, len(new_slots), assignments))
+    return (Fix(row.id, changes) if changes else None), issues
+
+
+def iter_reservation_batches(
+    conn: Connection,
+    batch_size: int = 500,
+    since: Optional[datetime] = None,
+    reservation_ids: Optional[Sequence[int]] = None,
+) -> Iterator[list]:
+    """
+    予約をID順のバッチで取得（キーセットページング）
+
+    Args:
+        conn: DB接続
+        batch_size: 1バッチの件数
+        since: 指定した場合、この時刻以降に予約またはそのアサインが更新された予約のみ
+        reservation_ids: 指定した場合、そのIDの予約のみ
+    """
+    columns = [
+        _reservations.c.id, _reservations.c.start_time, _reservations.c.end_time,
+        _reservations.c.max_participants, _reservations.c.service_duration,
+        _reservations.c.break_duration, _reservations.c.slot_count, _reservations.c.time_slots,
+        _reservations.c.slots_filled,
+    ]
+    last_id = 0
+    while True:
+        stmt = select(*columns).where(_reservations.c.id > last_id)
+        if since is not None:
+            stmt = stmt.where(or_(
+                _reservations.c.updated_at >= since,
+                _reservations.c.id.in_(
+                    select(_assignments.c.reservation_id).where(_assignments.c.updated_at >= since)
+                ),
+            ))
+        if reservation_ids:
+            stmt = stmt.where(_reservations.c.id.in_(reservation_ids))
+        rows = conn.execute(stmt.order_by(_reservations.c.id).limit(batch_size)).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _load_assignments(conn: Connection, reservation_ids: List[int]) -> Dict[int, list]:
+    """バッチ内の予約の有効なアサインを1クエリで取得"""
+    rows = conn.execute(
+        select(
+            _assignments.c.id, _assignments.c.reservation_id,
+            _assignments.c.staff_id, _assignments.c.slot_number,
+        )
+        .where(_assignments.c.reservation_id.in_(reservation_ids))
+        .where(_assignments.c.status.notin_(_INACTIVE_STATUSES))
+        .order_by(_assignments.c.id)
+    ).all()
+    grouped: Dict[int, list] = defaultdict(list)
+    for row in rows:
+        grouped[row.reservation_id].append(row)
+    return grouped
+
+
+def _load_roster(conn: Connection, reservation_ids: List[int]) -> Dict[int, list]:
+    """バッチ内の予約の名簿を1クエリで取得"""
+    rows = conn.execute(
+        select(
+            _roster.c.reservation_id, _roster.c.employee_id, _employees.c.name,
+            func.coalesce(_roster.c.department, _employees.c.department).label("department"),
+        )
+        .join(_employees, _employees.c.id == _roster.c.employee_id)
+        .where(_roster.c.reservation_id.in_(reservation_ids))
+        .order_by(_roster.c.id)
+    ).all()
+    grouped: Dict[int, list] = defaultdict(list)
+    for row in rows:
+        grouped[row.reservation_id].append(row)
+    return grouped
+
+
+def _apply_fixes(conn: Connection, fixes: List[Fix], current: Dict[int, Any]) -> None:
+    """修正内容をexecutemanyのUPDATEでまとめて書き込む"""
+    stmt = (
+        update(_reservations)
+        .where(_reservations.c.id == bindparam("_id"))
+        .values({
+            column: bindparam(f"_{column}", type_=_reservations.c[column].type)
+            for column in FIXABLE_COLUMNS
+        })
+    )
+    params = []
+    for fix in fixes:
+        row = current[fix.reservation_id]
+        values = {"_id": fix.reservation_id}
+        for column in FIXABLE_COLUMNS:
+            values[f"_{column}"] = fix.changes[column][1] if column in fix.changes else getattr(row, column)
+        params.append(values)
+    conn.execute(stmt, params)
+
+
+def verify_consistency(
+    conn: Connection,
+    apply: bool = False,
+    incremental: bool = False,
+    batch_size: int = 500,
+    reservation_ids: Optional[Sequence[int]] = None,
+) -> ConsistencyReport:
+    """
+    予約データの整合性をチェックし、必要に応じて修正する
+
+    Args:
+        conn: DB接続（バッチごとにコミットする）
+        apply: Trueの場合は修正を書き込む（Falseの場合は差分のみ返す）
+        incremental: Trueの場合は前回実行以降に更新された予約のみチェック
+        batch_size: 1バッチの件数
+        reservation_ids: 指定した場合、そのIDの予約のみチェック
+
+    Returns:
+        チェック結果
+    """
+    report = ConsistencyReport(applied=apply)
+    started_at = database_now(conn)
+
+    if incremental:
+        last_run = load_state(conn, WATERMARK_KEY)
+        if last_run:
+            report.since = datetime.fromisoformat(last_run) - WATERMARK_OVERLAP
+
+    for rows in iter_reservation_batches(conn, batch_size, report.since, reservation_ids):
+        ids = [row.id for row in rows]
+        assignments = _load_assignments(conn, ids)
+        roster = _load_roster(conn, ids)
+        batch_fixes = []
+        for row in rows:
+            fix, issues = check_reservation(row, assignments.get(row.id, []), roster.get(row.id, []))
+            if fix:
+                batch_fixes.append(fix)
+            report.issues.extend(issues)
+        report.checked += len(rows)
+        report.fixes.extend(batch_fixes)
+
+        if apply and batch_fixes:
+            _apply_fixes(conn, batch_fixes, {row.id: row for row in rows})
+        # 読み取りのみの場合もトランザクションを閉じてロックを保持し続けない
+        conn.commit()
+
+    # 対象を絞った実行や差分確認のみの場合は前回実行時刻を進めない
+    if apply and not reservation_ids:
+        save_state(conn, WATERMARK_KEY, started_at.isoformat())
+        conn.commit()
+    return report
+
+
+def describe_change(column: str, old: Any, new: Any) -> str:
+    """修正内容を1行の文字列で表現（差分表示用）"""
+    if column != "time_slots":
+        return f"{column}: {old!r} -> {new!r}"
+
+    old_slots, double_encoded = _decode_time_slots(old)
+    parts = []
+    if double_encoded:
+        parts.append("二重エンコードを解消")
+    old_slots = old_slots or []
+    if len(old_slots) != len(new):
+        parts.append(f"{len(old_slots)}枠 -> {len(new)}枠")
+    for index, slot in enumerate(new):
+        before = old_slots[index] if index < len(old_slots) else {}
+        if bool(before.get("is_filled")) != bool(slot.get("is_filled")) or \
+                before.get("employee_name") != slot.get("employee_name"):
+            parts.append(
+                f"枠{slot.get('slot', index + 1)}: {before.get('employee_name') or '空き'} -> "
+                f"{slot.get('employee_name') or '空き'}"
+            )
+    return "time_slots: " + ("、".join(parts) or "内容を正規化")
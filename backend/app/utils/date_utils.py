@@ -0,0 +1,120 @@
+"""
+日付・時刻ユーティリティ
+
+予約日（reservation_date）は文字列で保存されており、"YYYY/MM/DD" のほかに
+"YYYY-MM-DD" などの形式が混在しているため、解析と検索用の表記をここにまとめる。
+"""
+from datetime import date, datetime, time, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+from ..config import settings
+
+# 予約日として受け付ける書式
+DATE_FORMATS = ("%Y/%m/%d", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+# 募集期限などの日時として受け付ける書式
+DATETIME_FORMATS = ("%Y/%m/%d %H:%M", "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M")
+
+
+def parse_date(value) -> Optional[date]:
+    """
+    予約日の文字列を日付に変換
+
+    Args:
+        value: 日付文字列（YYYY/MM/DD, YYYY-MM-DD など）
+
+    Returns:
+        date（解析できない場合はNone）
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_local_datetime(value) -> Optional[datetime]:
+    """
+    日時文字列（設定のタイムゾーンの現地時刻）をUTCの日時に変換
+
+    日付のみの場合はその日の終わり（23:59:59）とみなす。
+
+    Args:
+        value: 日時文字列（YYYY/MM/DD HH:MM, YYYY/MM/DD など）
+
+    Returns:
+        タイムゾーン付きのUTC日時（解析できない場合はNone）
+    """
+    if not value:
+        return None
+    text = str(value).strip()
+    local = None
+    for fmt in DATETIME_FORMATS:
+        try:
+            local = datetime.strptime(text, fmt)
+            break
+        except ValueError:
+            continue
+    if local is None:
+        day = parse_date(text)
+        if day is None:
+            return None
+        local = datetime.combine(day, time(23, 59, 59))
+    return local.replace(tzinfo=ZoneInfo(settings.TIMEZONE)).astimezone(timezone.utc)
+
+
+def local_today() -> date:
+    """設定のタイムゾーンでの今日の日付"""
+    return datetime.now(ZoneInfo(settings.TIMEZONE)).date()
+
+
+def format_date(value: date) -> str:
+    """日付を予約日の標準形式（YYYY/MM/DD）に変換"""
+    return value.strftime("%Y/%m/%d")
+
+
+def date_variants(value: date) -> List[str]:
+    """
+    予約日を文字列のまま検索するための表記ゆれの一覧
+
+    Args:
+        value: 日付
+
+    Returns:
+        YYYY/MM/DD, YYYY-MM-DD, YYYY/M/D の各表記
+    """
+    return sorted({
+        value.strftime("%Y/%m/%d"),
+        value.strftime("%Y-%m-%d"),
+        f"{value.year}/{value.month}/{value.day}",
+    })
+
+
+def time_to_minutes(value: str) -> int:
+    """
+    時刻文字列を0時からの分数に変換（例: "10:30" -> 630）
+
+    Args:
+        value: 時刻文字列（HH:MM形式、24:00も可）
+
+    Returns:
+        分数
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    try:
+        hour, minute = map(int, str(value).split(":")[:2])
+    except (ValueError, AttributeError):
+        raise ValueError(f"Invalid time format: {value}. Expected format: HH:MM")
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or hour * 60 + minute > 24 * 60:
+        raise ValueError(f"Invalid time format: {value}. Expected format: HH:MM")
+    return hour * 60 + minute
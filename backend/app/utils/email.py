@@ -1,12 +1,46 @@
 """
 メール送信ユーティリティ
 """
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import List, Optional, Tuple
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _build_message(to_email: List[str], subject: str, body: str, html: str = None) -> MIMEMultipart:
+    """メールメッセージを作成"""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = settings.SMTP_FROM_EMAIL
+    msg['To'] = ', '.join(to_email)
+    msg['Subject'] = subject
+    
+    # プレーンテキスト
+    part1 = MIMEText(body, 'plain')
+    msg.attach(part1)
+    
+    # HTML（オプション）
+    if html:
+        part2 = MIMEText(html, 'html')
+        msg.attach(part2)
+    return msg
+
+
+def _connect() -> smtplib.SMTP:
+    """SMTPサーバーに接続してログイン"""
+    if settings.SMTP_TLS:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+        server.starttls()
+    else:
+        server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT)
+    
+    if settings.SMTP_USER and settings.SMTP_PASSWORD:
+        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return server
+
 
 def send_email(
     to_email: str | List[str],
@@ -25,51 +59,63 @@ def send_email(
     """
     # メール送信が無効な場合はスキップ
     if not settings.SMTP_HOST:
-        print(f"📧 メール送信（スキップ）: {to_email} - {subject}")
+        logger.info("メール送信（スキップ）", extra={"to_email": to_email, "subject": subject})
         return
     
     # 送信先が文字列の場合はリストに変換
     if isinstance(to_email, str):
         to_email = [to_email]
     
-    # メールメッセージの作成
-    msg = MIMEMultipart('alternative')
-    msg['From'] = settings.SMTP_FROM_EMAIL
-    msg['To'] = ', '.join(to_email)
-    msg['Subject'] = subject
-    
-    # プレーンテキスト
-    part1 = MIMEText(body, 'plain')
-    msg.attach(part1)
-    
-    # HTML（オプション）
-    if html:
-        part2 = MIMEText(html, 'html')
-        msg.attach(part2)
+    msg = _build_message(to_email, subject, body, html)
     
     try:
-        # SMTPサーバーに接続
-        if settings.SMTP_TLS:
-            server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
-            server.starttls()
-        else:
-            server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT)
-        
-        # ログイン
-        if settings.SMTP_USER and settings.SMTP_PASSWORD:
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        
-        # メール送信
+        server = _connect()
         server.sendmail(settings.SMTP_FROM_EMAIL, to_email, msg.as_string())
         server.quit()
         
-        print(f"✅ メール送信成功: {to_email} - {subject}")
+        logger.info("メール送信成功", extra={"to_email": to_email, "subject": subject})
         
     except Exception as e:
-        print(f"❌ メール送信エラー: {e}")
+        logger.exception("メール送信エラー", extra={"to_email": to_email, "subject": subject})
         raise
 
 
+def send_emails(messages: List[Tuple[str, str, str, Optional[str]]]):
+    """
+    複数のメールを1回のSMTP接続でまとめて送信する
+    
+    1通の送信に失敗しても残りは送信を続ける（失敗はログに記録）。
+    
+    Args:
+        messages: (送信先, 件名, 本文, HTML本文) のリスト
+    """
+    if not messages:
+        return
+    if not settings.SMTP_HOST:
+        logger.info("メール一括送信（スキップ）", extra={"count": len(messages)})
+        return
+    
+    sent = 0
+    try:
+        server = _connect()
+    except Exception:
+        logger.exception("メール一括送信エラー（SMTP接続）", extra={"count": len(messages)})
+        raise
+    try:
+        for to_email, subject, body, html in messages:
+            try:
+                server.sendmail(
+                    settings.SMTP_FROM_EMAIL, [to_email], _build_message([to_email], subject, body, html).as_string()
+                )
+                sent += 1
+            except smtplib.SMTPException:
+                logger.exception("メール送信エラー", extra={"to_email": to_email, "subject": subject})
+    finally:
+        server.quit()
+    
+    logger.info("メール一括送信完了", extra={"count": len(messages), "sent": sent})
+
+
 def send_reservation_created_email(to_email: str, reservation_data: dict):
     """予約作成通知メール"""
     subject = "【Oriental Synergy】予約が作成されました"
@@ -109,8 +155,8 @@ Oriental Synergy
     send_email(to_email, subject, body, html)
 
 
-def send_staff_assigned_email(to_email: str, assignment_data: dict):
-    """スタッフアサイン通知メール"""
+def _staff_assigned_content(assignment_data: dict) -> Tuple[str, str, str]:
+    """スタッフアサイン通知メールの件名・本文・HTML本文"""
     subject = "【Oriental Synergy】新しい予約にアサインされました"
     
     body = f"""
@@ -147,6 +193,60 @@ Oriental Synergy
 </html>
     """
     
+    return subject, body, html
+
+
+def send_staff_assigned_email(to_email: str, assignment_data: dict):
+    """スタッフアサイン通知メール"""
+    send_email(to_email, *_staff_assigned_content(assignment_data))
+
+
+def send_staff_assigned_emails(notifications: List[Tuple[str, dict]]):
+    """
+    スタッフアサイン通知メールをまとめて送信（一括オファー用）
+    
+    Args:
+        notifications: (送信先, assignment_data) のリスト
+    """
+    send_emails([(to_email, *_staff_assigned_content(data)) for to_email, data in notifications])
+
+
+def send_waitlist_promoted_email(to_email: str, waitlist_data: dict):
+    """キャンセル待ち繰り上げ通知メール"""
+    subject = "【Oriental Synergy】キャンセル待ちの予約が確定しました"
+    
+    body = f"""
+{waitlist_data['employee_name']} 様
+
+キャンセル待ちに登録されていた予約に空きが出たため、予約が確定しました。
+
+予約ID: {waitlist_data['reservation_id']}
+予約日: {waitlist_data['reservation_date']}
+枠: {waitlist_data['slot_number']}（{waitlist_data['start_time']} - {waitlist_data['end_time']}）
+場所: {waitlist_data['office_address']}
+
+ご都合が悪い場合は担当者までご連絡ください。
+
+Oriental Synergy
+    """
+    
+    html = f"""
+<html>
+<body>
+<h2>{waitlist_data['employee_name']} 様</h2>
+<p>キャンセル待ちに登録されていた予約に空きが出たため、予約が確定しました。</p>
+<table border="1" cellpadding="10">
+    <tr><th>予約ID</th><td>{waitlist_data['reservation_id']}</td></tr>
+    <tr><th>予約日</th><td>{waitlist_data['reservation_date']}</td></tr>
+    <tr><th>枠</th><td>{waitlist_data['slot_number']}（{waitlist_data['start_time']} - {waitlist_data['end_time']}）</td></tr>
+    <tr><th>場所</th><td>{waitlist_data['office_address']}</td></tr>
+</table>
+<p>ご都合が悪い場合は担当者までご連絡ください。</p>
+<p>Oriental Synergy</p>
+</body>
+</html>
+    """
+    
     send_email(to_email, subject, body, html)
 
 
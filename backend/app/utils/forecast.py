@@ -0,0 +1,221 @@
+"""
+スタッフ需要（予約の枠数）の予測
+
+過去 FORECAST_HISTORY_WEEKS 週の予約（キャンセル以外）の枠数を、企業 × 週 × 曜日 × 時間帯の
+NumPy配列に集計し、企業・曜日・時間帯ごとの週次の系列に減衰トレンド付きの指数平滑法（Holt法）を
+全系列まとめてベクトル演算で当てはめ、今週から FORECAST_HORIZON_WEEKS 週分を予測する。
+
+予測は定期ジョブ（refresh_forecast）が1日1回作成して maintenance_state に保存し、
+/analytics/forecast は保存済みの予測を読むだけにする（リクエストの処理中に学習しない）。
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from ..config import settings
+from ..models.reservation import Reservation, ReservationStatus
+from .date_utils import date_variants, time_to_minutes
+from .state_store import load_state, save_state
+
+# 予測の作成日時と予測本体のキー（本体は大きいため、APIは作成日時が変わったときだけ読み直す）
+GENERATED_AT_KEY = "forecast.generated_at"
+RESULT_KEY = "forecast.result"
+
+# 時間帯（予約の開始時刻で分類、[開始分, 終了分)）
+TIME_BANDS: Tuple[Tuple[str, int, int], ...] = (
+    ("morning", 0, 12 * 60),
+    ("afternoon", 12 * 60, 17 * 60),
+    ("evening", 17 * 60, 24 * 60),
+)
+
+# 平滑化の係数（水準・トレンド・トレンドの減衰）
+ALPHA = 0.3
+BETA = 0.1
+PHI = 0.9
+
+_reservations = Reservation.__table__
+
+
+def week_start(day: date) -> date:
+    """その日を含む週の月曜日"""
+    return day - timedelta(days=day.weekday())
+
+
+def _band(start_time: Optional[str]) -> Optional[int]:
+    if not start_time:
+        return None
+    try:
+        minute = time_to_minutes(start_time)
+    except (ValueError, TypeError):
+        return None
+    for index, (_, start, end) in enumerate(TIME_BANDS):
+        if start <= minute < end:
+            return index
+    return None
+
+
+def load_demand(conn: Connection, first_week: date, weeks: int) -> Tuple[List[int], np.ndarray]:
+    """
+    過去の予約の枠数を 企業 × 週 × 曜日 × 時間帯 の配列に集計
+
+    Args:
+        conn: DB接続
+        first_week: 集計する最初の週の月曜日
+        weeks: 集計する週数
+
+    Returns:
+        (企業IDのリスト, 配列 shape=(企業数, 週数, 7, 時間帯数))
+    """
+    days = [first_week + timedelta(days=offset) for offset in range(weeks * 7)]
+    variants = {variant: day for day in days for variant in date_variants(day)}
+    rows = conn.execute(
+        select(
+            _reservations.c.company_id, _reservations.c.reservation_date,
+            _reservations.c.start_time, _reservations.c.slot_count,
+        ).where(
+            _reservations.c.reservation_date.in_(list(variants)),
+            _reservations.c.status != ReservationStatus.CANCELLED,
+        )
+    ).all()
+
+    company_ids = sorted({row.company_id for row in rows})
+    company_index = {company_id: index for index, company_id in enumerate(company_ids)}
+    indices = ([], [], [], [])
+    counts = []
+    for row in rows:
+        band = _band(row.start_time)
+        if band is None:
+            continue
+        offset = (variants[row.reservation_date] - first_week).days
+        for axis, value in zip(indices, (company_index[row.company_id], offset // 7, offset % 7, band)):
+            axis.append(value)
+        counts.append(row.slot_count or 1)
+
+    demand = np.zeros((len(company_ids), weeks, 7, len(TIME_BANDS)))
+    if counts:
+        np.add.at(demand, tuple(np.asarray(axis) for axis in indices), np.asarray(counts, dtype=float))
+    return company_ids, demand
+
+
+def holt_forecast(series: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    減衰トレンド付きの指数平滑法（Holt法）で各系列を予測
+
+    Args:
+        series: shape=(系列数, 期間数) の実績
+        horizon: 予測する期間数
+
+    Returns:
+        shape=(系列数, horizon) の予測（0未満は0）
+    """
+    level = series[:, 0].copy()
+    trend = np.zeros_like(level)
+    for t in range(1, series.shape[1]):
+        previous = level
+        level = ALPHA * series[:, t] + (1 - ALPHA) * (previous + PHI * trend)
+        trend = BETA * (level - previous) + (1 - BETA) * PHI * trend
+    # h期先: 水準 + (φ + φ^2 + ... + φ^h) × トレンド
+    damping = np.cumsum(PHI ** np.arange(1, horizon + 1))
+    return np.maximum(level[:, None] + damping[None, :] * trend[:, None], 0)
+
+
+def build_forecast(conn: Connection, today: date) -> Dict[str, Any]:
+    """
+    予測を作成
+
+    Args:
+        conn: DB接続
+        today: 今日（この日を含む週から予測する）
+
+    Returns:
+        保存する予測（企業IDごとに forecast[週][曜日][時間帯] の枠数）
+    """
+    history_weeks = settings.FORECAST_HISTORY_WEEKS
+    horizon = settings.FORECAST_HORIZON_WEEKS
+    current_week = week_start(today)
+    first_week = current_week - timedelta(weeks=history_weeks)
+
+    company_ids, demand = load_demand(conn, first_week, history_weeks)
+    # 企業・曜日・時間帯ごとの週次の系列にする
+    series = demand.transpose(0, 2, 3, 1).reshape(-1, history_weeks)
+    predicted = holt_forecast(series, horizon) if len(series) else np.zeros((0, horizon))
+    predicted = predicted.reshape(len(company_ids), 7, len(TIME_BANDS), horizon).transpose(0, 3, 1, 2)
+
+    return {
+        "first_week": current_week.isoformat(),
+        "history_weeks": history_weeks,
+        "horizon_weeks": horizon,
+        "bands": [name for name, _, _ in TIME_BANDS],
+        "companies": {
+            str(company_id): np.round(predicted[index], 2).tolist()
+            for index, company_id in enumerate(company_ids)
+        },
+    }
+
+
+def refresh_forecast(conn: Connection, now: datetime, batch_size: int) -> int:
+    """
+    1日1回、予測を作り直す（定期ジョブ）
+
+    FORECAST_REFRESH_HOUR 以降の最初の実行で作成し、その日のうちは作り直さない。
+    予測がまだない場合はすぐに作成する。
+
+    Args:
+        conn: DB接続
+        now: 現在時刻（UTC）
+        batch_size: 未使用（定期ジョブの共通の引数）
+
+    Returns:
+        予測した企業数（作り直さなかった場合は0）
+    """
+    local_now = now.astimezone(ZoneInfo(settings.TIMEZONE))
+    generated_at = load_state(conn, GENERATED_AT_KEY)
+    if generated_at:
+        generated_on = datetime.fromisoformat(generated_at).astimezone(ZoneInfo(settings.TIMEZONE)).date()
+        if generated_on >= local_now.date() or local_now.hour < settings.FORECAST_REFRESH_HOUR:
+            return 0
+
+    result = build_forecast(conn, local_now.date())
+    save_state(conn, RESULT_KEY, result)
+    save_state(conn, GENERATED_AT_KEY, now.isoformat())
+    conn.commit()
+    return len(result["companies"])
+
+
+class ForecastCache:
+    """保存済みの予測のプロセス内キャッシュ（作成日時が変わったときだけ本体を読み直す）"""
+
+    def __init__(self):
+        self._generated_at: Optional[str] = None
+        self._result: Optional[Dict[str, Any]] = None
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def get(self, bind) -> Tuple[Optional[str], Optional[Dict[str, Any]], Dict[str, np.ndarray]]:
+        """
+        予測を取得
+
+        Args:
+            bind: Session または Connection
+
+        Returns:
+            (作成日時, 予測, 企業IDごとの配列 shape=(週, 7, 時間帯))。予測がない場合は (None, None, {})
+        """
+        generated_at = load_state(bind, GENERATED_AT_KEY)
+        with self._lock:
+            if generated_at is not None and generated_at == self._generated_at:
+                return self._generated_at, self._result, self._arrays
+        result = load_state(bind, RESULT_KEY) if generated_at else None
+        arrays = {
+            company_id: np.asarray(values, dtype=float)
+            for company_id, values in (result or {}).get("companies", {}).items()
+        }
+        with self._lock:
+            self._generated_at, self._result, self._arrays = generated_at, result, arrays
+        return generated_at, result, arrays
+
+
+forecast_cache = ForecastCache()
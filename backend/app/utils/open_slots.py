@@ -0,0 +1,206 @@
+"""
+空き枠インデックス（open_slots）の維持
+
+スタッフ向けの求人一覧（/jobs/open）を予約の time_slots のJSONを読まずに
+(date, start_minute, area) の索引の範囲検索で返すため、募集中の予約の空き枠を
+open_slots テーブルに展開して持つ。
+
+予約の作成・更新・削除、アサインの作成・ステータス変更・削除、定期処理によるオファーの失効の
+たびに、変更があった予約の行だけを再計算し、差分（追加・更新・削除）をコミット前に書き込む。
+Session と Connection のどちらでも使える。
+"""
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+from ..models.open_slot import OpenSlotIndex
+from ..models.reservation import Reservation, ReservationStatus
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from .areas import address_area
+from .date_utils import parse_date, format_date, time_to_minutes
+
+# スタッフを募集している予約のステータス
+OPEN_STATUSES = (ReservationStatus.RECRUITING, ReservationStatus.ASSIGNING)
+
+# 枠を埋めていないアサインのステータス
+INACTIVE_ASSIGNMENT_STATUSES = (AssignmentStatus.REJECTED, AssignmentStatus.CANCELLED)
+
+# 差分の判定に使うカラム
+_VALUE_COLUMNS = (
+    "company_id", "date", "start_minute", "end_minute", "start_time", "end_time",
+    "area", "city", "office_name", "office_address", "hourly_rate",
+)
+
+_table = OpenSlotIndex.__table__
+
+
+def _decode_time_slots(time_slots) -> List[dict]:
+    if isinstance(time_slots, str):
+        try:
+            time_slots = json.loads(time_slots)
+        except json.JSONDecodeError:
+            return []
+    return time_slots if isinstance(time_slots, list) else []
+
+
+def slot_windows(time_slots, start_time: Optional[str], end_time: Optional[str]) -> Iterator[Tuple[Optional[int], str, str]]:
+    """
+    予約の枠ごとの (枠番号, 開始時刻, 終了時刻)
+
+    枠がない予約は予約全体を枠番号Noneの1枠とする。時刻がない枠は含めない。
+    """
+    slots = _decode_time_slots(time_slots)
+    if not slots:
+        if start_time and end_time:
+            yield None, start_time, end_time
+        return
+    for index, slot in enumerate(slots, start=1):
+        if slot.get("start_time") and slot.get("end_time"):
+            yield index, slot["start_time"], slot["end_time"]
+
+
+def _open_rows(reservation, taken: set) -> Iterator[dict]:
+    """予約の空き枠のインデックス行"""
+    day = parse_date(reservation.reservation_date)
+    if day is None:
+        return
+    area, city = address_area(reservation.office_address)
+    for slot_number, start_time, end_time in slot_windows(
+        reservation.time_slots, reservation.start_time, reservation.end_time
+    ):
+        if (reservation.id, slot_number) in taken:
+            continue
+        try:
+            start_minute, end_minute = time_to_minutes(start_time), time_to_minutes(end_time)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        yield {
+            "reservation_id": reservation.id,
+            "slot_number": slot_number,
+            "company_id": reservation.company_id,
+            "date": format_date(day),
+            "start_minute": start_minute,
+            "end_minute": end_minute,
+            "start_time": f"{start_minute // 60:02d}:{start_minute % 60:02d}",
+            "end_time": f"{end_minute // 60:02d}:{end_minute % 60:02d}",
+            "area": area,
+            "city": city,
+            "office_name": reservation.office_name,
+            "office_address": reservation.office_address,
+            "hourly_rate": reservation.hourly_rate,
+        }
+
+
+def refresh_open_slots(bind, reservation_ids: Iterable[Optional[int]]) -> Dict[str, int]:
+    """
+    予約の空き枠を再計算してインデックスに反映（コミットは呼び出し側で行う）
+
+    Session を渡した場合は、未反映の変更を先に flush してから読み込む。
+    削除された予約・募集中でなくなった予約の行は削除される。
+
+    Args:
+        bind: Session または Connection
+        reservation_ids: 変更があった予約のID
+
+    Returns:
+        {"inserted": 追加数, "updated": 更新数, "deleted": 削除数}
+    """
+    ids = sorted({reservation_id for reservation_id in reservation_ids if reservation_id is not None})
+    stats = {"inserted": 0, "updated": 0, "deleted": 0}
+    if not ids:
+        return stats
+    if isinstance(bind, Session):
+        bind.flush()
+
+    reservations = Reservation.__table__
+    assignments = ReservationStaff.__table__
+    open_reservations = bind.execute(
+        select(
+            reservations.c.id, reservations.c.company_id, reservations.c.reservation_date,
+            reservations.c.start_time, reservations.c.end_time, reservations.c.time_slots,
+            reservations.c.office_name, reservations.c.office_address, reservations.c.hourly_rate,
+        ).where(reservations.c.id.in_(ids), reservations.c.status.in_(OPEN_STATUSES))
+    ).all()
+    taken = set(bind.execute(
+        select(assignments.c.reservation_id, assignments.c.slot_number).where(
+            assignments.c.reservation_id.in_([row.id for row in open_reservations]),
+            assignments.c.status.notin_(INACTIVE_ASSIGNMENT_STATUSES),
+        )
+    ).all()) if open_reservations else set()
+
+    desired = {
+        (row["reservation_id"], row["slot_number"]): row
+        for reservation in open_reservations for row in _open_rows(reservation, taken)
+    }
+    existing = {
+        (row.reservation_id, row.slot_number): row
+        for row in bind.execute(
+            select(_table.c.id, _table.c.reservation_id, _table.c.slot_number, *(_table.c[c] for c in _VALUE_COLUMNS))
+            .where(_table.c.reservation_id.in_(ids))
+        )
+    }
+
+    removed = [row.id for key, row in existing.items() if key not in desired]
+    changed = [
+        {"row_id": existing[key].id, **{column: values[column] for column in _VALUE_COLUMNS}}
+        for key, values in desired.items()
+        if key in existing and any(getattr(existing[key], column) != values[column] for column in _VALUE_COLUMNS)
+    ]
+    added = [values for key, values in desired.items() if key not in existing]
+
+    if removed:
+        bind.execute(delete(_table).where(_table.c.id.in_(removed)))
+    if changed:
+        bind.execute(
+            update(_table).where(_table.c.id == bindparam("row_id"))
+            .values(**{column: bindparam(column) for column in _VALUE_COLUMNS}),
+            changed,
+        )
+    if added:
+        bind.execute(insert(_table), added)
+    stats.update(inserted=len(added), updated=len(changed), deleted=len(removed))
+    return stats
+
+
+def remove_open_slots(bind, reservation_ids: Iterable[int]) -> None:
+    """予約の空き枠を削除（予約を削除する前に呼ぶ）"""
+    ids = list(reservation_ids)
+    if ids:
+        bind.execute(delete(_table).where(_table.c.reservation_id.in_(ids)))
+
+
+def rebuild_open_slots(conn, batch_size: int = 500) -> Dict[str, int]:
+    """
+    全予約の空き枠インデックスを再構築
+
+    予約をIDの順に batch_size 件ずつ refresh_open_slots し、バッチごとにコミットする。
+    インデックスに残っている、既に存在しない予約の行も削除する。
+
+    Args:
+        conn: DB接続（Connection）
+        batch_size: 1回に処理する予約数
+
+    Returns:
+        {"reservations": 処理した予約数, "inserted": 追加数, "updated": 更新数, "deleted": 削除数}
+    """
+    reservations = Reservation.__table__
+    totals = {"reservations": 0, "inserted": 0, "updated": 0, "deleted": 0}
+    last_id = 0
+    while True:
+        ids = conn.execute(
+            select(reservations.c.id).where(reservations.c.id > last_id).order_by(reservations.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        for key, value in refresh_open_slots(conn, ids).items():
+            totals[key] += value
+        totals["reservations"] += len(ids)
+        conn.commit()
+
+    orphaned = conn.execute(
+        delete(_table).where(_table.c.reservation_id.notin_(select(reservations.c.id)))
+    ).rowcount
+    conn.commit()
+    totals["deleted"] += orphaned
+    return totals
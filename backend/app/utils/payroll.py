@@ -0,0 +1,227 @@
+"""
+月次の給与計算（全スタッフの給与明細を一括で計算）
+
+対象月の確定済み・完了報告済みのアサインを、予約の時給・枠の施術時間・勤怠（実働時間・遅刻・早退）と結合して
+1回のクエリで取得し、列ごとのNumPy配列にしてからベクトル演算とスタッフごとの集計（bincount）で
+全スタッフの給与明細を作る。
+
+    - 基本給: 時給 × 予定の施術時間（アサインごとに円未満切り捨て、/staff/{id}/earnings と同じ）
+    - 割増: 実働が予定の施術時間を超えた分 × 時給 × PAYROLL_OVERTIME_RATE
+    - 控除: 遅刻・早退の場合、実働が予定の施術時間に満たない分 × 時給
+"""
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import Integer, cast, func, or_, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.attendance import Attendance
+from ..models.reservation import Reservation
+from ..models.reservation_staff import ReservationStaff
+from ..models.staff import Staff
+from ..schemas.payroll import Payslip
+from .reservation_status import CONFIRMED_STATUSES
+
+# 給与の対象になるアサイン（/staff/{id}/earnings と同じく確定済み・完了報告済み）
+# 完了報告でアサインは COMPLETED になるため、勤怠（実働時間・遅刻・早退）があるアサインの大半は COMPLETED
+PAYABLE_STATUSES = CONFIRMED_STATUSES
+
+
+@dataclass
+class PayrollColumns:
+    """対象月の給与の対象のアサイン（1要素が1アサイン）"""
+    staff_id: np.ndarray  # int64
+    scheduled: np.ndarray  # int64 予定の施術時間（分）
+    hourly_rate: np.ndarray  # int64 時給（円）
+    attended: np.ndarray  # bool 実働時間の記録があるか
+    worked: np.ndarray  # int64 実働時間（分、記録がない場合は0）
+    late: np.ndarray  # bool
+    early_leave: np.ndarray  # bool
+
+    def __len__(self) -> int:
+        return len(self.staff_id)
+
+
+def month_prefixes(year: int, month: int) -> List[str]:
+    """
+    予約日の文字列で対象月を検索するための前方一致の一覧
+
+    Returns:
+        YYYY/MM/, YYYY-MM-, YYYY/M/, YYYY-M- の各表記
+    """
+    return sorted({
+        f"{year}/{month:02d}/", f"{year}-{month:02d}-", f"{year}/{month}/", f"{year}-{month}-",
+    })
+
+
+def _slot_durations(time_slots) -> Dict[int, int]:
+    """予約の枠番号 -> 施術時間（分）"""
+    if isinstance(time_slots, str):
+        try:
+            time_slots = json.loads(time_slots)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    durations = {}
+    if isinstance(time_slots, list):
+        for slot in time_slots:
+            if isinstance(slot, dict) and slot.get("slot") is not None:
+                durations.setdefault(slot["slot"], slot.get("duration") or 0)
+    return durations
+
+
+def load_payroll_columns(
+    db: Session, year: int, month: int, staff_ids: Optional[Iterable[int]] = None
+) -> PayrollColumns:
+    """
+    対象月の給与の対象のアサインを1回のクエリで取得し、列ごとの配列にする
+
+    Args:
+        db: データベースセッション
+        year: 年
+        month: 月
+        staff_ids: 指定した場合、そのスタッフのみ
+
+    Returns:
+        PayrollColumns
+    """
+    prefixes = month_prefixes(year, month)
+    # 勤怠は対象月の分だけをアサインごとに集計してから結合する
+    attendance = select(
+        Attendance.assignment_id,
+        func.sum(Attendance.work_hours).label("work_minutes"),
+        func.max(cast(Attendance.is_late, Integer)).label("late"),
+        func.max(cast(Attendance.is_early_leave, Integer)).label("early_leave"),
+    ).where(
+        Attendance.assignment_id.isnot(None),
+        or_(*(Attendance.work_date.startswith(prefix) for prefix in prefixes)),
+    ).group_by(Attendance.assignment_id).subquery()
+
+    stmt = select(
+        ReservationStaff.staff_id, ReservationStaff.slot_number, ReservationStaff.reservation_id,
+        Reservation.time_slots, Reservation.service_duration, Reservation.hourly_rate,
+        attendance.c.work_minutes, attendance.c.late, attendance.c.early_leave,
+    ).join(
+        Reservation, Reservation.id == ReservationStaff.reservation_id
+    ).outerjoin(
+        attendance, attendance.c.assignment_id == ReservationStaff.id
+    ).where(
+        ReservationStaff.status.in_(PAYABLE_STATUSES),
+        or_(*(Reservation.reservation_date.startswith(prefix) for prefix in prefixes)),
+    )
+    if staff_ids is not None:
+        stmt = stmt.where(ReservationStaff.staff_id.in_(list(staff_ids)))
+    rows = db.execute(stmt).all()
+
+    # 枠の施術時間はJSONのため予約ごとに1回だけ読む
+    slot_durations: Dict[int, Dict[int, int]] = {}
+    scheduled = []
+    for row in rows:
+        if row.slot_number and row.time_slots:
+            durations = slot_durations.get(row.reservation_id)
+            if durations is None:
+                durations = slot_durations[row.reservation_id] = _slot_durations(row.time_slots)
+            scheduled.append(durations.get(row.slot_number, 0))
+        else:
+            scheduled.append(row.service_duration or 0)
+
+    return PayrollColumns(
+        staff_id=np.fromiter((row.staff_id for row in rows), dtype=np.int64, count=len(rows)),
+        scheduled=np.asarray(scheduled, dtype=np.int64),
+        hourly_rate=np.fromiter((row.hourly_rate or 0 for row in rows), dtype=np.int64, count=len(rows)),
+        attended=np.fromiter((row.work_minutes is not None for row in rows), dtype=bool, count=len(rows)),
+        worked=np.fromiter((row.work_minutes or 0 for row in rows), dtype=np.int64, count=len(rows)),
+        late=np.fromiter((bool(row.late) for row in rows), dtype=bool, count=len(rows)),
+        early_leave=np.fromiter((bool(row.early_leave) for row in rows), dtype=bool, count=len(rows)),
+    )
+
+
+def compute_payslips(
+    columns: PayrollColumns, staff: List[Tuple[int, str]], year: int, month: int
+) -> List[Payslip]:
+    """
+    アサインの配列からスタッフごとの給与明細を計算
+
+    Args:
+        columns: load_payroll_columns の結果
+        staff: (スタッフID, 名前) のリスト（アサインがないスタッフも0円の明細を作る）
+        year: 年
+        month: 月
+
+    Returns:
+        スタッフIDの順の給与明細
+    """
+    staff = sorted(staff)
+    staff_order = np.fromiter((staff_id for staff_id, _ in staff), dtype=np.int64, count=len(staff))
+
+    # 一覧にないスタッフのアサインは除外する
+    position = np.searchsorted(staff_order, columns.staff_id)
+    known = position < len(staff_order)
+    known[known] = staff_order[position[known]] == columns.staff_id[known]
+    index = position[known]
+    scheduled = columns.scheduled[known]
+    rate = columns.hourly_rate[known]
+    attended = columns.attended[known]
+    worked = columns.worked[known]
+    late = columns.late[known]
+    early_leave = columns.early_leave[known]
+
+    payable = (scheduled > 0) & (rate > 0)
+    base_pay = np.where(payable, scheduled * rate // 60, 0)
+    overtime = np.where(attended, np.maximum(worked - scheduled, 0), 0)
+    overtime_pay = np.floor(overtime * rate * settings.PAYROLL_OVERTIME_RATE / 60).astype(np.int64)
+    shortfall = np.where(attended & (late | early_leave), np.maximum(scheduled - worked, 0), 0)
+    deductions = shortfall * rate // 60
+
+    def per_staff(values) -> np.ndarray:
+        return np.bincount(index, weights=values, minlength=len(staff_order)).astype(np.int64)
+
+    totals = {
+        "assignment_count": np.bincount(index, minlength=len(staff_order)),
+        "scheduled_minutes": per_staff(scheduled),
+        "worked_minutes": per_staff(np.where(attended, worked, scheduled)),
+        "overtime_minutes": per_staff(overtime),
+        "shortfall_minutes": per_staff(shortfall),
+        "late_count": per_staff(late & attended),
+        "early_leave_count": per_staff(early_leave & attended),
+        "base_pay": per_staff(base_pay),
+        "overtime_pay": per_staff(overtime_pay),
+        "deductions": per_staff(deductions),
+    }
+    totals["total_pay"] = totals["base_pay"] + totals["overtime_pay"] - totals["deductions"]
+    columns_by_name = {name: values.tolist() for name, values in totals.items()}
+
+    return [
+        Payslip(
+            staff_id=staff_id,
+            staff_name=name,
+            year=year,
+            month=month,
+            **{field: values[i] for field, values in columns_by_name.items()},
+        )
+        for i, (staff_id, name) in enumerate(staff)
+    ]
+
+
+def calculate_payroll(
+    db: Session, year: int, month: int, staff_ids: Optional[Iterable[int]] = None
+) -> List[Payslip]:
+    """
+    対象月の全スタッフ（または指定したスタッフ）の給与明細を計算
+
+    Args:
+        db: データベースセッション
+        year: 年
+        month: 月
+        staff_ids: 指定した場合、そのスタッフのみ
+
+    Returns:
+        スタッフIDの順の給与明細
+    """
+    query = db.query(Staff.id, Staff.name)
+    if staff_ids is not None:
+        staff_ids = list(staff_ids)
+        query = query.filter(Staff.id.in_(staff_ids))
+    staff = [(staff_id, name) for staff_id, name in query.all()]
+    columns = load_payroll_columns(db, year, month, staff_ids)
+    return compute_payslips(columns, staff, year, month)
@@ -0,0 +1,127 @@
+"""
+一覧APIの項目指定（fields=）
+
+一覧画面は数項目しか表示しないため、`fields=id,office_name,status` のように
+返す項目を指定できるようにする。
+
+    - 指定された項目のカラムだけを SELECT する（load_only、リレーションは読み込まない）
+    - 指定された項目だけを持つレスポンススキーマでシリアライズする（項目の組ごとにキャッシュ）
+    - id は常に含める
+
+fields を省略した場合は従来どおり全項目を返す。
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, create_model, field_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import lazyload, load_only
+from ..core.responses import model_response
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    fields クエリパラメータを解析
+
+    Args:
+        fields: カンマ区切りの項目名（Noneまたは空の場合は全項目）
+        schema: 一覧のレスポンススキーマ（指定できる項目）
+
+    Returns:
+        項目名のタプル（id を先頭に含む、指定順・重複なし）。全項目の場合はNone
+
+    Raises:
+        HTTPException: スキーマにない項目が指定された場合（400）
+    """
+    if fields is None or not fields.strip():
+        return None
+    names = ["id"]
+    for name in (part.strip() for part in fields.split(",")):
+        if name and name not in names:
+            names.append(name)
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"fields に指定できない項目です: {', '.join(unknown)}"
+        )
+    return tuple(names)
+
+
+def project_query(query, model, names: Optional[Iterable[str]], extra_options: Optional[Dict[str, Any]] = None):
+    """
+    クエリを指定された項目のカラムだけを読み込むように絞る
+
+    Args:
+        query: 一覧のクエリ
+        model: 対象のモデル
+        names: parse_fields の結果（Noneの場合はクエリをそのまま返す）
+        extra_options: カラム以外の項目（プロパティなど）を返すために必要なローダーオプション
+
+    Returns:
+        絞り込んだクエリ
+    """
+    if names is None:
+        return query
+    columns = inspect(model).column_attrs
+    attributes = [getattr(model, name) for name in names if name in columns]
+    # 既定で selectin / joined のリレーションも、指定された項目に必要なものだけ読み込む
+    options = [load_only(*attributes), lazyload("*")]
+    options.extend(option for name, option in (extra_options or {}).items() if name in names)
+    return query.options(*options)
+
+
+def _copy_validators(schema: Type[BaseModel], names: Tuple[str, ...]) -> Dict[str, Any]:
+    """スキーマのフィールドバリデータのうち、指定された項目に関係するものを複製"""
+    validators = {}
+    for name, decorator in schema.__pydantic_decorators__.field_validators.items():
+        targets = [field for field in decorator.info.fields if field in names]
+        if targets:
+            # decorator.func は元のスキーマに束縛されたクラスメソッドのため、関数を取り出して付け直す
+            func = getattr(decorator.func, "__func__", decorator.func)
+            validators[name] = field_validator(*targets, mode=decorator.info.mode)(classmethod(func))
+    return validators
+
+
+@lru_cache(maxsize=128)
+def projection_schema(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    指定された項目だけを持つレスポンススキーマ（項目の組ごとにキャッシュ）
+
+    Args:
+        schema: 元のレスポンススキーマ
+        names: parse_fields の結果
+
+    Returns:
+        項目を絞ったスキーマ
+    """
+    fields = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names}
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        __validators__=_copy_validators(schema, names),
+        **fields,
+    )
+
+
+def projected_response(
+    items: Iterable[Any],
+    schema: Type[BaseModel],
+    names: Tuple[str, ...],
+    response: Optional[Response] = None,
+) -> Response:
+    """
+    指定された項目だけをシリアライズしたレスポンス
+
+    エンドポイントの response_model（全項目）による検証を通さないため、Responseとして返す。
+
+    Args:
+        items: ORMオブジェクト（または属性を持つオブジェクト）のリスト
+        schema: 元のレスポンススキーマ
+        names: parse_fields の結果
+        response: エンドポイントに注入されたレスポンス（ETagなどのヘッダーを引き継ぐ）
+
+    Returns:
+        Response: application/json のレスポンス
+    """
+    return model_response(List[projection_schema(schema, names)], list(items), response=response)
@@ -0,0 +1,276 @@
+"""
+予約ステータスの自動遷移
+
+予約ごとにアサインの件数（カウンター）を保持し、オファー作成・受託・完了報告・評価などの
+イベントのたびに差分だけを加算して、カウンターからステータスを決める（予約のアサインを毎回数え直さない）。
+
+    RECRUITING        オファーなし
+    ASSIGNING         オファーあり（確定が必要数に満たない）
+    CONFIRMED         確定数 >= 必要数（枠数、枠がなければ1）、または予約全体（枠指定なし）のアサインが確定
+    SERVICE_COMPLETED 確定した全アサインが完了報告済み
+    EVALUATED         確定した全アサインのスタッフが評価済み
+
+CANCELLED / CLOSED は手動（または定期処理）で設定する終了状態のため変更しない。
+カウンターがずれた場合は recompute_reservation_status.py で一括再計算する。
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, exists, func, select, update, bindparam
+from sqlalchemy.orm import Session
+from ..models.attendance import Attendance, AttendanceStatus
+from ..models.rating import Rating
+from ..models.reservation import Reservation, ReservationStatus
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from .open_slots import refresh_open_slots
+
+COUNTER_COLUMNS = ("offered_count", "confirmed_count", "completed_count", "rated_count", "whole_confirmed_count")
+
+# 各カウンターに数えるアサインのステータス
+OFFERED_STATUSES = (AssignmentStatus.PENDING, AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED)
+CONFIRMED_STATUSES = (AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED)
+
+# 自動で変更しないステータス
+TERMINAL_STATUSES = (ReservationStatus.CANCELLED, ReservationStatus.CLOSED)
+
+
+def required_staff(time_slots) -> int:
+    """確定が必要なアサイン数（枠数、枠がなければ1）"""
+    if isinstance(time_slots, str):
+        try:
+            time_slots = json.loads(time_slots)
+        except json.JSONDecodeError:
+            time_slots = None
+    return len(time_slots) if isinstance(time_slots, list) and time_slots else 1
+
+
+def derive_status(
+    current: ReservationStatus, required: int, offered: int, confirmed: int, completed: int, rated: int,
+    whole_confirmed: int = 0,
+) -> ReservationStatus:
+    """
+    カウンターからステータスを決める
+
+    Args:
+        current: 現在のステータス
+        required: 確定が必要なアサイン数
+        offered: オファー中・確定・完了のアサイン数
+        confirmed: 確定・完了のアサイン数
+        completed: 完了報告済みのアサイン数
+        rated: 評価済みのスタッフの確定・完了アサイン数
+        whole_confirmed: 予約全体（枠指定なし）の確定・完了アサイン数（全枠を受け持つ）
+
+    Returns:
+        新しいステータス
+    """
+    if current in TERMINAL_STATUSES:
+        return current
+    if confirmed > 0 and (confirmed >= required or whole_confirmed > 0):
+        if completed >= confirmed:
+            return ReservationStatus.EVALUATED if rated >= confirmed else ReservationStatus.SERVICE_COMPLETED
+        return ReservationStatus.CONFIRMED
+    if offered > 0:
+        return ReservationStatus.ASSIGNING
+    return ReservationStatus.RECRUITING
+
+
+def refresh_status(reservation: Reservation) -> Optional[ReservationStatus]:
+    """
+    予約のカウンターからステータスを更新
+
+    Returns:
+        変更した場合は新しいステータス、変更がなければNone
+    """
+    new_status = derive_status(
+        reservation.status, required_staff(reservation.time_slots),
+        *(getattr(reservation, column) or 0 for column in COUNTER_COLUMNS),
+    )
+    if new_status == reservation.status:
+        return None
+    reservation.status = new_status
+    return new_status
+
+
+def apply_counters(db: Session, reservation: Reservation, **deltas: int) -> Optional[ReservationStatus]:
+    """
+    カウンターに差分を加算してステータスを更新（コミットは呼び出し側で行う）
+
+    同時に更新されても数がずれないよう、加算は UPDATE ... SET count = count + n で行う。
+
+    Args:
+        db: データベースセッション
+        reservation: 予約
+        **deltas: カウンター名 -> 差分（offered_count=1 など）
+
+    Returns:
+        変更した場合は新しいステータス
+    """
+    changed = False
+    for column, delta in deltas.items():
+        if delta:
+            setattr(reservation, column, func.coalesce(getattr(Reservation, column), 0) + delta)
+            changed = True
+    if changed:
+        db.flush()  # 加算後の値はアクセス時に再読み込みされる
+    return refresh_status(reservation)
+
+
+def _membership(status: Optional[AssignmentStatus], whole: bool) -> Tuple[int, int, int, int]:
+    """アサインのステータスが (offered, confirmed, completed, whole_confirmed) のどれに数えられるか"""
+    return (
+        int(status in OFFERED_STATUSES),
+        int(status in CONFIRMED_STATUSES),
+        int(status == AssignmentStatus.COMPLETED),
+        int(whole and status in CONFIRMED_STATUSES),
+    )
+
+
+def _is_rated(db: Session, reservation_id: int, staff_id: int) -> bool:
+    return db.query(
+        exists().where(Rating.reservation_id == reservation_id, Rating.staff_id == staff_id)
+    ).scalar()
+
+
+def on_assignment_change(
+    db: Session,
+    reservation: Optional[Reservation],
+    staff_id: Optional[int],
+    old_status: Optional[AssignmentStatus],
+    new_status: Optional[AssignmentStatus],
+    count: int = 1,
+    slot_number: Optional[int] = None,
+) -> Optional[ReservationStatus]:
+    """
+    アサインの作成・ステータス変更・削除をカウンターに反映
+
+    Args:
+        db: データベースセッション
+        reservation: アサインの予約
+        staff_id: スタッフID（確定数が変わる場合に評価済みかの確認に使う）
+        old_status: 変更前のステータス（作成の場合はNone）
+        new_status: 変更後のステータス（削除の場合はNone）
+        count: 同じ変更をしたアサインの件数（一括オファー用）
+        slot_number: アサインの枠番号（Noneは予約全体のアサイン。確定数が変わる場合に使う）
+
+    Returns:
+        予約のステータスを変更した場合は新しいステータス
+    """
+    if reservation is None:
+        return None
+    whole = slot_number is None
+    offered, confirmed, completed, whole_confirmed = (
+        (after - before) * count
+        for before, after in zip(_membership(old_status, whole), _membership(new_status, whole))
+    )
+    rated = confirmed if confirmed and _is_rated(db, reservation.id, staff_id) else 0
+    return apply_counters(
+        db, reservation,
+        offered_count=offered, confirmed_count=confirmed, completed_count=completed, rated_count=rated,
+        whole_confirmed_count=whole_confirmed,
+    )
+
+
+def on_rating_change(db: Session, reservation: Optional[Reservation], staff_id: int, sign: int) -> Optional[ReservationStatus]:
+    """
+    評価の作成（sign=1）・削除（sign=-1）をカウンターに反映
+
+    評価は予約・スタッフの組に1件のため、そのスタッフの確定・完了アサインの件数分を加算する。
+    """
+    if reservation is None:
+        return None
+    covered = db.query(func.count(ReservationStaff.id)).filter(
+        ReservationStaff.reservation_id == reservation.id,
+        ReservationStaff.staff_id == staff_id,
+        ReservationStaff.status.in_(CONFIRMED_STATUSES),
+    ).scalar() or 0
+    return apply_counters(db, reservation, rated_count=sign * covered)
+
+
+def _count_query(reservation_ids: List[int]):
+    """予約ごとのカウンターを集計するクエリ"""
+    rs = ReservationStaff.__table__
+    is_confirmed = rs.c.status.in_(CONFIRMED_STATUSES)
+    # 完了報告は以前は勤怠のみに記録していたため、勤怠の完了も完了として数える
+    attendance_completed = exists().where(
+        Attendance.assignment_id == rs.c.id, Attendance.status == AttendanceStatus.COMPLETED
+    )
+    rated = exists().where(Rating.reservation_id == rs.c.reservation_id, Rating.staff_id == rs.c.staff_id)
+    return select(
+        rs.c.reservation_id,
+        func.sum(case((rs.c.status.in_(OFFERED_STATUSES), 1), else_=0)),
+        func.sum(case((is_confirmed, 1), else_=0)),
+        func.sum(case(
+            (rs.c.status == AssignmentStatus.COMPLETED, 1),
+            (and_(is_confirmed, attendance_completed), 1),
+            else_=0,
+        )),
+        func.sum(case((and_(is_confirmed, rated), 1), else_=0)),
+        func.sum(case((and_(is_confirmed, rs.c.slot_number.is_(None)), 1), else_=0)),
+    ).where(rs.c.reservation_id.in_(reservation_ids)).group_by(rs.c.reservation_id)
+
+
+def recompute_reservations(
+    conn, reservation_ids: Optional[Iterable[int]] = None, batch_size: int = 500, apply: bool = True
+) -> Dict[str, int]:
+    """
+    アサイン・勤怠・評価からカウンターとステータスを一括で再計算
+
+    予約をIDの順に batch_size 件ずつ読み込み、変更がある行だけを executemany で更新する。
+    ステータスを変更した予約は空き枠インデックスも更新する。
+
+    Args:
+        conn: DB接続（Connection）
+        reservation_ids: 指定した場合はこの予約のみ
+        batch_size: 1回に処理する予約数
+        apply: Falseの場合は更新せずに件数だけ数える
+
+    Returns:
+        {"checked": 確認した予約数, "counters": カウンターを修正した数, "status": ステータスを変更した数}
+    """
+    table = Reservation.__table__
+    stats = {"checked": 0, "counters": 0, "status": 0}
+    ids_filter = sorted(set(reservation_ids)) if reservation_ids is not None else None
+    last_id = 0
+    while True:
+        query = select(
+            table.c.id, table.c.status, table.c.time_slots, *(table.c[column] for column in COUNTER_COLUMNS)
+        ).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        if ids_filter is not None:
+            query = query.where(table.c.id.in_(ids_filter))
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        counts = {row[0]: tuple(int(value or 0) for value in row[1:]) for row in conn.execute(
+            _count_query([row.id for row in rows])
+        )}
+        status_params, counter_params = [], []
+        for row in rows:
+            counters = counts.get(row.id, (0,) * len(COUNTER_COLUMNS))
+            current = tuple(getattr(row, column) or 0 for column in COUNTER_COLUMNS)
+            status = ReservationStatus(row.status) if not isinstance(row.status, ReservationStatus) else row.status
+            new_status = derive_status(status, required_staff(row.time_slots), *counters)
+            stats["checked"] += 1
+            if counters == current and new_status == status:
+                continue
+            stats["counters"] += counters != current
+            stats["status"] += new_status != status
+            param = {"row_id": row.id, "new_status": new_status, **dict(zip(COUNTER_COLUMNS, counters))}
+            (status_params if new_status != status else counter_params).append(param)
+
+        if apply and (status_params or counter_params):
+            statement = update(table).where(table.c.id == bindparam("row_id")).values(
+                status=bindparam("new_status"),
+                **{column: bindparam(column) for column in COUNTER_COLUMNS},
+            )
+            if status_params:
+                conn.execute(statement, status_params)
+                # 募集中かどうかが変わると空き枠も変わる
+                refresh_open_slots(conn, [param["row_id"] for param in status_params])
+            if counter_params:
+                # カウンターだけの修正では差分同期で再送されないよう updated_at は変更しない
+                conn.execute(statement.values(updated_at=table.c.updated_at), counter_params)
+            conn.commit()
+        if len(rows) < batch_size:
+            break
+    return stats
@@ -0,0 +1,213 @@
+"""
+予約の参加社員（名簿）
+
+社員の予約への登録・二重登録の確認・人数の集計は reservation_employees の
+(reservation_id, employee_id) の一意索引で行う。
+レスポンスの employee_names（カンマ区切り）は名簿から生成する（Reservation.employee_names）。
+"""
+from typing import List, Optional
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+from ..models.employee import Employee
+from ..models.reservation import Reservation
+from ..models.reservation_employee import ReservationEmployee
+
+
+def split_names(employee_names: Optional[str]) -> List[str]:
+    """カンマ区切りの社員名をリストに変換"""
+    if not employee_names:
+        return []
+    return [name.strip() for name in employee_names.split(",") if name.strip()]
+
+
+def resolve_employee(
+    db: Session,
+    company_id: int,
+    name: str,
+    department: Optional[str] = None,
+    position: Optional[str] = None,
+    phone: Optional[str] = None,
+    email: Optional[str] = None,
+    employee_id: Optional[int] = None,
+) -> Employee:
+    """
+    登録する社員を特定する（見つからなければ企業の社員として作成）
+
+    employee_id を指定した場合はその社員、指定がなければ企業内で氏名が一致する社員
+    （部署も一致する社員を優先）を使う。
+
+    Args:
+        db: データベースセッション
+        company_id: 予約の企業ID
+        name: 社員名
+        department: 部署
+        position: 役職
+        phone: 電話番号
+        email: メールアドレス
+        employee_id: 社員ID
+
+    Returns:
+        社員（作成した場合は flush 済み）
+
+    Raises:
+        ValueError: employee_id の社員が存在しないか、別の企業に所属している場合
+    """
+    if employee_id is not None:
+        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        if employee is None or employee.company_id != company_id:
+            raise ValueError(f"社員ID {employee_id} はこの予約の企業に所属していません")
+        return employee
+
+    candidates = db.query(Employee).filter(
+        Employee.company_id == company_id, Employee.name == name
+    ).order_by(Employee.id).all()
+    for candidate in candidates:
+        if department and candidate.department == department:
+            return candidate
+    if candidates:
+        return candidates[0]
+
+    # 社員スキーマでは部署が必須のため、不明な場合は空文字にする
+    employee = Employee(
+        company_id=company_id, name=name, department=department or "", position=position, phone=phone, email=email
+    )
+    db.add(employee)
+    db.flush()
+    return employee
+
+
+def is_registered(db: Session, reservation_id: int, employee_id: int) -> bool:
+    """社員が予約に登録済みか"""
+    return db.query(
+        exists().where(
+            ReservationEmployee.reservation_id == reservation_id,
+            ReservationEmployee.employee_id == employee_id,
+        )
+    ).scalar()
+
+
+def roster_count(db: Session, reservation_id: int) -> int:
+    """予約に登録済みの社員数"""
+    return db.query(func.count(ReservationEmployee.id)).filter(
+        ReservationEmployee.reservation_id == reservation_id
+    ).scalar() or 0
+
+
+def touch_reservation(reservation: Reservation) -> None:
+    """
+    名簿の変更を予約の更新として記録（employee_names が変わるため、ETag・差分同期に反映する）
+
+    予約の行を更新すると updated_at と version が進む。作成中（未保存）の予約では何もしない。
+    """
+    if reservation.id is not None:
+        reservation.updated_at = func.now()
+
+
+def touch_reservations_of_employee(db: Session, employee_id: int) -> None:
+    """社員名の変更を、その社員が名簿にいる予約の更新として記録（コミットは呼び出し側で行う）"""
+    reservations = Reservation.__table__
+    db.execute(
+        update(reservations)
+        .where(reservations.c.id.in_(
+            select(ReservationEmployee.reservation_id).where(ReservationEmployee.employee_id == employee_id)
+        ))
+        .values(updated_at=func.now())
+    )
+
+
+def add_to_roster(
+    db: Session,
+    reservation: Reservation,
+    employee: Employee,
+    slot_number: Optional[int] = None,
+    department: Optional[str] = None,
+    position: Optional[str] = None,
+    notes: Optional[str] = None,
+) -> ReservationEmployee:
+    """
+    社員を予約の名簿に追加（コミットは呼び出し側で行う）
+
+    同じ社員が同時に登録された場合は一意制約により flush 時に IntegrityError になる。
+    """
+    entry = ReservationEmployee(
+        employee=employee,
+        slot_number=slot_number,
+        department=department if department is not None else employee.department,
+        position=position if position is not None else employee.position,
+        notes=notes,
+    )
+    reservation.roster.append(entry)
+    touch_reservation(reservation)
+    db.flush()
+    return entry
+
+
+def assign_roster_slot(db: Session, reservation: Reservation, employee: Employee, slot_number: int) -> ReservationEmployee:
+    """
+    社員を枠に割り当てたことを名簿に反映（コミットは呼び出し側で行う）
+
+    その枠に割り当てられていた別の社員は名簿に残したまま枠番号を外す。
+    社員が名簿にいなければ追加する。
+    """
+    entry = None
+    for existing in reservation.roster:
+        if existing.employee_id == employee.id:
+            entry = existing
+        elif existing.slot_number == slot_number:
+            existing.slot_number = None
+    if entry is None:
+        return add_to_roster(db, reservation, employee, slot_number)
+    entry.slot_number = slot_number
+    touch_reservation(reservation)
+    return entry
+
+
+def release_roster_slot(
+    reservation: Reservation, slot_number: int, employee_id: Optional[int] = None
+) -> Optional[ReservationEmployee]:
+    """
+    枠の割り当て解除を名簿に反映（その枠の社員を名簿から外す）
+
+    Args:
+        reservation: 予約
+        slot_number: 枠番号
+        employee_id: 枠に入っていた社員ID（名簿の枠番号が未設定の行も照合する）
+
+    Returns:
+        外した名簿の行（いなければNone）
+    """
+    for entry in reservation.roster:
+        if entry.slot_number == slot_number or (employee_id is not None and entry.employee_id == employee_id):
+            reservation.roster.remove(entry)
+            touch_reservation(reservation)
+            return entry
+    return None
+
+
+def sync_roster_names(db: Session, reservation: Reservation, names: List[str]) -> bool:
+    """
+    予約の作成・更新で指定された社員名を名簿に反映（コミットは呼び出し側で行う）
+
+    名簿にない社員は追加し、指定されなかった社員は枠に入っていない場合だけ外す
+    （枠に入っている社員は枠の割り当て解除で外す）。
+
+    Returns:
+        名簿を変更した場合はTrue
+    """
+    wanted = list(dict.fromkeys(names))
+    current = {entry.employee.name for entry in reservation.roster}
+    changed = False
+    for entry in list(reservation.roster):
+        if entry.employee.name not in wanted and entry.slot_number is None:
+            reservation.roster.remove(entry)
+            changed = True
+    for name in wanted:
+        if name in current:
+            continue
+        employee = resolve_employee(db, reservation.company_id, name)
+        if not any(entry.employee_id == employee.id for entry in reservation.roster):
+            add_to_roster(db, reservation, employee)
+            changed = True
+    if changed:
+        touch_reservation(reservation)
+    return changed
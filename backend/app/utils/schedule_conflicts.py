@@ -0,0 +1,261 @@
+"""
+スタッフのダブルブッキング検出
+
+スタッフごと・日付ごとに確定済み（CONFIRMED・完了報告済みの COMPLETED）のアサインの拘束時間を
+開始分でソートした配列として持ち、bisect で重なりを判定する。
+
+    - オファー作成時・受託時: 対象スタッフの対象日のアサインだけを読み込んで判定
+    - 一括チェック: 全ての確定済みアサインを走査して既存の重なりを列挙
+    - 自動割り当て: 回答待ち（PENDING）のオファーも含めて指定日の予定を読み込む（load_day_schedules）
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from ..models.reservation import Reservation
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from .availability import assignment_window
+from .date_utils import parse_date, format_date, date_variants
+from .reservation_status import CONFIRMED_STATUSES
+
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@dataclass(frozen=True)
+class ScheduledAssignment:
+    """確定済みアサインの拘束時間"""
+    assignment_id: int
+    reservation_id: int
+    staff_id: int
+    date: str
+    start: int  # 開始分
+    end: int    # 終了分
+    office_address: Optional[str] = None
+
+    @property
+    def start_time(self) -> str:
+        return _format_minutes(self.start)
+
+    @property
+    def end_time(self) -> str:
+        return _format_minutes(self.end)
+
+
+@dataclass(frozen=True)
+class ScheduleConflict:
+    """同じスタッフの確定済みアサイン同士の時間の重なり"""
+    staff_id: int
+    date: str
+    first: ScheduledAssignment
+    second: ScheduledAssignment
+
+
+class StaffSchedule:
+    """
+    1人のスタッフの1日分の確定済みアサイン
+
+    開始分でソートした配列と、終了分の累積最大値を持つ。
+    既存データに重なりがあっても判定できるよう、直前の1件ではなく
+    累積最大値で「開始が依頼の終了より前で、終了が依頼の開始より後」の有無を調べる。
+    """
+
+    def __init__(self, items: Optional[List[ScheduledAssignment]] = None):
+        # アサインIDは一意なので、タプルの比較が ScheduledAssignment まで及ぶことはない
+        self._items: List[Tuple[int, int, ScheduledAssignment]] = sorted(
+            (item.start, item.assignment_id, item) for item in items or ()
+        )
+        self._starts: List[int] = [entry[0] for entry in self._items]
+        self._max_ends: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: ScheduledAssignment) -> None:
+        """アサインを追加"""
+        insort(self._items, (item.start, item.assignment_id, item))
+        insort(self._starts, item.start)
+        self._max_ends = None
+
+    def find_overlap(self, start: int, end: int) -> Optional[ScheduledAssignment]:
+        """
+        時間帯（分）と重なるアサインを1件返す（なければNone）
+
+        O(log n)。終了時刻ちょうどに開始する時間帯は重ならないとみなす。
+        """
+        if self._max_ends is None:
+            self._max_ends = list(accumulate((entry[2].end for entry in self._items), max))
+        index = bisect_left(self._starts, end) - 1
+        if index < 0 or self._max_ends[index] <= start:
+            return None
+        # 累積最大値が start を超える範囲を遡って、実際に重なっている1件を探す
+        while index >= 0 and self._max_ends[index] > start:
+            item = self._items[index][2]
+            if item.end > start:
+                return item
+            index -= 1
+        return None
+
+    def neighbours(self, start: int, end: int) -> Tuple[Optional[ScheduledAssignment], Optional[ScheduledAssignment]]:
+        """時間帯の直前に始まるアサインと、終了後に最初に始まるアサイン（移動距離の見積もり用）"""
+        before = bisect_left(self._starts, start) - 1
+        after = bisect_left(self._starts, end)
+        return (
+            self._items[before][2] if before >= 0 else None,
+            self._items[after][2] if after < len(self._items) else None,
+        )
+
+
+def _scheduled_query(db: Session, statuses: Sequence[AssignmentStatus] = CONFIRMED_STATUSES):
+    return db.query(
+        ReservationStaff.id, ReservationStaff.reservation_id, ReservationStaff.staff_id, ReservationStaff.slot_number,
+        Reservation.reservation_date, Reservation.time_slots, Reservation.start_time, Reservation.end_time,
+        Reservation.office_address,
+    ).join(Reservation, Reservation.id == ReservationStaff.reservation_id).filter(
+        ReservationStaff.status.in_(list(statuses))
+    )
+
+
+def _to_scheduled(row) -> Optional[ScheduledAssignment]:
+    """クエリ結果の行を ScheduledAssignment に変換（日付・時刻が読めない行はNone）"""
+    day = parse_date(row.reservation_date)
+    if day is None:
+        return None
+    try:
+        start, end = assignment_window(row.time_slots, row.slot_number, row.start_time, row.end_time)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return ScheduledAssignment(
+        row.id, row.reservation_id, row.staff_id, format_date(day), start, end, row.office_address
+    )
+
+
+def load_staff_schedule(
+    db: Session, staff_id: int, reservation_date: str, exclude_assignment_id: Optional[int] = None
+) -> StaffSchedule:
+    """
+    スタッフの指定日の確定済みアサインを読み込む
+
+    Args:
+        db: データベースセッション
+        staff_id: スタッフID
+        reservation_date: 日付（予約の reservation_date の形式）
+        exclude_assignment_id: 除外するアサインID（受託しようとしているアサイン自身など）
+    """
+    day = parse_date(reservation_date)
+    if day is None:
+        return StaffSchedule()
+    query = _scheduled_query(db).filter(
+        ReservationStaff.staff_id == staff_id,
+        Reservation.reservation_date.in_(date_variants(day)),
+    )
+    if exclude_assignment_id is not None:
+        query = query.filter(ReservationStaff.id != exclude_assignment_id)
+    return StaffSchedule([item for item in map(_to_scheduled, query) if item is not None])
+
+
+def load_day_schedules(
+    db: Session,
+    day: date,
+    staff_ids: Optional[Iterable[int]] = None,
+    statuses: Sequence[AssignmentStatus] = CONFIRMED_STATUSES,
+) -> Dict[int, StaffSchedule]:
+    """
+    指定日の全スタッフ（または指定したスタッフ）のアサインを1回のクエリで読み込む
+
+    Args:
+        db: データベースセッション
+        day: 日付
+        staff_ids: 指定した場合、このスタッフのみ
+        statuses: 読み込むアサインのステータス（省略時は確定済み・完了報告済み）
+
+    Returns:
+        スタッフID -> StaffSchedule（該当するアサインがないスタッフは含まない）
+    """
+    query = _scheduled_query(db, statuses).filter(Reservation.reservation_date.in_(date_variants(day)))
+    if staff_ids is not None:
+        query = query.filter(ReservationStaff.staff_id.in_(list(staff_ids)))
+    items: Dict[int, List[ScheduledAssignment]] = defaultdict(list)
+    for row in query:
+        item = _to_scheduled(row)
+        if item is not None:
+            items[item.staff_id].append(item)
+    return {staff_id: StaffSchedule(staff_items) for staff_id, staff_items in items.items()}
+
+
+def find_conflict(
+    db: Session,
+    staff_id: int,
+    reservation: Reservation,
+    slot_number: Optional[int],
+    exclude_assignment_id: Optional[int] = None,
+) -> Optional[ScheduledAssignment]:
+    """
+    スタッフを予約（の枠）に割り当てた場合に時間が重なる確定済みアサインを返す
+
+    Args:
+        db: データベースセッション
+        staff_id: スタッフID
+        reservation: 割り当て先の予約
+        slot_number: 枠番号（Noneの場合は予約全体の時間帯）
+        exclude_assignment_id: 除外するアサインID
+
+    Returns:
+        重なるアサイン（なければNone）
+    """
+    try:
+        start, end = assignment_window(
+            reservation.time_slots, slot_number, reservation.start_time, reservation.end_time
+        )
+    except (ValueError, TypeError, AttributeError):
+        return None
+    schedule = load_staff_schedule(db, staff_id, reservation.reservation_date, exclude_assignment_id)
+    return schedule.find_overlap(start, end)
+
+
+def conflict_message(conflict: ScheduledAssignment) -> str:
+    """重なりをユーザーに伝えるエラーメッセージ"""
+    return (
+        f"このスタッフは同じ時間帯に別の予約（予約ID {conflict.reservation_id}、"
+        f"{conflict.date} {conflict.start_time}〜{conflict.end_time}）が確定しています"
+    )
+
+
+def scan_conflicts(db: Session, staff_id: Optional[int] = None) -> List[ScheduleConflict]:
+    """
+    確定済みアサイン全体から時間の重なりを列挙
+
+    スタッフ・日付ごとに開始分でソートし、それまでの終了分の最大値と比較して
+    重なる組を検出する（同じ時間帯に3件以上重なる場合は、最も遅く終わるアサインとの組を報告）。
+
+    Args:
+        db: データベースセッション
+        staff_id: 指定した場合、このスタッフのみ確認
+
+    Returns:
+        重なりのリスト（スタッフID・日付・開始時刻順）
+    """
+    query = _scheduled_query(db)
+    if staff_id is not None:
+        query = query.filter(ReservationStaff.staff_id == staff_id)
+
+    groups: Dict[Tuple[int, str], List[ScheduledAssignment]] = defaultdict(list)
+    for row in query.yield_per(1000):
+        item = _to_scheduled(row)
+        if item is not None:
+            groups[(item.staff_id, item.date)].append(item)
+
+    conflicts: List[ScheduleConflict] = []
+    for (group_staff_id, day), items in sorted(groups.items()):
+        items.sort(key=lambda item: (item.start, item.assignment_id))
+        latest = items[0]
+        for item in items[1:]:
+            if item.start < latest.end:
+                conflicts.append(ScheduleConflict(group_staff_id, day, latest, item))
+            if item.end > latest.end:
+                latest = item
+    return conflicts
@@ -0,0 +1,102 @@
+"""
+予約の時間枠の変更通知
+
+予約画面の枠選択を最新に保つため、枠の空き状況の差分を
+予約チャネルと企業チャネルにリアルタイム配信する。
+社員名などの個人情報は含めず、枠番号と埋まっているかどうかだけを送る。
+"""
+import json
+from typing import Any, Dict, List
+from ..core.realtime import broker, reservation_channel, company_channel
+
+
+def _parse_slots(time_slots: Any) -> List[dict]:
+    """time_slots をリストとして取得（文字列の場合はJSONパース）"""
+    if isinstance(time_slots, str):
+        try:
+            time_slots = json.loads(time_slots)
+        except json.JSONDecodeError:
+            return []
+    return time_slots if isinstance(time_slots, list) else []
+
+
+def slot_states(reservation) -> List[bool]:
+    """
+    各枠が埋まっているかどうかのリスト（変更前の状態の保存用）
+
+    Args:
+        reservation: 予約モデル
+
+    Returns:
+        枠番号順の is_filled のリスト
+    """
+    return [bool(slot.get("is_filled")) for slot in _parse_slots(reservation.time_slots)]
+
+
+def slot_snapshot(reservation) -> Dict[str, Any]:
+    """
+    予約の枠の状態全体（接続直後にクライアントへ送る）
+
+    Args:
+        reservation: 予約モデル
+
+    Returns:
+        スナップショットメッセージ
+    """
+    return {
+        "type": "snapshot",
+        "reservation_id": reservation.id,
+        "status": reservation.status.value if reservation.status else None,
+        "max_participants": reservation.max_participants,
+        "slots_filled": reservation.slots_filled or 0,
+        "slots": [
+            {
+                "slot": slot.get("slot", index + 1),
+                "start_time": slot.get("start_time"),
+                "end_time": slot.get("end_time"),
+                "is_filled": bool(slot.get("is_filled")),
+            }
+            for index, slot in enumerate(_parse_slots(reservation.time_slots))
+        ],
+    }
+
+
+def _publish(reservation, message: Dict[str, Any]) -> None:
+    """予約チャネルと企業チャネルに配信"""
+    broker.publish(reservation_channel(reservation.id), message)
+    broker.publish(company_channel(reservation.company_id), message)
+
+
+def publish_slot_snapshot(reservation) -> None:
+    """枠の構成が変わった場合に状態全体を配信する（コミット後に呼ぶ）"""
+    _publish(reservation, slot_snapshot(reservation))
+
+
+def publish_slot_changes(reservation, before: List[bool]) -> None:
+    """
+    変更前の状態と比較して、変わった枠だけを配信する（コミット後に呼ぶ）
+
+    Args:
+        reservation: 更新後の予約モデル
+        before: 更新前の slot_states() の結果
+    """
+    after = slot_states(reservation)
+    if len(after) != len(before):
+        publish_slot_snapshot(reservation)
+        return
+    changed = [
+        {"slot": index + 1, "is_filled": is_filled}
+        for index, (was_filled, is_filled) in enumerate(zip(before, after))
+        if was_filled != is_filled
+    ]
+    if not changed:
+        return
+
+    message = {
+        "type": "slots",
+        "reservation_id": reservation.id,
+        "status": reservation.status.value if reservation.status else None,
+        "slots_filled": reservation.slots_filled or 0,
+        "changed": changed,
+    }
+    _publish(reservation, message)
@@ -0,0 +1,56 @@
+"""
+メンテナンス状態の読み書きユーティリティ
+
+バッチ処理の前回実行時刻（ウォーターマーク）などを maintenance_state テーブルに
+JSONとして保存する。Session と Connection のどちらからでも利用できる。
+"""
+import json
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import func, select, update, insert
+from ..models.maintenance_state import MaintenanceState
+
+_table = MaintenanceState.__table__
+
+
+def load_state(bind, key: str, default: Any = None) -> Any:
+    """
+    状態を取得
+    
+    Args:
+        bind: Session または Connection
+        key: 状態のキー
+        default: 未保存の場合の値
+        
+    Returns:
+        保存されている値（JSONデコード済み）
+    """
+    value: Optional[str] = bind.execute(
+        select(_table.c.value).where(_table.c.key == key)
+    ).scalar()
+    if value is None:
+        return default
+    return json.loads(value)
+
+
+def save_state(bind, key: str, value: Any) -> None:
+    """
+    状態を保存（存在しなければ作成）
+    
+    Args:
+        bind: Session または Connection
+        key: 状態のキー
+        value: JSONにシリアライズ可能な値
+    """
+    payload = json.dumps(value, ensure_ascii=False, default=str)
+    result = bind.execute(update(_table).where(_table.c.key == key).values(value=payload))
+    if result.rowcount == 0:
+        bind.execute(insert(_table).values(key=key, value=payload))
+
+
+def database_now(bind) -> datetime:
+    """DBサーバー側の現在時刻（updated_at と同じ時計、ウォーターマーク用）"""
+    value = bind.execute(select(func.now())).scalar()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value
@@ -0,0 +1,112 @@
+"""
+定期処理のスイープ（期限切れのオファー・募集期限を過ぎた予約）
+
+対象の行をインデックス付きの日時カラムで絞り込み、IDをまとめて取得して
+集合的なUPDATEで更新する。1回のUPDATEは batch_size 件までに抑え、バッチごとにコミットする。
+オファーをキャンセルした予約は、そのバッチの予約だけカウンターとステータス、空き枠を再計算する。
+"""
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import and_, exists, select, update
+from sqlalchemy.engine import Connection
+from ..models.reservation import Reservation, ReservationStatus
+from ..models.reservation_staff import ReservationStaff, AssignmentStatus
+from .open_slots import refresh_open_slots
+from .reservation_status import CONFIRMED_STATUSES, recompute_reservations
+
+
+def _update_in_batches(
+    conn: Connection,
+    table,
+    condition,
+    values: dict,
+    batch_size: int,
+    after_update: Optional[Callable[[List[int]], None]] = None,
+) -> int:
+    """
+    条件に一致する行をIDの昇順に batch_size 件ずつ更新
+
+    after_update を指定した場合は、バッチごとに更新対象のIDを渡してコミット前に呼ぶ。
+
+    Returns:
+        更新した行数
+    """
+    total = 0
+    while True:
+        ids = conn.execute(
+            select(table.c.id).where(condition).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return total
+        # 取得後に他の処理で状態が変わった行を上書きしないよう、条件を付けたまま更新する
+        result = conn.execute(update(table).where(table.c.id.in_(ids), condition).values(**values))
+        if after_update is not None:
+            after_update(ids)
+        conn.commit()
+        total += result.rowcount
+        if len(ids) < batch_size:
+            return total
+
+
+def expire_pending_offers(conn: Connection, now: datetime, batch_size: int) -> int:
+    """
+    有効期限を過ぎたオファー、および募集期限を過ぎた予約へのオファー（PENDING）をキャンセル
+
+    Args:
+        conn: DB接続
+        now: 現在時刻（UTC）
+        batch_size: 1回のUPDATEで更新する最大件数
+
+    Returns:
+        キャンセルしたオファーの件数
+    """
+    table = ReservationStaff.__table__
+    pending = table.c.status == AssignmentStatus.PENDING
+    values = {"status": AssignmentStatus.CANCELLED}
+
+    def recompute(ids: List[int]) -> None:
+        reservation_ids = conn.execute(
+            select(table.c.reservation_id).where(table.c.id.in_(ids)).distinct()
+        ).scalars().all()
+        recompute_reservations(conn, reservation_ids, batch_size=batch_size)
+        refresh_open_slots(conn, reservation_ids)
+
+    expired = _update_in_batches(
+        conn, table, and_(pending, table.c.expires_at <= now), values, batch_size, recompute
+    )
+    past_deadline = _update_in_batches(
+        conn, table,
+        and_(pending, table.c.reservation_id.in_(
+            select(Reservation.id).where(Reservation.application_deadline_at <= now)
+        )),
+        values, batch_size, recompute,
+    )
+    return expired + past_deadline
+
+
+def close_past_deadline_reservations(conn: Connection, now: datetime, batch_size: int) -> int:
+    """
+    募集期限を過ぎても募集中（RECRUITING）のままで、確定したスタッフがいない予約をキャンセル
+
+    Args:
+        conn: DB接続
+        now: 現在時刻（UTC）
+        batch_size: 1回のUPDATEで更新する最大件数
+
+    Returns:
+        キャンセルした予約の件数
+    """
+    table = Reservation.__table__
+    confirmed = exists().where(
+        ReservationStaff.reservation_id == table.c.id,
+        ReservationStaff.status.in_(CONFIRMED_STATUSES),
+    )
+    condition = and_(
+        table.c.status == ReservationStatus.RECRUITING,
+        table.c.application_deadline_at <= now,
+        ~confirmed,
+    )
+    return _update_in_batches(
+        conn, table, condition, {"status": ReservationStatus.CANCELLED}, batch_size,
+        lambda ids: refresh_open_slots(conn, ids),
+    )
@@ -0,0 +1,175 @@
+"""
+差分同期（changes since）のユーティリティ
+
+同期トークンは次の値をJSONにしてbase64エンコードした不透明な文字列:
+
+    t: 取得済みの更新日時（updated_at）
+    i: t と同じ更新日時の行のうち取得済みの最大ID（0の場合は t の行を含めて再取得）
+    d: 取得済みの削除記録（tombstones）の最大ID
+
+最終ページで直近 SYNC_OVERLAP 以内に更新された行がある場合、トークンは
+その時点まで巻き戻して i=0 とし、次回もそれらの行を再取得する。
+updated_at の精度（SQLiteは秒単位）や、コミットが遅れたトランザクションの
+取りこぼしを防ぐためで、クライアントはIDで上書きするため重複しても問題ない。
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, or_, func, literal, select, String
+from sqlalchemy.orm import Session, Query
+from ..models.tombstone import Tombstone
+
+SYNC_OVERLAP = timedelta(seconds=2)
+
+
+class InvalidSyncToken(ValueError):
+    """同期トークンが不正"""
+
+
+class SyncCursor:
+    """同期トークンの内容"""
+
+    def __init__(self, updated_at: Optional[datetime] = None, last_id: int = 0, tombstone_id: int = 0):
+        self.updated_at = updated_at
+        self.last_id = last_id
+        self.tombstone_id = tombstone_id
+
+    def encode(self) -> str:
+        payload = {
+            "t": self.updated_at.isoformat() if self.updated_at else None,
+            "i": self.last_id,
+            "d": self.tombstone_id,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: Optional[str]) -> "SyncCursor":
+        if not token:
+            return cls()
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw)
+            updated_at = datetime.fromisoformat(payload["t"]) if payload.get("t") else None
+            return cls(updated_at, int(payload.get("i", 0)), int(payload.get("d", 0)))
+        except (ValueError, TypeError, KeyError) as e:
+            raise InvalidSyncToken(str(e)) from e
+
+
+def record_tombstone(
+    db: Session,
+    table_name: str,
+    record_id: int,
+    company_id: Optional[int] = None,
+    staff_id: Optional[int] = None,
+) -> None:
+    """
+    削除記録を追加（削除と同じトランザクションでコミットすること）
+
+    Args:
+        db: データベースセッション
+        table_name: 削除したレコードのテーブル名
+        record_id: 削除したレコードのID
+        company_id: 企業ID（企業ユーザーの同期範囲）
+        staff_id: スタッフID（スタッフユーザーの同期範囲）
+    """
+    db.add(Tombstone(table_name=table_name, record_id=record_id, company_id=company_id, staff_id=staff_id))
+
+
+def _timestamp_param(db: Session, value: datetime):
+    """
+    updated_at と比較するパラメータ
+
+    SQLiteでは updated_at が CURRENT_TIMESTAMP の書式（秒単位の文字列）で保存されるため、
+    同じ書式の文字列で比較しないと同一時刻の行が一致しない。
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return literal(value.strftime("%Y-%m-%d %H:%M:%S"), String)
+    return value
+
+
+def fetch_changes(
+    db: Session,
+    query: Query,
+    model,
+    cursor: SyncCursor,
+    limit: int,
+) -> Tuple[List[Any], bool, SyncCursor]:
+    """
+    トークン以降に作成・更新された行を (updated_at, id) 順に取得
+
+    Args:
+        db: データベースセッション
+        query: 同期範囲で絞り込んだクエリ
+        model: 対象モデル（updated_at と id を持つ）
+        cursor: 前回の同期トークン
+        limit: 最大件数
+
+    Returns:
+        (変更された行, 続きがあるか, 変更分を反映した次のカーソル)
+    """
+    if cursor.updated_at is not None:
+        since = _timestamp_param(db, cursor.updated_at)
+        query = query.filter(or_(
+            model.updated_at > since,
+            and_(model.updated_at == since, model.id > cursor.last_id),
+        ))
+    rows = query.order_by(model.updated_at, model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = SyncCursor(cursor.updated_at, cursor.last_id, cursor.tombstone_id)
+    if has_more:
+        next_cursor.updated_at = rows[-1].updated_at
+        next_cursor.last_id = rows[-1].id
+    elif rows or cursor.updated_at is None:
+        # 最終ページ: 直近（SYNC_OVERLAP以内）に更新された行は次回も再取得する
+        now = db.execute(select(func.now())).scalar()
+        if isinstance(now, str):
+            now = datetime.fromisoformat(now)
+        horizon = now - SYNC_OVERLAP
+        if rows and _naive(rows[-1].updated_at) <= _naive(horizon):
+            next_cursor.updated_at = rows[-1].updated_at
+            next_cursor.last_id = rows[-1].id
+        else:
+            next_cursor.updated_at = horizon
+            next_cursor.last_id = 0
+    return rows, has_more, next_cursor
+
+
+def fetch_tombstones(
+    db: Session,
+    table_name: str,
+    cursor: SyncCursor,
+    limit: int,
+    company_id: Optional[int] = None,
+    staff_id: Optional[int] = None,
+) -> Tuple[List[int], bool, int]:
+    """
+    トークン以降の削除記録を取得
+
+    初回同期（トークンなし）の場合は削除記録を返さず、現在の最大IDだけを返す。
+
+    Returns:
+        (削除されたレコードのID, 続きがあるか, 取得済みの最大の削除記録ID)
+    """
+    query = db.query(Tombstone.id, Tombstone.record_id).filter(Tombstone.table_name == table_name)
+    if cursor.updated_at is None and cursor.tombstone_id == 0:
+        latest = db.query(func.max(Tombstone.id)).filter(Tombstone.table_name == table_name).scalar()
+        return [], False, latest or 0
+
+    if company_id is not None:
+        query = query.filter(Tombstone.company_id == company_id)
+    if staff_id is not None:
+        query = query.filter(Tombstone.staff_id == staff_id)
+    rows = query.filter(Tombstone.id > cursor.tombstone_id).order_by(Tombstone.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last_id = rows[-1].id if rows else cursor.tombstone_id
+    return [row.record_id for row in rows], has_more, last_id
+
+
+def _naive(value: datetime) -> datetime:
+    """タイムゾーンの有無が混在しても比較できるようにする"""
+    return value.replace(tzinfo=None) if value.tzinfo else value
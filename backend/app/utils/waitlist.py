@@ -0,0 +1,130 @@
+"""
+予約のキャンセル待ち
+
+枠が空いたとき（社員の割り当て解除）に、同じトランザクションの中で待機中の先頭を
+その枠に繰り上げ、予約の名簿（reservation_employees）にも追加する。先頭の行は SELECT ... FOR UPDATE でロックするため、
+同時に空いた枠に同じ社員が二重に繰り上がることはない（SQLiteではDB全体の書き込みロックで直列化される）。
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..core.realtime import broker, company_channel
+from ..models.reservation import Reservation
+from ..models.reservation_waitlist import ReservationWaitlist, WaitlistStatus
+from .roster import resolve_employee, is_registered, add_to_roster
+
+
+def next_in_line(db: Session, reservation_id: int, slot_number: int) -> Optional[ReservationWaitlist]:
+    """
+    枠に繰り上げる待機中の先頭（希望枠がないか、その枠を希望している最も古い登録）
+
+    Args:
+        db: データベースセッション
+        reservation_id: 予約ID
+        slot_number: 空いた枠番号（1始まり）
+
+    Returns:
+        繰り上げる登録（いなければNone）
+    """
+    return db.query(ReservationWaitlist).filter(
+        ReservationWaitlist.reservation_id == reservation_id,
+        ReservationWaitlist.status == WaitlistStatus.WAITING,
+        or_(ReservationWaitlist.preferred_slot.is_(None), ReservationWaitlist.preferred_slot == slot_number),
+    ).order_by(ReservationWaitlist.id).with_for_update().first()
+
+
+def promote_next(
+    db: Session, reservation: Reservation, slots: List[dict], slot_number: int
+) -> Optional[ReservationWaitlist]:
+    """
+    空いた枠に待機中の先頭を割り当てる（コミットは呼び出し側で行う）
+
+    待機中に別の方法で予約に登録済みになった社員は取り消して次の登録を繰り上げる。
+
+    Args:
+        db: データベースセッション
+        reservation: 予約
+        slots: 更新中の time_slots（空いた枠の内容をこの中で書き換える）
+        slot_number: 空いた枠番号（1始まり）
+
+    Returns:
+        繰り上げた登録（いなければNone）
+    """
+    while True:
+        entry = next_in_line(db, reservation.id, slot_number)
+        if entry is None:
+            return None
+        try:
+            employee = resolve_employee(
+                db, reservation.company_id, entry.employee_name, department=entry.department,
+                position=entry.position, phone=entry.phone, email=entry.email, employee_id=entry.employee_id,
+            )
+        except ValueError:
+            employee = None
+        if employee is not None and not is_registered(db, reservation.id, employee.id):
+            break
+        entry.status = WaitlistStatus.CANCELLED
+
+    slot = slots[slot_number - 1]
+    slot['employee_id'] = employee.id
+    slot['employee_name'] = entry.employee_name
+    slot['employee_department'] = entry.department
+    if entry.position:
+        slot['employee_position'] = entry.position
+    slot['is_filled'] = True
+
+    add_to_roster(
+        db, reservation, employee, slot_number,
+        department=entry.department, position=entry.position, notes=entry.notes,
+    )
+
+    entry.employee_id = employee.id
+    entry.status = WaitlistStatus.PROMOTED
+    entry.promoted_slot = slot_number
+    entry.promoted_at = datetime.now(timezone.utc)
+    return entry
+
+
+def waiting_count(db: Session, reservation_id: int, before_id: Optional[int] = None) -> int:
+    """
+    待機中の件数（before_id を指定した場合はそれより前に並んでいる件数）
+    """
+    query = db.query(func.count(ReservationWaitlist.id)).filter(
+        ReservationWaitlist.reservation_id == reservation_id,
+        ReservationWaitlist.status == WaitlistStatus.WAITING,
+    )
+    if before_id is not None:
+        query = query.filter(ReservationWaitlist.id < before_id)
+    return query.scalar() or 0
+
+
+def remove_waitlist(db: Session, reservation_ids: List[int]) -> None:
+    """予約のキャンセル待ちを削除（予約を削除する前に呼ぶ）"""
+    if reservation_ids:
+        db.query(ReservationWaitlist).filter(
+            ReservationWaitlist.reservation_id.in_(reservation_ids)
+        ).delete(synchronize_session=False)
+
+
+def publish_promotion(reservation: Reservation, entry: ReservationWaitlist) -> None:
+    """繰り上げを企業チャネルに配信する（コミット後に呼ぶ）"""
+    broker.publish(company_channel(reservation.company_id), {
+        "type": "waitlist_promoted",
+        "reservation_id": reservation.id,
+        "waitlist_id": entry.id,
+        "slot": entry.promoted_slot,
+    })
+
+
+def promotion_email_data(reservation: Reservation, entry: ReservationWaitlist, slot: dict) -> dict:
+    """繰り上げ通知メールの内容"""
+    return {
+        "employee_name": entry.employee_name,
+        "reservation_id": reservation.id,
+        "reservation_date": reservation.reservation_date,
+        "slot_number": entry.promoted_slot,
+        "start_time": slot.get("start_time"),
+        "end_time": slot.get("end_time"),
+        "office_address": reservation.office_address,
+    }
@@ -0,0 +1,156 @@
+"""
+バックグラウンドジョブのワーカー
+
+jobs テーブルの実行待ちのジョブを取得し、スレッドプールで実行する（core/jobs.py）。
+APIサーバーとは別のプロセスとして、必要な数だけ起動する。
+SIGTERM / SIGINT を受けると新しいジョブの取得をやめ、実行中のジョブの完了を待って終了する。
+
+Usage:
+    python -m app.worker
+    python -m app.worker --concurrency 8 --types email.staff_assigned,email.waitlist_promoted
+    python -m app.worker --once  # 実行できるジョブがなくなったら終了
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List
+from sqlalchemy.engine import Engine
+from .config import settings
+from .core.jobs import JOB_TYPES, claim_job, heartbeat, requeue_stale_jobs, run_job
+from .core.logger import setup_logging, shutdown_logging
+from .database import engine
+
+# python -m で実行すると __name__ が __main__ になるため、アプリのロガーの配下の名前を指定する
+logger = logging.getLogger("app.worker")
+
+# 停止したワーカーのジョブを確認する間隔（秒）
+REQUEUE_INTERVAL_SECONDS = 60.0
+
+
+class Worker:
+    """ジョブを取得して実行するワーカー"""
+
+    def __init__(self, bind: Engine, job_types: List[str], concurrency: int, poll_interval: float):
+        self.bind = bind
+        self.job_types = job_types
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._last_heartbeat = time.monotonic()
+
+    def stop(self, *_) -> None:
+        """新しいジョブの取得をやめる（シグナルハンドラーから呼ぶ）"""
+        self._stop.set()
+
+    def run(self, once: bool = False) -> int:
+        """
+        停止するまでジョブを取得して実行
+
+        Args:
+            once: Trueの場合、実行できるジョブがなくなった時点で終了する
+
+        Returns:
+            実行したジョブ数
+        """
+        processed = 0
+        last_requeue = 0.0
+        running = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as executor:
+            while not self._stop.is_set():
+                self._heartbeat(running)
+                try:
+                    if time.monotonic() - last_requeue >= REQUEUE_INTERVAL_SECONDS:
+                        requeue_stale_jobs(self.bind, settings.JOB_LOCK_TIMEOUT_SECONDS)
+                        last_requeue = time.monotonic()
+                    while len(running) < self.concurrency and not self._stop.is_set():
+                        job = claim_job(self.bind, self.worker_id, self.job_types)
+                        if job is None:
+                            break
+                        running.add(executor.submit(run_job, self.bind, job, self.worker_id))
+                except Exception:
+                    logger.exception("ジョブの取得に失敗しました")
+
+                if once and not running:
+                    break
+                if running:
+                    done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    processed += self._collect(done)
+                else:
+                    self._stop.wait(self.poll_interval)
+
+            # 実行中のジョブは最後まで実行する（その間も生存確認を続ける）
+            while running:
+                done, running = wait(running, timeout=self.poll_interval)
+                processed += self._collect(done)
+                self._heartbeat(running)
+        return processed
+
+    def _heartbeat(self, running) -> None:
+        """実行中のジョブがあれば、JOB_HEARTBEAT_INTERVAL_SECONDS ごとに locked_at を更新する"""
+        if not running:
+            return
+        if time.monotonic() - self._last_heartbeat < settings.JOB_HEARTBEAT_INTERVAL_SECONDS:
+            return
+        try:
+            heartbeat(self.bind, self.worker_id)
+            self._last_heartbeat = time.monotonic()
+        except Exception:
+            logger.exception("実行中のジョブの生存確認に失敗しました")
+
+    @staticmethod
+    def _collect(done) -> int:
+        for future in done:
+            if future.exception() is not None:
+                logger.error("ジョブの結果を記録できませんでした", exc_info=future.exception())
+        return len(done)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="バックグラウンドジョブを実行します")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+        help="このプロセスで同時に実行するジョブ数",
+    )
+    parser.add_argument("--types", help="実行するジョブの種類（カンマ区切り、省略時は全種類）")
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL_SECONDS,
+        help="実行できるジョブがないときの確認間隔（秒）",
+    )
+    parser.add_argument("--once", action="store_true", help="実行できるジョブがなくなったら終了する")
+    args = parser.parse_args()
+
+    args.types = [name.strip() for name in args.types.split(",") if name.strip()] if args.types else list(JOB_TYPES)
+    unknown = [name for name in args.types if name not in JOB_TYPES]
+    if unknown:
+        parser.error(f"未登録のジョブの種類です: {', '.join(unknown)}（登録済み: {', '.join(JOB_TYPES)}）")
+    if args.concurrency < 1:
+        parser.error("--concurrency は1以上を指定してください")
+    return args
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    worker = Worker(engine, args.types, args.concurrency, args.poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    logger.info("ジョブワーカーが起動しました", extra={
+        "worker_id": worker.worker_id, "job_types": args.types, "concurrency": args.concurrency,
+    })
+    try:
+        processed = worker.run(once=args.once)
+        logger.info("ジョブワーカーが終了しました", extra={"worker_id": worker.worker_id, "processed": processed})
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+APIの負荷試験（ベンチマーク）スクリプト
+
+generate_load_data.py で投入したデータに対して、実際の画面で使われる
+エンドポイントを重み付きで混ぜて並行実行し、エンドポイントごとの
+スループットとレイテンシのパーセンタイルを表示します。
+
+対象エンドポイント（括弧内はデフォルトの重み）:
+    staff_my_assignments   GET  /assignments/my                       (30)
+    company_reservations   GET  /reservations?company_id=...          (25)
+    rating_summary         GET  /staff/{id}/rating-summary            (20)
+    booking                POST /reservations/{id}/employees          (15)
+    check_in_out           POST /attendance/check-in → check-out      (10)
+
+Usage:
+    # 別ターミナルでAPIサーバーを起動しておく
+    python benchmark_api.py --base-url http://localhost:8000 --duration 60 --concurrency 32
+    python benchmark_api.py --mix staff_my_assignments=50,booking=50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+import httpx
+
+
+DEFAULT_MIX = {
+    "staff_my_assignments": 30,
+    "company_reservations": 25,
+    "rating_summary": 20,
+    "booking": 15,
+    "check_in_out": 10,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="APIの負荷試験を実行します")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="APIサーバーのURL")
+    parser.add_argument("--duration", type=float, default=30.0, help="計測時間（秒）")
+    parser.add_argument("--concurrency", type=int, default=16, help="同時実行数")
+    parser.add_argument("--users", type=int, default=20, help="ログインする企業・スタッフの人数（それぞれ）")
+    parser.add_argument("--prefix", default="load", help="generate_load_data.py で指定した接頭辞")
+    parser.add_argument("--password", default="password123", help="共通パスワード")
+    parser.add_argument("--mix", default=None, help="重みの指定（例: booking=50,rating_summary=50）")
+    parser.add_argument("--seed", type=int, default=1, help="乱数シード")
+    return parser.parse_args()
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"不明なエンドポイント名です: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+class Stats:
+    """エンドポイントごとのレイテンシとステータスコードを集計"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, started: float, response: Optional[httpx.Response]):
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        if response is None:
+            self.errors[name] += 1
+        else:
+            self.statuses[name][response.status_code] += 1
+
+    def report(self, elapsed: float):
+        header = f"{'endpoint':<22} {'req':>7} {'rps':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}  status"
+        print(header)
+        print("-" * len(header))
+        total = 0
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            total += len(values)
+            quantiles = statistics.quantiles(values, n=100, method="inclusive") if len(values) >= 2 else values * 99
+            statuses = ", ".join(f"{code}:{count}" for code, count in sorted(self.statuses[name].items()))
+            if self.errors[name]:
+                statuses += f", error:{self.errors[name]}"
+            print(f"{name:<22} {len(values):>7} {len(values) / elapsed:>8.1f} "
+                  f"{quantiles[49]:>8.1f} {quantiles[89]:>8.1f} {quantiles[94]:>8.1f} "
+                  f"{quantiles[98]:>8.1f} {values[-1]:>8.1f}  {statuses}")
+        print("-" * len(header))
+        print(f"{'total':<22} {total:>7} {total / elapsed:>8.1f}   (レイテンシはミリ秒)")
+
+
+class Session:
+    """ログイン済みユーザーとベンチマークに必要なID"""
+
+    def __init__(self, token: str):
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.staff_id: Optional[int] = None
+        self.company_id: Optional[int] = None
+        self.reservation_ids: List[int] = []
+        self.confirmed: List[dict] = []
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> Optional[Session]:
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    if response.status_code != 200:
+        return None
+    return Session(response.json()["access_token"])
+
+
+async def prepare(client: httpx.AsyncClient, args) -> Dict[str, List[Session]]:
+    """企業・スタッフユーザーでログインし、操作対象のIDを取得する"""
+    sessions: Dict[str, List[Session]] = {"company": [], "staff": []}
+
+    for n in range(1, args.users + 1):
+        session = await login(client, f"{args.prefix}-staff{n}@example.com", args.password)
+        if session is None:
+            continue
+        response = await client.get("/api/v1/assignments/my", headers=session.headers)
+        assignments = response.json() if response.status_code == 200 else []
+        if assignments:
+            session.staff_id = assignments[0]["staff_id"]
+        session.confirmed = [a for a in assignments if a["status"] == "confirmed"]
+        sessions["staff"].append(session)
+
+    for n in range(1, args.users + 1):
+        session = await login(client, f"{args.prefix}-company{n}@example.com", args.password)
+        if session is None:
+            continue
+        response = await client.get("/api/v1/auth/me", headers=session.headers)
+        if response.status_code == 200:
+            session.company_id = response.json().get("company_id")
+        if session.company_id:
+            response = await client.get(
+                "/api/v1/reservations", params={"company_id": session.company_id, "status": "recruiting"},
+                headers=session.headers,
+            )
+            if response.status_code == 200:
+                session.reservation_ids = [r["id"] for r in response.json()]
+        sessions["company"].append(session)
+
+    if not sessions["staff"] or not sessions["company"]:
+        raise SystemExit("ログインできるユーザーがいません。generate_load_data.py を先に実行してください")
+    return sessions
+
+
+async def run_staff_my_assignments(client, sessions, rng, stats):
+    session = rng.choice(sessions["staff"])
+    started = time.perf_counter()
+    response = await client.get("/api/v1/assignments/my", headers=session.headers)
+    stats.record("staff_my_assignments", started, response)
+
+
+async def run_company_reservations(client, sessions, rng, stats):
+    session = rng.choice(sessions["company"])
+    started = time.perf_counter()
+    response = await client.get(
+        "/api/v1/reservations", params={"company_id": session.company_id}, headers=session.headers
+    )
+    stats.record("company_reservations", started, response)
+
+
+async def run_rating_summary(client, sessions, rng, stats):
+    session = rng.choice([s for s in sessions["staff"] if s.staff_id] or sessions["staff"])
+    started = time.perf_counter()
+    response = await client.get(f"/api/v1/staff/{session.staff_id or 1}/rating-summary", headers=session.headers)
+    stats.record("rating_summary", started, response)
+
+
+async def run_booking(client, sessions, rng, stats):
+    candidates = [s for s in sessions["company"] if s.reservation_ids]
+    if not candidates:
+        return
+    session = rng.choice(candidates)
+    reservation_id = rng.choice(session.reservation_ids)
+    payload = {
+        "employee_name": f"負荷試験社員{rng.randrange(10 ** 9)}",
+        "department": "負荷試験部",
+        "slot_number": rng.randint(1, 10),
+    }
+    started = time.perf_counter()
+    response = await client.post(
+        f"/api/v1/reservations/{reservation_id}/employees", json=payload, headers=session.headers
+    )
+    stats.record("booking", started, response)
+
+
+async def run_check_in_out(client, sessions, rng, stats):
+    candidates = [s for s in sessions["staff"] if s.confirmed]
+    if not candidates:
+        return
+    session = rng.choice(candidates)
+    assignment = rng.choice(session.confirmed)
+    started = time.perf_counter()
+    response = await client.post("/api/v1/attendance/check-in", json={
+        "assignment_id": assignment["id"], "reservation_id": assignment["reservation_id"],
+    }, headers=session.headers)
+    if response.status_code == 200:
+        response = await client.post("/api/v1/attendance/check-out", json={
+            "attendance_id": response.json()["id"],
+        }, headers=session.headers)
+    stats.record("check_in_out", started, response)
+
+
+SCENARIOS = {
+    "staff_my_assignments": run_staff_my_assignments,
+    "company_reservations": run_company_reservations,
+    "rating_summary": run_rating_summary,
+    "booking": run_booking,
+    "check_in_out": run_check_in_out,
+}
+
+
+async def worker(client, sessions, mix, deadline, seed, stats):
+    rng = random.Random(seed)
+    names = list(mix.keys())
+    weights = list(mix.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            await SCENARIOS[name](client, sessions, rng, stats)
+        except httpx.HTTPError:
+            stats.record(name, started, None)
+
+
+async def main(args):
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        print("🔑 ログインと対象データの取得中...")
+        sessions = await prepare(client, args)
+        print(f"  企業 {len(sessions['company'])}名 / スタッフ {len(sessions['staff'])}名")
+        print(f"🚀 {args.duration:.0f}秒間、同時実行数 {args.concurrency} で計測します...")
+
+        stats = Stats()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            worker(client, sessions, mix, deadline, args.seed + i, stats) for i in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    print()
+    stats.report(elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
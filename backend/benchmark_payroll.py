@@ -0,0 +1,92 @@
+"""
+月次の給与計算のベンチマーク
+
+generate_load_data.py で投入したデータを読み込み、対象月の全スタッフの給与について
+次の2つの方式の実行時間（DBの読み込みを含む）を比較し、基本給の合計が一致することを確認します。
+
+    per_staff   スタッフごとに /staff/{id}/earnings と同じ計算（calculate_staff_earnings）を呼ぶ
+    columnar    utils/payroll.py の calculate_payroll（1回のクエリ + NumPy の集計）
+
+Usage:
+    python benchmark_payroll.py
+    python benchmark_payroll.py --year 2025 --month 10 --repeat 10
+"""
+import argparse
+import time
+from typing import Callable, Dict
+from app.api.v1.staff import calculate_staff_earnings
+from app.database import SessionLocal
+from app.models.staff import Staff as StaffModel
+from app.utils.date_utils import local_today
+from app.utils.payroll import calculate_payroll
+
+
+def parse_args():
+    today = local_today()
+    parser = argparse.ArgumentParser(description="月次の給与計算の実行時間を比較します")
+    parser.add_argument("--year", type=int, default=today.year, help="対象年")
+    parser.add_argument("--month", type=int, default=today.month, help="対象月")
+    parser.add_argument("--repeat", type=int, default=5, help="1つの方式あたりの計測回数")
+    return parser.parse_args()
+
+
+def per_staff(db, year: int, month: int) -> Dict[int, int]:
+    """スタッフごとに給与を計算（変更前の経路）"""
+    return {
+        staff.id: calculate_staff_earnings(db, staff, month, year).total_earnings
+        for staff in db.query(StaffModel).all()
+    }
+
+
+def columnar(db, year: int, month: int) -> Dict[int, int]:
+    """全スタッフの給与明細を一括で計算"""
+    return {payslip.staff_id: payslip.base_pay for payslip in calculate_payroll(db, year, month)}
+
+
+def measure(func: Callable, year: int, month: int, repeat: int):
+    """1回あたりの実行時間（ミリ秒、最小値と中央値）と結果"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        # セッションの識別マップに前回の読み込みが残らないよう毎回新しいセッションを使う
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            result = func(db, year, month)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    timings.sort()
+    return timings[0], timings[len(timings) // 2], result
+
+
+def main():
+    args = parse_args()
+    print(f"📊 {args.year}年{args.month}月の全スタッフの給与計算（{args.repeat}回計測、ミリ秒）\n")
+    header = f"{'method':<12} {'staff':>6} {'min':>10} {'median':>10} {'total_pay':>14} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    baseline = None
+    for label, func in (("per_staff", per_staff), ("columnar", columnar)):
+        fastest, median, result = measure(func, args.year, args.month, args.repeat)
+        baseline = baseline or median
+        results[label] = result
+        print(
+            f"{label:<12} {len(result):>6} {fastest:>10.1f} {median:>10.1f} {sum(result.values()):>14,} "
+            f"{baseline / median:>7.1f}x"
+        )
+
+    mismatched = [
+        staff_id for staff_id, amount in results["per_staff"].items()
+        if results["columnar"].get(staff_id) != amount
+    ]
+    if mismatched:
+        print(f"\n❌ 基本給が一致しないスタッフ: {len(mismatched)} 人（例: {mismatched[:10]}）")
+    else:
+        print("\n✅ 全スタッフの基本給が一致しました")
+
+
+if __name__ == "__main__":
+    main()
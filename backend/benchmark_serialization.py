@@ -0,0 +1,120 @@
+"""
+一覧レスポンスのシリアライズのベンチマーク
+
+generate_load_data.py で投入したデータを読み込み、件数の多い一覧について
+1レスポンスあたりのシリアライズのCPU時間を比較します（DBの読み込み時間は含みません）。
+
+    response_model   FastAPI の response_model による検証 → jsonable_encoder → JSONResponse（変更前）
+    + orjson         同じ処理で、レンダリングだけ ORJSONResponse（既定のレスポンスクラス）
+    type_adapter     core/responses.py の model_response（TypeAdapter で1回だけ変換）
+
+Usage:
+    python benchmark_serialization.py
+    python benchmark_serialization.py --rows 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable, List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.database import SessionLocal
+from app.models.company import Company as CompanyModel
+from app.models.reservation import Reservation as ReservationModel
+from app.models.staff import Staff as StaffModel
+from app.schemas.company import Company
+from app.schemas.reservation import Reservation
+from app.schemas.staff import Staff
+from app.core.responses import model_response
+
+
+ENDPOINTS = {
+    # 名前: (モデル, レスポンススキーマ, by_alias)
+    "reservations": (ReservationModel, Reservation, True),
+    "companies": (CompanyModel, Company, False),
+    "staff": (StaffModel, Staff, True),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="一覧レスポンスのシリアライズのCPU時間を比較します")
+    parser.add_argument("--rows", type=int, default=500, help="1レスポンスの件数（一覧の limit）")
+    parser.add_argument("--repeat", type=int, default=20, help="1つの方式あたりの計測回数")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="対象（カンマ区切り）")
+    return parser.parse_args()
+
+
+def response_model_path(schema, by_alias: bool, response_class) -> Callable[[list], bytes]:
+    """変更前の経路（FastAPI がエンドポイントの戻り値に対して行う処理）"""
+    field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+    loop = asyncio.new_event_loop()
+
+    def render(rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows, by_alias=by_alias))
+        return response_class(content).body
+
+    return render
+
+
+def type_adapter_path(schema, by_alias: bool) -> Callable[[list], bytes]:
+    """core/responses.py の経路"""
+    def render(rows):
+        return model_response(List[schema], rows, by_alias=by_alias).body
+
+    return render
+
+
+def measure(render: Callable[[list], bytes], rows: list, repeat: int):
+    """1レスポンスあたりのCPU時間（ミリ秒、最小値と中央値）とレスポンスサイズ"""
+    size = len(render(rows))  # 初回（スキーマの構築など）は計測しない
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        render(rows)
+        timings.append((time.process_time() - started) * 1000)
+    timings.sort()
+    return timings[0], timings[len(timings) // 2], size
+
+
+def main():
+    args = parse_args()
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"不明な対象です: {', '.join(unknown)}")
+
+    print(f"📊 1レスポンスあたりのCPU時間（{args.repeat}回計測、ミリ秒）\n")
+    header = f"{'endpoint':<14} {'rows':>6} {'method':<16} {'min':>9} {'median':>9} {'bytes':>10} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+
+    db = SessionLocal()
+    try:
+        for name in names:
+            model, schema, by_alias = ENDPOINTS[name]
+            # 一覧と同じく関連（予約の名簿など）まで読み込んでからシリアライズだけを計測する
+            rows = db.query(model).order_by(model.id).limit(args.rows).all()
+            if not rows:
+                print(f"{name:<14} {'-':>6} データがありません（generate_load_data.py で投入してください）")
+                continue
+            methods = [
+                ("response_model", response_model_path(schema, by_alias, JSONResponse)),
+                ("+ orjson", response_model_path(schema, by_alias, ORJSONResponse)),
+                ("type_adapter", type_adapter_path(schema, by_alias)),
+            ]
+            baseline = None
+            for label, render in methods:
+                fastest, median, size = measure(render, rows, args.repeat)
+                baseline = baseline or median
+                print(
+                    f"{name:<14} {len(rows):>6} {label:<16} {fastest:>9.2f} {median:>9.2f} {size:>10,} "
+                    f"{baseline / median:>7.1f}x"
+                )
+            print()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ from backend.app.models.reservation_staff import ReservationStaff, AssignmentSta
 from backend.app.models.staff import Staff as StaffModel
 from backend.app.models.company import Company as CompanyModel
 from backend.app.models.employee import Employee as EmployeeModel
+from backend.app.models.reservation_employee import ReservationEmployee
 
 def create_test004_data():
     db = SessionLocal()
@@ -110,7 +111,10 @@ def create_test004_data():
                 end_time="12:45",
                 application_deadline=today,
                 max_participants=2,
-                employee_names=f"{employee1.name if employee1 else '未設定'},{employee2.name if employee2 else '未設定'}",
+                roster=[
+                    ReservationEmployee(employee=employee, slot_number=slot_number)
+                    for slot_number, employee in ((1, employee1), (2, employee2)) if employee
+                ],
                 total_duration=225,  # 3時間45分
                 service_duration=60,
                 break_duration=15,
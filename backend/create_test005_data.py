@@ -12,6 +12,7 @@ from app.models.reservation_staff import ReservationStaff, AssignmentStatus
 from app.models.staff import Staff as StaffModel
 from app.models.company import Company as CompanyModel
 from app.models.employee import Employee as EmployeeModel
+from app.models.reservation_employee import ReservationEmployee
 
 def create_test005_data():
     db = SessionLocal()
@@ -94,7 +95,10 @@ def create_test005_data():
                 status=ReservationStatus.RECRUITING,
                 notes="",
                 requirements="1月分のテスト005用予約です（スタッフ側動作確認用）",
-                employee_names=f"{employee1.name},{employee2.name}"
+                roster=[
+                    ReservationEmployee(employee=employee1, slot_number=1),
+                    ReservationEmployee(employee=employee2, slot_number=2),
+                ]
             )
             db.add(reservation)
             db.commit()
@@ -12,6 +12,7 @@ from app.models.reservation_staff import ReservationStaff, AssignmentStatus
 from app.models.staff import Staff as StaffModel
 from app.models.company import Company as CompanyModel
 from app.models.employee import Employee as EmployeeModel
+from app.models.reservation_employee import ReservationEmployee
 
 def create_test006_007_data():
     db = SessionLocal()
@@ -94,7 +95,7 @@ def create_test006_007_data():
                 status=ReservationStatus.RECRUITING,
                 notes="",
                 requirements="テスト006用予約（受託テスト用）",
-                employee_names=f"{employee1.name}"
+                roster=[ReservationEmployee(employee=employee1)]
             )
             db.add(reservation_006)
             db.commit()
@@ -175,7 +176,7 @@ def create_test006_007_data():
                 status=ReservationStatus.RECRUITING,
                 notes="",
                 requirements="テスト007用予約（辞退テスト用）",
-                employee_names=f"{employee2.name}"
+                roster=[ReservationEmployee(employee=employee2)]
             )
             db.add(reservation_007)
             db.commit()
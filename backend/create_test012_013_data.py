@@ -18,6 +18,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models.reservation import Reservation, ReservationStatus
 from app.models.company import Company
+from app.models.reservation_employee import ReservationEmployee
+from app.utils.roster import resolve_employee
 from datetime import datetime, timedelta
 import json
 
@@ -116,7 +118,9 @@ def create_test_reservations():
             start_time="12:00",
             end_time="14:00",
             max_participants=3,  # 募集人数3名
-            employee_names="田中太郎",  # 既に1名登録済み
+            roster=[ReservationEmployee(  # 既に1名登録済み
+                employee=resolve_employee(db, company.id, "田中太郎", department="営業部"), slot_number=1,
+            )],
             staff_names=None,
             status=ReservationStatus.RECRUITING,
             notes="テスト012用予約（時間枠テスト）",
@@ -167,7 +171,9 @@ def create_test_reservations():
             start_time="12:00",
             end_time="14:00",
             max_participants=3,  # 募集人数3名
-            employee_names="佐藤花子",  # 既に1名登録済み
+            roster=[ReservationEmployee(  # 既に1名登録済み
+                employee=resolve_employee(db, company.id, "佐藤花子", department="総務部"), slot_number=1,
+            )],
             staff_names=None,
             status=ReservationStatus.RECRUITING,
             notes="テスト013用予約（時間枠テスト）",
@@ -0,0 +1,363 @@
+"""
+負荷試験用の大量データ生成スクリプト
+
+企業・社員・スタッフ・予約（時間枠付き）・アサイン・勤怠・評価を
+パラメータ指定で一括投入します。ORMオブジェクトを1件ずつ作るのではなく、
+SQLAlchemy Core の executemany でバッチ単位に INSERT するため、
+100万行以上でも数分で投入できます。
+
+ログイン用のパスワードは全ユーザー共通で、bcryptのハッシュ計算は1回だけ行います。
+
+Usage:
+    python generate_load_data.py
+    python generate_load_data.py --companies 200 --employees-per-company 50 \\
+        --staff 500 --months 12 --reservations-per-month 20
+
+生成されるログインアカウント:
+    管理者:   {prefix}-admin@example.com
+    企業:     {prefix}-company{N}@example.com
+    スタッフ: {prefix}-staff{N}@example.com
+"""
+import argparse
+import copy
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List
+from sqlalchemy import func, select, text
+from app.database import engine, Base
+from app.models import (
+    User, Company, Staff, Employee, Reservation, Attendance, Rating, ReservationStaff, ReservationEmployee,
+)
+from app.models.user import UserRole
+from app.models.reservation import ReservationStatus
+from app.models.reservation_staff import AssignmentStatus
+from app.models.attendance import AttendanceStatus
+from app.core.security import get_password_hash
+from app.utils.open_slots import rebuild_open_slots
+from app.utils.reservation_status import recompute_reservations
+from app.utils.time_slot_calculator import calculate_time_slots, calculate_total_minutes
+
+
+LAST_NAMES = ["佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤",
+              "吉田", "山田", "佐々木", "山口", "松本", "井上", "木村", "林", "斎藤", "清水"]
+FIRST_NAMES = ["太郎", "花子", "一郎", "美咲", "健太", "愛", "翔太", "陽子", "大輔", "由美",
+               "拓也", "彩", "直樹", "真由美", "亮", "恵", "誠", "さくら", "悠人", "結衣"]
+DEPARTMENTS = ["営業部", "総務部", "経理部", "開発部", "人事部", "製造部", "企画部", "広報部"]
+POSITIONS = [None, "主任", "係長", "課長", "部長"]
+INDUSTRIES = ["建設業", "製造業", "IT", "小売業", "金融業", "医療・福祉", "運輸業"]
+AREAS = [
+    ("大阪府", "大阪市北区梅田"), ("大阪府", "大阪市中央区本町"), ("大阪府", "堺市堺区"),
+    ("兵庫県", "神戸市中央区"), ("京都府", "京都市下京区"), ("東京都", "千代田区丸の内"),
+    ("東京都", "港区芝浦"), ("神奈川県", "横浜市西区"), ("愛知県", "名古屋市中村区"),
+]
+REPORT_TEXTS = [
+    "肩こりが強く、首回りを中心に施術しました。",
+    "腰の張りを訴えていたため、腰部を重点的にほぐしました。",
+    "眼精疲労があるとのことで、頭部と首を中心に施術しました。",
+    "全身の疲労感が強いため、全身をバランスよく施術しました。",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="負荷試験用の大量データを生成します")
+    parser.add_argument("--companies", type=int, default=100, help="企業数")
+    parser.add_argument("--employees-per-company", type=int, default=40, help="企業あたりの社員数")
+    parser.add_argument("--staff", type=int, default=300, help="スタッフ数")
+    parser.add_argument("--months", type=int, default=12, help="予約を生成する月数（開始月から）")
+    parser.add_argument("--start-month", type=str, default=None,
+                        help="予約の開始月（YYYY-MM、省略時は今日から months/2 ヶ月前）")
+    parser.add_argument("--reservations-per-month", type=int, default=20, help="企業・月あたりの予約数")
+    parser.add_argument("--fill-rate", type=float, default=0.8, help="社員が予約枠を埋める割合")
+    parser.add_argument("--rating-rate", type=float, default=0.7, help="完了したアサインに評価が付く割合")
+    parser.add_argument("--batch-size", type=int, default=5000, help="1回のINSERTに含める行数")
+    parser.add_argument("--prefix", type=str, default="load", help="生成するメールアドレスの接頭辞")
+    parser.add_argument("--password", type=str, default="password123", help="全ユーザー共通のパスワード")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    return parser.parse_args()
+
+
+class BulkWriter:
+    """
+    テーブルごとに行をバッファし、batch_size件ごとにexecutemanyでINSERTする
+
+    外部キー制約（PostgreSQL）に違反しないよう、書き出しは常に
+    テーブルの依存順（親テーブルが先）でまとめて行う。
+    """
+
+    def __init__(self, conn, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.buffers: Dict[str, List[dict]] = {}
+        self.counts: Dict[str, int] = {}
+        self.order = [table.name for table in Base.metadata.sorted_tables]
+        self.tables = {table.name: table for table in Base.metadata.sorted_tables}
+
+    def add(self, model, row: dict):
+        buffer = self.buffers.setdefault(model.__tablename__, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for name in self.order:
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            self.conn.execute(self.tables[name].insert(), rows)
+            self.counts[name] = self.counts.get(name, 0) + len(rows)
+            self.buffers[name] = []
+
+    def reset_sequences(self):
+        """IDを明示して投入したため、PostgreSQLのシーケンスを最大IDに合わせる"""
+        if self.conn.dialect.name != "postgresql":
+            return
+        for name in self.counts:
+            self.conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM {name}))"
+            ))
+
+
+def next_id(conn, model) -> int:
+    """既存データと衝突しないIDの開始値を取得"""
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def month_starts(start: date, months: int) -> Iterable[date]:
+    year, month = start.year, start.month
+    for _ in range(months):
+        yield date(year, month, 1)
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def random_name(rng: random.Random) -> str:
+    return rng.choice(LAST_NAMES) + rng.choice(FIRST_NAMES)
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    today = date.today()
+
+    if args.start_month:
+        year, month = map(int, args.start_month.split("-"))
+        start = date(year, month, 1)
+    else:
+        back = args.months // 2
+        year, month = today.year, today.month - back
+        while month < 1:
+            year, month = year - 1, month + 12
+        start = date(year, month, 1)
+
+    print("🔑 パスワードハッシュを計算中（1回のみ）...")
+    password_hash = get_password_hash(args.password)
+
+    # 時間枠の計算結果は条件ごとにキャッシュして使い回す
+    slot_cache: Dict[tuple, dict] = {}
+
+    def slots_for(start_time: str, end_time: str, service: int, break_: int, participants: int) -> dict:
+        key = (start_time, end_time, service, break_, participants)
+        if key not in slot_cache:
+            slot_cache[key] = calculate_time_slots(start_time, end_time, service, break_, participants)
+        return slot_cache[key]
+
+    # DEBUG時のSQLログ出力は大量投入では致命的に遅くなるため無効化
+    engine.echo = False
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # 一括投入中はジャーナル・同期を緩めて書き込みを高速化
+            conn.execute(text("PRAGMA synchronous=OFF"))
+            conn.execute(text("PRAGMA temp_store=MEMORY"))
+            conn.execute(text("PRAGMA cache_size=-200000"))
+
+        writer = BulkWriter(conn, args.batch_size)
+        ids = {model: next_id(conn, model) for model in
+               (User, Company, Staff, Employee, Reservation, ReservationStaff, Attendance, Rating)}
+
+        def take_id(model) -> int:
+            value = ids[model]
+            ids[model] += 1
+            return value
+
+        # ユーザー・企業・社員
+        print("🏢 企業・社員を生成中...")
+        admin_id = take_id(User)
+        writer.add(User, dict(id=admin_id, email=f"{args.prefix}-admin@example.com", password_hash=password_hash,
+                              name="負荷試験 管理者", role=UserRole.ADMIN, is_active=True))
+
+        companies = []
+        employees_by_company: Dict[int, List[dict]] = {}
+        for n in range(1, args.companies + 1):
+            user_id = take_id(User)
+            writer.add(User, dict(id=user_id, email=f"{args.prefix}-company{n}@example.com",
+                                  password_hash=password_hash, name=f"負荷試験企業{n} 担当者",
+                                  role=UserRole.COMPANY, is_active=True))
+            prefecture, city = rng.choice(AREAS)
+            company = dict(
+                id=take_id(Company), user_id=user_id, name=f"負荷試験株式会社{n}",
+                office_name=f"{city}営業所", industry=rng.choice(INDUSTRIES), plan=rng.choice(["6ヶ月", "1年"]),
+                contract_start_date=start.strftime("%Y/%m/%d"), usage_count=0,
+                address=f"{prefecture}{city}{rng.randint(1, 9)}-{rng.randint(1, 30)}-{rng.randint(1, 20)}",
+                contact_person=random_name(rng),
+            )
+            writer.add(Company, company)
+            companies.append(company)
+
+            employees = []
+            for _ in range(args.employees_per_company):
+                employee = dict(id=take_id(Employee), company_id=company["id"], name=random_name(rng),
+                                department=rng.choice(DEPARTMENTS), position=rng.choice(POSITIONS),
+                                is_active=True, line_linked=False)
+                writer.add(Employee, employee)
+                employees.append(employee)
+            employees_by_company[company["id"]] = employees
+
+        # スタッフ
+        print("💆 スタッフを生成中...")
+        staff_ids = []
+        for n in range(1, args.staff + 1):
+            user_id = take_id(User)
+            writer.add(User, dict(id=user_id, email=f"{args.prefix}-staff{n}@example.com",
+                                  password_hash=password_hash, name=f"負荷試験スタッフ{n}",
+                                  role=UserRole.STAFF, is_active=True))
+            staff_id = take_id(Staff)
+            prefecture, city = rng.choice(AREAS)
+            writer.add(Staff, dict(id=staff_id, user_id=user_id, name=random_name(rng),
+                                   address=f"{prefecture}{city}", qualifications="あん摩マッサージ指圧師",
+                                   available_days=rng.choice(["平日", "土日", "全日"]), is_available=True))
+            staff_ids.append(staff_id)
+
+        # 予約・アサイン・勤怠・評価
+        print("📅 予約・アサイン・勤怠・評価を生成中...")
+        for month_start in month_starts(start, args.months):
+            days_in_month = ((month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - month_start).days
+            for company in companies:
+                employees = employees_by_company[company["id"]]
+                for _ in range(args.reservations_per_month):
+                    day = month_start + timedelta(days=rng.randrange(days_in_month))
+                    is_past = day < today
+                    start_hour = rng.randint(9, 15)
+                    start_time = f"{start_hour:02d}:00"
+                    end_time = f"{start_hour + rng.choice([2, 3, 4]):02d}:00"
+                    service_duration = rng.choice([20, 30, 40, 60])
+                    break_duration = rng.choice([0, 5, 10, 15])
+                    participants = rng.randint(2, 10)
+                    hourly_rate = rng.choice([2500, 3000, 3500, 4000])
+
+                    slot_result = slots_for(start_time, end_time, service_duration, break_duration, participants)
+                    if not slot_result["valid"]:
+                        continue
+                    slots = copy.deepcopy(slot_result["slots"])
+
+                    # 社員による枠の予約
+                    booked = rng.sample(employees, min(len(employees), len(slots)))
+                    roster = []
+                    for slot, employee in zip(slots, booked):
+                        if rng.random() >= args.fill_rate:
+                            continue
+                        slot.update(employee_id=employee["id"], employee_name=employee["name"],
+                                    employee_department=employee["department"], is_filled=True)
+                        roster.append((slot["slot"], employee))
+
+                    if is_past:
+                        status = rng.choice([ReservationStatus.SERVICE_COMPLETED, ReservationStatus.EVALUATED,
+                                             ReservationStatus.CLOSED])
+                    else:
+                        status = rng.choice([ReservationStatus.RECRUITING, ReservationStatus.ASSIGNING,
+                                             ReservationStatus.CONFIRMED])
+
+                    reservation_id = take_id(Reservation)
+                    writer.add(Reservation, dict(
+                        id=reservation_id, company_id=company["id"], office_name=company["office_name"],
+                        office_address=company["address"], reservation_date=day.strftime("%Y/%m/%d"),
+                        start_time=start_time, end_time=end_time,
+                        application_deadline=(day - timedelta(days=3)).strftime("%Y/%m/%d 18:00"),
+                        max_participants=participants,
+                        total_duration=calculate_total_minutes(start_time, end_time),
+                        service_duration=service_duration, break_duration=break_duration,
+                        slot_count=slot_result["slot_count"], time_slots=slots, slots_filled=len(roster),
+                        hourly_rate=hourly_rate, status=status,
+                    ))
+                    for slot_number, employee in roster:
+                        writer.add(ReservationEmployee, dict(
+                            reservation_id=reservation_id, employee_id=employee["id"],
+                            slot_number=slot_number, department=employee["department"],
+                        ))
+
+                    # スタッフのアサイン（1予約につき1名が全枠を担当）
+                    if status == ReservationStatus.RECRUITING:
+                        continue
+                    staff_id = rng.choice(staff_ids)
+                    for slot in slots:
+                        if is_past or status == ReservationStatus.CONFIRMED:
+                            assignment_status = AssignmentStatus.CONFIRMED
+                        else:
+                            assignment_status = rng.choice([AssignmentStatus.PENDING, AssignmentStatus.CONFIRMED])
+                        assignment_id = take_id(ReservationStaff)
+                        writer.add(ReservationStaff, dict(
+                            id=assignment_id, reservation_id=reservation_id, staff_id=staff_id,
+                            slot_number=slot["slot"], status=assignment_status, assigned_by=admin_id,
+                        ))
+                        if not is_past:
+                            continue
+
+                        # 勤怠（過去の予約のみ）
+                        slot_hour, slot_minute = map(int, slot["start_time"].split(":"))
+                        scheduled = datetime(day.year, day.month, day.day, slot_hour, slot_minute)
+                        late_minutes = max(0, int(rng.gauss(0, 4)))
+                        clock_in = scheduled + timedelta(minutes=late_minutes)
+                        clock_out = scheduled + timedelta(minutes=slot["duration"] + rng.randint(-3, 8))
+                        writer.add(Attendance, dict(
+                            id=take_id(Attendance), staff_id=staff_id, reservation_id=reservation_id,
+                            assignment_id=assignment_id, work_date=day.strftime("%Y/%m/%d"),
+                            clock_in_time=clock_in, clock_out_time=clock_out, break_minutes=0,
+                            work_hours=int((clock_out - clock_in).total_seconds() // 60),
+                            completion_report=rng.choice(REPORT_TEXTS), completed_at=clock_out,
+                            status=AttendanceStatus.COMPLETED, is_late=late_minutes > 5,
+                            is_early_leave=clock_out < scheduled + timedelta(minutes=slot["duration"]),
+                            is_approved=True, correction_requested=False,
+                        ))
+
+                        # 評価
+                        if rng.random() < args.rating_rate:
+                            scores = [rng.choice([3, 4, 4, 5, 5]) for _ in range(5)]
+                            average = sum(scores) / 5.0
+                            writer.add(Rating, dict(
+                                id=take_id(Rating), reservation_id=reservation_id, company_id=company["id"],
+                                staff_id=staff_id, assignment_id=assignment_id,
+                                cleanliness=scores[0], responsiveness=scores[1], satisfaction=scores[2],
+                                punctuality=scores[3], skill=scores[4], average_rating=average,
+                                rating=average, is_public=True,
+                                created_at=clock_out, updated_at=clock_out,
+                            ))
+
+        writer.flush()
+        writer.reset_sequences()
+
+    # 予約のカウンター・ステータスを投入したアサイン・勤怠・評価から計算し、
+    # 検索API（GET /jobs/open）が読む空き枠インデックスを作成
+    print("🔄 予約のステータス・空き枠インデックスを計算中...")
+    with engine.connect() as conn:
+        status_stats = recompute_reservations(conn)
+        open_slot_stats = rebuild_open_slots(conn)
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+    print("\n🎉 データ生成が完了しました！")
+    for name, count in sorted(writer.counts.items()):
+        print(f"  - {name}: {count:,}行")
+    print(f"  合計: {total:,}行 / {elapsed:.1f}秒（{total / elapsed:,.0f}行/秒）")
+    print(f"  - ステータスを更新した予約: {status_stats['status']:,}件")
+    print(f"  - 空き枠インデックス: {open_slot_stats['inserted']:,}行")
+    print("\n🔑 ログイン情報（パスワードは全員共通）:")
+    print(f"  管理者:   {args.prefix}-admin@example.com / {args.password}")
+    print(f"  企業:     {args.prefix}-company1@example.com 〜 {args.prefix}-company{args.companies}@example.com")
+    print(f"  スタッフ: {args.prefix}-staff1@example.com 〜 {args.prefix}-staff{args.staff}@example.com")
+
+
+if __name__ == "__main__":
+    generate(parse_args())
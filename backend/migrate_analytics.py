@@ -0,0 +1,51 @@
+"""
+分析用の集計テーブル（/analytics/...）のマイグレーションスクリプト
+
+- company_kpi_rollups / staff_kpi_rollups / kpi_touched_days テーブルを作成
+- 全日の日次・月次の集計を作成（以降は定期ジョブ refresh_analytics が差分更新する）
+
+Usage:
+    python migrate_analytics.py
+    python migrate_analytics.py --rebuild   # 既存の集計を捨てて全日を再集計
+"""
+import argparse
+from datetime import datetime, timezone
+from sqlalchemy import inspect
+from app.config import settings
+from app.database import engine
+from app.models.kpi_rollup import CompanyKpiRollup, StaffKpiRollup, KpiTouchedDay
+from app.models.maintenance_state import MaintenanceState
+from app.utils.analytics import WATERMARK_KEY, refresh_analytics
+from app.utils.state_store import save_state
+
+
+def migrate_analytics(rebuild: bool = False):
+    """集計テーブルを作成し、全日を集計"""
+    print("🔧 分析用の集計テーブルのマイグレーション中...")
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for model in (MaintenanceState, CompanyKpiRollup, StaffKpiRollup, KpiTouchedDay):
+            if not inspector.has_table(model.__tablename__):
+                model.__table__.create(bind=conn)
+                print(f"  ✅ {model.__tablename__} テーブルを作成しました")
+            else:
+                print(f"  ℹ️  {model.__tablename__} テーブルは既に存在します")
+        if rebuild:
+            # ウォーターマークを消すと次の実行で全日を集計する
+            save_state(conn, WATERMARK_KEY, None)
+            print("  🔄 全日を再集計します")
+
+    print("📊 集計中...")
+    with engine.connect() as conn:
+        days = refresh_analytics(conn, datetime.now(timezone.utc), settings.SCHEDULER_BATCH_SIZE)
+    print(f"  ✅ {days} 日分を集計しました")
+
+    print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分析用の集計テーブルを作成し、集計します")
+    parser.add_argument("--rebuild", action="store_true", help="既存の集計を捨てて全日を再集計")
+    args = parser.parse_args()
+    migrate_analytics(rebuild=args.rebuild)
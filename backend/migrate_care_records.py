@@ -0,0 +1,143 @@
+"""
+社員のお悩み（concerns）・カルテ（medical_record）に追記された完了報告をケア記録に移行するスクリプト
+
+- employee_care_records テーブルと (employee_id, created_at DESC) のインデックスを作成（未作成の場合）
+- 完了報告のある勤怠から、報告が追記された社員（アサインの枠の employee_id）を求める
+- concerns / medical_record の末尾が報告の本文と一致する部分だけを取り除き、報告ごとにケア記録として登録
+  （作成日時は報告日時、勤怠ID・スタッフIDも記録する）
+- 管理者が書いたお悩み・カルテや、報告と一致しない段落はそのまま残す
+
+取り除いた報告は concerns / medical_record に残らず、ケア記録済みの勤怠は登録しないため、何度実行してもよい。
+
+Usage:
+    python migrate_care_records.py [--dry-run] [--batch-size 500]
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+from sqlalchemy import bindparam, insert, inspect, select, update
+from app.database import engine
+from app.models.attendance import Attendance
+from app.models.employee import Employee
+from app.models.employee_care_record import EmployeeCareRecord
+from app.models.reservation import Reservation
+from app.models.reservation_staff import ReservationStaff
+from app.utils.care_records import strip_appended_reports
+
+
+def load_reports(conn, batch_size: int) -> Dict[int, Dict[int, Tuple[str, int, datetime]]]:
+    """
+    完了報告を、報告が追記された社員ごとに読み込む
+
+    Returns:
+        社員ID -> {勤怠ID: (報告の本文, スタッフID, 報告日時)}
+    """
+    attendance = Attendance.__table__
+    assignments = ReservationStaff.__table__
+    reservations = Reservation.__table__
+    recorded = set(conn.execute(
+        select(EmployeeCareRecord.__table__.c.attendance_id)
+        .where(EmployeeCareRecord.__table__.c.attendance_id.isnot(None))
+    ).scalars())
+
+    reports: Dict[int, Dict[int, Tuple[str, int, datetime]]] = defaultdict(dict)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(
+                attendance.c.id, attendance.c.staff_id, attendance.c.completion_report, attendance.c.completed_at,
+                assignments.c.slot_number, reservations.c.time_slots,
+            )
+            .join(assignments, assignments.c.id == attendance.c.assignment_id)
+            .join(reservations, reservations.c.id == assignments.c.reservation_id)
+            .where(attendance.c.id > last_id, attendance.c.completion_report.isnot(None))
+            .order_by(attendance.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            body = row.completion_report.strip()
+            if not body or row.id in recorded or not row.slot_number:
+                continue
+            # 旧コードと同じく、アサインの枠に登録された社員に追記されていた
+            time_slots = row.time_slots if isinstance(row.time_slots, list) else []
+            slot = next((slot for slot in time_slots if slot.get("slot") == row.slot_number), None)
+            if slot and slot.get("employee_id"):
+                reports[slot["employee_id"]][row.id] = (body, row.staff_id, row.completed_at)
+        if len(rows) < batch_size:
+            break
+    return reports
+
+
+def migrate_care_records(dry_run: bool = False, batch_size: int = 500):
+    """お悩み・カルテに追記された報告をケア記録に移行"""
+    print("🔧 employee_care_records テーブルを確認中...")
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(EmployeeCareRecord.__tablename__):
+            EmployeeCareRecord.__table__.create(bind=conn)
+            print(f"  ✅ {EmployeeCareRecord.__tablename__} テーブルを作成しました")
+        else:
+            print(f"  ℹ️  {EmployeeCareRecord.__tablename__} テーブルは既に存在します")
+
+    employees = Employee.__table__
+    records = EmployeeCareRecord.__table__
+    migrated = created = 0
+    print("🔄 お悩み・カルテに追記された報告をケア記録に移行中...")
+    with engine.connect() as conn:
+        reports = load_reports(conn, batch_size)
+        employee_ids = sorted(reports)
+        for start in range(0, len(employee_ids), batch_size):
+            rows = conn.execute(
+                select(employees.c.id, employees.c.concerns, employees.c.medical_record)
+                .where(employees.c.id.in_(employee_ids[start:start + batch_size]))
+                .order_by(employees.c.id)
+            ).all()
+
+            new_records, changed = [], []
+            for row in rows:
+                candidates = {attendance_id: body for attendance_id, (body, _, _) in reports[row.id].items()}
+                concerns, from_concerns = strip_appended_reports(row.concerns, candidates)
+                medical_record, from_medical = strip_appended_reports(row.medical_record, candidates)
+                if not from_concerns and not from_medical:
+                    continue
+                for attendance_id in sorted(set(from_concerns) | set(from_medical)):
+                    body, staff_id, completed_at = reports[row.id][attendance_id]
+                    new_records.append({
+                        "employee_id": row.id, "attendance_id": attendance_id, "staff_id": staff_id,
+                        "body": body, "created_at": completed_at or datetime.now(timezone.utc),
+                    })
+                changed.append({
+                    "row_id": row.id,
+                    "new_concerns": concerns if from_concerns else row.concerns,
+                    "new_medical_record": medical_record if from_medical else row.medical_record,
+                })
+            migrated += len(changed)
+            created += len(new_records)
+
+            if not dry_run and changed:
+                conn.execute(insert(records), new_records)
+                conn.execute(
+                    update(employees).where(employees.c.id == bindparam("row_id")).values(
+                        concerns=bindparam("new_concerns"), medical_record=bindparam("new_medical_record"),
+                        # 移行による変更で更新日時を進めない
+                        updated_at=employees.c.updated_at,
+                    ),
+                    changed,
+                )
+                conn.commit()
+
+    print(f"\n📊 移行した社員: {migrated} 件（作成したケア記録: {created} 件）")
+    if dry_run:
+        print("\nℹ️  --dry-run のため変更は保存していません")
+    else:
+        print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="お悩み・カルテに追記された報告をケア記録に移行")
+    parser.add_argument("--dry-run", action="store_true", help="変更を保存せずに件数だけ確認")
+    parser.add_argument("--batch-size", type=int, default=500, help="1回に処理する勤怠・社員の数")
+    args = parser.parse_args()
+    migrate_care_records(dry_run=args.dry_run, batch_size=args.batch_size)
@@ -0,0 +1,158 @@
+"""
+予約の参加社員を名簿（reservation_employees）に移行するスクリプト
+
+- reservation_employees テーブルを作成（未作成の場合）
+- 各予約の time_slots に入っている社員を枠番号付きで名簿に登録
+- 旧 employee_names カラム（カンマ区切り）にだけある社員を枠番号なしで名簿に登録
+
+社員は employee_id、なければ企業内の社員名で特定し、見つからない場合は企業の社員として作成する。
+名簿に登録済みの予約は変更しないため、何度実行してもよい。
+予約の notes に追記されていた [社員登録] の行はそのまま残す。
+
+Usage:
+    python migrate_employee_roster.py [--dry-run] [--batch-size 500]
+"""
+import argparse
+import json
+from collections import Counter
+from sqlalchemy import column, inspect, select
+from app.database import engine, SessionLocal
+from app.models.employee import Employee
+from app.models.reservation import Reservation
+from app.models.reservation_employee import ReservationEmployee
+from app.utils.roster import split_names
+
+
+def _slot_members(time_slots):
+    """time_slots に入っている社員の (枠番号, 社員ID, 社員名, 部署, 役職)"""
+    if isinstance(time_slots, str):
+        try:
+            time_slots = json.loads(time_slots)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(time_slots, list):
+        return []
+    return [
+        (index, slot.get("employee_id"), slot["employee_name"],
+         slot.get("employee_department"), slot.get("employee_position"))
+        for index, slot in enumerate(time_slots, start=1)
+        if isinstance(slot, dict) and slot.get("employee_name")
+    ]
+
+
+class EmployeeResolver:
+    """企業・社員名から社員を特定（企業ごとに社員を1回だけ読み込む）"""
+
+    def __init__(self, db):
+        self.db = db
+        self.by_id = {}
+        self.by_name = {}
+        self.created = 0
+
+    def _company(self, company_id):
+        if company_id not in self.by_name:
+            names = self.by_name[company_id] = {}
+            for employee in self.db.query(Employee).filter(Employee.company_id == company_id).order_by(Employee.id):
+                self.by_id[employee.id] = employee
+                names.setdefault(employee.name, employee)
+        return self.by_name[company_id]
+
+    def resolve(self, company_id, employee_id, name, department=None, position=None):
+        names = self._company(company_id)
+        employee = self.by_id.get(employee_id)
+        if employee is not None and employee.company_id == company_id:
+            return employee
+        if name not in names:
+            names[name] = Employee(company_id=company_id, name=name, department=department or "", position=position)
+            self.db.add(names[name])
+            self.created += 1
+        return names[name]
+
+
+def migrate_employee_roster(dry_run: bool = False, batch_size: int = 500):
+    """予約の参加社員を名簿に移行"""
+    print("🔧 reservation_employees テーブルを確認中...")
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table(ReservationEmployee.__tablename__):
+            ReservationEmployee.__table__.create(bind=conn)
+            print(f"  ✅ {ReservationEmployee.__tablename__} テーブルを作成しました")
+        else:
+            print(f"  ℹ️  {ReservationEmployee.__tablename__} テーブルは既に存在します")
+        # employee_names はモデルから外したため、既存DBに残っている場合だけ読み込む
+        has_legacy = "employee_names" in {c["name"] for c in inspector.get_columns(Reservation.__tablename__)}
+
+    reservations = Reservation.__table__
+    roster = ReservationEmployee.__table__
+    columns = [reservations.c.id, reservations.c.company_id, reservations.c.time_slots]
+    if has_legacy:
+        columns.append(column("employee_names"))
+
+    print("🔄 予約の参加社員を移行中...")
+    db = SessionLocal()
+    resolver = EmployeeResolver(db)
+    migrated = entries = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(*columns).select_from(reservations)
+                .where(reservations.c.id > last_id, reservations.c.id.notin_(select(roster.c.reservation_id)))
+                .order_by(reservations.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            for row in rows:
+                registered = set()
+                slot_names = Counter()
+                new_entries = []
+                for slot_number, employee_id, name, department, position in _slot_members(row.time_slots):
+                    employee = resolver.resolve(row.company_id, employee_id, name, department, position)
+                    if id(employee) in registered:
+                        continue
+                    registered.add(id(employee))
+                    slot_names[name] += 1
+                    new_entries.append(ReservationEmployee(
+                        reservation_id=row.id, employee=employee, slot_number=slot_number,
+                        department=department, position=position,
+                    ))
+                for name in split_names(row.employee_names if has_legacy else None):
+                    # 枠に入っている社員（同姓同名の別の社員IDの場合を含む）は登録済み
+                    if slot_names[name] > 0:
+                        slot_names[name] -= 1
+                        continue
+                    employee = resolver.resolve(row.company_id, None, name)
+                    if id(employee) in registered:
+                        continue
+                    registered.add(id(employee))
+                    new_entries.append(ReservationEmployee(reservation_id=row.id, employee=employee))
+                if new_entries:
+                    db.add_all(new_entries)
+                    migrated += 1
+                    entries += len(new_entries)
+
+            if dry_run:
+                db.flush()
+            else:
+                db.commit()
+    finally:
+        if dry_run:
+            db.rollback()
+        db.close()
+
+    print(f"\n📊 名簿を登録した予約: {migrated} 件（登録した社員: {entries} 件）")
+    print(f"   新しく作成した社員: {resolver.created} 件")
+    if dry_run:
+        print("\nℹ️  --dry-run のため変更は保存していません")
+    else:
+        print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="予約の参加社員を名簿に移行")
+    parser.add_argument("--dry-run", action="store_true", help="変更を保存せずに件数だけ確認")
+    parser.add_argument("--batch-size", type=int, default=500, help="1回に処理する予約数")
+    args = parser.parse_args()
+    migrate_employee_roster(dry_run=args.dry_run, batch_size=args.batch_size)
@@ -0,0 +1,30 @@
+"""
+バックグラウンドジョブ（python -m app.worker）用のマイグレーションスクリプト
+
+- jobs テーブルとインデックスを作成
+
+Usage:
+    python migrate_jobs.py
+"""
+from sqlalchemy import inspect
+from app.database import engine
+from app.models.job import Job
+
+
+def migrate_jobs():
+    """ジョブのキューのテーブルを作成"""
+    print("🔧 バックグラウンドジョブ用のマイグレーション中...")
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table(Job.__tablename__):
+            Job.__table__.create(bind=conn)
+            print(f"  ✅ {Job.__tablename__} テーブルを作成しました")
+        else:
+            print(f"  ℹ️  {Job.__tablename__} テーブルは既に存在します")
+
+    print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    migrate_jobs()
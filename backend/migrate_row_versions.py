@@ -0,0 +1,36 @@
+"""
+ETag（If-None-Match）用の行バージョンのマイグレーションスクリプト
+
+- reservations / staff / companies / open_slots に version カラムを追加
+  （更新のたびに1増える。updated_at が秒単位のSQLiteでも、同じ秒の更新でETagが変わる）
+
+Usage:
+    python migrate_row_versions.py
+"""
+from sqlalchemy import inspect, text
+from app.database import engine
+
+TABLES = ("reservations", "staff", "companies", "open_slots")
+
+
+def migrate_row_versions():
+    """各テーブルに version カラムを追加"""
+    print("🔧 行バージョンのマイグレーション中...")
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in TABLES:
+            if not inspector.has_table(table):
+                print(f"  ℹ️  {table} テーブルがありません（init_db.py で作成してください）")
+                continue
+            if "version" in {column["name"] for column in inspector.get_columns(table)}:
+                print(f"  ℹ️  {table}.version は既に存在します")
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+            print(f"  ✅ {table}.version カラムを追加しました")
+
+    print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    migrate_row_versions()
@@ -0,0 +1,88 @@
+"""
+定期処理（オファーの期限切れ・募集期限の締め切り）用のマイグレーションスクリプト
+
+- reservation_staff に expires_at カラムを追加（既存のPENDINGは今から OFFER_EXPIRY_HOURS 時間後）
+- reservations に application_deadline_at カラムを追加（application_deadline の文字列から変換）
+- 上記カラムのインデックスを作成
+- scheduler_leases / maintenance_state テーブルを作成
+
+Usage:
+    python migrate_scheduler.py
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import inspect, text, select, update, bindparam
+from app.config import settings
+from app.database import engine
+from app.models.reservation import Reservation
+from app.models.reservation_staff import ReservationStaff, AssignmentStatus
+from app.models.scheduler_lease import SchedulerLease
+from app.models.maintenance_state import MaintenanceState
+from app.utils.date_utils import parse_local_datetime
+
+
+def _add_column(conn, inspector, table: str, column: str) -> bool:
+    """タイムゾーン付き日時のカラムを追加（既に存在する場合はFalse）"""
+    if column in {c["name"] for c in inspector.get_columns(table)}:
+        print(f"  ℹ️  {table}.{column} は既に存在します")
+        return False
+    column_type = "DATETIME" if conn.dialect.name == "sqlite" else "TIMESTAMP WITH TIME ZONE"
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    print(f"  ✅ {table}.{column} カラムを追加しました")
+    return True
+
+
+def migrate_scheduler():
+    """定期処理用のカラム・インデックス・テーブルを追加"""
+    print("🔧 定期処理用のマイグレーション中...")
+    
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        
+        if _add_column(conn, inspector, "reservation_staff", "expires_at"):
+            # 既存のオファーがすぐに期限切れにならないよう、今から有効期間を与える
+            expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.OFFER_EXPIRY_HOURS)
+            result = conn.execute(
+                update(ReservationStaff.__table__)
+                .where(ReservationStaff.__table__.c.status == AssignmentStatus.PENDING)
+                # 差分同期で全件が再送されないよう updated_at は変更しない
+                .values(expires_at=expires_at, updated_at=ReservationStaff.__table__.c.updated_at)
+            )
+            print(f"  ✅ PENDING のオファー {result.rowcount} 件に有効期限を設定しました")
+        
+        if _add_column(conn, inspector, "reservations", "application_deadline_at"):
+            table = Reservation.__table__
+            rows = conn.execute(
+                select(table.c.id, table.c.application_deadline).where(table.c.application_deadline.isnot(None))
+            ).all()
+            params = [
+                {"row_id": row.id, "deadline_at": parse_local_datetime(row.application_deadline)}
+                for row in rows
+            ]
+            params = [param for param in params if param["deadline_at"] is not None]
+            if params:
+                conn.execute(
+                    update(table).where(table.c.id == bindparam("row_id"))
+                    .values(application_deadline_at=bindparam("deadline_at"), updated_at=table.c.updated_at),
+                    params,
+                )
+            print(f"  ✅ 募集期限 {len(params)} 件を変換しました（解析できなかったもの: {len(rows) - len(params)} 件）")
+        
+        for table in (Reservation.__table__, ReservationStaff.__table__):
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=conn)
+                    print(f"  ✅ インデックス {index.name} を作成しました")
+        
+        for model in (SchedulerLease, MaintenanceState):
+            if not inspector.has_table(model.__tablename__):
+                model.__table__.create(bind=conn)
+                print(f"  ✅ {model.__tablename__} テーブルを作成しました")
+            else:
+                print(f"  ℹ️  {model.__tablename__} テーブルは既に存在します")
+    
+    print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    migrate_scheduler()
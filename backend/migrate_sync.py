@@ -0,0 +1,57 @@
+"""
+差分同期API用のマイグレーションスクリプト
+
+- reservation_staff に updated_at カラムを追加（既存行は assigned_at で初期化）
+- reservations / reservation_staff のモデルに定義されたインデックスのうち未作成のものを作成
+  （updated_at、スタッフ・ステータスの複合インデックス）
+- tombstones（削除記録）テーブルを作成
+
+Usage:
+    python migrate_sync.py
+"""
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.models.reservation import Reservation
+from app.models.reservation_staff import ReservationStaff
+from app.models.tombstone import Tombstone
+
+
+def migrate_sync():
+    """差分同期用のカラム・インデックス・テーブルを追加"""
+    print("🔧 差分同期用のマイグレーション中...")
+    
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_columns = {column["name"] for column in inspector.get_columns("reservation_staff")}
+        
+        if "updated_at" not in existing_columns:
+            # SQLiteはALTER TABLEでCURRENT_TIMESTAMPをデフォルトにできないため、既存行は明示的に埋める
+            column_type = "DATETIME" if conn.dialect.name == "sqlite" else "TIMESTAMP WITH TIME ZONE DEFAULT now()"
+            conn.execute(text(f"ALTER TABLE reservation_staff ADD COLUMN updated_at {column_type}"))
+            conn.execute(text(
+                "UPDATE reservation_staff SET updated_at = COALESCE(assigned_at, CURRENT_TIMESTAMP)"
+            ))
+            print("  ✅ reservation_staff.updated_at カラムを追加しました")
+        else:
+            print("  ℹ️  reservation_staff.updated_at は既に存在します")
+        
+        for table in (Reservation.__table__, ReservationStaff.__table__):
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            table_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for index in table.indexes:
+                # 他のマイグレーションで追加するカラムのインデックスはそちらで作成する
+                if index.name not in existing_indexes and {c.name for c in index.columns} <= table_columns:
+                    index.create(bind=conn)
+                    print(f"  ✅ インデックス {index.name} を作成しました")
+        
+        if not inspector.has_table(Tombstone.__tablename__):
+            Tombstone.__table__.create(bind=conn)
+            print("  ✅ tombstones テーブルを作成しました")
+        else:
+            print("  ℹ️  tombstones テーブルは既に存在します")
+    
+    print("\n✅ マイグレーションが完了しました")
+
+
+if __name__ == "__main__":
+    migrate_sync()
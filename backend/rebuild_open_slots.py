@@ -0,0 +1,42 @@
+"""
+空き枠インデックス（open_slots）を作成・再構築するスクリプト
+
+- open_slots テーブルを作成（未作成の場合）
+- 全予約の time_slots とアサインから空き枠を再計算して差分を反映
+
+既存DBの初回移行と、インデックスがずれた場合の修正に使う。
+
+Usage:
+    python rebuild_open_slots.py [--batch-size 500]
+"""
+import argparse
+from sqlalchemy import inspect
+from app.database import engine
+from app.models.open_slot import OpenSlotIndex
+from app.utils.open_slots import rebuild_open_slots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="空き枠インデックスを再構築")
+    parser.add_argument("--batch-size", type=int, default=500, help="1回に処理する予約数")
+    args = parser.parse_args()
+    
+    print("🔧 open_slots テーブルを確認中...")
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(OpenSlotIndex.__tablename__):
+            OpenSlotIndex.__table__.create(bind=conn)
+            print(f"  ✅ {OpenSlotIndex.__tablename__} テーブルを作成しました")
+        else:
+            print(f"  ℹ️  {OpenSlotIndex.__tablename__} テーブルは既に存在します")
+    
+    print("🔄 空き枠を再計算中...")
+    with engine.connect() as conn:
+        stats = rebuild_open_slots(conn, batch_size=args.batch_size)
+    
+    print(f"\n📊 確認した予約: {stats['reservations']} 件")
+    print(f"   追加: {stats['inserted']} 件 / 更新: {stats['updated']} 件 / 削除: {stats['deleted']} 件")
+    print("\n✅ 再構築が完了しました")
+
+
+if __name__ == "__main__":
+    main()
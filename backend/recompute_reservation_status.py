@@ -0,0 +1,74 @@
+"""
+予約のアサイン件数（カウンター）とステータスを一括で再計算するスクリプト
+
+- reservations に offered_count / confirmed_count / completed_count / rated_count / whole_confirmed_count カラムを追加（未追加の場合）
+- reservations / reservation_staff のインデックスを作成（未作成の場合）
+- アサイン・勤怠・評価からカウンターを集計し、ステータスを自動遷移のルールで再判定
+
+既存DBの初回移行と、カウンターがずれた場合の修正に使う。
+
+Usage:
+    python recompute_reservation_status.py [--dry-run] [--batch-size 500] [--reservation-id 1 ...]
+"""
+import argparse
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.models.reservation import Reservation
+from app.models.reservation_staff import ReservationStaff
+from app.utils.reservation_status import COUNTER_COLUMNS, recompute_reservations
+
+
+def ensure_schema():
+    """カウンターのカラムとインデックスを追加"""
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        columns = {c["name"] for c in inspector.get_columns("reservations")}
+        for column in COUNTER_COLUMNS:
+            if column in columns:
+                continue
+            conn.execute(text(f"ALTER TABLE reservations ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+            columns.add(column)
+            print(f"  ✅ reservations.{column} カラムを追加しました")
+        
+        for table in (Reservation.__table__, ReservationStaff.__table__):
+            table_columns = {c["name"] for c in inspector.get_columns(table.name)} | (
+                columns if table.name == "reservations" else set()
+            )
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                if not {column.name for column in index.columns} <= table_columns:
+                    print(f"  ⚠️  インデックス {index.name} のカラムがないためスキップしました")
+                    continue
+                index.create(bind=conn)
+                print(f"  ✅ インデックス {index.name} を作成しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="予約のカウンターとステータスを再計算")
+    parser.add_argument("--dry-run", action="store_true", help="更新せずに件数だけ表示")
+    parser.add_argument("--batch-size", type=int, default=500, help="1回に処理する予約数")
+    parser.add_argument("--reservation-id", type=int, nargs="+", help="対象の予約ID（省略時は全件）")
+    args = parser.parse_args()
+    
+    print("🔧 スキーマを確認中...")
+    ensure_schema()
+    
+    print("🔄 カウンターとステータスを再計算中...")
+    with engine.connect() as conn:
+        stats = recompute_reservations(
+            conn, args.reservation_id, batch_size=args.batch_size, apply=not args.dry_run
+        )
+    
+    print(f"\n📊 確認した予約: {stats['checked']} 件")
+    print(f"   カウンターを修正: {stats['counters']} 件")
+    print(f"   ステータスを変更: {stats['status']} 件")
+    if args.dry_run:
+        print("\nℹ️  --dry-run のため更新していません")
+    else:
+        print("\n✅ 再計算が完了しました")
+
+
+if __name__ == "__main__":
+    main()
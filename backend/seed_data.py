@@ -319,7 +319,6 @@ def seed_data():
                 application_deadline=application_deadline,
                 max_participants=slot_result['slot_count'],  # 枠数に応じて自動設定
             staff_names="",
-                employee_names="",
                 # 時間枠管理フィールド
                 total_duration=total_duration,
                 service_duration=template["service_duration"],
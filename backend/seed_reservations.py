@@ -9,6 +9,8 @@ sys.path.append(str(Path(__file__).parent))
 
 from app.database import SessionLocal
 from app.models.reservation import Reservation, ReservationStatus
+from app.models.reservation_employee import ReservationEmployee
+from app.utils.roster import resolve_employee, split_names
 
 
 def seed_reservations():
@@ -28,6 +30,13 @@ def seed_reservations():
             db.commit()
             print("🗑️  既存データを削除しました")
         
+        def roster(company_id, employee_names):
+            """社員名から参加社員の名簿を作成（企業に社員がいなければ作成）"""
+            return [
+                ReservationEmployee(employee=resolve_employee(db, company_id, name))
+                for name in split_names(employee_names)
+            ]
+        
         # 予約サンプルデータ
         reservations = [
             Reservation(
@@ -38,7 +47,7 @@ def seed_reservations():
                 start_time="10:00",
                 end_time="12:00",
                 staff_names="山田花子, 佐藤美咲",
-                employee_names="田中太郎, 鈴木次郎",
+                roster=roster(1, "田中太郎, 鈴木次郎"),
                 status=ReservationStatus.CONFIRMED,
                 notes="初回の施術です",
                 requirements="マッサージチェア使用希望",
@@ -51,7 +60,7 @@ def seed_reservations():
                 start_time="14:00",
                 end_time="16:00",
                 staff_names="鈴木健太",
-                employee_names="山田花子, 佐藤次郎",
+                roster=roster(1, "山田花子, 佐藤次郎"),
                 status=ReservationStatus.PENDING,
                 notes="",
                 requirements="",
@@ -64,7 +73,7 @@ def seed_reservations():
                 start_time="13:00",
                 end_time="15:00",
                 staff_names="高橋愛, 田中太郎",
-                employee_names="鈴木美穂, 田中健一, 佐藤三郎",
+                roster=roster(2, "鈴木美穂, 田中健一, 佐藤三郎"),
                 status=ReservationStatus.CONFIRMED,
                 notes="定期訪問",
                 requirements="静かな個室希望",
@@ -77,7 +86,7 @@ def seed_reservations():
                 start_time="10:00",
                 end_time="12:00",
                 staff_names="山田花子",
-                employee_names="鈴木美穂, 田中健一",
+                roster=roster(2, "鈴木美穂, 田中健一"),
                 status=ReservationStatus.COMPLETED,
                 notes="前回と同じ施術内容",
                 requirements="",
@@ -90,7 +99,7 @@ def seed_reservations():
                 start_time="15:00",
                 end_time="17:00",
                 staff_names="佐藤美咲, 鈴木健太",
-                employee_names="田中太郎",
+                roster=roster(1, "田中太郎"),
                 status=ReservationStatus.CANCELLED,
                 notes="クライアント都合によりキャンセル",
                 requirements="",
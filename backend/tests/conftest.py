@@ -0,0 +1,80 @@
+"""
+APIテストの共通フィクスチャ
+
+テストごとにメモリ上のSQLiteにテーブルを作成し、get_db をそのセッションに差し替える。
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import models  # noqa: F401  全モデルをメタデータに登録
+from app.core.security import create_access_token
+from app.database import Base, get_db
+from app.main import app
+from app.models.company import Company
+from app.models.staff import Staff
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = TestingSession()
+
+    def override_get_db():
+        request_session = TestingSession()
+        try:
+            yield request_session
+        finally:
+            request_session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield session
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    # startup（リアルタイム配信・定期処理）は起動しない
+    return TestClient(app)
+
+
+def auth_headers(user: User) -> dict:
+    """ユーザーのアクセストークンのヘッダー"""
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+def create_user(db, email: str, role: UserRole) -> User:
+    user = User(email=email, password_hash="x", name=email.split("@")[0], role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def admin(db) -> User:
+    return create_user(db, "admin@example.com", UserRole.ADMIN)
+
+
+@pytest.fixture
+def company(db) -> Company:
+    user = create_user(db, "company@example.com", UserRole.COMPANY)
+    company = Company(user_id=user.id, name="テスト株式会社", office_name="本社", address="大阪府大阪市北区梅田1-1")
+    db.add(company)
+    db.commit()
+    return company
+
+
+def create_staff(db, email: str, name: str) -> Staff:
+    user = create_user(db, email, UserRole.STAFF)
+    staff = Staff(user_id=user.id, name=name)
+    db.add(staff)
+    db.commit()
+    return staff
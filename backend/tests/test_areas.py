@@ -0,0 +1,39 @@
+"""
+住所の地域（都道府県・市区町村）の読み取りのテスト
+"""
+import pytest
+from app.utils.areas import address_area
+from app.utils.assignment_optimizer import TRAVEL_SAME_CITY, TRAVEL_SAME_PREFECTURE, travel_cost
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("京都府京都市下京区烏丸通七条下る", ("京都府", "京都市")),
+    ("大阪府大阪市北区梅田1-1", ("大阪府", "大阪市")),
+    ("東京都千代田区丸の内1-1", ("東京都", "千代田区")),
+    ("東京都新宿区市谷本村町5-1", ("東京都", "新宿区")),
+    ("東京都町田市森野2-2-22", ("東京都", "町田市")),
+    ("北海道札幌市中央区北1条西2丁目", ("北海道", "札幌市")),
+    ("神奈川県横浜市西区みなとみらい1-1", ("神奈川県", "横浜市")),
+    ("三重県四日市市諏訪町1-5", ("三重県", "四日市市")),
+    ("広島県廿日市市下平良1-11-1", ("広島県", "廿日市市")),
+    ("千葉県市川市八幡1-1-1", ("千葉県", "市川市")),
+    ("千葉県市原市国分寺台中央1-1-1", ("千葉県", "市原市")),
+    ("長野県大町市大町3887", ("長野県", "大町市")),
+    ("東京都東村山市本町1-2-3", ("東京都", "東村山市")),
+    ("北海道虻田郡ニセコ町字富士見47", ("北海道", "虻田郡ニセコ町")),
+    ("山梨県西八代郡市川三郷町市川大門1790-3", ("山梨県", "西八代郡市川三郷町")),
+    ("長野県軽井沢町軽井沢1323", ("長野県", "軽井沢町")),
+    ("和歌山県和歌山市七番丁23", ("和歌山県", "和歌山市")),
+    ("鹿児島県 鹿児島市 山下町11-1", ("鹿児島県", "鹿児島市")),
+    ("千代田区丸の内1-1", ("", "千代田区")),
+    ("", ("", "")),
+    (None, ("", "")),
+])
+def test_address_area(address, expected):
+    assert address_area(address) == expected
+
+
+def test_travel_cost_uses_prefecture_and_city():
+    assert travel_cost("京都府京都市下京区1-1", "京都府京都市中京区2-2") == TRAVEL_SAME_CITY
+    assert travel_cost("京都府京都市下京区1-1", "京都府宇治市宇治1-1") == TRAVEL_SAME_PREFECTURE
+    assert travel_cost("三重県四日市市諏訪町1-5", "三重県四日市市安島1-1") == TRAVEL_SAME_CITY
@@ -0,0 +1,53 @@
+"""
+一括取得API（/staff/batch・/companies/batch・/reservations/batch）のテスト
+"""
+from app.main import app
+from app.models.reservation import Reservation
+from .conftest import auth_headers, create_staff
+
+
+def test_staff_batch_returns_map_with_null_for_missing_ids(client, db, admin):
+    staff = create_staff(db, "staff@example.com", "山田")
+    response = client.get(
+        "/api/v1/staff/batch", headers=auth_headers(admin), params={"ids": f"{staff.id},9999", "fields": "name"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {str(staff.id): {"id": staff.id, "name": "山田"}, "9999": None}
+
+    # 一覧は引き続きリストを返す
+    response = client.get("/api/v1/staff", headers=auth_headers(admin))
+    assert [item["id"] for item in response.json()] == [staff.id]
+
+
+def test_companies_and_reservations_batch(client, db, admin, company):
+    reservation = Reservation(
+        company_id=company.id, office_name="本社", reservation_date="2030-01-10", start_time="10:00",
+        end_time="11:00", max_participants=1,
+    )
+    db.add(reservation)
+    db.commit()
+
+    response = client.get("/api/v1/companies/batch", headers=auth_headers(admin), params={"ids": str(company.id)})
+    assert response.status_code == 200
+    assert response.json()[str(company.id)]["id"] == company.id
+
+    response = client.get(
+        "/api/v1/reservations/batch", headers=auth_headers(admin), params={"ids": f"{reservation.id},0"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body[str(reservation.id)]["office_name"] == "本社" and body["0"] is None
+
+    etag = response.headers["etag"]
+    response = client.get(
+        "/api/v1/reservations/batch", headers={**auth_headers(admin), "If-None-Match": etag},
+        params={"ids": f"{reservation.id},0"},
+    )
+    assert response.status_code == 304
+
+
+def test_batch_routes_document_map_responses():
+    paths = app.openapi()["paths"]
+    for path in ("/api/v1/staff/batch", "/api/v1/companies/batch", "/api/v1/reservations/batch"):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["type"] == "object" and "additionalProperties" in schema
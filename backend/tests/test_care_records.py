@@ -0,0 +1,80 @@
+"""
+社員のケア記録APIのテスト
+"""
+import pytest
+from app.models.employee import Employee
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.reservation_employee import ReservationEmployee
+from app.models.reservation_staff import ReservationStaff, AssignmentStatus
+from app.utils.care_records import add_care_record
+from .conftest import auth_headers, create_staff
+
+
+@pytest.fixture
+def employee(db, company):
+    employee = Employee(company_id=company.id, name="田中太郎", department="営業部")
+    db.add(employee)
+    db.commit()
+    add_care_record(db, employee.id, "肩こりが強い")
+    db.commit()
+    return employee
+
+
+def assign(db, company, employee, staff, status):
+    """社員が名簿に載っている予約に、スタッフのアサインを作成"""
+    reservation = Reservation(
+        company_id=company.id, office_name="本社", reservation_date="2030/01/10",
+        start_time="10:00", end_time="11:00", status=ReservationStatus.ASSIGNING,
+    )
+    db.add(reservation)
+    db.flush()
+    db.add(ReservationEmployee(reservation_id=reservation.id, employee_id=employee.id, slot_number=1))
+    db.add(ReservationStaff(reservation_id=reservation.id, staff_id=staff.id, slot_number=1, status=status))
+    db.commit()
+
+
+def care_records(client, employee, user):
+    return client.get(f"/api/v1/employees/{employee.id}/care-records", headers=auth_headers(user))
+
+
+def test_admin_can_read_care_records(client, admin, employee):
+    response = care_records(client, employee, admin)
+    assert response.status_code == 200
+    assert [item["body"] for item in response.json()["items"]] == ["肩こりが強い"]
+
+
+@pytest.mark.parametrize("status", [AssignmentStatus.CONFIRMED, AssignmentStatus.COMPLETED])
+def test_staff_who_served_the_employee_can_read_care_records(client, db, company, employee, status):
+    staff = create_staff(db, "staff@example.com", "山田")
+    assign(db, company, employee, staff, status)
+    response = care_records(client, employee, staff.user)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+@pytest.mark.parametrize("status", [None, AssignmentStatus.PENDING, AssignmentStatus.REJECTED])
+def test_other_staff_cannot_read_care_records(client, db, company, employee, status):
+    staff = create_staff(db, "staff@example.com", "山田")
+    if status is not None:
+        assign(db, company, employee, staff, status)
+    assert care_records(client, employee, staff.user).status_code == 403
+
+
+def test_company_cannot_read_care_records(client, company, employee):
+    assert care_records(client, employee, company.user).status_code == 403
+
+
+def test_employee_list_hides_summaries_of_employees_the_staff_has_not_served(client, db, company, employee):
+    other = Employee(company_id=company.id, name="鈴木花子", department="総務部")
+    db.add(other)
+    db.flush()
+    add_care_record(db, other.id, "腰痛")
+    db.commit()
+    staff = create_staff(db, "staff@example.com", "山田")
+    assign(db, company, employee, staff, AssignmentStatus.CONFIRMED)
+
+    response = client.get("/api/v1/employees", headers=auth_headers(staff.user))
+    assert response.status_code == 200
+    summaries = {item["name"]: item["latest_care_record"] for item in response.json()}
+    assert summaries["田中太郎"]["summary"] == "肩こりが強い"
+    assert summaries["鈴木花子"] is None
@@ -0,0 +1,125 @@
+"""
+給与計算のテスト（出勤打刻 → 退勤打刻 → 完了報告 → 給与明細）
+"""
+from datetime import datetime
+import pytest
+from app.api.v1 import attendance as attendance_api
+from app.config import settings
+from app.models.attendance import Attendance
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.reservation_staff import ReservationStaff, AssignmentStatus
+from .conftest import auth_headers, create_staff
+
+HOURLY_RATE = 3000
+
+
+class FrozenClock(datetime):
+    """打刻時刻を固定する（attendance モジュールの datetime を差し替える）"""
+    current = datetime(2030, 1, 10, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(attendance_api, "datetime", FrozenClock)
+    return FrozenClock
+
+
+@pytest.fixture
+def staff(db):
+    return create_staff(db, "staff@example.com", "山田")
+
+
+def create_assignment(db, company, staff, day: str, status=AssignmentStatus.CONFIRMED) -> ReservationStaff:
+    """60分の枠1つの予約に、スタッフの確定済みアサインを作成"""
+    reservation = Reservation(
+        company_id=company.id, office_name="本社", reservation_date=day, start_time="10:00", end_time="11:00",
+        hourly_rate=HOURLY_RATE, service_duration=60, max_participants=1,
+        time_slots=[{"slot": 1, "start_time": "10:00", "end_time": "11:00", "duration": 60}],
+        status=ReservationStatus.CONFIRMED, offered_count=1, confirmed_count=1,
+    )
+    db.add(reservation)
+    db.flush()
+    assignment = ReservationStaff(reservation_id=reservation.id, staff_id=staff.id, slot_number=1, status=status)
+    db.add(assignment)
+    db.commit()
+    return assignment
+
+
+def work(client, clock, staff, assignment, minutes: int):
+    """打刻から完了報告までを行う"""
+    headers = auth_headers(staff.user)
+    clock.current = datetime(2030, 1, 10, 10, 0)
+    response = client.post("/api/v1/attendance/check-in", headers=headers, json={
+        "assignment_id": assignment.id, "reservation_id": assignment.reservation_id,
+    })
+    assert response.status_code == 200
+    attendance_id = response.json()["id"]
+
+    clock.current = datetime(2030, 1, 10, 10, minutes) if minutes < 60 else datetime(2030, 1, 10, 11, minutes - 60)
+    assert client.post("/api/v1/attendance/check-out", headers=headers, json={
+        "attendance_id": attendance_id,
+    }).status_code == 200
+    response = client.post("/api/v1/attendance/complete", headers=headers, json={
+        "attendance_id": attendance_id, "report": "特になし",
+    })
+    assert response.status_code == 200
+
+
+def payslip(client, admin, staff) -> dict:
+    response = client.get(
+        "/api/v1/payroll", headers=auth_headers(admin), params={"year": 2030, "month": 1, "ids": str(staff.id)}
+    )
+    assert response.status_code == 200
+    return response.json()[0]
+
+
+def test_reported_assignment_is_paid_with_overtime(client, db, clock, admin, company, staff):
+    assignment = create_assignment(db, company, staff, "2030/01/10")
+    work(client, clock, staff, assignment, minutes=75)
+
+    db.refresh(assignment)
+    assert assignment.status == AssignmentStatus.COMPLETED
+
+    slip = payslip(client, admin, staff)
+    overtime_pay = int(15 * HOURLY_RATE * settings.PAYROLL_OVERTIME_RATE / 60)
+    assert slip["assignment_count"] == 1
+    assert slip["scheduled_minutes"] == 60
+    assert slip["worked_minutes"] == 75
+    assert slip["overtime_minutes"] == 15
+    assert slip["base_pay"] == HOURLY_RATE
+    assert slip["overtime_pay"] == overtime_pay
+    assert slip["total_pay"] == HOURLY_RATE + overtime_pay
+
+
+def test_late_reported_assignment_is_deducted(client, db, clock, admin, company, staff):
+    assignment = create_assignment(db, company, staff, "2030/01/10")
+    work(client, clock, staff, assignment, minutes=45)
+    attendance = db.query(Attendance).filter(Attendance.assignment_id == assignment.id).one()
+    attendance.is_late = True
+    db.commit()
+
+    slip = payslip(client, admin, staff)
+    assert slip["late_count"] == 1
+    assert slip["shortfall_minutes"] == 15
+    assert slip["deductions"] == 15 * HOURLY_RATE // 60
+    assert slip["total_pay"] == HOURLY_RATE - 15 * HOURLY_RATE // 60
+
+
+def test_reported_and_unreported_assignments_are_both_paid(client, db, clock, admin, company, staff):
+    reported = create_assignment(db, company, staff, "2030/01/10")
+    create_assignment(db, company, staff, "2030/01/29")
+    work(client, clock, staff, reported, minutes=60)
+
+    slip = payslip(client, admin, staff)
+    assert slip["assignment_count"] == 2
+    assert slip["base_pay"] == 2 * HOURLY_RATE
+
+    earnings = client.get(
+        f"/api/v1/staff/{staff.id}/earnings", headers=auth_headers(admin), params={"year": 2030, "month": 1}
+    ).json()
+    assert earnings["assignment_count"] == 2
+    assert earnings["total_earnings"] == 2 * HOURLY_RATE
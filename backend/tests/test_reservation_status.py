@@ -0,0 +1,91 @@
+"""
+予約ステータスの自動遷移のテスト
+"""
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.reservation_staff import ReservationStaff, AssignmentStatus
+from app.utils.reservation_status import COUNTER_COLUMNS, recompute_reservations
+from .conftest import auth_headers, create_staff
+
+TIME_SLOTS = [
+    {"slot": 1, "start_time": "10:00", "end_time": "10:30", "duration": 30},
+    {"slot": 2, "start_time": "10:30", "end_time": "11:00", "duration": 30},
+    {"slot": 3, "start_time": "11:00", "end_time": "11:30", "duration": 30},
+]
+
+
+def create_reservation(db, company) -> Reservation:
+    reservation = Reservation(
+        company_id=company.id, office_name="本社", reservation_date="2030-01-10", start_time="10:00",
+        end_time="11:30", hourly_rate=3000, service_duration=30, max_participants=3, time_slots=TIME_SLOTS,
+    )
+    db.add(reservation)
+    db.commit()
+    return reservation
+
+
+def reservation_status(db, reservation) -> ReservationStatus:
+    db.expire_all()
+    return db.get(Reservation, reservation.id).status
+
+
+def test_whole_reservation_assignment_covers_all_slots(client, db, admin, company):
+    """枠指定なし（staff_ids）で一括オファーしたアサインが確定すると、複数枠の予約も確定・完了になる"""
+    staff = create_staff(db, "staff@example.com", "山田")
+    reservation = create_reservation(db, company)
+
+    response = client.post(
+        f"/api/v1/reservations/{reservation.id}/assignments/bulk", headers=auth_headers(admin),
+        json={"staff_ids": [staff.id], "notify": False},
+    )
+    assert response.status_code == 201
+    assert reservation_status(db, reservation) == ReservationStatus.ASSIGNING
+
+    assignment = db.query(ReservationStaff).filter(ReservationStaff.reservation_id == reservation.id).one()
+    assert assignment.slot_number is None
+    response = client.post(f"/api/v1/assignments/{assignment.id}/accept", headers=auth_headers(staff.user))
+    assert response.status_code == 200
+    assert reservation_status(db, reservation) == ReservationStatus.CONFIRMED
+
+    response = client.put(
+        f"/api/v1/assignments/{assignment.id}", headers=auth_headers(admin),
+        json={"status": AssignmentStatus.COMPLETED.value},
+    )
+    assert response.status_code == 200
+    assert reservation_status(db, reservation) == ReservationStatus.SERVICE_COMPLETED
+
+
+def test_slot_assignments_confirm_only_when_all_slots_are_covered(client, db, admin, company):
+    staffs = [create_staff(db, f"staff{number}@example.com", f"スタッフ{number}") for number in (1, 2, 3)]
+    reservation = create_reservation(db, company)
+    for number, staff in enumerate(staffs, start=1):
+        db.add(ReservationStaff(
+            reservation_id=reservation.id, staff_id=staff.id, slot_number=number, status=AssignmentStatus.PENDING,
+        ))
+    db.commit()
+    assignments = db.query(ReservationStaff).order_by(ReservationStaff.slot_number).all()
+
+    for staff, assignment in zip(staffs[:2], assignments):
+        assert client.post(
+            f"/api/v1/assignments/{assignment.id}/accept", headers=auth_headers(staff.user)
+        ).status_code == 200
+    assert reservation_status(db, reservation) == ReservationStatus.RECRUITING  # オファーはカウンター外で作成
+
+    # カウンターを再計算すると、3枠中2枠の確定は手配中
+    engine = db.get_bind()
+    with engine.connect() as conn:
+        recompute_reservations(conn, [reservation.id])
+    assert reservation_status(db, reservation) == ReservationStatus.ASSIGNING
+
+    # 枠指定なしに変えると全枠を受け持つ
+    response = client.put(f"/api/v1/assignments/{assignments[1].id}", headers=auth_headers(admin), json={
+        "slot_number": None,
+    })
+    assert response.status_code == 200
+    assert reservation_status(db, reservation) == ReservationStatus.CONFIRMED
+
+    db.expire_all()
+    counters = {column: getattr(db.get(Reservation, reservation.id), column) for column in COUNTER_COLUMNS}
+    with engine.connect() as conn:
+        stats = recompute_reservations(conn, [reservation.id])
+    assert stats["counters"] == 0 and stats["status"] == 0
+    assert counters["whole_confirmed_count"] == 1
@@ -0,0 +1,80 @@
+"""
+予約データの整合性チェック・修正スクリプト
+
+旧 fix_reservation_consistency.py / fix_time_slots_filled.py / fix_reservation_slots.py を統合したもの。
+チェック内容は app/utils/consistency.py を参照。
+
+Usage:
+    python verify_consistency.py                  # 差分の表示のみ（DBは変更しない）
+    python verify_consistency.py --fix            # 修正を書き込む
+    python verify_consistency.py --fix --incremental  # 前回の --fix 実行以降に更新された予約のみ
+    python verify_consistency.py --reservation-id 12 --reservation-id 13
+"""
+import argparse
+import sys
+import time
+from app.database import engine
+from app.models.maintenance_state import MaintenanceState
+from app.utils.consistency import verify_consistency, describe_change
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="予約データの整合性をチェックします")
+    parser.add_argument("--fix", action="store_true", help="修正をDBに書き込む（指定しない場合は差分の表示のみ）")
+    parser.add_argument("--incremental", action="store_true", help="前回実行以降に更新された予約のみチェック")
+    parser.add_argument("--batch-size", type=int, default=500, help="1バッチの件数")
+    parser.add_argument("--reservation-id", type=int, action="append", help="チェックする予約ID（複数指定可）")
+    parser.add_argument("--quiet", action="store_true", help="予約ごとの差分を表示しない")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    engine.echo = False
+    # 既存DBにも前回実行時刻の保存先を用意する
+    MaintenanceState.__table__.create(bind=engine, checkfirst=True)
+
+    print("=" * 80)
+    print("予約データの整合性チェック" + ("と修正" if args.fix else "（差分表示のみ）"))
+    print("=" * 80)
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        report = verify_consistency(
+            conn,
+            apply=args.fix,
+            incremental=args.incremental,
+            batch_size=args.batch_size,
+            reservation_ids=args.reservation_id,
+        )
+    elapsed = time.perf_counter() - started
+
+    if report.since:
+        print(f"🕒 {report.since.isoformat()} 以降に更新された予約のみチェックしました")
+
+    if not args.quiet:
+        for fix in report.fixes:
+            print(f"\n予約ID {fix.reservation_id}:")
+            for column, (old, new) in fix.changes.items():
+                print(f"  🔧 {describe_change(column, old, new)}")
+        for issue in report.issues:
+            print(f"\n予約ID {issue.reservation_id}:")
+            print(f"  ❌ [{issue.kind}] {issue.message}")
+
+    print()
+    print("=" * 80)
+    print(f"チェック件数: {report.checked}件（{elapsed:.1f}秒）")
+    if args.fix:
+        print(f"✅ 修正件数: {len(report.fixes)}件")
+    else:
+        print(f"🔍 修正が必要な予約: {len(report.fixes)}件（--fix で書き込みます）")
+    print(f"{'⚠️ ' if report.issues else '✅'} 自動修正できない不整合: {len(report.issues)}件")
+    print("=" * 80)
+
+    # 修正が残っている場合は終了コード1（cronなどでの検知用）
+    remaining = report.issues or (report.fixes and not args.fix)
+    sys.exit(1 if remaining else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ import {
   Staff,
   Assignment,
   Employee,
+  CareRecord,
   getAdminStatusLabel,
   getStatusBadgeClass
 } from '@/lib/api'
@@ -46,6 +47,24 @@ export default function AdminReservationDetailPage() {
   const [selectedEmployee, setSelectedEmployee] = useState<Employee | null>(null)
   const [editingEmployee, setEditingEmployee] = useState<Partial<Employee>>({})
   const [savingEmployee, setSavingEmployee] = useState(false)
+  // 社員のケア記録（完了報告の特記事項、新しい順）
+  const [careRecords, setCareRecords] = useState<CareRecord[]>([])
+  const [careRecordsCursor, setCareRecordsCursor] = useState<string | null>(null)
+  const [loadingCareRecords, setLoadingCareRecords] = useState(false)
+
+  // ケア記録を取得（cursor を指定した場合は続きを追加）
+  const loadCareRecords = async (employeeId: number, cursor?: string) => {
+    try {
+      setLoadingCareRecords(true)
+      const page = await employeesApi.getCareRecords(employeeId, cursor)
+      setCareRecords(prev => (cursor ? [...prev, ...page.items] : page.items))
+      setCareRecordsCursor(page.next_cursor ?? null)
+    } catch (err) {
+      console.error('ケア記録取得エラー:', err)
+    } finally {
+      setLoadingCareRecords(false)
+    }
+  }
 
   // データ取得
   useEffect(() => {
@@ -633,6 +652,9 @@ export default function AdminReservationDetailPage() {
                         medical_record: employee.medical_record || ''
                       })
                       setShowEmployeeModal(true)
+                      setCareRecords([])
+                      setCareRecordsCursor(null)
+                      loadCareRecords(employeeId)
                     } catch (err) {
                       alert('社員情報の取得に失敗しました: ' + (err instanceof Error ? err.message : ''))
                     }
@@ -1083,6 +1105,38 @@ export default function AdminReservationDetailPage() {
                     disabled={savingEmployee}
                   ></textarea>
                 </div>
+
+                <div className="mb-3">
+                  <label className="form-label">ケア記録（完了報告の特記事項）</label>
+                  {careRecords.length === 0 && !loadingCareRecords && (
+                    <div className="form-control-plaintext text-muted">記録はありません</div>
+                  )}
+                  <ul className="list-group">
+                    {careRecords.map((record) => (
+                      <li key={record.id} className="list-group-item">
+                        <div className="small text-muted mb-1">
+                          {new Date(record.created_at).toLocaleString('ja-JP')}
+                          {record.staff_name && ` ・ ${record.staff_name}`}
+                        </div>
+                        <div style={{ whiteSpace: 'pre-wrap' }}>{record.body}</div>
+                      </li>
+                    ))}
+                  </ul>
+                  {loadingCareRecords && (
+                    <div className="text-center py-2">
+                      <span className="spinner-border spinner-border-sm"></span>
+                    </div>
+                  )}
+                  {careRecordsCursor && !loadingCareRecords && (
+                    <button
+                      type="button"
+                      className="btn btn-link btn-sm px-0"
+                      onClick={() => loadCareRecords(selectedEmployee.id, careRecordsCursor)}
+                    >
+                      さらに表示
+                    </button>
+                  )}
+                </div>
               </div>
               <div className="modal-footer">
                 <button
@@ -55,22 +55,25 @@ export default function CompanyReservationDetailPage() {
       setEmployees(employeesData)
       setAssignments(assignmentsData)
       
-      // 評価済みのスタッフIDをチェック
+      // 評価済みのスタッフIDをまとめてチェック
       const evaluatedSet = new Set<number>()
-      const checkPromises = assignmentsData
+      const confirmedStaffIds = assignmentsData
         .filter(a => a.status === 'confirmed')
-        .map(async (assignment) => {
-          try {
-            const checkResult = await ratingsApi.checkExists(reservationId, assignment.staff_id)
-            if (checkResult.exists) {
-              evaluatedSet.add(assignment.staff_id)
+        .map(a => a.staff_id)
+      if (confirmedStaffIds.length > 0) {
+        try {
+          const checkResults = await ratingsApi.checkExistsBatch(
+            confirmedStaffIds.map(staffId => ({ reservationId, staffId }))
+          )
+          confirmedStaffIds.forEach(staffId => {
+            if (checkResults[`${reservationId}:${staffId}`]?.exists) {
+              evaluatedSet.add(staffId)
             }
-          } catch (err) {
-            console.error(`評価チェックエラー (staff_id: ${assignment.staff_id}):`, err)
-          }
-        })
-      
-      await Promise.all(checkPromises)
+          })
+        } catch (err) {
+          console.error('評価チェックエラー:', err)
+        }
+      }
       setEvaluatedStaffIds(evaluatedSet)
     } catch (err) {
       setError(err instanceof Error ? err.message : '予約データの取得に失敗しました')
@@ -391,6 +391,23 @@ export interface EmployeeCreate {
   medical_record?: string;
 }
 
+// ケア記録（完了報告の特記事項、管理者・担当したスタッフのみ参照可能）
+export interface CareRecord {
+  id: number;
+  employee_id: number;
+  attendance_id?: number;
+  staff_id?: number;
+  staff_name?: string;
+  body: string;
+  created_at: string;
+}
+
+export interface CareRecordList {
+  items: CareRecord[];  // 新しい順
+  next_cursor?: string;  // 次のページの cursor（最終ページはnull）
+  has_more: boolean;
+}
+
 export const employeesApi = {
   getAll: (companyId?: number, skip = 0, limit = 100) => {
     const params = new URLSearchParams({ skip: skip.toString(), limit: limit.toString() });
@@ -398,6 +415,11 @@ export const employeesApi = {
     return request<Employee[]>(`/employees?${params.toString()}`);
   },
   getById: (id: number) => request<Employee>(`/employees/${id}`),
+  getCareRecords: (id: number, cursor?: string, limit = 20) => {
+    const params = new URLSearchParams({ limit: limit.toString() });
+    if (cursor) params.append('cursor', cursor);
+    return request<CareRecordList>(`/employees/${id}/care-records?${params.toString()}`);
+  },
   create: (data: EmployeeCreate) =>
     request<Employee>('/employees', {
       method: 'POST',
@@ -813,6 +835,11 @@ export const ratingsApi = {
     request<{ exists: boolean; rating_id: number | null }>(
       `/ratings/check/${reservationId}/${staffId}`
     ),
+  // 複数の予約・スタッフの組み合わせを1回でチェック（キーは "予約ID:スタッフID"、最大100件）
+  checkExistsBatch: (pairs: { reservationId: number; staffId: number }[]) =>
+    request<Record<string, { exists: boolean; rating_id: number | null }>>(
+      `/ratings/check?pairs=${pairs.map(p => `${p.reservationId}:${p.staffId}`).join(',')}`
+    ),
   create: (data: RatingCreate) =>
     request<Rating>('/ratings', {
       method: 'POST',